@@ -15,6 +15,7 @@ Endpoints:
 - POST /analyze/reports/{name}/run - Run a pre-built report
 """
 
+import asyncio
 import io
 import json
 import logging
@@ -76,6 +77,7 @@ def detect_column_types(df) -> list:
     import pandas as pd
     
     columns = []
+    nullable = df.isna().any()  # one pass for all columns
     for col in df.columns:
         dtype = str(df[col].dtype)
         sample_values = df[col].dropna().head(3).tolist()
@@ -95,13 +97,43 @@ def detect_column_types(df) -> list:
             "name": str(col),
             "type": col_type,
             "dtype": dtype,
-            "nullable": bool(df[col].isna().any()),
+            "nullable": bool(nullable[col]),
             "sample_values": [str(v) for v in sample_values]
         })
     
     return columns
 
 
+def validate_dataset(df, dataset_name: str, expectations: Optional[str]) -> Optional[dict]:
+    """
+    Run upload expectations (DataValidator.from_schema format) as one
+    compiled scan; returns the suite as a dict, or None if none given.
+    """
+    if not expectations:
+        return None
+    from src.analytics.quality.validator import DataValidator
+
+    try:
+        schema = json.loads(expectations)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid expectations JSON: {e}")
+    if not isinstance(schema, dict):
+        raise HTTPException(status_code=400, detail="Expectations must be a JSON object")
+
+    sample = schema.get("sample")
+    suite = DataValidator.from_schema(dataset_name, schema).validate(df, sample=sample)
+    return suite.to_dict()
+
+
+def invalidate_dashboards(dataset_name: str, df=None) -> None:
+    """Mark dashboard charts built from this dataset stale, re-rendering them from ``df`` if given (best effort)."""
+    try:
+        from src.analytics.engine.dashboard_service import get_dashboard_service
+        get_dashboard_service().invalidate_dataset(dataset_name.lower(), df)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate dashboards for {dataset_name}: {e}")
+
+
 def sanitize_table_name(name: str) -> str:
     """Create a safe table name from dataset name"""
     import re
@@ -161,7 +193,8 @@ def _enforce_sql_guard(sql: str, allowed_tables: set[str], limit: int) -> tuple[
 async def upload_dataset(
     file: UploadFile = File(...),
     name: str = Form(None),
-    description: str = Form(None)
+    description: str = Form(None),
+    expectations: str = Form(None),
 ):
     """
     Upload a CSV or XLSX file as a dataset for analysis.
@@ -169,7 +202,9 @@ async def upload_dataset(
     The file will be:
     1. Stored in MinIO
     2. Schema detected (columns, types)
-    3. Available for NL2SQL queries
+    3. Validated against optional ``expectations`` (DataValidator.from_schema
+       JSON, plus an optional "sample" rows/fraction)
+    4. Available for NL2SQL queries
     """
     import pandas as pd
     from src.storage import upload_document_v2
@@ -200,6 +235,9 @@ async def upload_dataset(
     
     # Generate safe table name
     dataset_name = name or filename.rsplit('.', 1)[0]
+    
+    # Data quality: all rules answered from one vectorized scan per column
+    quality = await asyncio.to_thread(validate_dataset, df, dataset_name, expectations)
     table_name = sanitize_table_name(dataset_name)
     
     # Upload to MinIO
@@ -243,6 +281,8 @@ async def upload_dataset(
         
         # Audit logging skipped (schema mismatch)
     
+    await asyncio.to_thread(invalidate_dashboards, dataset_name, df)
+    
     return {
         "success": True,
         "dataset": {
@@ -254,6 +294,7 @@ async def upload_dataset(
             "table_name": table_name,
             "status": "ready"
         },
+        "quality": quality,
         "message": f"Dataset uploaded successfully with {row_count} rows and {len(columns)} columns"
     }
 
@@ -386,6 +427,7 @@ async def delete_dataset(dataset_id: str) -> dict:
         
         # Delete from database
         await conn.execute("DELETE FROM datasets WHERE id = $1", dataset_id)
+        await asyncio.to_thread(invalidate_dashboards, row["name"])
         
         # Audit logging skipped (schema mismatch)
         
@@ -3,10 +3,13 @@ ERPX AI Accounting - Config Routes
 ==================================
 Endpoints:
 - GET /config - Get public configuration for UI
-- POST /import/server - Import files from server directory (admin only)
+- POST /import/server - Import files from server directory (admin only, background)
+- GET /import/server/{import_id} - Import progress
+- POST /import/server/{import_id}/resume - Resume an interrupted import
 - GET /import/server/list - List available server directories
 """
 
+import asyncio
 import logging
 import os
 from pathlib import Path
@@ -188,12 +191,13 @@ async def import_from_server(
     
     Files are:
     1. Validated against allowed paths
-    2. Copied to MinIO storage
-    3. Created as new document jobs
+    2. Checked against already-imported content (checksum)
+    3. Streamed to MinIO storage
+    4. Created as new document jobs
+
+    The import runs in the background; poll GET /import/server/{import_id}.
     """
-    import uuid
-    from datetime import datetime
-    from src.storage import upload_document_v2
+    from api.server_import import list_import_files, start_import
     from src.db import get_pool as get_db_pool
 
     # Role check
@@ -216,12 +220,7 @@ async def import_from_server(
         raise HTTPException(status_code=404, detail="Directory not found")
 
     # Collect files
-    if body.recursive:
-        files = list(dir_path.rglob(body.file_pattern))
-    else:
-        files = list(dir_path.glob(body.file_pattern))
-    
-    files = [f for f in files if f.is_file()]
+    files = await asyncio.to_thread(list_import_files, dir_path, body.file_pattern, body.recursive)
 
     if not files:
         return {
@@ -233,86 +232,59 @@ async def import_from_server(
         }
 
     # Check count limit
-    if len(files) > settings.MAX_UPLOAD_COUNT:
+    if len(files) > settings.SERVER_IMPORT_MAX_FILES:
         raise HTTPException(
             status_code=400, 
-            detail=f"Too many files ({len(files)}). Maximum is {settings.MAX_UPLOAD_COUNT}"
+            detail=f"Too many files ({len(files)}). Maximum is {settings.SERVER_IMPORT_MAX_FILES}"
         )
 
     pool = await get_db_pool()
     if not pool:
         raise HTTPException(status_code=503, detail="Database unavailable")
 
-    imported = []
-    errors = []
-
-    for file_path in files:
-        try:
-            # Determine content type
-            ext = file_path.suffix.lower()
-            content_type_map = {
-                ".pdf": "application/pdf",
-                ".png": "image/png",
-                ".jpg": "image/jpeg",
-                ".jpeg": "image/jpeg",
-                ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                ".xls": "application/vnd.ms-excel",
-            }
-            content_type = content_type_map.get(ext, "application/octet-stream")
-
-            # Read file
-            with open(file_path, "rb") as f:
-                file_data = f.read()
-
-            # Check file size
-            if len(file_data) > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
-                errors.append({
-                    "file": str(file_path),
-                    "error": f"File too large (max {settings.MAX_FILE_SIZE_MB}MB)"
-                })
-                continue
-
-            # Upload to MinIO
-            job_id = str(uuid.uuid4())
-            bucket, key, checksum, size = upload_document_v2(
-                file_data=file_data,
-                filename=file_path.name,
-                content_type=content_type,
-                tenant_id=x_tenant_id,
-                job_id=job_id
-            )
-
-            # Create job record
-            async with pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO jobs (id, tenant_id, filename, content_type, file_size, 
-                                     minio_bucket, minio_key, checksum, status, source, created_at)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 'new', 'server_import', NOW())
-                    """,
-                    job_id, x_tenant_id, file_path.name, content_type, size,
-                    bucket, key, checksum
-                )
-
-            imported.append({
-                "job_id": job_id,
-                "filename": file_path.name,
-                "size": size
-            })
-
-        except Exception as e:
-            logger.error(f"Failed to import {file_path}: {e}")
-            errors.append({
-                "file": str(file_path),
-                "error": str(e)
-            })
+    import_id = await start_import(pool, dir_path, body.file_pattern, body.recursive, x_tenant_id, files)
 
     return {
         "success": True,
         "data": {
-            "imported": len(imported),
-            "errors": len(errors),
-            "files": imported,
-            "error_details": errors if errors else None
+            "import_id": import_id,
+            "status": "running",
+            "total_files": len(files),
+            "imported": 0,
         }
     }
+
+
+@router.get("/import/server/{import_id}")
+async def get_server_import(
+    import_id: str,
+    x_role: Optional[str] = Header(None, alias="X-User-Role")
+) -> dict:
+    """Progress of a server directory import."""
+    from api.server_import import get_import
+    from src.db import get_pool as get_db_pool
+
+    if x_role not in ["admin", "accountant"]:
+        raise HTTPException(status_code=403, detail="Admin or accountant role required")
+
+    progress = await get_import(await get_db_pool(), import_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return {"success": True, "data": progress}
+
+
+@router.post("/import/server/{import_id}/resume")
+async def resume_server_import(
+    import_id: str,
+    x_role: Optional[str] = Header(None, alias="X-User-Role")
+) -> dict:
+    """Resume a failed or interrupted import; files already recorded are skipped."""
+    from api.server_import import resume_import
+    from src.db import get_pool as get_db_pool
+
+    if x_role not in ["admin", "accountant"]:
+        raise HTTPException(status_code=403, detail="Admin or accountant role required")
+
+    if not await resume_import(await get_db_pool(), import_id):
+        raise HTTPException(status_code=409, detail="Import not found or still running")
+    return {"success": True, "data": {"import_id": import_id, "status": "running"}}
@@ -6,6 +6,7 @@ These endpoints provide a document-centric view for the UI,
 mapping to the underlying jobs-based architecture.
 """
 
+import asyncio
 import json
 import logging
 import os
@@ -13,7 +14,7 @@ import sys
 from datetime import datetime
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -444,16 +445,18 @@ async def get_document_ledger(document_id: str) -> dict:
 # =============================================================================
 
 @router.get("/{document_id}/preview")
-async def get_document_preview(document_id: str, preview: bool = False):
+async def get_document_preview(request: Request, document_id: str, preview: bool = False):
     """
     Get document file for preview.
-    Returns the raw file content from MinIO storage.
+    Returns the raw file content from MinIO storage (Range / If-None-Match aware).
     
     If preview=true and the file is Excel, returns HTML table representation.
     """
-    from fastapi.responses import StreamingResponse, HTMLResponse
-    from src.storage import download_document, stream_document
+    from fastapi.responses import HTMLResponse
+    from src.storage import get_object_store, serve_object
     import io
+
+    store = get_object_store()
     
     pool = await get_db_pool()
     if not pool:
@@ -487,8 +490,8 @@ async def get_document_preview(document_id: str, preview: bool = False):
                 try:
                     import pandas as pd
                     
-                    file_data = download_document(bucket, key)
-                    df = pd.read_excel(io.BytesIO(file_data), sheet_name=0)
+                    file_data = await store.download(bucket, key)
+                    df = await asyncio.to_thread(pd.read_excel, io.BytesIO(file_data), sheet_name=0)
                     
                     # Convert to HTML table
                     html_table = df.to_html(
@@ -514,19 +517,7 @@ async def get_document_preview(document_id: str, preview: bool = False):
                     pass
 
             # Stream file from MinIO
-            response, detected_content_type, size = stream_document(bucket, key)
-            
-            # Use detected content type or fallback
-            final_content_type = detected_content_type or content_type
-
-            return StreamingResponse(
-                io.BytesIO(response.read()),
-                media_type=final_content_type,
-                headers={
-                    "Content-Disposition": f'inline; filename="{filename}"',
-                    "Cache-Control": "private, max-age=3600",
-                }
-            )
+            return await serve_object(store, bucket, key, request, filename=filename)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to retrieve file: {str(e)}")
@@ -31,7 +31,12 @@ from api.reconciliation_routes import router as reconciliation_router
 from api.agent_routes import router as agent_router
 from api.analyze_routes import router as analyze_router
 from src.api.analytics_routes import router as analytics_router
-from api.middleware import RateLimitMiddleware, RequestLoggingMiddleware, TenantMiddleware
+from api.middleware import (
+    RateLimitMiddleware,
+    RequestLoggingMiddleware,
+    ResourceMonitorMiddleware,
+    TenantMiddleware,
+)
 from api.routes import router
 from core.config import settings
 from core.constants import API_PREFIX, API_VERSION
@@ -93,6 +98,8 @@ def create_app() -> FastAPI:
     )
 
     # Custom middleware
+    # Resource pressure / admission control for uploads, OCR and batches
+    app.add_middleware(ResourceMonitorMiddleware)
     app.add_middleware(RequestLoggingMiddleware)
     app.add_middleware(RateLimitMiddleware)
     app.add_middleware(TenantMiddleware)
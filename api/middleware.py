@@ -8,163 +8,254 @@ Middleware for:
 - Authentication (skeleton)
 - Idempotency (PR-10)
 - Resource monitoring (Quantum Performance)
+
+All middlewares are pure ASGI (no BaseHTTPMiddleware task/stream wrapping).
+Idempotency records and rate-limit buckets live in the shared state store
+(api/state_store.py) so they hold across uvicorn workers.
 """
 
+import hashlib
+import json
 import os
+import re
 import sys
+import tempfile
 import time
 import uuid
-import json
-import hashlib
-import psutil
-from collections.abc import Callable
-from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import logging
 
+from api.resources import (
+    DISK_THRESHOLD_MB,
+    MEMORY_THRESHOLD_PERCENT,
+    AdmissionController,
+    PressureLevel,
+    ResourceSampler,
+    TempFileJanitor,
+    get_admission_controller,
+    get_resource_sampler,
+    get_temp_janitor,
+)
+from api.state_store import IdempotencyRecord, SharedStateStore, get_state_store
 from core.constants import RATE_LIMIT_REQUESTS_PER_MINUTE
 
 logger = logging.getLogger("erpx.api.middleware")
 
+# Responses larger than this are passed through but not stored for replay
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", str(1024 * 1024)))
+# Request bodies above this spill from memory to a temp file while hashing
+REQUEST_SPOOL_BYTES = 1024 * 1024
+
+
+async def send_json(send: Send, status_code: int, content: dict, headers: dict[str, str] | None = None) -> None:
+    """Send a complete JSON response straight to the ASGI server."""
+    body = json.dumps(content).encode()
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _scope_state(scope: Scope) -> dict:
+    """Dict behind request.state for this scope."""
+    return scope.setdefault("state", {})
+
 
 # =============================================================================
 # Idempotency Middleware (Quantum Performance)
 # =============================================================================
 
 
-class IdempotencyMiddleware(BaseHTTPMiddleware):
+class IdempotencyMiddleware:
     """
     Global idempotency middleware for all mutation endpoints.
     Prevents duplicate processing of identical requests.
-    
+
     Usage: Client sends X-Idempotency-Key header with unique request ID.
+
+    The request body is hashed while it is spooled (memory, then disk) and
+    replayed to the app; the response is forwarded chunk by chunk as it is
+    produced and captured on the side for the stored record.
     """
 
     # Methods that require idempotency
     MUTATION_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
-    
+
     # Paths excluded from idempotency check
     EXCLUDED_PATHS = {
         "/health", "/", "/docs", "/redoc", "/openapi.json",
         "/v1/copilot/chat",  # Chat is inherently non-idempotent
     }
-    
-    def __init__(self, app: ASGIApp, ttl_seconds: int = 86400):
-        super().__init__(app)
-        self.cache: dict[str, dict[str, Any]] = {}
-        self.ttl_seconds = ttl_seconds
-
-    def _compute_request_hash(self, method: str, path: str, body: bytes) -> str:
-        """Compute hash of request for validation."""
-        content = f"{method}:{path}:{body.decode('utf-8', errors='ignore')}"
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
-
-    def _clean_expired(self):
-        """Remove expired entries from cache."""
-        now = time.time()
-        expired_keys = [
-            k for k, v in self.cache.items()
-            if now - v.get("created_at", 0) > self.ttl_seconds
-        ]
-        for k in expired_keys:
-            del self.cache[k]
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip non-mutation methods
-        if request.method not in self.MUTATION_METHODS:
-            return await call_next(request)
-
-        # Skip excluded paths
-        if request.url.path in self.EXCLUDED_PATHS:
-            return await call_next(request)
-
-        # Get idempotency key from header
-        idempotency_key = request.headers.get("X-Idempotency-Key")
-        
-        if not idempotency_key:
-            # No key provided - proceed normally but warn
-            return await call_next(request)
-
-        # Clean expired entries periodically
-        if len(self.cache) > 1000:
-            self._clean_expired()
-
-        # Check if request was already processed
-        cached = self.cache.get(idempotency_key)
-        
-        if cached:
-            # Validate request hash matches
-            body = await request.body()
-            request_hash = self._compute_request_hash(
-                request.method, request.url.path, body
-            )
-            
-            if cached.get("request_hash") != request_hash:
-                return Response(
-                    content=json.dumps({
-                        "success": False,
-                        "error": "Idempotency key reused with different request body",
-                        "code": "IDEMPOTENCY_CONFLICT"
-                    }),
-                    status_code=422,
-                    media_type="application/json",
-                )
 
-            # Return cached response
-            logger.info(f"[Idempotency] Returning cached response for key: {idempotency_key}")
-            return Response(
-                content=cached["response_body"],
-                status_code=cached["response_code"],
-                media_type="application/json",
-                headers={"X-Idempotency-Replayed": "true"}
+    def __init__(
+        self,
+        app: ASGIApp,
+        ttl_seconds: int = 86400,
+        store: SharedStateStore | None = None,
+        max_body_bytes: int = IDEMPOTENCY_MAX_BODY_BYTES,
+    ):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.max_body_bytes = max_body_bytes
+
+    def _get_store(self) -> SharedStateStore:
+        if self.store is None:
+            self.store = get_state_store()
+        return self.store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.MUTATION_METHODS
+            or scope["path"] in self.EXCLUDED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        client_key = request_headers.get("X-Idempotency-Key")
+        if not client_key:
+            # No key provided - proceed normally
+            await self.app(scope, receive, send)
+            return
+        tenant = request_headers.get("X-Tenant-ID") or "default"
+        idempotency_key = self.namespaced_key(tenant, client_key)
+
+        with tempfile.SpooledTemporaryFile(max_size=REQUEST_SPOOL_BYTES) as spool:
+            request_hash = await self._spool_request(scope, receive, spool)
+            store = self._get_store()
+
+            existing = await store.reserve_idempotency_key(
+                idempotency_key, request_hash, self.ttl_seconds, tenant=tenant
             )
-
-        # Mark as processing
-        body = await request.body()
-        request_hash = self._compute_request_hash(
-            request.method, request.url.path, body
-        )
-        
-        self.cache[idempotency_key] = {
-            "status": "processing",
-            "request_hash": request_hash,
-            "created_at": time.time(),
-        }
-
-        # Process request
-        response = await call_next(request)
-
-        # Cache response for successful requests
-        if response.status_code < 500:
-            # Read response body
-            response_body = b""
-            async for chunk in response.body_iterator:
-                response_body += chunk
-
-            self.cache[idempotency_key] = {
-                "status": "completed",
-                "request_hash": request_hash,
-                "response_code": response.status_code,
-                "response_body": response_body,
-                "created_at": time.time(),
-            }
-
-            # Return new response with body
-            return Response(
-                content=response_body,
-                status_code=response.status_code,
-                media_type=response.media_type,
-                headers=dict(response.headers),
+            if existing is not None:
+                await self._respond_existing(idempotency_key, existing, request_hash, send)
+                return
+
+            spool.seek(0)
+            await self._run_and_capture(scope, self._replay_receive(spool, receive), send, idempotency_key, request_hash)
+
+    @staticmethod
+    def namespaced_key(tenant: str, client_key: str) -> str:
+        """
+        Store key for a client's X-Idempotency-Key: per tenant, and apart from
+        the datazones keys in the same table. Long keys are hashed to fit
+        idempotency_keys.idempotency_key (255 chars).
+        """
+        key = f"http:{tenant}:{client_key}"
+        if len(key) > 255:
+            digest = hashlib.sha256(f"{tenant}\0{client_key}".encode()).hexdigest()
+            key = f"http:#{digest}"
+        return key
+
+    async def _spool_request(self, scope: Scope, receive: Receive, spool) -> str:
+        """Read the request body into `spool`, hashing it as it arrives."""
+        digest = hashlib.sha256(f"{scope['method']}:{scope['path']}:".encode())
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            digest.update(chunk)
+            spool.write(chunk)
+            more_body = message.get("more_body", False)
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _replay_receive(spool, receive: Receive) -> Receive:
+        chunk_size = 64 * 1024
+        done = False
+
+        async def replay() -> Message:
+            nonlocal done
+            if done:
+                return await receive()  # disconnect notifications
+            chunk = spool.read(chunk_size)
+            more = len(chunk) == chunk_size
+            done = not more
+            return {"type": "http.request", "body": chunk, "more_body": more}
+
+        return replay
+
+    async def _respond_existing(self, key: str, existing: IdempotencyRecord, request_hash: str, send: Send) -> None:
+        if existing.request_hash != request_hash:
+            await send_json(send, 422, {
+                "success": False,
+                "error": "Idempotency key reused with different request body",
+                "code": "IDEMPOTENCY_CONFLICT",
+            })
+            return
+
+        if existing.status != "completed":
+            await send_json(send, 409, {
+                "success": False,
+                "error": "Request with this idempotency key is still processing",
+                "code": "IDEMPOTENCY_IN_PROGRESS",
+            }, headers={"Retry-After": "1"})
+            return
+
+        # Return cached response
+        logger.info(f"[Idempotency] Returning cached response for key: {key}")
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in existing.headers]
+        headers.append((b"x-idempotency-replayed", b"true"))
+        await send({"type": "http.response.start", "status": existing.response_code, "headers": headers})
+        await send({"type": "http.response.body", "body": existing.body})
+
+    async def _run_and_capture(self, scope: Scope, receive: Receive, send: Send, key: str, request_hash: str) -> None:
+        store = self._get_store()
+        status_code = 500
+        headers: list[tuple[str, str]] = []
+        chunks: list[bytes] = []
+        captured = 0
+        storable = True
+        finished = False
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, headers, captured, storable, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    (k.decode("latin-1"), v.decode("latin-1"))
+                    for k, v in message.get("headers", [])
+                    if k.lower() != b"content-length"  # recomputed on replay
+                ]
+            elif message["type"] == "http.response.body" and storable:
+                body = message.get("body", b"")
+                captured += len(body)
+                if captured > self.max_body_bytes:
+                    storable = False
+                    chunks.clear()
+                else:
+                    chunks.append(body)
+                finished = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture_send)
+        except BaseException:
+            await store.release_idempotency_key(key)
+            raise
+
+        if status_code < 500 and storable and finished:
+            record = IdempotencyRecord(
+                request_hash=request_hash,
+                status="completed",
+                response_code=status_code,
+                headers=headers,
+                body=b"".join(chunks),
             )
-
-        return response
+            await store.complete_idempotency_key(key, record, self.ttl_seconds)
+        else:
+            await store.release_idempotency_key(key)
 
 
 # =============================================================================
@@ -172,112 +263,122 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
 # =============================================================================
 
 
-class ResourceMonitorMiddleware(BaseHTTPMiddleware):
+class ResourceMonitorMiddleware:
     """
     Monitor system resources and reject requests when under pressure.
     Prevents OOM and ensures system stability.
+
+    Readings come from the background ResourceSampler (api/resources.py);
+    heavy requests then pass admission control, which queues them by
+    estimated cost and sheds them with 503 + Retry-After under overload.
     """
 
     # Memory threshold (reject if available < 15%)
-    MEMORY_THRESHOLD_PERCENT = 15
-    
-    # Disk threshold for /tmp (reject if < 500MB)
-    DISK_THRESHOLD_MB = 500
-    
-    # Heavy endpoints that need resource check
-    HEAVY_ENDPOINTS = {
-        "/v1/documents/upload",
-        "/v1/documents/extract",
-        "/v1/batch",
-        "/v1/ocr",
-    }
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Only check heavy endpoints
-        is_heavy = any(request.url.path.startswith(ep) for ep in self.HEAVY_ENDPOINTS)
-        
-        if is_heavy and request.method == "POST":
-            # Check memory
-            memory = psutil.virtual_memory()
-            available_percent = memory.available * 100 / memory.total
-            
-            if available_percent < self.MEMORY_THRESHOLD_PERCENT:
-                logger.warning(
-                    f"[ResourceMonitor] Memory pressure: {available_percent:.1f}% available. "
-                    f"Rejecting heavy request to {request.url.path}"
-                )
-                return Response(
-                    content=json.dumps({
-                        "success": False,
-                        "error": "Server under memory pressure. Please retry later.",
-                        "code": "RESOURCE_PRESSURE",
-                        "retry_after": 30,
-                        "details": {
-                            "available_memory_percent": round(available_percent, 1),
-                            "threshold": self.MEMORY_THRESHOLD_PERCENT
-                        }
-                    }),
-                    status_code=503,
-                    media_type="application/json",
-                    headers={"Retry-After": "30"}
-                )
+    MEMORY_THRESHOLD_PERCENT = MEMORY_THRESHOLD_PERCENT
+
+    # Disk threshold for /tmp (clean up if < 500MB, reject if < 250MB)
+    DISK_THRESHOLD_MB = DISK_THRESHOLD_MB
+
+    # Heavy endpoints (POST) and their relative cost per request
+    HEAVY_ENDPOINTS = [
+        (re.compile(r"^/v1/upload$"), 1.0),
+        (re.compile(r"^/v1/documents/[^/]+/extract$"), 2.0),  # OCR
+        (re.compile(r"^/v1/accounting/coding/file$"), 2.0),  # OCR
+        (re.compile(r"^/v1/accounting/batch$"), 4.0),
+        (re.compile(r"^/v1/analytics/datasets$"), 1.0),  # dataset upload
+        (re.compile(r"^/v1/analyze/datasets/upload$"), 1.0),
+    ]
+
+    # Uploads also scale with body size: +1x weight per 10MB
+    COST_BYTES_UNIT = 10 * 1024 * 1024
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sampler: ResourceSampler | None = None,
+        janitor: TempFileJanitor | None = None,
+        admission: AdmissionController | None = None,
+    ):
+        self.app = app
+        self.sampler = sampler or get_resource_sampler()
+        self.janitor = janitor or get_temp_janitor()
+        self.admission = admission or (
+            get_admission_controller() if sampler is None else AdmissionController(sampler=self.sampler)
+        )
 
-            # Check disk space for /tmp
-            try:
-                disk = psutil.disk_usage("/tmp")
-                available_mb = disk.free / (1024 * 1024)
-                
-                if available_mb < self.DISK_THRESHOLD_MB:
-                    logger.warning(
-                        f"[ResourceMonitor] Disk pressure: {available_mb:.0f}MB available in /tmp. "
-                        f"Triggering cleanup."
-                    )
-                    # Trigger async cleanup (don't block request)
-                    self._cleanup_tmp_files()
-                    
-                    if available_mb < self.DISK_THRESHOLD_MB / 2:
-                        return Response(
-                            content=json.dumps({
-                                "success": False,
-                                "error": "Server under disk pressure. Please retry later.",
-                                "code": "DISK_PRESSURE",
-                                "retry_after": 60,
-                            }),
-                            status_code=503,
-                            media_type="application/json",
-                            headers={"Retry-After": "60"}
-                        )
-            except Exception as e:
-                logger.debug(f"[ResourceMonitor] Could not check disk: {e}")
-
-        return await call_next(request)
-
-    def _cleanup_tmp_files(self):
-        """Clean up old temporary OCR files."""
-        import glob
-        import os
-        from datetime import datetime, timedelta
-
-        patterns = ["/tmp/ocr_*", "/tmp/erpx_*", "/tmp/batch_*"]
-        cutoff = datetime.now() - timedelta(hours=2)
-        cleaned = 0
-
-        for pattern in patterns:
-            for filepath in glob.glob(pattern):
+    def estimate_cost(self, scope: Scope) -> float | None:
+        """Cost units for a heavy request, None for everything else."""
+        if scope["method"] != "POST":
+            return None
+        path = scope["path"]
+        for pattern, weight in self.HEAVY_ENDPOINTS:
+            if pattern.match(path):
                 try:
-                    mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
-                    if mtime < cutoff:
-                        if os.path.isfile(filepath):
-                            os.remove(filepath)
-                        elif os.path.isdir(filepath):
-                            import shutil
-                            shutil.rmtree(filepath, ignore_errors=True)
-                        cleaned += 1
-                except Exception:
-                    pass
+                    size = int(Headers(scope=scope).get("content-length") or 0)
+                except ValueError:
+                    size = 0
+                return weight * (1 + size / self.COST_BYTES_UNIT)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        cost = self.estimate_cost(scope) if scope["type"] == "http" else None
+        if cost is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.sampler.ensure_running()
+        snapshot = self.sampler.snapshot
+        path = scope["path"]
+
+        if snapshot.disk_level > PressureLevel.NORMAL:
+            # Sweep old temp files in the background (don't block request)
+            self.janitor.request_cleanup()
+
+        if snapshot.memory_level == PressureLevel.CRITICAL:
+            available_percent = snapshot.memory_available_percent
+            logger.warning(
+                f"[ResourceMonitor] Memory pressure: {available_percent:.1f}% available. "
+                f"Rejecting heavy request to {path}"
+            )
+            await send_json(send, 503, {
+                "success": False,
+                "error": "Server under memory pressure. Please retry later.",
+                "code": "RESOURCE_PRESSURE",
+                "retry_after": 30,
+                "details": {
+                    "available_memory_percent": round(available_percent, 1),
+                    "threshold": self.MEMORY_THRESHOLD_PERCENT
+                }
+            }, headers={"Retry-After": "30"})
+            return
+
+        if snapshot.disk_level == PressureLevel.CRITICAL:
+            logger.warning(f"[ResourceMonitor] Disk pressure: {snapshot.disk_free_mb:.0f}MB available in /tmp")
+            await send_json(send, 503, {
+                "success": False,
+                "error": "Server under disk pressure. Please retry later.",
+                "code": "DISK_PRESSURE",
+                "retry_after": 60,
+            }, headers={"Retry-After": "60"})
+            return
+
+        if not await self.admission.acquire(cost):
+            logger.warning(
+                f"[ResourceMonitor] Shedding {path} (cost={cost:.1f}, in_use={self.admission.in_use:.1f}, "
+                f"queued={self.admission.queued}, level={snapshot.level.name})"
+            )
+            await send_json(send, 503, {
+                "success": False,
+                "error": "Server is busy with heavy requests. Please retry later.",
+                "code": "OVERLOADED",
+                "retry_after": 10,
+            }, headers={"Retry-After": "10"})
+            return
 
-        if cleaned > 0:
-            logger.info(f"[ResourceMonitor] Cleaned {cleaned} old temp files")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.release(cost)
 
 
 # =============================================================================
@@ -285,7 +386,7 @@ class ResourceMonitorMiddleware(BaseHTTPMiddleware):
 # =============================================================================
 
 
-class TenantMiddleware(BaseHTTPMiddleware):
+class TenantMiddleware:
     """
     Extract and validate tenant information from request.
     Sets tenant_id in request.state for downstream use.
@@ -298,9 +399,16 @@ class TenantMiddleware(BaseHTTPMiddleware):
         "default": {"name": "Default Tenant", "quota": 1000, "active": True},
     }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Get tenant ID from header or use default
-        tenant_id = request.headers.get("X-Tenant-ID", "default")
+        tenant_id = Headers(scope=scope).get("X-Tenant-ID", "default")
 
         # Validate tenant (mock)
         if tenant_id not in self.MOCK_TENANTS:
@@ -308,15 +416,16 @@ class TenantMiddleware(BaseHTTPMiddleware):
             tenant_id = "default"
 
         # Set in request state
-        request.state.tenant_id = tenant_id
-        request.state.tenant_info = self.MOCK_TENANTS.get(tenant_id, self.MOCK_TENANTS["default"])
-
-        response = await call_next(request)
+        state = _scope_state(scope)
+        state["tenant_id"] = tenant_id
+        state["tenant_info"] = self.MOCK_TENANTS[tenant_id]
 
-        # Add tenant info to response headers
-        response.headers["X-Tenant-ID"] = tenant_id
+        async def send_with_tenant(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Tenant-ID"] = tenant_id
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_tenant)
 
 
 # =============================================================================
@@ -324,55 +433,55 @@ class TenantMiddleware(BaseHTTPMiddleware):
 # =============================================================================
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """
-    Simple in-memory rate limiting per tenant.
-    In production, use Redis or similar.
+    Token-bucket rate limiting per tenant: bursts up to `limit` requests,
+    refilled at `limit` per minute. Buckets live in the shared state store,
+    so the limit is global across workers.
     """
 
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.request_counts = {}  # tenant_id -> {minute: count}
-        self.limit = RATE_LIMIT_REQUESTS_PER_MINUTE
+    EXCLUDED_PATHS = {"/health", "/", "/docs", "/redoc", "/openapi.json"}
+
+    def __init__(self, app: ASGIApp, limit: int = RATE_LIMIT_REQUESTS_PER_MINUTE, store: SharedStateStore | None = None):
+        self.app = app
+        self.limit = limit
+        self.store = store
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip rate limiting for health check
-        if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
-
-        tenant_id = getattr(request.state, "tenant_id", "default")
-        current_minute = int(time.time() / 60)
-
-        # Initialize or reset counter
-        if tenant_id not in self.request_counts:
-            self.request_counts[tenant_id] = {}
-
-        # Clean old minutes
-        self.request_counts[tenant_id] = {
-            k: v for k, v in self.request_counts[tenant_id].items() if k >= current_minute - 1
-        }
-
-        # Check limit
-        current_count = self.request_counts[tenant_id].get(current_minute, 0)
-
-        if current_count >= self.limit:
-            # Rate limit exceeded
-            return Response(
-                content='{"success": false, "error": "Rate limit exceeded", "code": "RATE_LIMIT"}',
-                status_code=429,
-                media_type="application/json",
+        if scope["type"] != "http" or scope["path"] in self.EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if self.store is None:
+            self.store = get_state_store()
+
+        tenant_id = scope.get("state", {}).get("tenant_id", "default")
+        result = await self.store.take_token(f"rate:{tenant_id}", self.limit, self.limit / 60.0)
+
+        if not result.allowed:
+            retry_after = max(1, int(result.retry_after + 0.999))
+            await send_json(
+                send, 429,
+                {"success": False, "error": "Rate limit exceeded", "code": "RATE_LIMIT"},
+                headers={
+                    "Retry-After": str(retry_after),
+                    "X-RateLimit-Limit": str(self.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
             )
+            return
 
-        # Increment counter
-        self.request_counts[tenant_id][current_minute] = current_count + 1
-
-        response = await call_next(request)
+        remaining = str(int(result.remaining))
 
-        # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(self.limit)
-        response.headers["X-RateLimit-Remaining"] = str(self.limit - current_count - 1)
+        async def send_with_limits(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(self.limit)
+                headers["X-RateLimit-Remaining"] = remaining
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_limits)
 
 
 # =============================================================================
@@ -380,43 +489,45 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 # =============================================================================
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
     Log all requests with timing information.
     Assigns unique request ID for tracing.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate request ID
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+        state = _scope_state(scope)
+        state["request_id"] = request_id
 
-        # Start time
+        method, path = scope["method"], scope["path"]
         start_time = time.time()
 
         # Log request
-        logger.info(
-            f"[{request_id}] {request.method} {request.url.path} "
-            f"tenant={getattr(request.state, 'tenant_id', 'unknown')}"
-        )
-
-        # Process request
-        response = await call_next(request)
-
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
-
-        # Log response
-        logger.info(
-            f"[{request_id}] {request.method} {request.url.path} "
-            f"status={response.status_code} duration={duration_ms:.2f}ms"
-        )
-
-        # Add headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Processing-Time-Ms"] = f"{duration_ms:.2f}"
+        logger.info(f"[{request_id}] {method} {path} tenant={state.get('tenant_id', 'unknown')}")
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Duration to first byte, as the response is streamed from here on
+                duration_ms = (time.time() - start_time) * 1000
+                logger.info(
+                    f"[{request_id}] {method} {path} "
+                    f"status={message['status']} duration={duration_ms:.2f}ms"
+                )
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Processing-Time-Ms"] = f"{duration_ms:.2f}"
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_timing)
 
 
 # =============================================================================
@@ -424,7 +535,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 # =============================================================================
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
     """
     Skeleton for authentication middleware.
     In production, integrate with OAuth2/JWT.
@@ -433,24 +544,28 @@ class AuthMiddleware(BaseHTTPMiddleware):
     # Paths that don't require authentication
     PUBLIC_PATHS = ["/health", "/", "/docs", "/redoc", "/openapi.json"]
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip auth for public paths
-        if request.url.path in self.PUBLIC_PATHS:
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] in self.PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # Get authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("Authorization")
+        state = _scope_state(scope)
 
         if auth_header:
             # Mock token validation
             if auth_header.startswith("Bearer "):
-                token = auth_header[7:]
                 # In production: validate JWT token
-                request.state.user_id = "mock-user"
-                request.state.user_role = "accounting_user"
+                state["user_id"] = "mock-user"
+                state["user_role"] = "accounting_user"
         else:
             # No auth header - allow for development
-            request.state.user_id = "anonymous"
-            request.state.user_role = "guest"
+            state["user_id"] = "anonymous"
+            state["user_role"] = "guest"
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
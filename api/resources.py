@@ -0,0 +1,351 @@
+"""
+ERPX AI Accounting - Resource Pressure & Admission Control
+==========================================================
+Keeps psutil and temp-file housekeeping out of the request path:
+
+- ResourceSampler:     background task sampling memory / disk, smoothed with
+                       an EWMA and published as an immutable snapshot
+                       (readers just load one attribute, no locks)
+- TempFileJanitor:     removes old OCR/batch temp files in a worker thread,
+                       at most one sweep at a time
+- AdmissionController: cost-based budget for heavy requests; queues them
+                       while the budget is used up and sheds them when the
+                       queue is full, the wait times out, or pressure is
+                       critical
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import shutil
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import IntEnum
+
+import psutil
+
+logger = logging.getLogger("erpx.api.resources")
+
+RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "1.0"))
+RESOURCE_SMOOTHING = float(os.getenv("RESOURCE_SMOOTHING", "0.3"))
+# Reject heavy requests if available memory < 15%, /tmp free < 250MB
+MEMORY_THRESHOLD_PERCENT = float(os.getenv("RESOURCE_MEMORY_THRESHOLD_PERCENT", "15"))
+DISK_THRESHOLD_MB = float(os.getenv("RESOURCE_DISK_THRESHOLD_MB", "500"))
+TEMP_FILE_MAX_AGE_SECONDS = 2 * 3600
+
+# Concurrent cost units admitted at normal pressure (~one mid-size upload each)
+ADMISSION_CAPACITY = float(os.getenv("ADMISSION_CAPACITY", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "15"))
+
+
+class PressureLevel(IntEnum):
+    NORMAL = 0
+    ELEVATED = 1  # admission budget halved, janitor triggered
+    CRITICAL = 2  # heavy requests shed
+
+
+# Share of the admission budget available at each level
+BUDGET_FACTOR = {PressureLevel.NORMAL: 1.0, PressureLevel.ELEVATED: 0.5, PressureLevel.CRITICAL: 0.0}
+
+
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    """Smoothed resource readings; replaced wholesale on every sample."""
+
+    memory_available_percent: float
+    disk_free_mb: float
+    memory_level: PressureLevel
+    disk_level: PressureLevel
+    sampled_at: float
+
+    @property
+    def level(self) -> PressureLevel:
+        return max(self.memory_level, self.disk_level)
+
+
+def classify_memory(available_percent: float, threshold: float = MEMORY_THRESHOLD_PERCENT) -> PressureLevel:
+    if available_percent < threshold:
+        return PressureLevel.CRITICAL
+    if available_percent < threshold * 2:
+        return PressureLevel.ELEVATED
+    return PressureLevel.NORMAL
+
+
+def classify_disk(free_mb: float, threshold: float = DISK_THRESHOLD_MB) -> PressureLevel:
+    if free_mb < threshold / 2:
+        return PressureLevel.CRITICAL
+    if free_mb < threshold:
+        return PressureLevel.ELEVATED
+    return PressureLevel.NORMAL
+
+
+def _read_system(disk_path: str) -> tuple[float, float]:
+    memory = psutil.virtual_memory()
+    try:
+        disk_free_mb = psutil.disk_usage(disk_path).free / (1024 * 1024)
+    except OSError as e:
+        logger.debug(f"[ResourceSampler] Could not check disk: {e}")
+        disk_free_mb = float("inf")
+    return memory.available * 100 / memory.total, disk_free_mb
+
+
+class ResourceSampler:
+    """
+    Periodically samples memory and disk. Levels use the smoothed values so
+    short spikes don't flap admission, except that a raw reading already in
+    the critical band escalates immediately.
+    """
+
+    def __init__(
+        self,
+        interval: float = RESOURCE_SAMPLE_INTERVAL,
+        alpha: float = RESOURCE_SMOOTHING,
+        disk_path: str = "/tmp",
+        probe: Callable[[], tuple[float, float]] | None = None,
+    ):
+        self.interval = interval
+        self.alpha = alpha
+        self.disk_path = disk_path
+        self._probe = probe or (lambda: _read_system(self.disk_path))
+        self._snapshot: ResourceSnapshot | None = None
+        self._listeners: list[Callable[[ResourceSnapshot], None]] = []
+        self._task: asyncio.Task | None = None
+
+    @property
+    def snapshot(self) -> ResourceSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.sample_once()
+        return snapshot
+
+    def subscribe(self, listener: Callable[[ResourceSnapshot], None]) -> None:
+        self._listeners.append(listener)
+
+    def sample_once(self) -> ResourceSnapshot:
+        """Take a reading synchronously and publish the new snapshot."""
+        return self._publish(*self._probe())
+
+    def _publish(self, memory_percent: float, disk_mb: float) -> ResourceSnapshot:
+        previous = self._snapshot
+        if previous is not None:
+            a = self.alpha
+            memory_smoothed = a * memory_percent + (1 - a) * previous.memory_available_percent
+            disk_smoothed = a * disk_mb + (1 - a) * previous.disk_free_mb
+        else:
+            memory_smoothed, disk_smoothed = memory_percent, disk_mb
+
+        snapshot = ResourceSnapshot(
+            memory_available_percent=memory_smoothed,
+            disk_free_mb=disk_smoothed,
+            memory_level=max(classify_memory(memory_smoothed), self._critical_only(classify_memory(memory_percent))),
+            disk_level=max(classify_disk(disk_smoothed), self._critical_only(classify_disk(disk_mb))),
+            sampled_at=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        if previous is None or previous.level != snapshot.level:
+            if snapshot.level > PressureLevel.NORMAL:
+                logger.warning(
+                    f"[ResourceSampler] Pressure {snapshot.level.name}: "
+                    f"memory {memory_smoothed:.1f}% available, /tmp {disk_smoothed:.0f}MB free"
+                )
+            elif previous is not None:
+                logger.info("[ResourceSampler] Pressure back to NORMAL")
+        for listener in self._listeners:
+            listener(snapshot)
+        return snapshot
+
+    @staticmethod
+    def _critical_only(level: PressureLevel) -> PressureLevel:
+        return level if level == PressureLevel.CRITICAL else PressureLevel.NORMAL
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # psutil reads /proc and statvfs; keep it off the event loop
+                reading = await asyncio.to_thread(self._probe)
+                self._publish(*reading)
+            except Exception as e:
+                logger.warning(f"[ResourceSampler] Sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def ensure_running(self) -> None:
+        """Start sampling on the current event loop if not already running there."""
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run(), name="resource-sampler")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+class TempFileJanitor:
+    """Deletes stale temp files/directories off the event loop, one sweep at a time."""
+
+    PATTERNS = ("/tmp/ocr_*", "/tmp/erpx_*", "/tmp/batch_*")
+
+    def __init__(
+        self,
+        patterns: tuple[str, ...] = PATTERNS,
+        max_age_seconds: float = TEMP_FILE_MAX_AGE_SECONDS,
+        min_interval: float = 60.0,
+    ):
+        self.patterns = patterns
+        self.max_age_seconds = max_age_seconds
+        self.min_interval = min_interval
+        self._task: asyncio.Task | None = None
+        self._last_run = float("-inf")
+
+    def cleanup(self) -> int:
+        """Blocking sweep; returns the number of entries removed."""
+        cutoff = time.time() - self.max_age_seconds
+        cleaned = 0
+        for pattern in self.patterns:
+            for path in glob.iglob(pattern):
+                try:
+                    if os.lstat(path).st_mtime >= cutoff:
+                        continue
+                    if os.path.isdir(path) and not os.path.islink(path):
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        os.remove(path)
+                    cleaned += 1
+                except OSError:
+                    pass
+        if cleaned > 0:
+            logger.info(f"[ResourceMonitor] Cleaned {cleaned} old temp files")
+        return cleaned
+
+    def request_cleanup(self) -> asyncio.Task | None:
+        """Schedule a sweep unless one is running or ran within min_interval."""
+        if self._task is not None and not self._task.done():
+            return None
+        now = time.monotonic()
+        if now - self._last_run < self.min_interval:
+            return None
+        self._last_run = now
+        self._task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.cleanup), name="temp-janitor")
+        return self._task
+
+
+class AdmissionController:
+    """
+    Budget of concurrent cost units for heavy requests, scaled down by the
+    current pressure level. Waiters are admitted FIFO as budget frees up; a
+    request larger than the whole budget still runs when nothing else does.
+    """
+
+    def __init__(
+        self,
+        capacity: float = ADMISSION_CAPACITY,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_wait: float = ADMISSION_MAX_WAIT,
+        sampler: ResourceSampler | None = None,
+    ):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.sampler = sampler
+        self.in_use = 0.0
+        self.shed = 0
+        self._waiters: deque[tuple[float, asyncio.Future]] = deque()
+        if sampler is not None:
+            sampler.subscribe(lambda _snapshot: self._wake())
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _level(self) -> PressureLevel:
+        return self.sampler.snapshot.level if self.sampler is not None else PressureLevel.NORMAL
+
+    def _fits(self, cost: float, level: PressureLevel) -> bool:
+        if level == PressureLevel.CRITICAL:
+            return False
+        return self.in_use == 0 or self.in_use + cost <= self.capacity * BUDGET_FACTOR[level]
+
+    async def acquire(self, cost: float) -> bool:
+        """Wait for budget; False means the request should be shed."""
+        level = self._level()
+        if level == PressureLevel.CRITICAL:
+            self.shed += 1
+            return False
+        if not self._waiters and self._fits(cost, level):
+            self.in_use += cost
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, future)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            if future.done():  # admitted just as the wait expired
+                return True
+            self._waiters.remove(entry)
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if future.done():
+                self.release(cost)
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            raise
+
+    def release(self, cost: float) -> None:
+        self.in_use = max(0.0, self.in_use - cost)
+        self._wake()
+
+    def _wake(self) -> None:
+        level = self._level()
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():  # cancelled waiter
+                self._waiters.popleft()
+                continue
+            if not self._fits(cost, level):
+                break
+            self._waiters.popleft()
+            self.in_use += cost
+            future.set_result(True)
+
+
+_sampler: ResourceSampler | None = None
+_janitor: TempFileJanitor | None = None
+_admission: AdmissionController | None = None
+
+
+def get_resource_sampler() -> ResourceSampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = ResourceSampler()
+    return _sampler
+
+
+def get_temp_janitor() -> TempFileJanitor:
+    global _janitor
+    if _janitor is None:
+        _janitor = TempFileJanitor()
+    return _janitor
+
+
+def get_admission_controller() -> AdmissionController:
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController(sampler=get_resource_sampler())
+    return _admission
@@ -4,6 +4,7 @@ ERPX AI Accounting - API Routes
 """
 
 import asyncio
+import json
 import os
 import sys
 import time
@@ -11,7 +12,7 @@ import uuid
 from datetime import datetime
 from functools import lru_cache
 
-from fastapi import APIRouter, File, Header, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Body, File, Header, HTTPException, Request, UploadFile
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -280,7 +281,11 @@ async def reconcile_transactions(request: Request, reconcile_request: ReconcileR
 
 @router.post("/accounting/batch", response_model=APIResponse)
 async def process_batch(
-    request: Request, documents: list, mode: str = "STRICT", x_tenant_id: str | None = Header(None)
+    request: Request,
+    documents: list[dict] = Body(...),
+    mode: str = "STRICT",
+    llm_batch: bool = False,
+    x_tenant_id: str | None = Header(None),
 ):
     """
     Process multiple documents in batch.
@@ -288,30 +293,27 @@ async def process_batch(
     Each document should have:
     - ocr_text OR structured_fields
     - Optional doc_id
+
+    With llm_batch=true, documents are coded directly by the LLM, several
+    per request (src.llm.batching), instead of one copilot run each.
     """
     start_time = time.time()
     request_id = get_request_id(request)
     tenant_id = get_tenant_id(request) or x_tenant_id
 
-    try:
-        copilot = get_copilot_instance(mode=mode.upper(), tenant_id=tenant_id)
+    if llm_batch:
+        from src.llm.batching import duplicate_ids
 
-        async def process_single(i, doc):
-            try:
-                async with _BATCH_SEMAPHORE:
-                    result = await asyncio.to_thread(
-                        copilot.process,
-                        ocr_text=doc.get("ocr_text"),
-                        structured_fields=doc.get("structured_fields"),
-                        file_metadata=doc.get("file_metadata"),
-                        doc_id=doc.get("doc_id", f"BATCH-{i}"),
-                    )
-                return {"index": i, "success": True, "data": result}
-            except Exception as e:
-                return {"index": i, "success": False, "error": str(e)}
-
-        tasks = [process_single(i, doc) for i, doc in enumerate(documents)]
-        results = await asyncio.gather(*tasks)
+        # Packed results are matched back to documents by id
+        duplicates = duplicate_ids([_batch_doc_id(doc, i) for i, doc in enumerate(documents)])
+        if duplicates:
+            raise HTTPException(status_code=422, detail=f"Duplicate doc_id in batch: {', '.join(duplicates)}")
+
+    try:
+        if llm_batch:
+            results = await _code_batch_packed(documents, request_id)
+        else:
+            results = await _process_batch_copilot(documents, mode, tenant_id)
         errors = [r for r in results if not r["success"]]
 
         processing_time = (time.time() - start_time) * 1000
@@ -335,6 +337,50 @@ async def process_batch(
         )
 
 
+def _batch_doc_id(doc: dict, index: int) -> str:
+    return str(doc.get("doc_id") or f"BATCH-{index}")
+
+
+async def _code_batch_packed(documents: list, request_id: str) -> list[dict]:
+    """LLM coding for a batch, packing small documents into shared requests."""
+    from src.workflows.pipeline_stages import generate_proposals_batched
+
+    texts = []
+    for i, doc in enumerate(documents):
+        text = doc.get("ocr_text") or json.dumps(doc.get("structured_fields") or {}, ensure_ascii=False)
+        texts.append((_batch_doc_id(doc, i), text))
+
+    results = await generate_proposals_batched(texts, request_id=request_id)
+    return [
+        {"index": i, "success": True, "data": r.data, "batched": r.batched}
+        if r.ok
+        else {"index": i, "success": False, "error": r.error}
+        for i, r in enumerate(results)
+    ]
+
+
+async def _process_batch_copilot(documents: list, mode: str, tenant_id: str | None) -> list[dict]:
+    """One copilot run per document, bounded by _BATCH_SEMAPHORE."""
+    copilot = get_copilot_instance(mode=mode.upper(), tenant_id=tenant_id)
+
+    async def process_single(i, doc):
+        try:
+            async with _BATCH_SEMAPHORE:
+                result = await asyncio.to_thread(
+                    copilot.process,
+                    ocr_text=doc.get("ocr_text"),
+                    structured_fields=doc.get("structured_fields"),
+                    file_metadata=doc.get("file_metadata"),
+                    doc_id=doc.get("doc_id", f"BATCH-{i}"),
+                )
+            return {"index": i, "success": True, "data": result}
+        except Exception as e:
+            return {"index": i, "success": False, "error": str(e)}
+
+    tasks = [process_single(i, doc) for i, doc in enumerate(documents)]
+    return list(await asyncio.gather(*tasks))
+
+
 # =============================================================================
 # Approval Endpoints
 # =============================================================================
@@ -0,0 +1,408 @@
+"""
+ERPX AI Accounting - Server Directory Import
+============================================
+Background bulk import behind POST /config/import/server.
+
+An import is a server_imports row (migration 021) plus a task on the API
+worker that, for every file in the directory:
+
+1. hashes it in chunks (worker thread) and skips content already known to
+   document_checksums (check_document_duplicate) or seen earlier in the run
+2. streams new files to MinIO, SERVER_IMPORT_CONCURRENCY uploads at a time
+3. writes jobs / document_checksums / server_import_files rows with
+   executemany, up to SERVER_IMPORT_BATCH_SIZE files per transaction
+
+Finished files are recorded in the same transaction as their jobs rows, so
+resume_import() after a crash or restart only handles what is left.
+Progress is polled with get_import().
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.config import settings
+from src.datazones.idempotency import (
+    DOCUMENT_CHECKSUM_INSERT_SQL,
+    check_document_duplicate,
+    document_checksum_row,
+)
+from src.datazones.unit_of_work import resolve_tenant_id
+
+logger = logging.getLogger("erpx.server_import")
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+}
+
+HASH_CHUNK_BYTES = 1024 * 1024
+FLUSH_INTERVAL_SECONDS = 5.0
+# A running import whose heartbeat (updated_at) is older than this may be resumed
+STALE_AFTER_SECONDS = 300
+
+JOB_INSERT_SQL = """
+    INSERT INTO jobs (id, tenant_id, filename, content_type, file_size,
+                     minio_bucket, minio_key, checksum, status, source, created_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 'new', 'server_import', NOW())
+"""
+
+FILE_UPSERT_SQL = """
+    INSERT INTO server_import_files (import_id, path, status, job_id, checksum, file_size, error)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (import_id, path) DO UPDATE
+    SET status = EXCLUDED.status, job_id = EXCLUDED.job_id, checksum = EXCLUDED.checksum,
+        file_size = EXCLUDED.file_size, error = EXCLUDED.error, created_at = NOW()
+"""
+
+PROGRESS_SQL = """
+    UPDATE server_imports SET
+        imported = c.imported, duplicates = c.duplicates, failed = c.failed, updated_at = NOW()
+    FROM (
+        SELECT count(*) FILTER (WHERE status = 'imported') AS imported,
+               count(*) FILTER (WHERE status = 'duplicate') AS duplicates,
+               count(*) FILTER (WHERE status = 'failed') AS failed
+        FROM server_import_files WHERE import_id = $1
+    ) c
+    WHERE id = $1
+"""
+
+CLAIM_SQL = """
+    UPDATE server_imports SET status = 'running', error = NULL, finished_at = NULL, updated_at = NOW()
+    WHERE id = $1 AND (status <> 'running' OR updated_at < NOW() - make_interval(secs => $2))
+    RETURNING directory, file_pattern, recursive, tenant_id
+"""
+
+# import_id -> task, keeps running imports referenced and avoids double starts
+_running: dict[str, asyncio.Task] = {}
+
+
+@dataclass
+class FileOutcome:
+    """Result of importing one file, buffered until the next flush."""
+
+    path: str
+    status: str  # imported | duplicate | failed
+    checksum: str | None = None
+    size: int | None = None
+    job_id: str | None = None
+    content_type: str | None = None
+    bucket: str | None = None
+    key: str | None = None
+    error: str | None = None
+
+
+def content_type_for(path: Path) -> str:
+    return CONTENT_TYPES.get(path.suffix.lower(), "application/octet-stream")
+
+
+def list_import_files(directory: Path, pattern: str, recursive: bool) -> list[Path]:
+    """Files to import, sorted so resumed runs see the same order."""
+    files = directory.rglob(pattern) if recursive else directory.glob(pattern)
+    return sorted(f for f in files if f.is_file())
+
+
+def hash_file(path: Path) -> tuple[str, int]:
+    """SHA256 and size of a file, read in chunks."""
+    sha = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            sha.update(chunk)
+            size += len(chunk)
+    return sha.hexdigest(), size
+
+
+def upload_file(path: Path, checksum: str, size: int, tenant_id: str, job_id: str) -> tuple[str, str, str, int]:
+    """Stream a file to MinIO (blocking; run in a worker thread)."""
+    from src.storage import upload_document_stream
+
+    with open(path, "rb") as f:
+        return upload_document_stream(
+            f,
+            length=size,
+            checksum=checksum,
+            filename=path.name,
+            content_type=content_type_for(path),
+            tenant_id=tenant_id,
+            job_id=job_id,
+        )
+
+
+class ServerImport:
+    """One run of an import: hash, dedup, upload and record files concurrently."""
+
+    def __init__(
+        self,
+        pool,
+        import_id: str,
+        directory: Path,
+        file_pattern: str,
+        recursive: bool,
+        tenant_id: str,
+        concurrency: int | None = None,
+        batch_size: int | None = None,
+    ):
+        self.pool = pool
+        self.import_id = import_id
+        self.directory = directory
+        self.file_pattern = file_pattern
+        self.recursive = recursive
+        self.tenant_id = tenant_id  # tenant code (X-Tenant-ID)
+        self.tenant_uuid: uuid.UUID | None = None  # resolved when the run starts
+        self.concurrency = concurrency or settings.SERVER_IMPORT_CONCURRENCY
+        self.batch_size = batch_size or settings.SERVER_IMPORT_BATCH_SIZE
+        self.max_file_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+        self._buffer: list[FileOutcome] = []
+        # checksum -> job id of the first copy in this run (None if it failed)
+        self._claims: dict[str, asyncio.Future] = {}
+        self._flush_lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+
+    async def run(self, files: list[Path] | None = None):
+        """Import every file not already recorded for this import."""
+        try:
+            if files is None:
+                files = await asyncio.to_thread(list_import_files, self.directory, self.file_pattern, self.recursive)
+
+            async with self.pool.acquire() as conn:
+                self.tenant_uuid = await resolve_tenant_id(conn, self.tenant_id)
+                done = {
+                    r["path"]
+                    for r in await conn.fetch(
+                        "SELECT path FROM server_import_files WHERE import_id = $1 AND status <> 'failed'",
+                        uuid.UUID(self.import_id),
+                    )
+                }
+                await conn.execute(
+                    "UPDATE server_imports SET total_files = $2, updated_at = NOW() WHERE id = $1",
+                    uuid.UUID(self.import_id),
+                    len(files),
+                )
+
+            pending = [f for f in files if str(f) not in done]
+            logger.info(
+                f"[{self.import_id}] Importing {len(pending)}/{len(files)} files from {self.directory} "
+                f"(concurrency={self.concurrency})"
+            )
+
+            queue: asyncio.Queue[Path] = asyncio.Queue()
+            for f in pending:
+                queue.put_nowait(f)
+            await asyncio.gather(*(self._worker(queue) for _ in range(min(self.concurrency, len(pending)))))
+            await self.flush()
+
+            await self._finish("completed")
+        except Exception as e:
+            logger.error(f"[{self.import_id}] Import failed: {e}")
+            await self._finish("failed", str(e))
+
+    async def _worker(self, queue: asyncio.Queue):
+        while not queue.empty():
+            outcome = await self.import_file(queue.get_nowait())
+            # append after the await: a concurrent flush may have swapped the buffer
+            self._buffer.append(outcome)
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush > FLUSH_INTERVAL_SECONDS:
+                await self.flush()
+
+    async def import_file(self, path: Path) -> FileOutcome:
+        """Hash, dedup and upload one file; never raises."""
+        try:
+            checksum, size = await asyncio.to_thread(hash_file, path)
+            if size > self.max_file_bytes:
+                return FileOutcome(
+                    str(path), "failed", checksum, size, error=f"File too large (max {settings.MAX_FILE_SIZE_MB}MB)"
+                )
+
+            # Identical files in the same run wait for the first copy, which
+            # only counts as handled once it is known or uploaded
+            while checksum in self._claims:
+                first_job_id = await self._claims[checksum]
+                if first_job_id:
+                    return FileOutcome(str(path), "duplicate", checksum, size, job_id=first_job_id)
+            claim = self._claims[checksum] = asyncio.get_running_loop().create_future()
+            handled_by = None
+            try:
+                async with self.pool.acquire() as conn:
+                    existing = await check_document_duplicate(conn, checksum, size, self.tenant_uuid)
+                if existing:
+                    handled_by = existing["first_job_id"]
+                    return FileOutcome(str(path), "duplicate", checksum, size, job_id=handled_by)
+
+                job_id = str(uuid.uuid4())
+                bucket, key, _, _ = await asyncio.to_thread(upload_file, path, checksum, size, self.tenant_id, job_id)
+                handled_by = job_id
+                return FileOutcome(str(path), "imported", checksum, size, job_id, content_type_for(path), bucket, key)
+            finally:
+                if not handled_by:
+                    del self._claims[checksum]  # a later copy tries again
+                claim.set_result(handled_by)
+        except Exception as e:
+            logger.warning(f"[{self.import_id}] Failed to import {path}: {e}")
+            return FileOutcome(str(path), "failed", error=str(e))
+
+    async def flush(self):
+        """Write buffered outcomes and refresh progress in one transaction."""
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if not batch:
+                return
+
+            import_id = uuid.UUID(self.import_id)
+            imported = [o for o in batch if o.status == "imported"]
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    if imported:
+                        await conn.executemany(
+                            JOB_INSERT_SQL,
+                            [
+                                (
+                                    o.job_id,
+                                    self.tenant_uuid,
+                                    Path(o.path).name,
+                                    o.content_type,
+                                    o.size,
+                                    o.bucket,
+                                    o.key,
+                                    o.checksum,
+                                )
+                                for o in imported
+                            ],
+                        )
+                        await conn.executemany(
+                            DOCUMENT_CHECKSUM_INSERT_SQL,
+                            [
+                                document_checksum_row(
+                                    o.checksum,
+                                    o.size,
+                                    o.job_id,
+                                    tenant_id=self.tenant_uuid,
+                                    filename=Path(o.path).name,
+                                    content_type=o.content_type,
+                                )
+                                for o in imported
+                            ],
+                        )
+                    await conn.executemany(
+                        FILE_UPSERT_SQL,
+                        [(import_id, o.path, o.status, o.job_id, o.checksum, o.size, o.error) for o in batch],
+                    )
+                    await conn.execute(PROGRESS_SQL, import_id)
+
+    async def _finish(self, status: str, error: str | None = None):
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute(
+                    "UPDATE server_imports SET status = $2, error = $3, finished_at = NOW(), updated_at = NOW() "
+                    "WHERE id = $1",
+                    uuid.UUID(self.import_id),
+                    status,
+                    error,
+                )
+        except Exception as e:
+            logger.error(f"[{self.import_id}] Could not record import status {status}: {e}")
+        logger.info(f"[{self.import_id}] Import {status}")
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _spawn(server_import: ServerImport, files: list[Path] | None = None):
+    task = asyncio.get_running_loop().create_task(
+        server_import.run(files), name=f"server-import-{server_import.import_id}"
+    )
+    _running[server_import.import_id] = task
+    task.add_done_callback(lambda _: _running.pop(server_import.import_id, None))
+
+
+async def start_import(
+    pool, directory: Path, file_pattern: str, recursive: bool, tenant_id: str, files: list[Path]
+) -> str:
+    """Create an import row and run it in the background; returns the import id."""
+    import_id = str(uuid.uuid4())
+    async with pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO server_imports (id, tenant_id, directory, file_pattern, recursive, status, total_files)
+            VALUES ($1, $2, $3, $4, $5, 'running', $6)
+            """,
+            uuid.UUID(import_id),
+            tenant_id,
+            str(directory),
+            file_pattern,
+            recursive,
+            len(files),
+        )
+    _spawn(ServerImport(pool, import_id, directory, file_pattern, recursive, tenant_id), files)
+    return import_id
+
+
+async def resume_import(pool, import_id: str) -> bool:
+    """
+    Continue an import that failed or whose worker died (stale heartbeat).
+
+    Returns False if the import is unknown or still running elsewhere.
+    """
+    if import_id in _running or not _is_uuid(import_id):
+        return False
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(CLAIM_SQL, uuid.UUID(import_id), STALE_AFTER_SECONDS)
+    if not row:
+        return False
+    _spawn(
+        ServerImport(
+            pool, import_id, Path(row["directory"]), row["file_pattern"], row["recursive"], row["tenant_id"]
+        )
+    )
+    return True
+
+
+async def get_import(pool, import_id: str, error_limit: int = 20) -> dict | None:
+    """Progress counters plus the most recent failures."""
+    if not _is_uuid(import_id):
+        return None
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow("SELECT * FROM server_imports WHERE id = $1", uuid.UUID(import_id))
+        if not row:
+            return None
+        failures = await conn.fetch(
+            """
+            SELECT path, error FROM server_import_files
+            WHERE import_id = $1 AND status = 'failed'
+            ORDER BY created_at DESC LIMIT $2
+            """,
+            uuid.UUID(import_id),
+            error_limit,
+        )
+
+    processed = row["imported"] + row["duplicates"] + row["failed"]
+    return {
+        "import_id": import_id,
+        "status": row["status"],
+        "directory": row["directory"],
+        "total_files": row["total_files"],
+        "processed": processed,
+        "imported": row["imported"],
+        "duplicates": row["duplicates"],
+        "failed": row["failed"],
+        "progress": round(processed / row["total_files"], 4) if row["total_files"] else 1.0,
+        "error": row["error"],
+        "error_details": [{"file": r["path"], "error": r["error"]} for r in failures] or None,
+        "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+        "finished_at": row["finished_at"].isoformat() if row["finished_at"] else None,
+    }
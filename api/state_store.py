@@ -0,0 +1,349 @@
+"""
+ERPX AI Accounting - Shared API State Store
+===========================================
+Cross-worker state for the API middleware (idempotency records and
+rate-limit token buckets), so limits and replays hold no matter which
+uvicorn worker serves a request.
+
+Backends (API_STATE_STORE):
+- memory:   InMemoryStateStore, single process (tests / local dev)
+- redis:    RedisStateStore, any Redis-protocol server (REDIS_URL)
+- postgres: PostgresStateStore, idempotency_keys + rate_limit_buckets
+            (migration 019)
+"""
+
+import base64
+import heapq
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger("erpx.api.state_store")
+
+STATE_STORE_BACKEND = os.getenv("API_STATE_STORE", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+@dataclass
+class IdempotencyRecord:
+    """Stored outcome of a request made with an idempotency key"""
+
+    request_hash: str
+    status: str = "processing"  # processing, completed
+    response_code: int | None = None
+    headers: list[tuple[str, str]] = field(default_factory=list)
+    body: bytes = b""
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "request_hash": self.request_hash,
+            "status": self.status,
+            "response_code": self.response_code,
+            "headers": self.headers,
+            "body": base64.b64encode(self.body).decode(),
+        })
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "IdempotencyRecord":
+        data = json.loads(raw)
+        return cls(
+            request_hash=data["request_hash"],
+            status=data.get("status", "processing"),
+            response_code=data.get("response_code"),
+            headers=[tuple(h) for h in data.get("headers") or []],
+            body=base64.b64decode(data.get("body") or ""),
+        )
+
+
+@dataclass
+class TokenBucketResult:
+    """Outcome of taking tokens from a rate-limit bucket"""
+
+    allowed: bool
+    remaining: float
+    retry_after: float = 0.0
+
+
+class SharedStateStore(ABC):
+    """Interface shared by all backends."""
+
+    @abstractmethod
+    async def reserve_idempotency_key(
+        self, key: str, request_hash: str, ttl: float, tenant: str | None = None
+    ) -> IdempotencyRecord | None:
+        """
+        Atomically claim `key` as processing. Returns None if this caller
+        owns it now, or the existing (unexpired) record otherwise. `tenant`
+        (a tenant code) is recorded by backends that keep it.
+        """
+
+    @abstractmethod
+    async def complete_idempotency_key(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        """Store the final response for a claimed key."""
+
+    @abstractmethod
+    async def release_idempotency_key(self, key: str) -> None:
+        """Drop a claim (request failed) so the client can retry."""
+
+    @abstractmethod
+    async def take_token(self, bucket: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> TokenBucketResult:
+        """Token-bucket rate limiting: take `cost` tokens if available."""
+
+    async def close(self) -> None:
+        pass
+
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+class InMemoryStateStore(SharedStateStore):
+    """
+    Single-process store. Expiry is indexed by a heap of deadlines, so
+    purging only touches entries that actually expired.
+    """
+
+    def __init__(self):
+        self._records: dict[str, tuple[float, IdempotencyRecord]] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._buckets: dict[str, tuple[float, float]] = {}  # bucket -> (tokens, updated_at)
+
+    def _purge_expired(self, now: float) -> None:
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            entry = self._records.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._records[key]
+
+    def _set(self, key: str, record: IdempotencyRecord, ttl: float, now: float) -> None:
+        deadline = now + ttl
+        self._records[key] = (deadline, record)
+        heapq.heappush(self._expiry_heap, (deadline, key))
+
+    async def reserve_idempotency_key(self, key, request_hash, ttl, tenant=None):
+        now = time.monotonic()
+        self._purge_expired(now)
+        entry = self._records.get(key)
+        if entry is not None:
+            return entry[1]
+        self._set(key, IdempotencyRecord(request_hash=request_hash), ttl, now)
+        return None
+
+    async def complete_idempotency_key(self, key, record, ttl):
+        self._set(key, record, ttl, time.monotonic())
+
+    async def release_idempotency_key(self, key):
+        self._records.pop(key, None)
+
+    async def take_token(self, bucket, capacity, refill_per_second, cost=1.0):
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(bucket, (capacity, now))
+        tokens = _refill(tokens, updated_at, now, capacity, refill_per_second)
+        if tokens >= cost:
+            self._buckets[bucket] = (tokens - cost, now)
+            return TokenBucketResult(True, tokens - cost)
+        self._buckets[bucket] = (tokens, now)
+        return TokenBucketResult(False, tokens, (cost - tokens) / refill_per_second if refill_per_second else 60.0)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+# Atomic refill-and-take; bucket is a hash {tokens, ts} expiring when idle
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisStateStore(SharedStateStore):
+    """Redis-protocol store: SET NX EX claims, native key TTLs, Lua token buckets."""
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "erpx:", client=None):
+        if client is None:
+            import redis.asyncio as redis_asyncio
+
+            client = redis_asyncio.from_url(url)
+        self._redis = client
+        self._prefix = prefix
+        self._bucket_script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+
+    async def reserve_idempotency_key(self, key, request_hash, ttl, tenant=None):
+        redis_key = f"{self._prefix}idem:{key}"
+        claimed = await self._redis.set(
+            redis_key, IdempotencyRecord(request_hash=request_hash).to_json(), nx=True, px=int(ttl * 1000)
+        )
+        if claimed:
+            return None
+        raw = await self._redis.get(redis_key)
+        if raw is None:  # expired between SET and GET
+            return await self.reserve_idempotency_key(key, request_hash, ttl, tenant)
+        return IdempotencyRecord.from_json(raw)
+
+    async def complete_idempotency_key(self, key, record, ttl):
+        await self._redis.set(f"{self._prefix}idem:{key}", record.to_json(), px=int(ttl * 1000))
+
+    async def release_idempotency_key(self, key):
+        await self._redis.delete(f"{self._prefix}idem:{key}")
+
+    async def take_token(self, bucket, capacity, refill_per_second, cost=1.0):
+        allowed, tokens = await self._bucket_script(
+            keys=[f"{self._prefix}bucket:{bucket}"], args=[capacity, refill_per_second, cost, time.time()]
+        )
+        tokens = float(tokens)
+        if allowed:
+            return TokenBucketResult(True, tokens)
+        return TokenBucketResult(False, tokens, (cost - tokens) / refill_per_second if refill_per_second else 60.0)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+# Bucket level after refilling since the last update (old row values in DO UPDATE)
+_PG_REFILLED = "LEAST($2, b.tokens + EXTRACT(EPOCH FROM NOW() - b.updated_at) * $3)"
+
+
+class PostgresStateStore(SharedStateStore):
+    """
+    Postgres store on the existing idempotency_keys table (expired rows are
+    taken over by the claiming INSERT) and the UNLOGGED rate_limit_buckets
+    table, each operation a single statement.
+    """
+
+    def __init__(self, pool=None):
+        self._pool = pool
+
+    async def _get_pool(self):
+        if self._pool is None:
+            from src.db import get_pool
+
+            self._pool = await get_pool()
+        return self._pool
+
+    async def reserve_idempotency_key(self, key, request_hash, ttl, tenant=None):
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            claimed = await conn.fetchval(
+                """
+                INSERT INTO idempotency_keys
+                    (idempotency_key, tenant_id, operation, status, request_hash, expires_at)
+                VALUES ($1, (SELECT id FROM tenants WHERE code = $4), 'http', 'processing', $2,
+                        NOW() + make_interval(secs => $3))
+                ON CONFLICT (idempotency_key) DO UPDATE
+                    SET status = 'processing', request_hash = EXCLUDED.request_hash,
+                        tenant_id = EXCLUDED.tenant_id,
+                        response_code = NULL, response_body = NULL, completed_at = NULL,
+                        created_at = NOW(), expires_at = EXCLUDED.expires_at
+                    WHERE idempotency_keys.expires_at <= NOW()
+                RETURNING id
+                """,
+                key, request_hash, float(ttl), tenant,
+            )
+            if claimed is not None:
+                return None
+            row = await conn.fetchrow(
+                """
+                SELECT status, request_hash, response_code, response_body
+                FROM idempotency_keys WHERE idempotency_key = $1
+                """,
+                key,
+            )
+        if row is None:
+            return await self.reserve_idempotency_key(key, request_hash, ttl, tenant)
+        stored = row["response_body"]
+        stored = json.loads(stored) if isinstance(stored, str) else (stored or {})
+        return IdempotencyRecord(
+            request_hash=row["request_hash"] or "",
+            status=row["status"],
+            response_code=row["response_code"],
+            headers=[tuple(h) for h in stored.get("headers") or []],
+            body=base64.b64decode(stored.get("body") or ""),
+        )
+
+    async def complete_idempotency_key(self, key, record, ttl):
+        pool = await self._get_pool()
+        payload = json.dumps({"headers": record.headers, "body": base64.b64encode(record.body).decode()})
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                UPDATE idempotency_keys
+                SET status = $2, response_code = $3, response_body = $4::jsonb,
+                    completed_at = NOW(), expires_at = NOW() + make_interval(secs => $5)
+                WHERE idempotency_key = $1
+                """,
+                key, record.status, record.response_code, payload, float(ttl),
+            )
+
+    async def release_idempotency_key(self, key):
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            # Expire instead of DELETE (the erpx role has no DELETE grant on this
+            # table); the next claim takes over expired rows
+            await conn.execute(
+                """
+                UPDATE idempotency_keys SET status = 'released', expires_at = NOW()
+                WHERE idempotency_key = $1 AND status = 'processing'
+                """,
+                key,
+            )
+
+    async def take_token(self, bucket, capacity, refill_per_second, cost=1.0):
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                INSERT INTO rate_limit_buckets AS b (bucket_key, tokens, allowed, updated_at)
+                VALUES ($1, CASE WHEN $2 >= $4 THEN $2 - $4 ELSE $2 END, $2 >= $4, NOW())
+                ON CONFLICT (bucket_key) DO UPDATE SET
+                    tokens = CASE WHEN {_PG_REFILLED} >= $4 THEN {_PG_REFILLED} - $4 ELSE {_PG_REFILLED} END,
+                    allowed = {_PG_REFILLED} >= $4,
+                    updated_at = NOW()
+                RETURNING b.tokens, b.allowed
+                """,
+                bucket, float(capacity), float(refill_per_second), float(cost),
+            )
+        tokens = float(row["tokens"])
+        if row["allowed"]:
+            return TokenBucketResult(True, tokens)
+        return TokenBucketResult(False, tokens, (cost - tokens) / refill_per_second if refill_per_second else 60.0)
+
+
+def create_state_store(backend: str | None = None) -> SharedStateStore:
+    backend = (backend or STATE_STORE_BACKEND).lower()
+    if backend == "redis":
+        return RedisStateStore()
+    if backend == "postgres":
+        return PostgresStateStore()
+    if backend != "memory":
+        logger.warning(f"Unknown API_STATE_STORE={backend!r}; using in-memory store")
+    return InMemoryStateStore()
+
+
+_store: SharedStateStore | None = None
+
+
+def get_state_store() -> SharedStateStore:
+    """Process-wide store selected by API_STATE_STORE."""
+    global _store
+    if _store is None:
+        _store = create_state_store()
+    return _store
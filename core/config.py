@@ -132,6 +132,9 @@ class Settings:
     MAX_FILE_SIZE_MB: int = field(default_factory=lambda: _get_int("MAX_FILE_SIZE_MB", 50))
     MAX_UPLOAD_COUNT: int = field(default_factory=lambda: _get_int("MAX_UPLOAD_COUNT", 100))
     ALLOWED_SERVER_PATHS: str = field(default_factory=lambda: os.getenv("ALLOWED_SERVER_PATHS", "/data/imports"))
+    SERVER_IMPORT_MAX_FILES: int = field(default_factory=lambda: _get_int("SERVER_IMPORT_MAX_FILES", 10000))
+    SERVER_IMPORT_CONCURRENCY: int = field(default_factory=lambda: _get_int("SERVER_IMPORT_CONCURRENCY", 8))
+    SERVER_IMPORT_BATCH_SIZE: int = field(default_factory=lambda: _get_int("SERVER_IMPORT_BATCH_SIZE", 200))
     MAX_TEXT_LENGTH: int = field(default_factory=lambda: _get_int("MAX_TEXT_LENGTH", 50000))
     MAX_JOURNAL_ENTRIES: int = field(default_factory=lambda: _get_int("MAX_JOURNAL_ENTRIES", 20))
     MAX_AMOUNT: float = field(default_factory=lambda: _get_float("MAX_AMOUNT", 1_000_000_000))
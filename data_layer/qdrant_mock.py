@@ -13,6 +13,8 @@ import threading
 from dataclasses import dataclass
 from typing import Any
 
+from src.rag.quantization import MIN_CALIBRATION, CompressedVectors, CompressionConfig, EmbeddingCodec
+
 
 @dataclass
 class VectorPoint:
@@ -32,6 +34,10 @@ class SearchResult:
     payload: dict[str, Any]
 
 
+def _as_codec(compression: CompressionConfig | EmbeddingCodec) -> EmbeddingCodec:
+    return compression if isinstance(compression, EmbeddingCodec) else EmbeddingCodec(compression)
+
+
 class QdrantMock:
     """
     Mock Qdrant vector database.
@@ -44,6 +50,8 @@ class QdrantMock:
 
         # Collections storage
         self._collections: dict[str, dict[str, VectorPoint]] = {}
+        # Quantized vectors of compressed collections (payloads stay in _collections)
+        self._compressed: dict[str, CompressedVectors] = {}
 
         # Initialize collections
         self._init_collections()
@@ -170,14 +178,46 @@ class QdrantMock:
     # COLLECTION OPERATIONS
     # =========================================================================
 
-    def create_collection(self, name: str, vector_size: int = 1024) -> bool:
-        """Create a new collection"""
+    def create_collection(
+        self, name: str, vector_size: int = 1024, compression: CompressionConfig | EmbeddingCodec | None = None
+    ) -> bool:
+        """
+        Create a new collection. ``compression`` stores vectors reduced and
+        quantized (see src/rag/quantization.py) instead of as float lists.
+        """
         with self._lock:
             if name not in self._collections:
                 self._collections[name] = {}
+                if compression is not None:
+                    self._compressed[name] = CompressedVectors(_as_codec(compression))
                 return True
             return False
 
+    def compress_collection(self, name: str, compression: CompressionConfig | EmbeddingCodec) -> bool:
+        """Re-store an existing collection's vectors compressed (codec fitted on them)"""
+        with self._lock:
+            points = self._collections.get(name)
+            if points is None or name in self._compressed:
+                return False
+            codec = _as_codec(compression)
+            store = CompressedVectors(codec)
+            if points:
+                vectors = [p.vector for p in points.values()]
+                if codec.needs_fit and len(vectors) >= MIN_CALIBRATION:
+                    codec.fit(vectors)
+                store.add(list(points), vectors)
+                for p in points.values():
+                    p.vector = []
+            self._compressed[name] = store
+            return True
+
+    def memory_usage(self, name: str) -> dict[str, int]:
+        """Approximate bytes held for a collection's vectors (compressed: "codes" in RAM, "rescore" on disk)"""
+        if name in self._compressed:
+            return self._compressed[name].nbytes
+        # list of Python floats: 8-byte pointer + 24-byte float object each
+        return {"vectors": sum(32 * len(p.vector) + 56 for p in self._collections.get(name, {}).values())}
+
     def delete_collection(self, name: str) -> bool:
         """Delete a collection"""
         with self._lock:
@@ -200,9 +240,38 @@ class QdrantMock:
             if collection not in self._collections:
                 return False
 
+            if collection in self._compressed:
+                self._compressed[collection].add([point_id], [vector])
+                vector = []
             self._collections[collection][point_id] = VectorPoint(id=point_id, vector=vector, payload=payload)
             return True
 
+    def upsert_points(self, collection: str, points: list[dict[str, Any]]) -> bool:
+        """Batch upsert of {"id", "vector", "payload"} dicts"""
+        with self._lock:
+            if collection not in self._collections:
+                return False
+
+            compressed = self._compressed.get(collection)
+            if compressed is not None and points:
+                compressed.add([p["id"] for p in points], [p["vector"] for p in points])
+            for p in points:
+                vector = [] if compressed is not None else p["vector"]
+                self._collections[collection][p["id"]] = VectorPoint(id=p["id"], vector=vector, payload=p["payload"])
+            return True
+
+    def delete_points(self, collection: str, point_ids: list[str]) -> int:
+        """Batch delete; returns number of points removed"""
+        with self._lock:
+            points = self._collections.get(collection, {})
+            if collection in self._compressed:
+                self._compressed[collection].remove(point_ids)
+            return sum(points.pop(pid, None) is not None for pid in point_ids)
+
+    def count(self, collection: str) -> int:
+        """Number of points in a collection"""
+        return len(self._collections.get(collection, {}))
+
     def delete(self, collection: str, point_id: str) -> bool:
         """Delete a point"""
         with self._lock:
@@ -211,6 +280,8 @@ class QdrantMock:
 
             if point_id in self._collections[collection]:
                 del self._collections[collection][point_id]
+                if collection in self._compressed:
+                    self._compressed[collection].remove([point_id])
                 return True
             return False
 
@@ -218,7 +289,10 @@ class QdrantMock:
         """Get a point by ID"""
         if collection not in self._collections:
             return None
-        return self._collections[collection].get(point_id)
+        point = self._collections[collection].get(point_id)
+        if point is not None and collection in self._compressed:
+            return VectorPoint(point.id, self._compressed[collection].vector(point_id), point.payload)
+        return point
 
     # =========================================================================
     # SEARCH OPERATIONS
@@ -234,6 +308,19 @@ class QdrantMock:
         if collection not in self._collections:
             return []
 
+        compressed = self._compressed.get(collection)
+        if compressed is not None:
+            points = self._collections[collection]
+            allowed = None
+            if filter_payload:
+                allowed = {
+                    pid for pid, p in points.items() if all(p.payload.get(k) == v for k, v in filter_payload.items())
+                }
+            return [
+                SearchResult(id=pid, score=score, payload=points[pid].payload)
+                for pid, score in compressed.search(query_vector, limit, allowed)
+            ]
+
         results = []
 
         for point_id, point in self._collections[collection].items():
@@ -9,11 +9,15 @@ import json
 import os
 import threading
 import uuid
+from collections import OrderedDict
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
+# Documents whose evidence is kept in memory (older ones are only on disk)
+EVIDENCE_MAX_DOCUMENTS = int(os.getenv("EVIDENCE_MAX_DOCUMENTS", "1000"))
+
 
 class EvidenceType(str, Enum):
     """Types of evidence"""
@@ -85,12 +89,14 @@ class EvidenceStore:
     - Verify evidence integrity
     """
 
-    def __init__(self, storage_path: str = None):
+    def __init__(self, storage_path: str = None, max_documents: int = EVIDENCE_MAX_DOCUMENTS):
         self.storage_path = storage_path or os.getenv("EVIDENCE_STORAGE_PATH", "data/evidence")
+        self.max_documents = max_documents
         self._lock = threading.Lock()
         self._evidence: dict[str, Evidence] = {}  # evidence_id -> Evidence
-        self._doc_index: dict[str, list[str]] = {}  # doc_id -> [evidence_ids]
-        self._field_index: dict[str, list[str]] = {}  # field_name -> [evidence_ids]
+        # doc_id -> [evidence_ids], least recently stored first
+        self._doc_index: OrderedDict[str, list[str]] = OrderedDict()
+        self._field_index: dict[str, set[str]] = {}  # field_name -> {evidence_ids}
 
         # Ensure storage directory exists
         os.makedirs(self.storage_path, exist_ok=True)
@@ -116,14 +122,44 @@ class EvidenceStore:
         Returns:
             Evidence ID
         """
-        evidence_id = str(uuid.uuid4())
+        evidence = self._build(
+            doc_id,
+            tenant_id,
+            field_name,
+            field_value,
+            evidence_type,
+            source,
+            text_snippet=text_snippet,
+            source_location=source_location,
+            structured_path=structured_path,
+            calculation_formula=calculation_formula,
+            confidence=confidence,
+            metadata=metadata,
+        )
+        self._add([evidence])
+        return evidence.evidence_id
 
+    def _build(
+        self,
+        doc_id: str,
+        tenant_id: str,
+        field_name: str,
+        field_value: Any,
+        evidence_type: EvidenceType,
+        source: str,
+        text_snippet: str = None,
+        source_location: str = None,
+        structured_path: str = None,
+        calculation_formula: str = None,
+        confidence: float = 1.0,
+        metadata: dict = None,
+    ) -> Evidence:
         # Calculate content hash for integrity
         content = f"{field_name}:{field_value}:{text_snippet or ''}"
         content_hash = hashlib.sha256(content.encode()).hexdigest()
 
-        evidence = Evidence(
-            evidence_id=evidence_id,
+        return Evidence(
+            evidence_id=str(uuid.uuid4()),
             timestamp=datetime.utcnow().isoformat() + "Z",
             doc_id=doc_id,
             tenant_id=tenant_id,
@@ -140,25 +176,38 @@ class EvidenceStore:
             metadata=metadata or {},
         )
 
+    def _add(self, evidence_list: list[Evidence]):
+        """Index evidence records of one document and persist them in one file write"""
+        if not evidence_list:
+            return
+        doc_id = evidence_list[0].doc_id
         with self._lock:
-            self._evidence[evidence_id] = evidence
-
-            # Update indexes
-            if doc_id not in self._doc_index:
-                self._doc_index[doc_id] = []
-            self._doc_index[doc_id].append(evidence_id)
-
-            if field_name not in self._field_index:
-                self._field_index[field_name] = []
-            self._field_index[field_name].append(evidence_id)
-
-        # Persist
-        self._persist_evidence(evidence)
-
-        return evidence_id
-
-    def _persist_evidence(self, evidence: Evidence):
+            doc_ids = self._doc_index.setdefault(doc_id, [])
+            self._doc_index.move_to_end(doc_id)
+            for evidence in evidence_list:
+                self._evidence[evidence.evidence_id] = evidence
+                doc_ids.append(evidence.evidence_id)
+                self._field_index.setdefault(evidence.field_name, set()).add(evidence.evidence_id)
+            while len(self._doc_index) > self.max_documents:
+                self._evict(self._doc_index.popitem(last=False)[1])
+
+            # Persist (under the lock: the per-document file is read and rewritten)
+            self._persist_evidence(evidence_list)
+
+    def _evict(self, evidence_ids: list[str]):
+        """Drop a document's evidence from memory; it stays in its file"""
+        for eid in evidence_ids:
+            evidence = self._evidence.pop(eid, None)
+            if evidence is not None:
+                field_ids = self._field_index.get(evidence.field_name)
+                if field_ids is not None:
+                    field_ids.discard(eid)
+                    if not field_ids:
+                        del self._field_index[evidence.field_name]
+
+    def _persist_evidence(self, evidence_list: list[Evidence]):
         """Persist evidence to file"""
+        evidence = evidence_list[0]
         filename = os.path.join(self.storage_path, f"{evidence.tenant_id}_{evidence.doc_id}.json")
 
         # Load existing evidence for this doc
@@ -168,7 +217,7 @@ class EvidenceStore:
                 existing = json.load(f)
 
         # Append new evidence
-        existing.append(evidence.to_dict())
+        existing.extend(e.to_dict() for e in evidence_list)
 
         # Save
         with open(filename, "w", encoding="utf-8") as f:
@@ -236,48 +285,81 @@ class EvidenceStore:
             "evidence": [e.to_dict() for e in evidence_list],
         }
 
-    def store_from_output(self, doc_id: str, tenant_id: str, output: dict[str, Any]) -> list[str]:
+    def store_from_output(
+        self,
+        doc_id: str,
+        tenant_id: str,
+        output: dict[str, Any],
+        evidence_index: Any = None,
+    ) -> list[str]:
         """
         Store evidence from processing output.
 
         Extracts evidence from the 'evidence' section of output.
 
+        Args:
+            evidence_index: Optional guardrails.evidence_index.SourceEvidenceIndex for
+                the same document. When given, each item is checked against the
+                source and `metadata["verified_in_source"]` / confidence are set.
+
         Returns:
             List of created evidence IDs
         """
-        evidence_ids = []
+        records = []
 
         # Get evidence from output
         evidence_data = output.get("evidence", {})
 
         # Store text snippets
         for snippet in evidence_data.get("key_text_snippets", []):
-            eid = self.store(
-                doc_id=doc_id,
-                tenant_id=tenant_id,
-                field_name="_text_evidence",
-                field_value=snippet,
-                evidence_type=EvidenceType.OCR_SNIPPET,
-                source="ocr",
-                text_snippet=snippet,
+            confidence = 1.0
+            metadata = None
+            if evidence_index is not None and isinstance(snippet, str):
+                verified = evidence_index.string_in_source(snippet)
+                confidence = 1.0 if verified else round(evidence_index.ngram_overlap(snippet), 4)
+                metadata = {"verified_in_source": verified}
+
+            records.append(
+                self._build(
+                    doc_id=doc_id,
+                    tenant_id=tenant_id,
+                    field_name="_text_evidence",
+                    field_value=snippet,
+                    evidence_type=EvidenceType.OCR_SNIPPET,
+                    source="ocr",
+                    text_snippet=snippet,
+                    confidence=confidence,
+                    metadata=metadata,
+                )
             )
-            evidence_ids.append(eid)
 
         # Store number evidence
         for num_evidence in evidence_data.get("numbers_found", []):
-            eid = self.store(
-                doc_id=doc_id,
-                tenant_id=tenant_id,
-                field_name=num_evidence.get("label", "unknown"),
-                field_value=num_evidence.get("value"),
-                evidence_type=EvidenceType.OCR_TEXT
-                if num_evidence.get("source") == "ocr"
-                else EvidenceType.STRUCTURED_FIELD,
-                source=num_evidence.get("source", "unknown"),
+            value = num_evidence.get("value")
+            confidence = 1.0
+            metadata = None
+            if evidence_index is not None:
+                verified = evidence_index.value_in_source(value)
+                confidence = 1.0 if verified else 0.0
+                metadata = {"verified_in_source": verified}
+
+            records.append(
+                self._build(
+                    doc_id=doc_id,
+                    tenant_id=tenant_id,
+                    field_name=num_evidence.get("label", "unknown"),
+                    field_value=value,
+                    evidence_type=EvidenceType.OCR_TEXT
+                    if num_evidence.get("source") == "ocr"
+                    else EvidenceType.STRUCTURED_FIELD,
+                    source=num_evidence.get("source", "unknown"),
+                    confidence=confidence,
+                    metadata=metadata,
+                )
             )
-            evidence_ids.append(eid)
 
-        return evidence_ids
+        self._add(records)
+        return [e.evidence_id for e in records]
 
 
 # Global evidence store instance
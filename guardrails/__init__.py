@@ -1,4 +1,5 @@
 # ERPX AI Accounting - Guardrails Module
+from .evidence_index import SourceEvidenceIndex
 from .input_validator import InputValidator, validate_coding_request
 from .output_validator import OutputValidator, validate_output_schema
 from .policy_checker import PolicyChecker, check_policy
@@ -0,0 +1,185 @@
+"""
+ERPX AI Accounting - Source Evidence Index
+==========================================
+Per-document index of source evidence (OCR text + structured input).
+
+Built once per document and shared by OutputValidator (R2 hallucination
+checks), PolicyChecker, GuardrailsEngine and EvidenceStore, so each field
+lookup no longer re-scans or re-normalizes the full source text.
+
+Contents:
+- text: lowercased source text
+- compact_text: text with whitespace/dashes removed (computed once)
+- numbers: sorted numeric values found in text (bisect tolerance lookups)
+- structured values: flattened set of every value in the structured source
+- trigrams: n-gram set of compact_text for fast rejection / partial matches
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any
+
+NGRAM_SIZE = 3
+
+_COMPACT_RE = re.compile(r"[\s\-]")
+
+# Same formats OutputValidator has always recognised
+_NUMBER_PATTERNS = [
+    re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?"),  # 1,000,000.00
+    re.compile(r"\d+(?:\.\d{3})*(?:,\d+)?"),  # 1.000.000,00
+    re.compile(r"\d+"),  # Plain numbers
+]
+
+
+def compact(text: str) -> str:
+    """Lowercase and strip whitespace/dashes (matching rule for IDs, serials)."""
+    return _COMPACT_RE.sub("", text.lower())
+
+
+def extract_numbers(text: str) -> set[float]:
+    """Extract all numbers from text"""
+    numbers = set()
+    for pattern in _NUMBER_PATTERNS:
+        for match in pattern.findall(text):
+            try:
+                # Remove formatting
+                numbers.add(float(match.replace(",", "").replace(" ", "")))
+            except ValueError:
+                pass
+    return numbers
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> set[str]:
+    """Character n-grams of text (the text itself if shorter than n)."""
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class SourceEvidenceIndex:
+    """
+    Precomputed lookup structures over one document's source data.
+
+    Usage:
+        index = SourceEvidenceIndex(ocr_text, structured_input)
+        validator = OutputValidator(evidence_index=index)
+        policy_checker.check_policy(output, evidence_index=index)
+        evidence_store.store_from_output(doc_id, tenant_id, output, evidence_index=index)
+    """
+
+    def __init__(self, source_text: str | None = None, source_structured: dict | None = None):
+        self.text = (source_text or "").lower()
+        self.structured = source_structured or {}
+
+        self.compact_text = _COMPACT_RE.sub("", self.text)
+        self.numbers: list[float] = sorted(extract_numbers(self.text))
+        self.trigrams: set[str] = ngrams(self.compact_text)
+
+        self._structured_strs: set[str] = set()
+        self._structured_values: set[Any] = set()
+        self._flatten(self.structured)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _add_structured(self, value: Any):
+        self._structured_strs.add(str(value))
+        try:
+            self._structured_values.add(value)
+        except TypeError:
+            pass  # Unhashable containers only match via str()
+
+    def _flatten(self, d: dict):
+        """Collect values the way the old recursive _search_dict visited them."""
+        if not isinstance(d, dict):
+            return
+        for value in d.values():
+            self._add_structured(value)
+            if isinstance(value, dict):
+                self._flatten(value)
+            elif isinstance(value, list):
+                for item in value:
+                    self._add_structured(item)
+                    if isinstance(item, dict):
+                        self._flatten(item)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.text and not self.structured
+
+    @property
+    def source_numbers(self) -> set[float]:
+        return set(self.numbers)
+
+    def in_structured(self, target: Any) -> bool:
+        """Value appears anywhere in the structured source (by equality or str())."""
+        try:
+            if target in self._structured_values:
+                return True
+        except TypeError:
+            pass
+        return str(target) in self._structured_strs
+
+    def has_number_near(self, value: float, tolerance: float = 1.0) -> bool:
+        """A number strictly within `tolerance` of value exists in the text."""
+        numbers = self.numbers
+        if not numbers:
+            return False
+        i = bisect_left(numbers, value)
+        if i < len(numbers) and abs(numbers[i] - value) < tolerance:
+            return True
+        return i > 0 and abs(numbers[i - 1] - value) < tolerance
+
+    def contains_compact(self, value: str) -> bool:
+        """Value (ignoring case, spaces and dashes) is a substring of the source text."""
+        cleaned = compact(value)
+        if not cleaned:
+            return True
+        # Any missing n-gram proves absence without scanning the text
+        if len(cleaned) >= NGRAM_SIZE and not all(g in self.trigrams for g in ngrams(cleaned)):
+            return False
+        return cleaned in self.compact_text
+
+    def ngram_overlap(self, value: str) -> float:
+        """Fraction of value's n-grams present in the source (0.0 - 1.0) for partial matches."""
+        grams = ngrams(compact(value))
+        if not grams:
+            return 1.0
+        return sum(1 for g in grams if g in self.trigrams) / len(grams)
+
+    def value_in_source(self, value: Any) -> bool:
+        """Numeric value has evidence in the structured source or OCR text."""
+        if value is None:
+            return True
+
+        if self.in_structured(value):
+            return True
+
+        if str(value) in self.text:
+            return True
+
+        if isinstance(value, (int, float)):
+            # Check with comma / space thousands formatting
+            formatted = f"{value:,.0f}"
+            if formatted.replace(",", " ") in self.text or formatted in self.text:
+                return True
+            # Check if it's close to any number in source
+            if self.has_number_near(value):
+                return True
+
+        return False
+
+    def string_in_source(self, value: str) -> bool:
+        """String value has evidence in the source (exact, structured, or ignoring spaces/dashes)."""
+        if not value:
+            return True
+        if value.lower() in self.text:
+            return True
+        if self.in_structured(value):
+            return True
+        return self.contains_compact(value)
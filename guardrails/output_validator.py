@@ -14,6 +14,7 @@ from typing import Any
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.constants import DOC_TYPE_BANK_SLIP, DOC_TYPE_OTHER, DOC_TYPE_RECEIPT, DOC_TYPE_VAT_INVOICE, VAT_RATES_VN
+from guardrails.evidence_index import SourceEvidenceIndex, extract_numbers
 
 
 @dataclass
@@ -58,17 +59,30 @@ class OutputValidator:
     # Valid document types
     VALID_DOC_TYPES = {DOC_TYPE_RECEIPT, DOC_TYPE_VAT_INVOICE, DOC_TYPE_BANK_SLIP, DOC_TYPE_OTHER}
 
-    def __init__(self, source_text: str = None, source_structured: dict = None):
+    def __init__(
+        self,
+        source_text: str = None,
+        source_structured: dict = None,
+        evidence_index: SourceEvidenceIndex | None = None,
+    ):
         """
         Initialize with source data for hallucination checking.
 
         Args:
             source_text: Original OCR text
             source_structured: Original structured input
+            evidence_index: Prebuilt index for this document (takes precedence)
         """
-        self.source_text = (source_text or "").lower()
-        self.source_structured = source_structured or {}
-        self._source_numbers = self._extract_numbers(self.source_text)
+        self._set_index(evidence_index or SourceEvidenceIndex(source_text, source_structured))
+
+    def _set_index(self, index: SourceEvidenceIndex):
+        self.evidence_index = index
+        self.source_text = index.text
+        self.source_structured = index.structured
+
+    @property
+    def _source_numbers(self) -> set[float]:
+        return self.evidence_index.source_numbers
 
     def _is_legacy_output(self, output: dict[str, Any]) -> bool:
         """
@@ -85,11 +99,13 @@ class OutputValidator:
         """
         Validate output against FIXED SCHEMA and rules.
         """
-        if source_text is not None:
-            self.source_text = source_text.lower()
-            self._source_numbers = self._extract_numbers(self.source_text)
-        if source_structured is not None:
-            self.source_structured = source_structured
+        if source_text is not None or source_structured is not None:
+            self._set_index(
+                SourceEvidenceIndex(
+                    source_text if source_text is not None else self.source_text,
+                    source_structured if source_structured is not None else self.source_structured,
+                )
+            )
 
         errors = []
         warnings = []
@@ -330,99 +346,21 @@ class OutputValidator:
 
     def _value_in_source(self, value: Any) -> bool:
         """Check if numeric value exists in source"""
-        if value is None:
-            return True
-
-        # Check structured source first
-        str_value = str(value)
-        if self._search_dict(self.source_structured, value):
-            return True
-
-        # Check text source
-        if str_value in self.source_text:
-            return True
-
-        # Check formatted versions
-        if isinstance(value, (int, float)):
-            # Check with comma formatting
-            formatted = f"{value:,.0f}".replace(",", " ")
-            if formatted in self.source_text:
-                return True
-            formatted = f"{value:,.0f}"
-            if formatted in self.source_text:
-                return True
-
-        # Check if it's close to any number in source
-        if isinstance(value, (int, float)):
-            for src_num in self._source_numbers:
-                if abs(src_num - value) < 1:  # Allow 1 unit difference
-                    return True
-
-        return False
+        return self.evidence_index.value_in_source(value)
 
     def _string_in_source(self, value: str) -> bool:
         """Check if string value exists in source"""
-        if not value:
-            return True
-
-        value_lower = value.lower()
-
-        # Check text source
-        if value_lower in self.source_text:
-            return True
-
-        # Check structured source
-        if self._search_dict(self.source_structured, value):
-            return True
-
-        # Check without spaces/dashes
-        cleaned = re.sub(r"[\s\-]", "", value_lower)
-        cleaned_source = re.sub(r"[\s\-]", "", self.source_text)
-        if cleaned in cleaned_source:
-            return True
-
-        return False
+        return self.evidence_index.string_in_source(value)
 
     def _search_dict(self, d: dict, target: Any) -> bool:
         """Search for value in nested dict"""
-        if d is None:
-            return False
-
-        for key, value in d.items():
-            if value == target or str(value) == str(target):
-                return True
-            if isinstance(value, dict):
-                if self._search_dict(value, target):
-                    return True
-            elif isinstance(value, list):
-                for item in value:
-                    if item == target or str(item) == str(target):
-                        return True
-                    if isinstance(item, dict) and self._search_dict(item, target):
-                        return True
-        return False
+        if d is self.source_structured:
+            return self.evidence_index.in_structured(target)
+        return SourceEvidenceIndex(source_structured=d).in_structured(target)
 
     def _extract_numbers(self, text: str) -> set[float]:
         """Extract all numbers from text"""
-        numbers = set()
-
-        # Find numbers with various formats
-        patterns = [
-            r"\d+(?:,\d{3})*(?:\.\d+)?",  # 1,000,000.00
-            r"\d+(?:\.\d{3})*(?:,\d+)?",  # 1.000.000,00
-            r"\d+",  # Plain numbers
-        ]
-
-        for pattern in patterns:
-            for match in re.findall(pattern, text):
-                try:
-                    # Remove formatting
-                    clean = match.replace(",", "").replace(" ", "")
-                    numbers.add(float(clean))
-                except:
-                    pass
-
-        return numbers
+        return extract_numbers(text)
 
 
 def validate_output_schema(
@@ -19,6 +19,7 @@ from core.constants import (
     DOC_TYPE_VAT_INVOICE,
     MODE_STRICT,
 )
+from guardrails.evidence_index import SourceEvidenceIndex
 
 
 class ApprovalLevel(str, Enum):
@@ -67,6 +68,8 @@ class PolicyChecker:
         self.manager_approval_threshold = self.tenant_config.get(
             "manager_approval_threshold", APPROVAL_THRESHOLD_MANAGER
         )
+        # Ungrounded values are only recommendations unless a tenant opts in
+        self.enforce_source_grounding = bool(self.tenant_config.get("enforce_source_grounding", False))
 
     def check(
         self,
@@ -123,13 +126,19 @@ class PolicyChecker:
             approver_level=approver_level,
         )
 
-    def check_policy(self, output: dict[str, Any], context: dict[str, Any] = None) -> PolicyCheckResult:
+    def check_policy(
+        self,
+        output: dict[str, Any],
+        context: dict[str, Any] = None,
+        evidence_index: SourceEvidenceIndex | None = None,
+    ) -> PolicyCheckResult:
         """
         Check if output passes business policies.
 
         Args:
             output: Accounting coding output
             context: Additional context (user, department, etc.)
+            evidence_index: Source evidence index shared with OutputValidator (optional)
 
         Returns:
             PolicyCheckResult with approval requirements
@@ -178,6 +187,16 @@ class PolicyChecker:
             requires_review = True
             approval_level = max(approval_level, ApprovalLevel.MANAGER, key=lambda x: x.value)
 
+        # Source grounding: advisory by default, blocking when enforced for the tenant
+        if evidence_index is not None and not evidence_index.is_empty:
+            grounding_issues = self._check_source_grounding(payload, evidence_index)
+            if self.enforce_source_grounding:
+                violations.extend(grounding_issues)
+                if grounding_issues:
+                    requires_review = True
+            else:
+                recommendations.extend(grounding_issues)
+
         # Determine final status
         passed = len(violations) == 0
 
@@ -278,6 +297,23 @@ class PolicyChecker:
 
         return violations
 
+    def _check_source_grounding(self, payload: dict[str, Any], evidence_index: SourceEvidenceIndex) -> list[str]:
+        """Check that amounts and IDs that drive approval exist in the source"""
+        violations = []
+
+        chi_tiet = payload.get("chi_tiet", {})
+        hoa_don = payload.get("hoa_don", {})
+
+        grand_total = chi_tiet.get("grand_total") if isinstance(chi_tiet, dict) else None
+        if isinstance(grand_total, (int, float)) and grand_total and not evidence_index.value_in_source(grand_total):
+            violations.append(f"grand_total {grand_total:,.0f} not found in source document")
+
+        tax_id = hoa_don.get("tax_id") if isinstance(hoa_don, dict) else None
+        if tax_id and isinstance(tax_id, str) and not evidence_index.string_in_source(tax_id):
+            violations.append(f"Tax ID {tax_id} not found in source document")
+
+        return violations
+
     def _check_risk_indicators(self, payload: dict[str, Any], context: dict[str, Any] = None) -> list[str]:
         """Check for high-risk indicators"""
         violations = []
@@ -308,11 +344,15 @@ class PolicyChecker:
 
 
 def check_policy(
-    output: dict[str, Any], mode: str = MODE_STRICT, context: dict[str, Any] = None, tenant_config: dict = None
+    output: dict[str, Any],
+    mode: str = MODE_STRICT,
+    context: dict[str, Any] = None,
+    tenant_config: dict = None,
+    evidence_index: SourceEvidenceIndex | None = None,
 ) -> PolicyCheckResult:
     """Convenience function for policy checking"""
     checker = PolicyChecker(mode=mode, tenant_config=tenant_config)
-    return checker.check_policy(output, context)
+    return checker.check_policy(output, context, evidence_index=evidence_index)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+-- Migration 016: Policy rule cache invalidation
+-- =============================================
+-- API workers cache compiled policy rule sets per tenant (src/policy/ruleset.py).
+-- Any change to policy_rules sends NOTIFY on 'policy_rules_changed' so the
+-- caches drop the affected tenant. Payload is the tenant_id, or '' for
+-- system-wide rules (which invalidates every tenant).
+
+CREATE OR REPLACE FUNCTION notify_policy_rules_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    affected_tenant UUID;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        affected_tenant := OLD.tenant_id;
+    ELSE
+        affected_tenant := NEW.tenant_id;
+    END IF;
+
+    PERFORM pg_notify('policy_rules_changed', COALESCE(affected_tenant::text, ''));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS policy_rules_changed_notify ON policy_rules;
+CREATE TRIGGER policy_rules_changed_notify
+    AFTER INSERT OR UPDATE OR DELETE ON policy_rules
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_policy_rules_changed();
+
+DROP TRIGGER IF EXISTS update_policy_rules_updated_at ON policy_rules;
+CREATE TRIGGER update_policy_rules_updated_at
+    BEFORE UPDATE ON policy_rules
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at();
+
+COMMENT ON FUNCTION notify_policy_rules_changed() IS 'Invalidates cached compiled policy rule sets in API workers';
@@ -0,0 +1,21 @@
+-- Migration 017: Keyset pagination indexes
+-- ========================================
+-- List endpoints page on (created_at, id) DESC with a cursor instead of
+-- LIMIT/OFFSET (src/api/pagination.py). These indexes make every page an
+-- index range scan, independent of page depth.
+
+CREATE INDEX IF NOT EXISTS idx_documents_created_id
+    ON documents (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_documents_status_created_id
+    ON documents (status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_journal_proposals_created_id
+    ON journal_proposals (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_journal_proposals_status_created_id
+    ON journal_proposals (status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_journal_proposal_entries_proposal
+    ON journal_proposal_entries (proposal_id);
+
+CREATE INDEX IF NOT EXISTS idx_approvals_created_id
+    ON approvals (created_at DESC, id DESC);
@@ -0,0 +1,41 @@
+-- Migration 018: Vietnamese-aware document search
+-- ===============================================
+-- Normalized (unaccented, lowercased) search columns maintained on write,
+-- served by trigram and full-text GIN indexes (src/search/service.py).
+-- erpx_search_normalize() mirrors src/search/normalize.py:normalize_text().
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() is STABLE (it depends on search_path); pinning the dictionary
+-- makes the wrapper safe to declare IMMUTABLE for generated columns/indexes.
+CREATE OR REPLACE FUNCTION erpx_search_normalize(value TEXT)
+RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(
+        lower(public.unaccent('public.unaccent'::regdictionary, translate(value, 'đĐ', 'dD'))),
+        '\s+', ' ', 'g'
+    ))
+$$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
+
+-- Short fields: vendor, invoice number, tax ID
+ALTER TABLE extracted_invoices
+    ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+        erpx_search_normalize(
+            coalesce(vendor_name, '') || ' ' || coalesce(invoice_number, '') || ' ' || coalesce(vendor_tax_id, '')
+        )
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_extracted_invoices_search_trgm
+    ON extracted_invoices USING GIN (search_text gin_trgm_ops);
+
+-- OCR text
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('simple', erpx_search_normalize(coalesce(raw_text, '')))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_documents_search_tsv
+    ON documents USING GIN (search_tsv);
+
+CREATE INDEX IF NOT EXISTS idx_extracted_invoices_document_id
+    ON extracted_invoices (document_id);
@@ -0,0 +1,28 @@
+-- Migration 019: Shared rate-limit buckets
+-- ========================================
+-- Token buckets for RateLimitMiddleware when API_STATE_STORE=postgres
+-- (api/state_store.py), shared by every API worker. UNLOGGED: buckets are
+-- disposable and refill on their own, so WAL is skipped.
+
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+    bucket_key VARCHAR(255) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    allowed BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated
+    ON rate_limit_buckets (updated_at);
+
+-- Idle buckets are full again; drop them with the expired idempotency keys
+CREATE OR REPLACE FUNCTION cleanup_expired_idempotency_keys()
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    DELETE FROM idempotency_keys WHERE expires_at < NOW();
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    DELETE FROM rate_limit_buckets WHERE updated_at < NOW() - INTERVAL '1 hour';
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
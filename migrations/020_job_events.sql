@@ -0,0 +1,31 @@
+-- Migration 020: Job events
+-- =========================
+-- Append-only log of job state changes written by create_job_state /
+-- update_job_state, which also NOTIFY erpx_job_events with the row. The
+-- BIGSERIAL id is the SSE event id clients resume from (Last-Event-ID).
+
+CREATE TABLE IF NOT EXISTS job_events (
+    id BIGSERIAL PRIMARY KEY,
+    job_id VARCHAR(100) NOT NULL,
+    tenant_id UUID,
+    state VARCHAR(30) NOT NULL,
+    previous_state VARCHAR(30),
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id);
+CREATE INDEX IF NOT EXISTS idx_job_events_tenant ON job_events (tenant_id, id);
+CREATE INDEX IF NOT EXISTS idx_job_events_created ON job_events (created_at);
+
+-- Resume only needs recent history
+CREATE OR REPLACE FUNCTION cleanup_old_job_events(retention INTERVAL DEFAULT INTERVAL '7 days')
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    DELETE FROM job_events WHERE created_at < NOW() - retention;
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
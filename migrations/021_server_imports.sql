@@ -0,0 +1,37 @@
+-- Migration 021: Server directory imports
+-- =======================================
+-- Background bulk imports started by POST /v1/config/import/server
+-- (api/server_import.py). server_imports holds progress counters for
+-- polling; server_import_files records each finished file in the same
+-- transaction as its jobs row, so a resumed import skips it.
+
+CREATE TABLE IF NOT EXISTS server_imports (
+    id UUID PRIMARY KEY,
+    tenant_id VARCHAR(100),
+    directory TEXT NOT NULL,
+    file_pattern VARCHAR(255) NOT NULL DEFAULT '*',
+    recursive BOOLEAN NOT NULL DEFAULT FALSE,
+    status VARCHAR(20) NOT NULL DEFAULT 'running', -- running, completed, failed
+    total_files INTEGER NOT NULL DEFAULT 0,
+    imported INTEGER NOT NULL DEFAULT 0,
+    duplicates INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(), -- heartbeat while running
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_server_imports_tenant ON server_imports (tenant_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS server_import_files (
+    import_id UUID NOT NULL REFERENCES server_imports(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL, -- imported, duplicate, failed
+    job_id VARCHAR(100),
+    checksum VARCHAR(64),
+    file_size BIGINT,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (import_id, path)
+);
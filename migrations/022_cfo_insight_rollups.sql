@@ -0,0 +1,180 @@
+-- Migration 022: CFO insight rollups and snapshots
+-- ================================================
+-- src/insights/cfo.py used to aggregate ledger_lines and extracted_invoices
+-- over the whole window on every insight. These per-tenant, per-day rollups
+-- are maintained by triggers (every posting path writes the same tables), so
+-- an insight sums at most window_days rows regardless of ledger size.
+--
+-- cfo_insight_snapshots holds the latest generated insight per tenant and
+-- window; the outbox worker regenerates it on ledger.posted
+-- (handler cfo_insight_refresh) so the CFO dashboard reads a ready result.
+
+CREATE TABLE IF NOT EXISTS ledger_daily_stats (
+    tenant_id UUID NOT NULL,
+    day DATE NOT NULL,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    total_debit DECIMAL(18,2) NOT NULL DEFAULT 0,
+    total_credit DECIMAL(18,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS vendor_daily_stats (
+    tenant_id UUID NOT NULL,
+    day DATE NOT NULL,
+    vendor_name VARCHAR(255) NOT NULL,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(18,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, day, vendor_name)
+);
+
+CREATE TABLE IF NOT EXISTS cfo_insight_snapshots (
+    tenant_id UUID NOT NULL,
+    window_days INTEGER NOT NULL,
+    result JSONB NOT NULL,
+    generated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, window_days)
+);
+
+-- ============================================
+-- Rollup maintenance
+-- ============================================
+
+CREATE OR REPLACE FUNCTION bump_ledger_daily_stats(
+    p_tenant UUID, p_day DATE, p_entries INTEGER, p_debit DECIMAL, p_credit DECIMAL
+) RETURNS VOID AS $$
+BEGIN
+    IF p_tenant IS NULL OR p_day IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO ledger_daily_stats (tenant_id, day, entry_count, total_debit, total_credit)
+    VALUES (p_tenant, p_day, p_entries, COALESCE(p_debit, 0), COALESCE(p_credit, 0))
+    ON CONFLICT (tenant_id, day) DO UPDATE SET
+        entry_count = ledger_daily_stats.entry_count + EXCLUDED.entry_count,
+        total_debit = ledger_daily_stats.total_debit + EXCLUDED.total_debit,
+        total_credit = ledger_daily_stats.total_credit + EXCLUDED.total_credit;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ledger_entries_rollup()
+RETURNS TRIGGER AS $$
+DECLARE
+    line_debit DECIMAL := 0;
+    line_credit DECIMAL := 0;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_ledger_daily_stats(NEW.tenant_id, NEW.entry_date, 1, 0, 0);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_ledger_daily_stats(OLD.tenant_id, OLD.entry_date, -1, 0, 0);
+    ELSIF OLD.tenant_id IS DISTINCT FROM NEW.tenant_id OR OLD.entry_date IS DISTINCT FROM NEW.entry_date THEN
+        -- Re-dated or re-assigned entry: move it and its lines
+        SELECT COALESCE(SUM(debit_amount), 0), COALESCE(SUM(credit_amount), 0)
+        INTO line_debit, line_credit
+        FROM ledger_lines WHERE ledger_entry_id = NEW.id;
+        PERFORM bump_ledger_daily_stats(OLD.tenant_id, OLD.entry_date, -1, -line_debit, -line_credit);
+        PERFORM bump_ledger_daily_stats(NEW.tenant_id, NEW.entry_date, 1, line_debit, line_credit);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ledger_lines_rollup()
+RETURNS TRIGGER AS $$
+DECLARE
+    entry RECORD;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT tenant_id, entry_date INTO entry FROM ledger_entries WHERE id = OLD.ledger_entry_id;
+        IF FOUND THEN
+            PERFORM bump_ledger_daily_stats(entry.tenant_id, entry.entry_date, 0, -OLD.debit_amount, -OLD.credit_amount);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT tenant_id, entry_date INTO entry FROM ledger_entries WHERE id = NEW.ledger_entry_id;
+        IF FOUND THEN
+            PERFORM bump_ledger_daily_stats(entry.tenant_id, entry.entry_date, 0, NEW.debit_amount, NEW.credit_amount);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION extracted_invoices_vendor_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Same filter as the old top-vendors query (document-backed, named vendor, dated)
+    IF TG_OP IN ('UPDATE', 'DELETE')
+       AND OLD.tenant_id IS NOT NULL AND OLD.invoice_date IS NOT NULL
+       AND OLD.document_id IS NOT NULL AND COALESCE(OLD.vendor_name, '') != '' THEN
+        UPDATE vendor_daily_stats
+        SET transaction_count = transaction_count - 1,
+            total_amount = total_amount - COALESCE(OLD.total_amount, 0)
+        WHERE tenant_id = OLD.tenant_id AND day = OLD.invoice_date AND vendor_name = OLD.vendor_name;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE')
+       AND NEW.tenant_id IS NOT NULL AND NEW.invoice_date IS NOT NULL
+       AND NEW.document_id IS NOT NULL AND COALESCE(NEW.vendor_name, '') != '' THEN
+        INSERT INTO vendor_daily_stats (tenant_id, day, vendor_name, transaction_count, total_amount)
+        VALUES (NEW.tenant_id, NEW.invoice_date, NEW.vendor_name, 1, COALESCE(NEW.total_amount, 0))
+        ON CONFLICT (tenant_id, day, vendor_name) DO UPDATE SET
+            transaction_count = vendor_daily_stats.transaction_count + 1,
+            total_amount = vendor_daily_stats.total_amount + EXCLUDED.total_amount;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ledger_entries_rollup ON ledger_entries;
+CREATE TRIGGER ledger_entries_rollup
+    AFTER INSERT OR UPDATE OF tenant_id, entry_date OR DELETE ON ledger_entries
+    FOR EACH ROW
+    EXECUTE FUNCTION ledger_entries_rollup();
+
+DROP TRIGGER IF EXISTS ledger_lines_rollup ON ledger_lines;
+CREATE TRIGGER ledger_lines_rollup
+    AFTER INSERT OR UPDATE OF ledger_entry_id, debit_amount, credit_amount OR DELETE ON ledger_lines
+    FOR EACH ROW
+    EXECUTE FUNCTION ledger_lines_rollup();
+
+DROP TRIGGER IF EXISTS extracted_invoices_vendor_rollup ON extracted_invoices;
+CREATE TRIGGER extracted_invoices_vendor_rollup
+    AFTER INSERT OR UPDATE OF tenant_id, invoice_date, document_id, vendor_name, total_amount OR DELETE
+    ON extracted_invoices
+    FOR EACH ROW
+    EXECUTE FUNCTION extracted_invoices_vendor_rollup();
+
+-- ============================================
+-- Backfill (recomputed from raw rows, safe to re-run)
+-- ============================================
+
+INSERT INTO ledger_daily_stats (tenant_id, day, entry_count, total_debit, total_credit)
+SELECT le.tenant_id, le.entry_date, COUNT(DISTINCT le.id),
+       COALESCE(SUM(ll.debit_amount), 0), COALESCE(SUM(ll.credit_amount), 0)
+FROM ledger_entries le
+LEFT JOIN ledger_lines ll ON ll.ledger_entry_id = le.id
+WHERE le.tenant_id IS NOT NULL
+GROUP BY le.tenant_id, le.entry_date
+ON CONFLICT (tenant_id, day) DO UPDATE SET
+    entry_count = EXCLUDED.entry_count,
+    total_debit = EXCLUDED.total_debit,
+    total_credit = EXCLUDED.total_credit;
+
+INSERT INTO vendor_daily_stats (tenant_id, day, vendor_name, transaction_count, total_amount)
+SELECT ei.tenant_id, ei.invoice_date, ei.vendor_name, COUNT(*), COALESCE(SUM(ei.total_amount), 0)
+FROM extracted_invoices ei
+JOIN documents d ON d.id = ei.document_id
+WHERE ei.tenant_id IS NOT NULL
+  AND ei.invoice_date IS NOT NULL
+  AND ei.vendor_name IS NOT NULL
+  AND ei.vendor_name != ''
+GROUP BY ei.tenant_id, ei.invoice_date, ei.vendor_name
+ON CONFLICT (tenant_id, day, vendor_name) DO UPDATE SET
+    transaction_count = EXCLUDED.transaction_count,
+    total_amount = EXCLUDED.total_amount;
+
+-- ============================================
+-- Outbox subscription: regenerate snapshots on new postings
+-- ============================================
+
+INSERT INTO event_subscriptions (name, event_types, delivery_type, delivery_config)
+SELECT 'cfo_insight_refresh', ARRAY['ledger.posted'], 'internal', '{"handler": "cfo_insight_refresh"}'
+WHERE NOT EXISTS (SELECT 1 FROM event_subscriptions WHERE name = 'cfo_insight_refresh' AND tenant_id IS NULL);
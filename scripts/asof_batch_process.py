@@ -9,8 +9,10 @@ Usage:
     source venv/bin/activate
     python scripts/asof_batch_process.py data/processed/pilot_run_*/
     python scripts/asof_batch_process.py data/processed/pilot_run_*/ --bank-txns data/paysim_sample.csv
+    python scripts/asof_batch_process.py data/processed/pilot_run_*/ --llm-batch  # several invoices per LLM call
 """
 
+import asyncio
 import csv
 import json
 import logging
@@ -34,9 +36,10 @@ logger = logging.getLogger("ASOFBatch")
 class ASOFTBatchProcessor:
     """Batch processor for ASOFT-T Copilot."""
 
-    def __init__(self, concurrency: int = 4, strict_mode: bool = False):
+    def __init__(self, concurrency: int = 4, strict_mode: bool = False, llm_batch: bool = False):
         self.concurrency = concurrency
         self.strict_mode = strict_mode
+        self.llm_batch = llm_batch
         self.results: list[dict[str, Any]] = []
         self.results_lock = Lock()
 
@@ -139,6 +142,41 @@ class ASOFTBatchProcessor:
                 "missing_fields": [],
             }
 
+    def process_files_batched(self, invoice_files: list[Path]) -> list[dict[str, Any]]:
+        """
+        Code all invoices with packed LLM requests (src.llm.batching).
+
+        Skips the copilot's rules and reconciliation; only the LLM proposal
+        is produced, several invoices per request.
+        """
+        from src.workflows.pipeline_stages import generate_proposals_batched
+
+        documents, results = [], []
+        for invoice_path in invoice_files:
+            with open(invoice_path, encoding="utf-8") as f:
+                data = json.load(f)
+            doc_id = data.get("doc_id", invoice_path.stem)
+            fields = data.get("invoice_data") or data.get("labels") or {}
+            documents.append((doc_id, data.get("text") or json.dumps(fields, ensure_ascii=False)))
+
+        batch = asyncio.run(generate_proposals_batched(documents, request_id="asof-batch"))
+        for invoice_path, (doc_id, _), outcome in zip(invoice_files, documents, batch):
+            if outcome.ok:
+                result = dict(outcome.data)
+                result.setdefault("warnings", result.get("risks", []))
+                result.setdefault("missing_fields", [])
+            else:
+                result = {
+                    "error": outcome.error,
+                    "needs_human_review": True,
+                    "warnings": [f"Processing error: {outcome.error}"],
+                    "missing_fields": [],
+                }
+            result["source_file"] = str(invoice_path)
+            result["doc_id"] = doc_id
+            results.append(result)
+        return results
+
     def process_batch(
         self, input_path: str, bank_transactions_path: str | None = None, output_dir: str | None = None
     ) -> dict[str, Any]:
@@ -188,51 +226,24 @@ class ASOFTBatchProcessor:
 
         all_results = []
 
-        # Process with thread pool
-        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
-            future_to_file = {executor.submit(self.process_single, f, bank_transactions): f for f in invoice_files}
-
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-
-                try:
-                    result = future.result()
-                    all_results.append(result)
-
-                    stats["processed"] += 1
-
-                    if result.get("error"):
+        if self.llm_batch:
+            for file_path, result in zip(invoice_files, self.process_files_batched(invoice_files)):
+                self._record_result(file_path, result, stats, all_results, output_dir)
+        else:
+            # Process with thread pool
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                future_to_file = {
+                    executor.submit(self.process_single, f, bank_transactions): f for f in invoice_files
+                }
+
+                for future in as_completed(future_to_file):
+                    file_path = future_to_file[future]
+
+                    try:
+                        self._record_result(file_path, future.result(), stats, all_results, output_dir)
+                    except Exception as e:
+                        logger.error(f"Error processing {file_path}: {e}")
                         stats["errors"] += 1
-                    elif result.get("needs_human_review"):
-                        stats["needs_review"] += 1
-
-                    # Count reconciliation matches
-                    recon = result.get("reconciliation_result", {})
-                    if recon.get("matched"):
-                        stats["matched_reconciliations"] += len(recon["matched"])
-
-                    # Aggregate missing fields
-                    for field in result.get("missing_fields", []):
-                        stats["missing_fields_summary"][field] = stats["missing_fields_summary"].get(field, 0) + 1
-
-                    # Aggregate warnings
-                    for warning in result.get("warnings", []):
-                        key = warning[:50]  # Truncate for grouping
-                        stats["warnings_summary"][key] = stats["warnings_summary"].get(key, 0) + 1
-
-                    # Save individual result
-                    doc_id = result.get("doc_id", file_path.stem)
-                    result_file = output_dir / f"{doc_id}_asof.json"
-                    with open(result_file, "w", encoding="utf-8") as f:
-                        json.dump(result, f, ensure_ascii=False, indent=2)
-
-                    logger.info(
-                        f"[{stats['processed']}/{stats['total']}] {doc_id} - review={result.get('needs_human_review')}"
-                    )
-
-                except Exception as e:
-                    logger.error(f"Error processing {file_path}: {e}")
-                    stats["errors"] += 1
 
         # Calculate percentages
         if stats["total"] > 0:
@@ -265,6 +276,46 @@ class ASOFTBatchProcessor:
 
         return stats
 
+    def _record_result(
+        self,
+        file_path: Path,
+        result: dict[str, Any],
+        stats: dict[str, Any],
+        all_results: list[dict[str, Any]],
+        output_dir: Path,
+    ) -> None:
+        """Aggregate one invoice result into stats and save it."""
+        all_results.append(result)
+
+        stats["processed"] += 1
+
+        if result.get("error"):
+            stats["errors"] += 1
+        elif result.get("needs_human_review"):
+            stats["needs_review"] += 1
+
+        # Count reconciliation matches
+        recon = result.get("reconciliation_result", {})
+        if recon.get("matched"):
+            stats["matched_reconciliations"] += len(recon["matched"])
+
+        # Aggregate missing fields
+        for field in result.get("missing_fields", []):
+            stats["missing_fields_summary"][field] = stats["missing_fields_summary"].get(field, 0) + 1
+
+        # Aggregate warnings
+        for warning in result.get("warnings", []):
+            key = warning[:50]  # Truncate for grouping
+            stats["warnings_summary"][key] = stats["warnings_summary"].get(key, 0) + 1
+
+        # Save individual result
+        doc_id = result.get("doc_id", file_path.stem)
+        result_file = output_dir / f"{doc_id}_asof.json"
+        with open(result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"[{stats['processed']}/{stats['total']}] {doc_id} - review={result.get('needs_human_review')}")
+
     def _generate_report(self, stats: dict[str, Any], results: list[dict[str, Any]]) -> str:
         """Generate markdown batch report."""
         report = f"""# ASOFT-T Batch Processing Report
@@ -324,10 +375,11 @@ def main():
     parser.add_argument("--output", "-o", help="Output directory")
     parser.add_argument("--concurrency", "-c", type=int, default=4, help="Number of workers")
     parser.add_argument("--strict", action="store_true", help="Strict mode (require Serial/No)")
+    parser.add_argument("--llm-batch", action="store_true", help="LLM coding only, several invoices per request")
 
     args = parser.parse_args()
 
-    processor = ASOFTBatchProcessor(concurrency=args.concurrency, strict_mode=args.strict)
+    processor = ASOFTBatchProcessor(concurrency=args.concurrency, strict_mode=args.strict, llm_batch=args.llm_batch)
 
     stats = processor.process_batch(args.input_path, args.bank_txns, args.output)
 
@@ -14,15 +14,13 @@ Collections created:
 import logging
 import os
 import sys
-import uuid
-from datetime import datetime
 
 # Add project root
 sys.path.insert(0, "/root/erp-ai")
 
 import httpx
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client.models import Distance, VectorParams
 
 # Try to import sentence_transformers
 try:
@@ -372,42 +370,35 @@ def create_collections(client: QdrantClient):
             logger.error(f"Error creating collection {name}: {e}")
 
 
-def ingest_content(
-    client: QdrantClient, collection: str, content: str, source: str = "builtin", title: str = ""
-) -> int:
-    """Ingest content into Qdrant collection"""
-    chunks = chunk_text(content)
-    if not chunks:
-        return 0
-
-    embeddings = get_embeddings(chunks)
-
-    points = []
-    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-        point_id = str(uuid.uuid4())
-        points.append(
-            PointStruct(
-                id=point_id,
-                vector=embedding,
-                payload={
-                    "text": chunk,
-                    "source": source,
-                    "title": title,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "ingested_at": datetime.utcnow().isoformat(),
-                },
-            )
+_ingester = None
+
+
+def get_ingester(client: QdrantClient):
+    """
+    Incremental ingester: only new/changed chunks are embedded (see
+    src/rag/ingest.py); the BM25 index used by hybrid search is kept in step.
+    """
+    global _ingester
+    if _ingester is None or _ingester.sink.inner.client is not client:
+        from src.rag.hybrid import LexicalIndexSink
+        from src.rag.ingest import KBIngester, QdrantLibrarySink
+
+        _ingester = KBIngester(
+            LexicalIndexSink(QdrantLibrarySink(client)),
+            get_embeddings,
+            EMBEDDING_MODEL if EMBEDDINGS_AVAILABLE else "mock",
+            chunker=chunk_text,
         )
+    return _ingester
 
-    # Upsert in batches
-    batch_size = 100
-    for i in range(0, len(points), batch_size):
-        batch = points[i : i + batch_size]
-        client.upsert(collection_name=collection, points=batch)
 
-    logger.info(f"Ingested {len(points)} chunks into {collection}")
-    return len(points)
+def ingest_content(
+    client: QdrantClient, collection: str, content: str, source: str = "builtin", title: str = ""
+) -> int:
+    """Ingest content into Qdrant collection; returns number of chunks stored for it"""
+    stats = get_ingester(client).ingest(collection, [{"text": content, "source": source, "title": title}])
+    logger.info(f"Ingested {stats.chunks} chunks into {collection} ({stats.embedded} embedded, {stats.skipped} unchanged)")
+    return stats.chunks - stats.failed
 
 
 # =============================================================================
@@ -9,7 +9,7 @@ Metrics:
 - VAS pattern accuracy: % of entries with correct Dr/Cr pattern
 - Amount correctness: % of entries with correct amounts
 - Evidence completeness: % of invoices with complete evidence_fields_used
-- Latency stats: avg, p50, p95
+- Latency stats: avg, p50, p95, p99
 
 Error buckets:
 (A) wrong_accounts - incorrect account codes
@@ -24,7 +24,6 @@ Output: reports/pilot_report.json
 
 import json
 import logging
-import statistics
 import sys
 import time
 from collections import defaultdict
@@ -34,6 +33,8 @@ from typing import Any
 
 sys.path.insert(0, "/root/erp-ai")
 
+from src.observability.evaluation import LatencyHistogram
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("PilotEval")
 
@@ -240,17 +241,8 @@ class PilotEvaluator:
         # Count specific errors
         error_counts = {k: len(set(v)) for k, v in self.errors.items()}
 
-        # Latency stats
-        latency_stats = {}
-        if self.latencies:
-            sorted_lat = sorted(self.latencies)
-            latency_stats = {
-                "avg_ms": statistics.mean(self.latencies),
-                "p50_ms": statistics.median(self.latencies),
-                "p95_ms": sorted_lat[int(len(sorted_lat) * 0.95)] if len(sorted_lat) > 1 else sorted_lat[0],
-                "min_ms": min(self.latencies),
-                "max_ms": max(self.latencies),
-            }
+        # Latency stats (avg/min/max, p50/p95/p99, buckets)
+        latency_stats = LatencyHistogram(self.latencies).summary() if self.latencies else {}
 
         metrics = {
             "total_invoices": total,
@@ -314,6 +306,7 @@ class PilotEvaluator:
                 "evidence_completeness": f"{metrics['evidence_completeness'] * 100:.1f}%",
                 "avg_latency_ms": f"{metrics['latency'].get('avg_ms', 0):.0f}",
                 "p95_latency_ms": f"{metrics['latency'].get('p95_ms', 0):.0f}",
+                "p99_latency_ms": f"{metrics['latency'].get('p99_ms', 0):.0f}",
             },
             "kpi_status": metrics["kpi_pass"],
             "all_kpis_pass": metrics["all_kpis_pass"],
@@ -397,6 +390,7 @@ def run_pilot_evaluation(pilot_dir: str = "/root/erp-ai/data/pilot", output_dir:
     print(f"Evidence completeness: {report['summary']['evidence_completeness']}")
     print(f"Avg latency: {report['summary']['avg_latency_ms']} ms")
     print(f"P95 latency: {report['summary']['p95_latency_ms']} ms")
+    print(f"P99 latency: {report['summary']['p99_latency_ms']} ms")
     print()
     print("KPI Status:")
     for kpi, passed in report["kpi_status"].items():
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+ERPX AI - Offline Retrieval Evaluation
+======================================
+Recall@k and latency of lexical (BM25), dense and hybrid (RRF) retrieval
+over the built-in bootstrap_kb.py corpus. Runs entirely in memory; no
+Qdrant needed. Dense/hybrid-with-dense need sentence-transformers,
+reranking needs RAG_RERANK_MODEL.
+
+Usage:
+    python scripts/eval_rag_retrieval.py
+    python scripts/eval_rag_retrieval.py --k 3 --chunk-size 60 --json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+import bootstrap_kb
+from src.rag import SearchResult
+from src.rag.hybrid import RAG_RERANK_MODEL, BM25Index, CrossEncoderReranker, HybridRetriever
+from src.rag.ingest import chunk_id
+
+# (query, substring the relevant chunk must contain)
+EVAL_QUERIES = [
+    ("TK 133 thuế GTGT được khấu trừ", "133: Thuế GTGT được khấu trừ"),
+    ("tài khoản 3334", "3334"),
+    ("TK911", "911"),
+    ("Thông tư 200/2014", "Thông tư 200/2014"),
+    ("hạn nộp tờ khai thuế theo tháng", "Ngày 20 tháng sau"),
+    ("điều kiện khấu trừ VAT đầu vào", "Điều kiện khấu trừ VAT"),
+    ("thuế suất 8%", "8%: Thuế suất ưu đãi"),
+    ("hoa don dien tu noi dung bat buoc", "Nội dung bắt buộc"),
+    ("quy trình đóng sổ cuối kỳ", "Đóng sổ"),
+    ("bút toán bán hàng thu tiền mặt", "Bán hàng thu tiền mặt"),
+    ("trích khấu hao tài sản cố định", "Trích khấu hao TSCĐ"),
+    ("hoàn thuế GTGT xuất khẩu", "Hoàn thuế VAT"),
+]
+
+
+class InMemoryDense:
+    """search_vectors_batch over a numpy matrix (cosine)."""
+
+    def __init__(self, ids, vectors, payloads):
+        self.ids = ids
+        self.payloads = payloads
+        m = np.asarray(vectors, dtype=np.float32)
+        self.matrix = m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+    def search_vectors_batch(self, vectors, limit=5, score_threshold=None, filter_dict=None, collection_name=None):
+        q = np.asarray(vectors, dtype=np.float32)
+        q = q / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+        scores = q @ self.matrix.T
+        out = []
+        for row in scores:
+            hits = []
+            for i in np.argsort(-row)[:limit]:
+                if score_threshold is not None and row[i] < score_threshold:
+                    break
+                payload = self.payloads[i]
+                hits.append(SearchResult(self.ids[i], float(row[i]), payload["text"], {}, payload["source"]))
+            out.append(hits)
+        return out
+
+
+def build_corpus(chunk_size: int, overlap: int):
+    docs = [
+        (bootstrap_kb.TT200_KNOWLEDGE, "TT200/2014/TT-BTC"),
+        (bootstrap_kb.VAT_REGULATIONS, "Luật Thuế GTGT"),
+        (bootstrap_kb.INVOICE_REGULATIONS, "NĐ 123/2020/NĐ-CP"),
+        (bootstrap_kb.ACCOUNTING_SOP, "ERPX SOP"),
+    ]
+    chunks = {}
+    for text, source in docs:
+        for chunk in bootstrap_kb.chunk_text(text, chunk_size=chunk_size, overlap=overlap):
+            chunks[chunk_id(chunk)] = {"text": chunk, "source": source}
+    return chunks
+
+
+def evaluate(name, search_batch, queries, k):
+    latencies, hits = [], 0
+    for query, expected in queries:
+        start = time.perf_counter()
+        results = search_batch([query])[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += any(expected.lower() in r.text.lower() for r in results[:k])
+    start = time.perf_counter()
+    search_batch([q for q, _ in queries])
+    batch_ms = (time.perf_counter() - start) * 1000
+    latencies.sort()
+    return {
+        "mode": name,
+        f"recall@{k}": round(hits / len(queries), 3),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "batch_ms": round(batch_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval evaluation")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=60, help="words per chunk")
+    parser.add_argument("--overlap", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    chunks = build_corpus(args.chunk_size, args.overlap)
+    lexical = BM25Index()
+    for doc_id, payload in chunks.items():
+        lexical.add(doc_id, payload)
+
+    no_dense = lambda texts: []  # noqa: E731
+    modes = [("lexical", HybridRetriever(dense=object(), lexical=lexical, embed_batch=no_dense))]
+
+    if bootstrap_kb.EMBEDDINGS_AVAILABLE:
+        ids = list(chunks)
+        dense = InMemoryDense(ids, bootstrap_kb.get_embeddings([chunks[i]["text"] for i in ids]), list(chunks.values()))
+        empty = BM25Index()
+        embed = bootstrap_kb.get_embeddings
+        modes.append(("dense", HybridRetriever(dense=dense, lexical=empty, embed_batch=embed)))
+        modes.append(("hybrid", HybridRetriever(dense=dense, lexical=lexical, embed_batch=embed)))
+        if RAG_RERANK_MODEL:
+            reranker = CrossEncoderReranker()
+            modes.append(("hybrid+rerank", HybridRetriever(dense=dense, lexical=lexical, embed_batch=embed, reranker=reranker)))
+    else:
+        print("sentence-transformers not installed: dense and hybrid modes skipped", file=sys.stderr)
+
+    report = [
+        evaluate(name, lambda qs, r=r: r.search_batch(qs, limit=args.k, score_threshold=None), EVAL_QUERIES, args.k)
+        for name, r in modes
+    ]
+
+    if args.json:
+        print(json.dumps({"chunks": len(chunks), "queries": len(EVAL_QUERIES), "results": report}, indent=2))
+    else:
+        print(f"{len(chunks)} chunks, {len(EVAL_QUERIES)} queries")
+        for row in report:
+            print("  ".join(f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
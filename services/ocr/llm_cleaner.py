@@ -195,8 +195,10 @@ Return cleaned text and extracted fields as JSON only."""
     def _clean_with_rules(self, raw_text: str, context: Optional[dict] = None) -> dict[str, Any]:
         """Rule-based OCR cleaning fallback"""
         
-        corrections = []
-        cleaned = raw_text
+        from src.processing.ocr_correction import correct_text_with_rules
+
+        # 0. Label lexicon, label punctuation and digits misread as letters
+        cleaned, corrections = correct_text_with_rules(raw_text)
 
         # 1. Fix common Vietnamese term errors
         for wrong, correct in VN_TERMS.items():
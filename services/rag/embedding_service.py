@@ -4,11 +4,11 @@ Uses BGE-M3 (BAAI/bge-m3) for Vietnamese/English document embedding
 CPU-only mode
 """
 
+import hashlib
 import json
 import logging
 import os
 import sys
-import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -55,6 +55,12 @@ class EmbeddingService:
         self.qdrant_host = qdrant_host
         self.qdrant_port = qdrant_port
         self.client = QdrantClient(host=qdrant_host, port=qdrant_port)
+        self._ingester = None
+
+        # Optional dimension reduction + quantization (RAG_COMPRESSION, see src/rag/quantization.py)
+        from src.rag.quantization import load_collection_codecs
+
+        self.codec = load_collection_codecs().get(self.COLLECTION_NAME)
 
         logger.info("EmbeddingService initialized")
         logger.info(f"  Qdrant: {qdrant_host}:{qdrant_port}")
@@ -68,12 +74,30 @@ class EmbeddingService:
             logger.info(f"Creating collection: {self.COLLECTION_NAME}")
             self.client.create_collection(
                 collection_name=self.COLLECTION_NAME,
-                vectors_config=qdrant_models.VectorParams(size=self.VECTOR_DIM, distance=qdrant_models.Distance.COSINE),
+                vectors_config=qdrant_models.VectorParams(
+                    size=self.codec.output_dim(self.VECTOR_DIM) if self.codec else self.VECTOR_DIM,
+                    distance=qdrant_models.Distance.COSINE,
+                    on_disk=self._quantization_config() is not None,
+                ),
+                quantization_config=self._quantization_config(),
             )
             logger.info(f"Collection created: {self.COLLECTION_NAME}")
         else:
             logger.info(f"Collection already exists: {self.COLLECTION_NAME}")
 
+    def _quantization_config(self):
+        """Qdrant quantization for the collection; originals stay on disk for rescoring"""
+        quantization = self.codec.config.quantization if self.codec else "none"
+        if quantization == "int8":
+            return qdrant_models.ScalarQuantization(
+                scalar=qdrant_models.ScalarQuantizationConfig(
+                    type=qdrant_models.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if quantization == "binary":
+            return qdrant_models.BinaryQuantization(binary=qdrant_models.BinaryQuantizationConfig(always_ram=True))
+        return None
+
     def chunk_text(
         self, text: str, lines_per_chunk: int = 4, min_chunk_size: int = 50, max_chunk_size: int = 500
     ) -> list[str]:
@@ -152,71 +176,71 @@ class EmbeddingService:
 
         # embeddings is a dict with 'dense_vecs' key
         if isinstance(embeddings, dict):
-            return embeddings["dense_vecs"]
+            embeddings = embeddings["dense_vecs"]
+        # Documents and queries go through the same reduction
+        if self.codec is not None:
+            embeddings = self.codec.reduce(embeddings)
         return embeddings
 
+    def get_ingester(self):
+        """Incremental ingester: unchanged chunks are not re-embedded (see src/rag/ingest.py)"""
+        if self._ingester is None:
+            from src.rag.ingest import KBIngester, QdrantLibrarySink
+
+            self._ingester = KBIngester(
+                QdrantLibrarySink(self.client),
+                self.embed_texts,
+                "BAAI/bge-m3",
+                chunker=self.chunk_text,
+                batch_size=32,
+                text_key="chunk_text",
+            )
+        return self._ingester
+
+    def _ocr_document(self, json_path: Path) -> dict[str, Any] | None:
+        doc_data = self.extract_text_from_ocr_json(str(json_path))
+        if not doc_data["text"].strip():
+            logger.warning(f"No text content in {json_path.name}")
+            return None
+        return {
+            "key": str(json_path.resolve()),
+            "text": doc_data["text"],
+            "source_file": doc_data["source_file"],
+            "processed_at": doc_data["processed_at"],
+            "doc_type": "invoice",
+            "text_preview": doc_data["main_text"][:200] if doc_data["main_text"] else "",
+            "doc_id": hashlib.sha256(str(json_path.resolve()).encode()).hexdigest()[:8],
+            "json_file": str(json_path),
+        }
+
+    def _ingest_paths(self, json_paths: list[Path]) -> int:
+        def documents():
+            for json_path in json_paths:
+                logger.info(f"Ingesting: {json_path.name}")
+                doc = self._ocr_document(json_path)
+                if doc is not None:
+                    yield doc
+
+        stats = self.get_ingester().ingest(self.COLLECTION_NAME, documents())
+        logger.info(f"  {stats.chunks} chunks: {stats.embedded} embedded, {stats.skipped} unchanged")
+        return stats.embedded
+
     def ingest_ocr_json(self, json_path: str) -> int:
         """
         Ingest OCR JSON file into Qdrant
 
-        Returns: number of points inserted
+        Returns: number of points inserted (0 if the file is unchanged)
         """
         json_path = Path(json_path)
         if not json_path.exists():
             logger.error(f"File not found: {json_path}")
             return 0
-
-        logger.info(f"Ingesting: {json_path.name}")
-
-        # Extract text
-        doc_data = self.extract_text_from_ocr_json(str(json_path))
-
-        if not doc_data["text"].strip():
-            logger.warning(f"No text content in {json_path.name}")
-            return 0
-
-        # Chunk the text
-        chunks = self.chunk_text(doc_data["text"])
-        logger.info(f"  Created {len(chunks)} chunks")
-
-        if not chunks:
-            return 0
-
-        # Embed chunks
-        logger.info("  Embedding chunks...")
-        vectors = self.embed_texts(chunks)
-
-        # Prepare points for Qdrant
-        points = []
-        doc_id = str(uuid.uuid4())[:8]
-
-        for i, (chunk, vector) in enumerate(zip(chunks, vectors)):
-            point_id = str(uuid.uuid4())
-
-            payload = {
-                "source_file": doc_data["source_file"],
-                "processed_at": doc_data["processed_at"],
-                "doc_type": "invoice",
-                "text_preview": doc_data["main_text"][:200] if doc_data["main_text"] else "",
-                "chunk_text": chunk,
-                "chunk_index": i,
-                "total_chunks": len(chunks),
-                "doc_id": doc_id,
-                "json_file": str(json_path),
-            }
-
-            points.append(qdrant_models.PointStruct(id=point_id, vector=vector.tolist(), payload=payload))
-
-        # Upsert to Qdrant
-        self.client.upsert(collection_name=self.COLLECTION_NAME, points=points)
-
-        logger.info(f"  Inserted {len(points)} points")
-        return len(points)
+        return self._ingest_paths([json_path])
 
     def ingest_directory(self, directory: str) -> int:
-        """Ingest all JSON files in a directory"""
+        """Ingest all JSON files in a directory (only new/changed chunks are embedded)"""
         directory = Path(directory)
-        json_files = list(directory.glob("*.json"))
+        json_files = sorted(directory.glob("*.json"))
 
         if not json_files:
             logger.warning(f"No JSON files found in {directory}")
@@ -224,11 +248,7 @@ class EmbeddingService:
 
         logger.info(f"Found {len(json_files)} JSON files to ingest")
 
-        total_points = 0
-        for json_file in json_files:
-            points = self.ingest_ocr_json(str(json_file))
-            total_points += points
-
+        total_points = self._ingest_paths(json_files)
         logger.info(f"Total points ingested: {total_points}")
         return total_points
 
@@ -250,8 +270,15 @@ class EmbeddingService:
         query_vector = self.embed_texts([query])[0]
 
         # Search (qdrant-client 1.x uses query_points)
+        search_params = None
+        if self._quantization_config() is not None:
+            search_params = qdrant_models.SearchParams(
+                quantization=qdrant_models.QuantizationSearchParams(
+                    rescore=self.codec.config.rescore, oversampling=self.codec.config.oversampling
+                )
+            )
         results = self.client.query_points(
-            collection_name=self.COLLECTION_NAME, query=query_vector.tolist(), limit=top_k
+            collection_name=self.COLLECTION_NAME, query=query_vector.tolist(), limit=top_k, search_params=search_params
         )
 
         # Format results
@@ -4,9 +4,12 @@ Analytics AI Agent - Enhanced with Tool Execution
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from src.llm.streaming import JsonObjectDetector
+
 from .prompts import SYSTEM_PROMPT
 from .memory import ConversationMemory, get_memory
 from .agent_tools import get_tool_executor, parse_tool_call, get_tools_description
@@ -34,6 +37,25 @@ class AgentResponse:
         }
 
 
+# Start of a tool call in streamed output; text from here on is held back
+TOOL_CALL_MARKERS = ("```tool", '{"name"', '{ "name"')
+
+
+def _visible_text(buffer: str) -> str:
+    """Streamed text that is safe to show: everything before a (possibly partial) tool-call marker."""
+    cut = len(buffer)
+    for marker in TOOL_CALL_MARKERS:
+        idx = buffer.find(marker)
+        if idx >= 0:
+            cut = min(cut, idx)
+            continue
+        for k in range(len(marker) - 1, 0, -1):
+            if buffer.endswith(marker[:k]):
+                cut = min(cut, len(buffer) - k)
+                break
+    return buffer[:cut]
+
+
 # Enhanced system prompt with tool instructions
 ANALYTICS_SYSTEM_PROMPT = """Bạn là trợ lý phân tích dữ liệu tài chính AI. Bạn có thể:
 - Liệt kê và phân tích datasets
@@ -129,19 +151,7 @@ class AnalyticsAgent:
         llm = await self._get_llm_client()
         
         # Build prompt with conversation context
-        messages = session.get_messages_for_llm()
-        
-        prompt = f"""{ANALYTICS_SYSTEM_PROMPT}
-
-CONVERSATION HISTORY:
-"""
-        for msg in messages[-6:]:  # Last 6 messages for context
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role != "system":
-                prompt += f"\n{role.upper()}: {content}"
-        
-        prompt += f"\n\nUSER: {message}\n\nASSISTANT:"
+        prompt = self._build_prompt(session, message)
         
         try:
             # Get LLM response
@@ -179,14 +189,7 @@ CONVERSATION HISTORY:
                     result_summary = self._summarize_result(result)
                     
                     # Ask LLM to explain the result
-                    followup_prompt = f"""{ANALYTICS_SYSTEM_PROMPT}
-
-Tool {tool_name} đã được thực thi với kết quả:
-{result_summary}
-
-Hãy giải thích kết quả này cho người dùng một cách ngắn gọn và dễ hiểu.
-USER: {message}
-ASSISTANT:"""
+                    followup_prompt = self._build_followup_prompt(tool_name, result_summary, message)
                     
                     followup = await llm.generate(followup_prompt, max_tokens=1000)
                     response_text = followup.content if hasattr(followup, 'content') else str(followup)
@@ -216,6 +219,153 @@ ASSISTANT:"""
                 session_id=session.id
             )
     
+    async def chat_stream(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        max_tool_calls: int = 5
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Streaming variant of chat(): yields (event, data) as the LLM generates.
+
+        Events: "reasoning" / "delta" ({"text"}), "tool_call" ({"name", "params"}),
+        "tool_result" ({"tool", "result"}) and finally "done" (AgentResponse dict).
+        A tool call is executed as soon as its JSON is complete in the stream;
+        the rest of that generation is discarded.
+        """
+        session = self._memory.get_or_create_session(session_id)
+        session.add_message("user", message)
+
+        llm = await self._get_llm_client()
+        prompt = self._build_prompt(session, message)
+        max_tokens = 2000
+
+        tool_calls = []
+        tool_results = []
+        visualizations = []
+        response_text = ""
+
+        try:
+            for call_count in range(max_tool_calls + 1):
+                parsed = None
+                async for event, data in self._stream_completion(llm, prompt, max_tokens):
+                    if event == "completion":
+                        response_text, parsed = data["text"], data["tool_call"]
+                    else:
+                        yield event, data
+
+                if not parsed or call_count == max_tool_calls:
+                    break
+
+                tool_name, params = parsed
+                tool_calls.append({"name": tool_name, "params": params})
+                yield "tool_call", {"name": tool_name, "params": params}
+
+                result = await self._tool_executor.execute(tool_name, params)
+                tool_results.append({"tool": tool_name, "result": result})
+                yield "tool_result", {"tool": tool_name, "result": result}
+
+                if result.get("chart"):
+                    visualizations.append(result["chart"])
+
+                if not result.get("success"):
+                    response_text = f"Đã xảy ra lỗi khi thực hiện {tool_name}: {result.get('error', 'Unknown error')}"
+                    yield "delta", {"text": response_text}
+                    break
+
+                prompt = self._build_followup_prompt(tool_name, self._summarize_result(result), message)
+                max_tokens = 1000
+
+        except Exception as e:
+            logger.error(f"Agent stream error: {e}", exc_info=True)
+            yield "done", AgentResponse(
+                message=f"Xin lỗi, đã xảy ra lỗi: {str(e)}",
+                session_id=session.id
+            ).to_dict()
+            return
+
+        session.add_message("assistant", response_text)
+        yield "done", AgentResponse(
+            message=response_text,
+            tool_calls=tool_calls if tool_calls else None,
+            tool_results=tool_results if tool_results else None,
+            visualizations=visualizations if visualizations else None,
+            session_id=session.id
+        ).to_dict()
+
+    async def _stream_completion(self, llm, prompt: str, max_tokens: int) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Stream one generation. Text before a tool-call block is yielded as
+        "delta"; generation stops as soon as a complete tool call is seen.
+        Ends with ("completion", {"text", "tool_call"}).
+        """
+        buffer = ""
+        sent = 0
+        offset = 0  # buffer position the detector started at
+        detector = JsonObjectDetector()
+        tool_call = None
+
+        async with aclosing(llm.stream(prompt, max_tokens=max_tokens)) as chunks:
+            async for chunk in chunks:
+                if chunk.reasoning:
+                    yield "reasoning", {"text": chunk.reasoning}
+                if not chunk.content:
+                    continue
+                buffer += chunk.content
+
+                visible = _visible_text(buffer)
+                if len(visible) > sent:
+                    yield "delta", {"text": visible[sent:]}
+                    sent = len(visible)
+
+                obj_text = detector.feed(chunk.content)
+                while obj_text is not None:
+                    tool_call = parse_tool_call(f"```tool\n{obj_text}\n```")
+                    if tool_call:
+                        break
+                    # Not a tool call: keep scanning after this object
+                    offset += detector.end
+                    rest = buffer[offset:]
+                    detector = JsonObjectDetector()
+                    obj_text = detector.feed(rest)
+                if tool_call:
+                    break
+
+        if tool_call is None:
+            tool_call = parse_tool_call(buffer)
+            if tool_call is None and len(buffer) > sent:
+                yield "delta", {"text": buffer[sent:]}
+
+        yield "completion", {"text": buffer, "tool_call": tool_call}
+
+    def _build_prompt(self, session, message: str) -> str:
+        """Prompt with system instructions and recent conversation context"""
+        messages = session.get_messages_for_llm()
+        
+        prompt = f"""{ANALYTICS_SYSTEM_PROMPT}
+
+CONVERSATION HISTORY:
+"""
+        for msg in messages[-6:]:  # Last 6 messages for context
+            role = msg.get("role", "user")
+            content = msg.get("content", "")
+            if role != "system":
+                prompt += f"\n{role.upper()}: {content}"
+        
+        prompt += f"\n\nUSER: {message}\n\nASSISTANT:"
+        return prompt
+
+    def _build_followup_prompt(self, tool_name: str, result_summary: str, message: str) -> str:
+        """Prompt asking the LLM to explain a tool result"""
+        return f"""{ANALYTICS_SYSTEM_PROMPT}
+
+Tool {tool_name} đã được thực thi với kết quả:
+{result_summary}
+
+Hãy giải thích kết quả này cho người dùng một cách ngắn gọn và dễ hiểu.
+USER: {message}
+ASSISTANT:"""
+    
     def _summarize_result(self, result: Dict) -> str:
         """Create a summary of tool result for LLM context"""
         if not result.get("success"):
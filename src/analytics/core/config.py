@@ -66,6 +66,16 @@ class ForecastConfig:
     default_horizon: int = 30  # days
     default_model: str = "prophet"  # prophet, linear, arima
     confidence_interval: float = 0.95
+    max_workers: int = field(default_factory=lambda: int(os.getenv("FORECAST_MAX_WORKERS", "0")) or (os.cpu_count() or 4))
+    model_cache_size: int = field(default_factory=lambda: int(os.getenv("FORECAST_MODEL_CACHE_SIZE", "2048")))
+    history_cache_ttl: float = field(default_factory=lambda: float(os.getenv("FORECAST_HISTORY_CACHE_TTL", "300")))
+
+
+@dataclass
+class TransformConfig:
+    """Transform (dbt-style models) configuration"""
+    max_concurrency: int = field(default_factory=lambda: int(os.getenv("TRANSFORM_MAX_CONCURRENCY", "0")) or (os.cpu_count() or 4))
+    state_path: str = field(default_factory=lambda: os.getenv("TRANSFORM_STATE_PATH", "data/analytics/transform_state.json"))
 
 
 @dataclass
@@ -75,6 +85,7 @@ class AnalyticsConfig:
     llm: LLMConfig = field(default_factory=LLMConfig)
     metabase: MetabaseConfig = field(default_factory=MetabaseConfig)
     forecast: ForecastConfig = field(default_factory=ForecastConfig)
+    transform: TransformConfig = field(default_factory=TransformConfig)
     
     # Query limits
     max_query_rows: int = 10000
@@ -10,7 +10,7 @@ from ..connectors import DatasetConnector, PostgresConnector
 from ..agent import AnalyticsAgent
 from ..forecast import ProphetForecaster, LinearForecaster
 from ..quality import DataValidator
-from ..transform import TransformRunner
+from ..transform import FileRunStateStore, TransformRunner
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +62,10 @@ class AnalyticsService:
         )
         
         # Initialize transform runner
-        self._transform_runner = TransformRunner()
+        self._transform_runner = TransformRunner(
+            state_store=FileRunStateStore(config.transform.state_path),
+            max_concurrency=config.transform.max_concurrency,
+        )
         
         self._initialized = True
         logger.info("AnalyticsService initialized")
@@ -2,15 +2,15 @@
 Dashboard Service
 Create, save, and manage dashboards with charts and metrics.
 """
-import json
 import logging
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from pathlib import Path
 import pandas as pd
 
+from .dashboard_store import DashboardStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +26,7 @@ class ChartConfig:
     series_field: Optional[str] = None
     color_scheme: str = "violet"
     options: Dict = field(default_factory=dict)
+    stale: bool = False  # dataset changed since render and no loader to re-render
     
     def to_dict(self) -> Dict:
         return asdict(self)
@@ -77,7 +78,8 @@ class Dashboard:
     
     @classmethod
     def from_dict(cls, data: Dict) -> "Dashboard":
-        charts = [ChartConfig(**c) for c in data.get("charts", [])]
+        chart_fields = ChartConfig.__dataclass_fields__
+        charts = [ChartConfig(**{k: v for k, v in c.items() if k in chart_fields}) for c in data.get("charts", [])]
         metrics = [MetricCard(**m) for m in data.get("metrics", [])]
         return cls(
             dashboard_id=data["dashboard_id"],
@@ -96,37 +98,28 @@ class Dashboard:
 class DashboardService:
     """
     Service for creating and managing dashboards.
-    Dashboards are saved to disk as JSON files.
+    Dashboards live in a SQLite store (see dashboard_store.py) shared by all
+    workers; nothing is loaded at startup and every change is one transaction.
     """
     
-    def __init__(self, storage_path: str = "/root/erp-ai/data/dashboards"):
-        self._storage_path = Path(storage_path)
-        self._storage_path.mkdir(parents=True, exist_ok=True)
-        self._cache: Dict[str, Dashboard] = {}
-        self._load_all()
-    
-    def _load_all(self):
-        """Load all dashboards from storage"""
-        for f in self._storage_path.glob("*.json"):
-            try:
-                with open(f, "r") as fp:
-                    data = json.load(fp)
-                    dashboard = Dashboard.from_dict(data)
-                    self._cache[dashboard.dashboard_id] = dashboard
-            except Exception as e:
-                logger.error(f"Failed to load dashboard {f}: {e}")
-    
-    def _save_dashboard(self, dashboard: Dashboard):
-        """Save dashboard to disk"""
-        path = self._storage_path / f"{dashboard.dashboard_id}.json"
-        with open(path, "w") as f:
-            json.dump(dashboard.to_dict(), f, ensure_ascii=False, indent=2)
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        legacy_json_dir: Optional[str] = None,
+        dataset_loader: Optional[Callable[[str], Optional[pd.DataFrame]]] = None,
+    ):
+        from src.core import config
+        self._store = DashboardStore(db_path or config.DASHBOARD_DB_PATH)
+        self._store.import_json_dir(legacy_json_dir or config.DASHBOARD_LEGACY_JSON_DIR)
+        # dataset_name -> DataFrame, used to re-render charts whose dataset changed
+        self._dataset_loader = dataset_loader
     
     def create_dashboard(
         self,
         name: str,
         description: str = "",
-        dataset_name: Optional[str] = None
+        dataset_name: Optional[str] = None,
+        tenant_id: str = "default"
     ) -> Dashboard:
         """Create a new dashboard"""
         now = datetime.utcnow().isoformat()
@@ -138,38 +131,56 @@ class DashboardService:
             updated_at=now,
             dataset_name=dataset_name
         )
-        self._cache[dashboard.dashboard_id] = dashboard
-        self._save_dashboard(dashboard)
+        self._store.insert_dashboard(dashboard.to_dict(), tenant_id)
         return dashboard
     
     def get_dashboard(self, dashboard_id: str) -> Optional[Dashboard]:
-        """Get a dashboard by ID"""
-        return self._cache.get(dashboard_id)
+        """Get a dashboard by ID, re-rendering charts whose source dataset changed"""
+        data = self._store.get_dashboard(dashboard_id)
+        if data is None:
+            return None
+        
+        stale = [c for c in data["charts"] if c["stale"] and c["spec"]]
+        if stale and self._dataset_loader and data["dataset_name"]:
+            df = self._dataset_loader(data["dataset_name"])
+            if df is not None:
+                for chart in stale:
+                    try:
+                        chart["data"] = render_chart_data(df, chart["spec"])
+                        chart["stale"] = False
+                        self._store.store_rendered_chart(chart["chart_id"], chart["data"], data["dataset_version"])
+                    except Exception as e:
+                        logger.warning(f"Failed to re-render chart {chart['chart_id']}: {e}")
+        
+        return Dashboard.from_dict(data)
+    
+    def list_dashboards(self, tenant_id: str = "default", limit: int = 100, offset: int = 0) -> List[Dict]:
+        """List dashboards of a tenant (summary only, most recently updated first)"""
+        return self._store.list_dashboards(tenant_id, limit, offset)
     
-    def list_dashboards(self) -> List[Dict]:
-        """List all dashboards (summary only)"""
-        return [
-            {
-                "dashboard_id": d.dashboard_id,
-                "name": d.name,
-                "description": d.description,
-                "created_at": d.created_at,
-                "updated_at": d.updated_at,
-                "chart_count": len(d.charts),
-                "metric_count": len(d.metrics)
-            }
-            for d in self._cache.values()
-        ]
+    def update_dashboard(self, dashboard_id: str, **fields: Any) -> bool:
+        """Update name/description/dataset_name/layout/filters in place"""
+        return self._store.update_dashboard(dashboard_id, datetime.utcnow().isoformat(), **fields)
     
     def delete_dashboard(self, dashboard_id: str) -> bool:
         """Delete a dashboard"""
-        if dashboard_id in self._cache:
-            del self._cache[dashboard_id]
-            path = self._storage_path / f"{dashboard_id}.json"
-            if path.exists():
-                path.unlink()
-            return True
-        return False
+        return self._store.delete_dashboard(dashboard_id)
+    
+    def invalidate_dataset(self, dataset_name: str, df: Optional[pd.DataFrame] = None) -> int:
+        """
+        Mark charts built from dataset_name stale (call when the dataset changes).
+        
+        With the new data in ``df`` (e.g. on upload) charts that have a spec are
+        re-rendered at once, so no reader is left with stale charts.
+        """
+        version = self._store.invalidate_dataset(dataset_name)
+        if df is not None:
+            for chart in self._store.dataset_charts(dataset_name):
+                try:
+                    self._store.store_rendered_chart(chart["chart_id"], render_chart_data(df, chart["spec"]), version)
+                except Exception as e:
+                    logger.warning(f"Failed to re-render chart {chart['chart_id']}: {e}")
+        return version
     
     def add_chart(
         self,
@@ -180,13 +191,15 @@ class DashboardService:
         x_field: Optional[str] = None,
         y_field: Optional[str] = None,
         series_field: Optional[str] = None,
-        options: Optional[Dict] = None
+        options: Optional[Dict] = None,
+        spec: Optional[Dict] = None
     ) -> Optional[ChartConfig]:
-        """Add a chart to a dashboard"""
-        dashboard = self._cache.get(dashboard_id)
-        if not dashboard:
-            return None
+        """
+        Add a chart to a dashboard.
         
+        ``spec`` (see render_chart_data) lets the chart be re-rendered when
+        its dataset changes; without it the chart keeps its data.
+        """
         # Serialize dataframe to records
         data_records = data.to_dict(orient="records")
         
@@ -201,12 +214,14 @@ class DashboardService:
             options=options or {}
         )
         
-        dashboard.charts.append(chart)
-        dashboard.updated_at = datetime.utcnow().isoformat()
-        self._save_dashboard(dashboard)
-        
+        if not self._store.add_chart(dashboard_id, {**chart.to_dict(), "spec": spec}, datetime.utcnow().isoformat()):
+            return None
         return chart
     
+    def remove_chart(self, dashboard_id: str, chart_id: str) -> bool:
+        """Remove one chart from a dashboard"""
+        return self._store.remove_chart(dashboard_id, chart_id, datetime.utcnow().isoformat())
+    
     def add_metric(
         self,
         dashboard_id: str,
@@ -219,10 +234,6 @@ class DashboardService:
         color: str = "violet"
     ) -> Optional[MetricCard]:
         """Add a metric card to a dashboard"""
-        dashboard = self._cache.get(dashboard_id)
-        if not dashboard:
-            return None
-        
         metric = MetricCard(
             metric_id=str(uuid.uuid4()),
             title=title,
@@ -234,10 +245,8 @@ class DashboardService:
             color=color
         )
         
-        dashboard.metrics.append(metric)
-        dashboard.updated_at = datetime.utcnow().isoformat()
-        self._save_dashboard(dashboard)
-        
+        if not self._store.add_metric(dashboard_id, metric.to_dict(), datetime.utcnow().isoformat()):
+            return None
         return metric
     
     def create_chart_from_data(
@@ -285,26 +294,27 @@ class DashboardService:
         for col in numeric_cols[:5]:  # Max 5 metrics
             value = df[col].sum() if df[col].dtype in ['int64', 'float64'] else df[col].mean()
             formatted = self._format_number(value)
-            self.add_metric(
+            dashboard.metrics.append(self.add_metric(
                 dashboard.dashboard_id,
                 title=col,
                 value=float(value),
                 formatted_value=formatted
-            )
+            ))
         
         # Create time series chart if date column exists
         if date_column and date_column in df.columns and numeric_cols:
             try:
-                time_df = df[[date_column, numeric_cols[0]]].dropna()
-                time_df = time_df.sort_values(date_column)
-                self.add_chart(
+                spec = {"kind": "series", "x": date_column, "y": numeric_cols[0]}
+                chart = self.add_chart(
                     dashboard.dashboard_id,
                     chart_type="line",
                     title=f"{numeric_cols[0]} over time",
-                    data=time_df,
+                    data=pd.DataFrame(render_chart_data(df, spec)),
                     x_field=date_column,
-                    y_field=numeric_cols[0]
+                    y_field=numeric_cols[0],
+                    spec=spec
                 )
+                dashboard.charts.append(chart)
             except Exception as e:
                 logger.warning(f"Failed to create time series chart: {e}")
         
@@ -313,16 +323,17 @@ class DashboardService:
             try:
                 cat_col = categorical_cols[0]
                 num_col = numeric_cols[0]
-                agg_df = df.groupby(cat_col)[num_col].sum().reset_index()
-                agg_df = agg_df.nlargest(10, num_col)  # Top 10
-                self.add_chart(
+                spec = {"kind": "top", "group_by": cat_col, "y": num_col, "agg": "sum", "limit": 10}
+                chart = self.add_chart(
                     dashboard.dashboard_id,
                     chart_type="bar",
                     title=f"{num_col} by {cat_col}",
-                    data=agg_df,
+                    data=pd.DataFrame(render_chart_data(df, spec)),
                     x_field=cat_col,
-                    y_field=num_col
+                    y_field=num_col,
+                    spec=spec
                 )
+                dashboard.charts.append(chart)
             except Exception as e:
                 logger.warning(f"Failed to create bar chart: {e}")
         
@@ -340,6 +351,24 @@ class DashboardService:
             return f"{value:.2f}"
 
 
+def render_chart_data(df: pd.DataFrame, spec: Dict) -> List[Dict]:
+    """
+    Chart records from a dataset according to a chart spec:
+    
+        {"kind": "series", "x": "date", "y": "amount"}
+        {"kind": "top", "group_by": "vendor", "y": "amount", "agg": "sum", "limit": 10}
+    """
+    kind = spec.get("kind")
+    if kind == "series":
+        out = df[[spec["x"], spec["y"]]].dropna().sort_values(spec["x"])
+    elif kind == "top":
+        out = df.groupby(spec["group_by"])[spec["y"]].agg(spec.get("agg", "sum")).reset_index()
+        out = out.nlargest(spec.get("limit", 10), spec["y"])
+    else:
+        raise ValueError(f"Unknown chart spec kind: {kind}")
+    return out.to_dict(orient="records")
+
+
 # Singleton
 _service: Optional[DashboardService] = None
 
@@ -0,0 +1,409 @@
+"""
+Dashboard Store
+SQLite-backed dashboard repository shared by all API workers on a host.
+
+- One row per dashboard, chart and metric; dashboards are indexed by
+  (tenant_id, updated_at), so listing and startup never read chart data.
+- Every mutation is a single transaction that also bumps the dashboard's
+  version and updated_at, so concurrent writers never lose each other's
+  charts (no read-modify-write of a whole document).
+- Charts keep their rendered data together with the source dataset
+  version it was rendered from. invalidate_dataset() bumps that version;
+  stale charts are re-rendered from their spec right away when the new
+  data is at hand, otherwise on next read.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dashboards (
+    dashboard_id TEXT PRIMARY KEY,
+    tenant_id TEXT NOT NULL DEFAULT 'default',
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    dataset_name TEXT,
+    layout TEXT NOT NULL DEFAULT '{}',
+    filters TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_dashboards_tenant_updated ON dashboards (tenant_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_dashboards_dataset ON dashboards (dataset_name);
+
+CREATE TABLE IF NOT EXISTS dashboard_charts (
+    chart_id TEXT PRIMARY KEY,
+    dashboard_id TEXT NOT NULL REFERENCES dashboards (dashboard_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    chart_type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    data TEXT NOT NULL DEFAULT '[]',
+    x_field TEXT,
+    y_field TEXT,
+    series_field TEXT,
+    color_scheme TEXT NOT NULL DEFAULT 'violet',
+    options TEXT NOT NULL DEFAULT '{}',
+    spec TEXT,
+    rendered_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_dashboard_charts_dashboard ON dashboard_charts (dashboard_id, position);
+
+CREATE TABLE IF NOT EXISTS dashboard_metrics (
+    metric_id TEXT PRIMARY KEY,
+    dashboard_id TEXT NOT NULL REFERENCES dashboards (dashboard_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    value TEXT,
+    formatted_value TEXT NOT NULL,
+    change REAL,
+    change_direction TEXT,
+    icon TEXT NOT NULL DEFAULT 'chart',
+    color TEXT NOT NULL DEFAULT 'violet'
+);
+CREATE INDEX IF NOT EXISTS idx_dashboard_metrics_dashboard ON dashboard_metrics (dashboard_id, position);
+
+CREATE TABLE IF NOT EXISTS dataset_versions (
+    dataset_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dashboard_store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns update_dashboard() may change, and how they are stored
+DASHBOARD_FIELDS = {"name": str, "description": str, "dataset_name": None, "layout": json.dumps, "filters": json.dumps}
+CHART_FIELDS = ("chart_id", "chart_type", "title", "data", "x_field", "y_field", "series_field", "color_scheme", "options")
+METRIC_FIELDS = ("metric_id", "title", "value", "formatted_value", "change", "change_direction", "icon", "color")
+
+
+class DashboardStore:
+    """Dashboard persistence in one SQLite database (WAL mode, one connection per thread)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # executescript() commits on its own; every statement is IF NOT EXISTS
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE ... COMMIT: writers serialize instead of failing on upgrade."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Read transaction: several SELECTs see one consistent state."""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    # ------------------------------------------------------------------
+    # Dashboards
+    # ------------------------------------------------------------------
+
+    def insert_dashboard(self, dashboard: Dict[str, Any], tenant_id: str = "default") -> None:
+        """Insert a dashboard dict (Dashboard.to_dict() shape) with its charts and metrics."""
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO dashboards
+                (dashboard_id, tenant_id, name, description, dataset_name, layout, filters, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    dashboard["dashboard_id"],
+                    tenant_id,
+                    dashboard["name"],
+                    dashboard.get("description") or "",
+                    dashboard.get("dataset_name"),
+                    json.dumps(dashboard.get("layout") or {}),
+                    json.dumps(dashboard.get("filters") or []),
+                    dashboard["created_at"],
+                    dashboard["updated_at"],
+                ),
+            )
+            for chart in dashboard.get("charts", []):
+                self._insert_chart(conn, dashboard["dashboard_id"], chart, dashboard.get("dataset_name"))
+            for metric in dashboard.get("metrics", []):
+                self._insert_metric(conn, dashboard["dashboard_id"], metric)
+
+    def get_dashboard(self, dashboard_id: str) -> Optional[Dict[str, Any]]:
+        """Dashboard dict with charts/metrics in order; charts carry spec and stale flags."""
+        with self.snapshot() as conn:
+            return self._read_dashboard(conn, dashboard_id)
+
+    def _read_dashboard(self, conn, dashboard_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT * FROM dashboards WHERE dashboard_id = ?", (dashboard_id,)).fetchone()
+        if row is None:
+            return None
+        current_version = self.dataset_version(row["dataset_name"]) if row["dataset_name"] else 0
+
+        charts = []
+        for c in conn.execute(
+            "SELECT * FROM dashboard_charts WHERE dashboard_id = ? ORDER BY position", (dashboard_id,)
+        ):
+            chart = {f: c[f] for f in CHART_FIELDS}
+            chart["data"] = json.loads(c["data"])
+            chart["options"] = json.loads(c["options"])
+            chart["spec"] = json.loads(c["spec"]) if c["spec"] else None
+            chart["stale"] = c["rendered_version"] < current_version
+            chart["rendered_version"] = c["rendered_version"]
+            charts.append(chart)
+
+        metrics = []
+        for m in conn.execute(
+            "SELECT * FROM dashboard_metrics WHERE dashboard_id = ? ORDER BY position", (dashboard_id,)
+        ):
+            metric = {f: m[f] for f in METRIC_FIELDS}
+            metric["value"] = json.loads(m["value"]) if m["value"] is not None else None
+            metrics.append(metric)
+
+        return {
+            "dashboard_id": row["dashboard_id"],
+            "tenant_id": row["tenant_id"],
+            "name": row["name"],
+            "description": row["description"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "dataset_name": row["dataset_name"],
+            "layout": json.loads(row["layout"]),
+            "filters": json.loads(row["filters"]),
+            "version": row["version"],
+            "dataset_version": current_version,
+            "charts": charts,
+            "metrics": metrics,
+        }
+
+    def list_dashboards(self, tenant_id: str = "default", limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Summaries for a tenant, most recently updated first (index-only on dashboards)."""
+        rows = self._conn().execute(
+            """
+            SELECT d.dashboard_id, d.name, d.description, d.created_at, d.updated_at,
+                   (SELECT COUNT(*) FROM dashboard_charts c WHERE c.dashboard_id = d.dashboard_id) AS chart_count,
+                   (SELECT COUNT(*) FROM dashboard_metrics m WHERE m.dashboard_id = d.dashboard_id) AS metric_count
+            FROM dashboards d
+            WHERE d.tenant_id = ?
+            ORDER BY d.updated_at DESC
+            LIMIT ? OFFSET ?
+            """,
+            (tenant_id, limit, offset),
+        )
+        return [dict(row) for row in rows]
+
+    def update_dashboard(self, dashboard_id: str, updated_at: str, **fields: Any) -> bool:
+        """Atomically update only the given top-level fields."""
+        unknown = set(fields) - set(DASHBOARD_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown dashboard fields: {sorted(unknown)}")
+        assignments, params = [], []
+        for name, value in fields.items():
+            encode = DASHBOARD_FIELDS[name]
+            assignments.append(f"{name} = ?")
+            params.append(encode(value) if encode and value is not None else value)
+        with self.transaction() as conn:
+            return self._touch(conn, dashboard_id, updated_at, assignments, params)
+
+    def delete_dashboard(self, dashboard_id: str) -> bool:
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM dashboards WHERE dashboard_id = ?", (dashboard_id,)).rowcount > 0
+
+    @staticmethod
+    def _touch(conn, dashboard_id: str, updated_at: str, assignments=(), params=()) -> bool:
+        cur = conn.execute(
+            f"""
+            UPDATE dashboards SET {", ".join([*assignments, "updated_at = ?", "version = version + 1"])}
+            WHERE dashboard_id = ?
+            """,
+            (*params, updated_at, dashboard_id),
+        )
+        return cur.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Charts and metrics
+    # ------------------------------------------------------------------
+
+    def add_chart(self, dashboard_id: str, chart: Dict[str, Any], updated_at: str) -> bool:
+        """Append a chart (optional "spec" key: how to re-render it); False if the dashboard does not exist."""
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT dataset_name FROM dashboards WHERE dashboard_id = ?", (dashboard_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._insert_chart(conn, dashboard_id, chart, row["dataset_name"])
+            return self._touch(conn, dashboard_id, updated_at)
+
+    def add_metric(self, dashboard_id: str, metric: Dict[str, Any], updated_at: str) -> bool:
+        """Append a metric card; False if the dashboard does not exist."""
+        with self.transaction() as conn:
+            if not self._touch(conn, dashboard_id, updated_at):
+                return False
+            self._insert_metric(conn, dashboard_id, metric)
+            return True
+
+    def remove_chart(self, dashboard_id: str, chart_id: str, updated_at: str) -> bool:
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "DELETE FROM dashboard_charts WHERE dashboard_id = ? AND chart_id = ?", (dashboard_id, chart_id)
+            )
+            return cur.rowcount > 0 and self._touch(conn, dashboard_id, updated_at)
+
+    def store_rendered_chart(self, chart_id: str, data: List[Dict], rendered_version: int) -> bool:
+        """Cache re-rendered chart data; never replaces data rendered from a newer version."""
+        with self.transaction() as conn:
+            cur = conn.execute(
+                """
+                UPDATE dashboard_charts SET data = ?, rendered_version = ?
+                WHERE chart_id = ? AND rendered_version < ?
+                """,
+                (json.dumps(data, default=str), rendered_version, chart_id, rendered_version),
+            )
+            return cur.rowcount > 0
+
+    def _insert_chart(self, conn, dashboard_id: str, chart: Dict, dataset_name: Optional[str]):
+        conn.execute(
+            f"""
+            INSERT INTO dashboard_charts
+            ({", ".join(CHART_FIELDS)}, dashboard_id, position, spec, rendered_version)
+            VALUES ({", ".join("?" * len(CHART_FIELDS))}, ?,
+                    (SELECT COALESCE(MAX(position), -1) + 1 FROM dashboard_charts WHERE dashboard_id = ?), ?,
+                    (SELECT COALESCE(MAX(version), 0) FROM dataset_versions WHERE dataset_name = ?))
+            """,
+            (
+                chart["chart_id"],
+                chart["chart_type"],
+                chart["title"],
+                json.dumps(chart.get("data") or [], default=str),
+                chart.get("x_field"),
+                chart.get("y_field"),
+                chart.get("series_field"),
+                chart.get("color_scheme") or "violet",
+                json.dumps(chart.get("options") or {}),
+                dashboard_id,
+                dashboard_id,
+                json.dumps(chart["spec"]) if chart.get("spec") else None,
+                dataset_name,
+            ),
+        )
+
+    def _insert_metric(self, conn, dashboard_id: str, metric: Dict):
+        conn.execute(
+            f"""
+            INSERT INTO dashboard_metrics
+            ({", ".join(METRIC_FIELDS)}, dashboard_id, position)
+            VALUES ({", ".join("?" * len(METRIC_FIELDS))}, ?,
+                    (SELECT COALESCE(MAX(position), -1) + 1 FROM dashboard_metrics WHERE dashboard_id = ?))
+            """,
+            (
+                metric["metric_id"],
+                metric["title"],
+                json.dumps(metric.get("value"), default=str),
+                metric["formatted_value"],
+                metric.get("change"),
+                metric.get("change_direction"),
+                metric.get("icon") or "chart",
+                metric.get("color") or "violet",
+                dashboard_id,
+                dashboard_id,
+            ),
+        )
+
+    # ------------------------------------------------------------------
+    # Dataset versions (chart cache invalidation)
+    # ------------------------------------------------------------------
+
+    def dataset_version(self, dataset_name: str) -> int:
+        row = self._conn().execute(
+            "SELECT version FROM dataset_versions WHERE dataset_name = ?", (dataset_name,)
+        ).fetchone()
+        return row["version"] if row else 0
+
+    def invalidate_dataset(self, dataset_name: str) -> int:
+        """Mark charts rendered from dataset_name stale; returns the new version."""
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO dataset_versions (dataset_name, version) VALUES (?, 1)
+                ON CONFLICT (dataset_name) DO UPDATE SET version = version + 1
+                """,
+                (dataset_name,),
+            )
+            return conn.execute(
+                "SELECT version FROM dataset_versions WHERE dataset_name = ?", (dataset_name,)
+            ).fetchone()["version"]
+
+    def dataset_charts(self, dataset_name: str) -> List[Dict[str, Any]]:
+        """chart_id and spec of every re-renderable chart built from dataset_name."""
+        rows = self._conn().execute(
+            """
+            SELECT c.chart_id, c.spec FROM dashboard_charts c
+            JOIN dashboards d ON d.dashboard_id = c.dashboard_id
+            WHERE d.dataset_name = ? AND c.spec IS NOT NULL
+            """,
+            (dataset_name,),
+        ).fetchall()
+        return [{"chart_id": r["chart_id"], "spec": json.loads(r["spec"])} for r in rows]
+
+    # ------------------------------------------------------------------
+    # Legacy JSON import
+    # ------------------------------------------------------------------
+
+    def import_json_dir(self, path: str, tenant_id: str = "default") -> int:
+        """One-time import of the old <dashboard_id>.json files; later calls are no-ops."""
+        directory = Path(path)
+        conn = self._conn()
+        marker = f"json_import:{directory.resolve()}"
+        if conn.execute("SELECT 1 FROM dashboard_store_meta WHERE key = ?", (marker,)).fetchone():
+            return 0
+        imported = 0
+        if directory.is_dir():
+            for f in sorted(directory.glob("*.json")):
+                try:
+                    data = json.loads(f.read_text())
+                    if conn.execute(
+                        "SELECT 1 FROM dashboards WHERE dashboard_id = ?", (data["dashboard_id"],)
+                    ).fetchone():
+                        continue
+                    self.insert_dashboard(data, tenant_id)
+                    imported += 1
+                except Exception as e:
+                    logger.error(f"Failed to import dashboard {f}: {e}")
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO dashboard_store_meta (key, value) VALUES (?, ?)", (marker, str(imported))
+            )
+        if imported:
+            logger.info(f"Imported {imported} dashboards from {directory}")
+        return imported
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Literal
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import json
+import time
 
 from ..connectors import PostgresConnector, QueryResult
 from ..core.config import get_config
@@ -13,6 +14,10 @@ from ..core.exceptions import ForecastError
 
 logger = logging.getLogger(__name__)
 
+# metric -> (fetched_at, rows). Daily aggregates change slowly; sharing them
+# across requests avoids re-running the GROUP BY for every forecast call.
+_history_cache: Dict[str, tuple] = {}
+
 
 @dataclass
 class ForecastPoint:
@@ -105,10 +110,14 @@ class Forecaster:
         self._config = get_config().forecast
     
     async def _get_historical_data(self, metric: str) -> List[Dict[str, Any]]:
-        """Fetch historical data for a metric"""
+        """Fetch historical data for a metric (cached for history_cache_ttl seconds)"""
         if metric not in self.SUPPORTED_METRICS:
             raise ForecastError(f"Unsupported metric: {metric}")
         
+        cached = _history_cache.get(metric)
+        if cached and time.monotonic() - cached[0] < self._config.history_cache_ttl:
+            return cached[1]
+        
         await self._connector.connect()
         sql = self.SUPPORTED_METRICS[metric]["sql"]
         result = await self._connector.execute_query(sql)
@@ -116,8 +125,17 @@ class Forecaster:
         if not result.success:
             raise ForecastError(f"Failed to fetch data: {result.error}")
         
+        _history_cache[metric] = (time.monotonic(), result.rows)
         return result.rows
     
+    @staticmethod
+    def invalidate_history(metric: Optional[str] = None) -> None:
+        """Drop cached history for one metric (or all)"""
+        if metric is None:
+            _history_cache.clear()
+        else:
+            _history_cache.pop(metric, None)
+    
     async def forecast_prophet(
         self,
         metric: str,
@@ -4,6 +4,13 @@ from .models import (
     ProphetForecaster,
     LinearForecaster,
     ARIMAForecaster,
+    ExponentialSmoothingForecaster,
+)
+from .batch import (
+    BatchForecaster,
+    FittedModelCache,
+    SeriesForecast,
+    create_forecaster,
 )
 
 __all__ = [
@@ -12,4 +19,9 @@ __all__ = [
     "ProphetForecaster",
     "LinearForecaster",
     "ARIMAForecaster",
+    "ExponentialSmoothingForecaster",
+    "BatchForecaster",
+    "FittedModelCache",
+    "SeriesForecast",
+    "create_forecaster",
 ]
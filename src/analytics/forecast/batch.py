@@ -0,0 +1,362 @@
+"""
+Batch Forecasting
+Forecast many series at once (per-vendor, per-account, per-tenant cashflow).
+
+- Fits and CV folds are fanned out to a process pool
+- Fitted models are cached by (series hash, model, params): an unchanged
+  series is only re-predicted, never refit
+- When a series grows (new points appended), the previous fit is reused
+  via Forecaster.refit (warm-start / state append) instead of a cold fit
+"""
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Type
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import threading
+
+import pandas as pd
+
+from ..core.config import get_config
+from .forecaster import Forecaster, ForecastResult, run_cv_fold
+from .models import (
+    ARIMAForecaster,
+    ExponentialSmoothingForecaster,
+    LinearForecaster,
+    ProphetForecaster,
+)
+
+logger = logging.getLogger(__name__)
+
+
+FORECASTERS: Dict[str, Type[Forecaster]] = {
+    "prophet": ProphetForecaster,
+    "linear": LinearForecaster,
+    "arima": ARIMAForecaster,
+    "exponential_smoothing": ExponentialSmoothingForecaster,
+}
+
+
+def create_forecaster(model: str, **params) -> Forecaster:
+    """Instantiate a forecaster by name"""
+    if model not in FORECASTERS:
+        raise ValueError(f"Unknown forecast model: {model}")
+    return FORECASTERS[model](**params)
+
+
+def prepare_series(df: pd.DataFrame, date_col: str, value_col: str) -> pd.DataFrame:
+    """Normalize a series: two columns, parsed dates, no NaN, sorted by date"""
+    df = df[[date_col, value_col]].copy()
+    df[date_col] = pd.to_datetime(df[date_col])
+    df[value_col] = pd.to_numeric(df[value_col], errors="coerce")
+    return df.dropna().sort_values(date_col).reset_index(drop=True)
+
+
+def series_hash(df: pd.DataFrame, date_col: str, value_col: str) -> str:
+    """Content hash of a prepared series"""
+    hashed = pd.util.hash_pandas_object(df[[date_col, value_col]], index=False)
+    return hashlib.sha1(hashed.values.tobytes()).hexdigest()
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+@dataclass
+class CachedModel:
+    """A fitted forecaster and the series it was fitted on"""
+    series_key: str
+    series_hash: str
+    n_points: int
+    forecaster: Forecaster
+
+
+class FittedModelCache:
+    """
+    LRU cache of fitted forecasters keyed by (series hash, model, params).
+
+    Also remembers the latest fit per (series key, model, params) so a series
+    that gained new points can be refit incrementally from it.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or get_config().forecast.model_cache_size
+        self._entries: "OrderedDict[Tuple[str, str, str], CachedModel]" = OrderedDict()
+        self._latest: Dict[Tuple[str, str, str], Tuple[str, str, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, hash_: str, model: str, params: Dict[str, Any]) -> Optional[CachedModel]:
+        key = (hash_, model, params_key(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def latest(self, series_key: str, model: str, params: Dict[str, Any]) -> Optional[CachedModel]:
+        """Most recent fit for a named series (whatever its content was)"""
+        with self._lock:
+            key = self._latest.get((series_key, model, params_key(params)))
+            return self._entries.get(key) if key else None
+
+    def put(self, model: str, params: Dict[str, Any], entry: CachedModel) -> None:
+        pkey = params_key(params)
+        key = (entry.series_hash, model, pkey)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._latest[(entry.series_key, model, pkey)] = key
+            while len(self._entries) > self.max_size:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                latest_key = (evicted.series_key, evicted_key[1], evicted_key[2])
+                if self._latest.get(latest_key) == evicted_key:
+                    del self._latest[latest_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@dataclass
+class SeriesForecast:
+    """Outcome of forecasting one series in a batch"""
+    key: str
+    result: Optional[ForecastResult] = None
+    fit_mode: str = "full"  # full, incremental, cached
+    cv: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def to_dict(self, include_data: bool = True) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "fit_mode": self.fit_mode,
+            "result": self.result.to_dict(include_data) if self.result else None,
+            "cv": self.cv,
+            "error": self.error,
+        }
+
+
+def _fit_predict_task(
+    forecaster: Forecaster,
+    mode: str,
+    df: pd.DataFrame,
+    date_col: str,
+    value_col: str,
+    periods: int,
+) -> Tuple[Forecaster, ForecastResult]:
+    """Worker: fit (full / incremental) or reuse a fitted model, then predict"""
+    if mode == "incremental":
+        # Never mutate the cached instance (matters for in-process executors)
+        forecaster = copy.deepcopy(forecaster).refit(df, date_col, value_col)
+    elif mode == "full":
+        forecaster.fit(df, date_col, value_col)
+    return forecaster, forecaster.predict(periods)
+
+
+class BatchForecaster:
+    """
+    Forecast many series with one model configuration.
+
+    Usage:
+        with BatchForecaster("prophet") as batch:
+            results = batch.forecast_grouped(df, "vendor", "date", "amount", periods=30)
+            results["Cong ty ABC"].result.summary()
+
+    executor: "process" (default, CPU-bound fits), "thread" or "serial".
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+        executor: str = "process",
+        cache: Optional[FittedModelCache] = None,
+    ):
+        config = get_config().forecast
+        self.model = model or config.default_model
+        self.params = params or {}
+        self.max_workers = max_workers or config.max_workers
+        self.executor_kind = executor
+        self.cache = cache if cache is not None else FittedModelCache()
+        self._executor: Optional[Executor] = None
+
+        # Fill in constructor defaults so equivalent params share cache keys
+        self.params = create_forecaster(self.model, **self.params).get_params()
+
+    # ------------------------------------------------------------------
+    # Executor
+    # ------------------------------------------------------------------
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.executor_kind == "serial":
+            return None
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        executor = self._get_executor()
+        if executor is not None:
+            return executor.submit(fn, *args)
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> "BatchForecaster":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Forecasting
+    # ------------------------------------------------------------------
+
+    def _plan(self, key: str, df: pd.DataFrame, hash_: str) -> Tuple[str, Forecaster]:
+        """Decide how to obtain a fitted model for a series: cached, incremental or full"""
+        cached = self.cache.get(hash_, self.model, self.params)
+        if cached is not None:
+            return "cached", cached.forecaster
+
+        latest = self.cache.latest(key, self.model, self.params)
+        if latest is not None and latest.n_points < len(df):
+            prefix = df.iloc[:latest.n_points]
+            if series_hash(prefix, *df.columns) == latest.series_hash:
+                return "incremental", latest.forecaster
+
+        return "full", create_forecaster(self.model, **self.params)
+
+    def forecast_many(
+        self,
+        series: Dict[str, pd.DataFrame],
+        date_col: str = "ds",
+        value_col: str = "y",
+        periods: Optional[int] = None,
+        cross_validate: bool = False,
+        cv_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, SeriesForecast]:
+        """
+        Forecast every series in `series` (key -> DataFrame).
+
+        Args:
+            periods: Forecast horizon (default: config default_horizon)
+            cross_validate: Also run CV; every fold of every series is a
+                separate pool task
+            cv_kwargs: horizon / initial / period for Forecaster.cv_splits
+        """
+        periods = periods or get_config().forecast.default_horizon
+        outcomes: Dict[str, SeriesForecast] = {}
+        fits: Dict[str, Tuple[Optional[Future], str, str, tuple]] = {}
+        folds: Dict[str, list] = {}
+
+        for key, raw in series.items():
+            try:
+                df = prepare_series(raw, date_col, value_col)
+                hash_ = series_hash(df, date_col, value_col)
+                mode, forecaster = self._plan(key, df, hash_)
+            except Exception as e:
+                outcomes[key] = SeriesForecast(key=key, error=str(e))
+                continue
+
+            task_args = (forecaster, mode, df, date_col, value_col, periods)
+            # Cached models only need predict(): run those in-process after
+            # the fits are queued rather than shipping the model to a worker
+            future = None if mode == "cached" else self._submit(_fit_predict_task, *task_args)
+            fits[key] = (future, mode, hash_, task_args)
+
+            if cross_validate:
+                splits = Forecaster.cv_splits(df, date_col, **(cv_kwargs or {}))
+                folds[key] = None if splits is None else [
+                    self._submit(
+                        run_cv_fold,
+                        create_forecaster(self.model, **self.params),
+                        train,
+                        test,
+                        date_col,
+                        value_col,
+                    )
+                    for train, test in splits
+                ]
+
+        for key, (future, mode, hash_, task_args) in fits.items():
+            outcome = SeriesForecast(key=key, fit_mode=mode)
+            try:
+                if future is None:
+                    _, outcome.result = _fit_predict_task(*task_args)
+                else:
+                    forecaster, outcome.result = future.result()
+                    n_points = len(task_args[2])
+                    self.cache.put(self.model, self.params, CachedModel(key, hash_, n_points, forecaster))
+            except Exception as e:
+                logger.warning(f"Forecast failed for series {key}: {e}")
+                outcome.error = str(e)
+
+            if cross_validate:
+                outcome.cv = self._collect_cv(key, folds.get(key))
+            outcomes[key] = outcome
+
+        return {key: outcomes[key] for key in series if key in outcomes}
+
+    @staticmethod
+    def _collect_cv(key: str, futures: Optional[list]) -> Dict[str, Any]:
+        if futures is None:
+            return {"error": "Not enough data for cross-validation"}
+        metrics_list = []
+        for future in futures:
+            try:
+                metrics_list.append(future.result())
+            except Exception as e:
+                logger.warning(f"CV fold failed for series {key}: {e}")
+        return Forecaster.summarize_cv(metrics_list)
+
+    def forecast_grouped(
+        self,
+        df: pd.DataFrame,
+        group_col: str,
+        date_col: str,
+        value_col: str,
+        periods: Optional[int] = None,
+        **kwargs,
+    ) -> Dict[str, SeriesForecast]:
+        """Forecast one series per value of group_col (long-format input)"""
+        series = {
+            str(key): group[[date_col, value_col]]
+            for key, group in df.groupby(group_col, sort=False)
+        }
+        return self.forecast_many(series, date_col, value_col, periods, **kwargs)
+
+    async def aforecast_many(self, series: Dict[str, pd.DataFrame], *args, **kwargs) -> Dict[str, SeriesForecast]:
+        """forecast_many without blocking the event loop"""
+        return await asyncio.to_thread(self.forecast_many, series, *args, **kwargs)
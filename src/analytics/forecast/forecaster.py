@@ -3,6 +3,7 @@ Forecaster
 Time series forecasting with Prophet and scikit-learn
 """
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
@@ -108,27 +109,36 @@ class Forecaster(ABC):
         
         return metrics
     
-    def cross_validate(
-        self, 
-        df: pd.DataFrame, 
-        date_col: str, 
-        value_col: str,
+    def get_params(self) -> Dict[str, Any]:
+        """Constructor parameters (used to clone the model and key the fitted-model cache)"""
+        return {}
+    
+    def clone(self) -> "Forecaster":
+        """Unfitted copy with the same parameters"""
+        return type(self)(**self.get_params())
+    
+    def refit(self, df: pd.DataFrame, date_col: str, value_col: str) -> "Forecaster":
+        """
+        Refit after new points were appended to the series this model was
+        last fitted on. Models that can warm-start override this; the
+        default is a full fit.
+        """
+        return self.fit(df, date_col, value_col)
+    
+    @staticmethod
+    def cv_splits(
+        df: pd.DataFrame,
+        date_col: str,
         horizon: int = 30,
         initial: int = 365,
         period: int = 30,
-    ) -> Dict[str, Any]:
-        """
-        Perform time series cross-validation.
-        
-        Args:
-            horizon: Forecast horizon for each fold
-            initial: Initial training period size
-            period: Period between cutoff dates
-        """
+        max_folds: int = 5,
+    ) -> Optional[List[Tuple[pd.DataFrame, pd.DataFrame]]]:
+        """Expanding-window (train, test) splits, or None if there is not enough data"""
         df = df.sort_values(date_col).reset_index(drop=True)
         
         if len(df) < initial + horizon:
-            return {"error": "Not enough data for cross-validation"}
+            return None
         
         cutoffs = []
         start = initial
@@ -136,28 +146,17 @@ class Forecaster(ABC):
             cutoffs.append(start)
             start += period
         
-        metrics_list = []
-        
-        for cutoff in cutoffs[:5]:  # Limit to 5 folds
-            train = df.iloc[:cutoff]
-            test = df.iloc[cutoff:cutoff + horizon]
-            
-            try:
-                self.fit(train, date_col, value_col)
-                result = self.predict(len(test))
-                
-                # Calculate metrics
-                actual = test[value_col].values
-                predicted = result.forecast['yhat'].values[:len(actual)]
-                metrics = self.calculate_metrics(actual, predicted)
-                metrics_list.append(metrics)
-            except Exception as e:
-                logger.warning(f"CV fold failed: {e}")
-        
+        return [
+            (df.iloc[:cutoff], df.iloc[cutoff:cutoff + horizon])
+            for cutoff in cutoffs[:max_folds]
+        ]
+    
+    @staticmethod
+    def summarize_cv(metrics_list: List[Dict[str, float]]) -> Dict[str, Any]:
+        """Average per-fold metrics into a cross-validation report"""
         if not metrics_list:
             return {"error": "All CV folds failed"}
         
-        # Average metrics
         avg_metrics = {}
         for key in metrics_list[0].keys():
             values = [m.get(key) for m in metrics_list if m.get(key) is not None]
@@ -169,3 +168,65 @@ class Forecaster(ABC):
             "folds": len(metrics_list),
             "metrics": avg_metrics,
         }
+    
+    def cross_validate(
+        self, 
+        df: pd.DataFrame, 
+        date_col: str, 
+        value_col: str,
+        horizon: int = 30,
+        initial: int = 365,
+        period: int = 30,
+        executor: Optional[Executor] = None,
+    ) -> Dict[str, Any]:
+        """
+        Perform time series cross-validation.
+        
+        Args:
+            horizon: Forecast horizon for each fold
+            initial: Initial training period size
+            period: Period between cutoff dates
+            executor: Optional executor to fit folds in parallel (each fold
+                gets its own clone of this model)
+        """
+        splits = self.cv_splits(df, date_col, horizon, initial, period)
+        
+        if splits is None:
+            return {"error": "Not enough data for cross-validation"}
+        
+        metrics_list = []
+        
+        if executor is not None:
+            futures = [
+                executor.submit(run_cv_fold, self.clone(), train, test, date_col, value_col)
+                for train, test in splits
+            ]
+            for future in futures:
+                try:
+                    metrics_list.append(future.result())
+                except Exception as e:
+                    logger.warning(f"CV fold failed: {e}")
+        else:
+            for train, test in splits:
+                try:
+                    metrics_list.append(run_cv_fold(self, train, test, date_col, value_col))
+                except Exception as e:
+                    logger.warning(f"CV fold failed: {e}")
+        
+        return self.summarize_cv(metrics_list)
+
+
+def run_cv_fold(
+    forecaster: Forecaster,
+    train: pd.DataFrame,
+    test: pd.DataFrame,
+    date_col: str,
+    value_col: str,
+) -> Dict[str, float]:
+    """Fit on train, forecast len(test) points, score against test (picklable for process pools)"""
+    forecaster.fit(train, date_col, value_col)
+    result = forecaster.predict(len(test))
+    
+    actual = test[value_col].values
+    predicted = result.forecast['yhat'].values[:len(actual)]
+    return forecaster.calculate_metrics(actual, predicted)
@@ -40,8 +40,40 @@ class ProphetForecaster(Forecaster):
         self.changepoint_prior_scale = changepoint_prior_scale
         self._history = None
     
+    def get_params(self) -> dict:
+        return {
+            "seasonality_mode": self.seasonality_mode,
+            "yearly_seasonality": self.yearly_seasonality,
+            "weekly_seasonality": self.weekly_seasonality,
+            "daily_seasonality": self.daily_seasonality,
+            "changepoint_prior_scale": self.changepoint_prior_scale,
+        }
+    
     def fit(self, df: pd.DataFrame, date_col: str, value_col: str) -> "ProphetForecaster":
         """Fit Prophet model"""
+        return self._fit(df, date_col, value_col)
+    
+    def refit(self, df: pd.DataFrame, date_col: str, value_col: str) -> "ProphetForecaster":
+        """
+        Warm-start refit: Stan optimization is initialised from the previous
+        fit's parameters, so appending a few points converges in a fraction
+        of the iterations of a cold fit.
+        """
+        if not self._is_fitted:
+            return self._fit(df, date_col, value_col)
+        
+        params = self._model.params
+        init = {name: params[name][0][0] for name in ("k", "m", "sigma_obs")}
+        init.update({name: params[name][0] for name in ("delta", "beta")})
+        return self._fit(df, date_col, value_col, init=init)
+    
+    def _fit(
+        self,
+        df: pd.DataFrame,
+        date_col: str,
+        value_col: str,
+        init: Optional[dict] = None,
+    ) -> "ProphetForecaster":
         try:
             from prophet import Prophet
         except ImportError:
@@ -68,7 +100,10 @@ class ProphetForecaster(Forecaster):
         import warnings
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            self._model.fit(prophet_df)
+            if init is not None:
+                self._model.fit(prophet_df, init=init)
+            else:
+                self._model.fit(prophet_df)
         
         self._is_fitted = True
         logger.info(f"Prophet model fitted with {len(prophet_df)} data points")
@@ -215,6 +250,9 @@ class ARIMAForecaster(Forecaster):
         self._last_date = None
         self._freq = None
     
+    def get_params(self) -> dict:
+        return {"order": self.order, "seasonal_order": self.seasonal_order}
+    
     def fit(self, df: pd.DataFrame, date_col: str, value_col: str) -> "ARIMAForecaster":
         """Fit ARIMA model"""
         try:
@@ -250,6 +288,30 @@ class ARIMAForecaster(Forecaster):
         logger.info(f"ARIMA{self.order} model fitted, AIC: {self._model.aic:.2f}")
         return self
     
+    def refit(self, df: pd.DataFrame, date_col: str, value_col: str) -> "ARIMAForecaster":
+        """
+        Append new observations to the fitted state space model, keeping the
+        estimated parameters (no re-estimation). Falls back to a full fit if
+        the history was changed rather than extended.
+        """
+        if not self._is_fitted:
+            return self.fit(df, date_col, value_col)
+        
+        df = df[[date_col, value_col]].copy()
+        df[date_col] = pd.to_datetime(df[date_col])
+        df = df.dropna().sort_values(date_col)
+        
+        y = df[value_col].values
+        n_prev = len(self._y_train)
+        if len(y) <= n_prev or not np.array_equal(y[:n_prev], self._y_train):
+            return self.fit(df, date_col, value_col)
+        
+        self._model = self._model.append(y[n_prev:], refit=False)
+        self._y_train = y
+        self._last_date = df[date_col].max()
+        logger.info(f"ARIMA{self.order} model extended with {len(y) - n_prev} new points")
+        return self
+    
     def predict(self, periods: int) -> ForecastResult:
         """Generate ARIMA forecast"""
         if not self._is_fitted:
@@ -258,7 +320,7 @@ class ARIMAForecaster(Forecaster):
         # Forecast
         forecast_result = self._model.get_forecast(steps=periods)
         y_pred = forecast_result.predicted_mean
-        conf_int = forecast_result.conf_int()
+        conf_int = np.asarray(forecast_result.conf_int())  # ndarray when fitted on arrays
         
         # Generate future dates
         future_dates = pd.date_range(
@@ -270,8 +332,8 @@ class ARIMAForecaster(Forecaster):
         forecast = pd.DataFrame({
             'ds': future_dates,
             'yhat': y_pred,
-            'yhat_lower': conf_int.iloc[:, 0],
-            'yhat_upper': conf_int.iloc[:, 1],
+            'yhat_lower': conf_int[:, 0],
+            'yhat_upper': conf_int[:, 1],
         })
         
         # Calculate in-sample metrics
@@ -305,6 +367,13 @@ class ExponentialSmoothingForecaster(Forecaster):
         self.seasonal = seasonal
         self.seasonal_periods = seasonal_periods
     
+    def get_params(self) -> dict:
+        return {
+            "trend": self.trend,
+            "seasonal": self.seasonal,
+            "seasonal_periods": self.seasonal_periods,
+        }
+    
     def fit(self, df: pd.DataFrame, date_col: str, value_col: str) -> "ExponentialSmoothingForecaster":
         """Fit Exponential Smoothing model"""
         try:
@@ -0,0 +1,353 @@
+"""
+Compiled Validation Plan
+Runs all expectations of a DataValidator in one vectorized pass
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .expectations import (
+    ExpectColumnToExist,
+    ExpectColumnValuesInRange,
+    ExpectColumnValuesInSet,
+    ExpectColumnValuesNotNull,
+    ExpectColumnValuesUnique,
+    ExpectTableRowCountBetween,
+)
+from .validator import ValidationResult, ValidationRule
+
+logger = logging.getLogger(__name__)
+
+# Values kept for observed/unexpected reporting, as the per-rule expectations
+MAX_REPORTED_VALUES = 10
+
+COMPILED_RULES = (
+    ExpectColumnToExist,
+    ExpectColumnValuesNotNull,
+    ExpectColumnValuesUnique,
+    ExpectColumnValuesInRange,
+    ExpectColumnValuesInSet,
+    ExpectTableRowCountBetween,
+)
+
+
+@dataclass
+class ColumnStats:
+    """Mergeable per-column statistics accumulated across chunks."""
+    null_count: int = 0
+    numeric: bool = True
+    min: Any = None
+    max: Any = None
+    # (min_value, max_value) -> violations, one entry per range rule
+    range_violations: Dict[Tuple[Any, Any], int] = field(default_factory=dict)
+    distinct_values: Set[Any] = field(default_factory=set)
+    hashes: List[np.ndarray] = field(default_factory=list)
+
+
+@dataclass
+class ColumnPlan:
+    """What a single scan of one column must compute."""
+    column: str
+    nulls: bool = False
+    unique: bool = False
+    ranges: List[Tuple[Any, Any]] = field(default_factory=list)
+    distinct: bool = False  # value-set rules: collect distinct non-null values
+
+
+class ValidationPlan:
+    """
+    Validation rules compiled into per-column scans.
+
+    Rules on the same column share one scan: nulls are counted for all
+    columns with a single ``isna().sum()``, min/max and every range bound
+    are evaluated on one numeric view, and distinct values are computed
+    once for all value-set rules. The built-in expectations are answered
+    from these statistics; any other ValidationRule runs as before.
+
+    Statistics are mergeable, so the plan also validates an iterable of
+    chunks (``pd.read_csv(..., chunksize=...)``) without loading the
+    dataset. Uniqueness keeps one 64-bit hash per non-null value.
+    """
+
+    def __init__(self, rules: List[ValidationRule]):
+        self.rules = list(rules)
+        self.columns: Dict[str, ColumnPlan] = {}
+        self.fallback: List[ValidationRule] = []
+
+        for rule in self.rules:
+            if not isinstance(rule, COMPILED_RULES):
+                self.fallback.append(rule)
+                continue
+            column = getattr(rule, "column", None)
+            if column is None or isinstance(rule, ExpectColumnToExist):
+                continue
+            plan = self.columns.setdefault(column, ColumnPlan(column))
+            if isinstance(rule, ExpectColumnValuesNotNull):
+                plan.nulls = True
+            elif isinstance(rule, ExpectColumnValuesUnique):
+                plan.unique = True
+            elif isinstance(rule, ExpectColumnValuesInRange):
+                bounds = (rule.min_value, rule.max_value)
+                if bounds not in plan.ranges:
+                    plan.ranges.append(bounds)
+            elif isinstance(rule, ExpectColumnValuesInSet):
+                plan.distinct = True
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def _scan(self, df: pd.DataFrame, stats: Dict[str, ColumnStats]) -> None:
+        present = [c for c in self.columns if c in df.columns]
+        if not present:
+            return
+        null_counts = df[present].isna().sum()
+
+        for column in present:
+            plan = self.columns[column]
+            col_stats = stats.setdefault(column, ColumnStats())
+            col_stats.null_count += int(null_counts[column])
+            if not (plan.unique or plan.ranges or plan.distinct):
+                continue
+
+            values = df[column].dropna()
+            if plan.ranges:
+                self._scan_ranges(plan, values, col_stats)
+            if plan.distinct:
+                col_stats.distinct_values.update(pd.unique(values).tolist())
+            if plan.unique:
+                col_stats.hashes.append(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    @staticmethod
+    def _scan_ranges(plan: ColumnPlan, values: pd.Series, col_stats: ColumnStats) -> None:
+        if not col_stats.numeric or not pd.api.types.is_numeric_dtype(values):
+            col_stats.numeric = False
+            return
+        if len(values) == 0:
+            return
+        arr = values.to_numpy()
+        lo, hi = arr.min(), arr.max()
+        col_stats.min = lo if col_stats.min is None else min(col_stats.min, lo)
+        col_stats.max = hi if col_stats.max is None else max(col_stats.max, hi)
+        for min_value, max_value in plan.ranges:
+            violations = 0
+            # Bounds outside the chunk's [min, max] cannot be violated: skip the compare
+            if min_value is not None and lo < min_value:
+                violations += int(np.count_nonzero(arr < min_value))
+            if max_value is not None and hi > max_value:
+                violations += int(np.count_nonzero(arr > max_value))
+            key = (min_value, max_value)
+            col_stats.range_violations[key] = col_stats.range_violations.get(key, 0) + violations
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        df: pd.DataFrame,
+        sample: Optional[Union[int, float]] = None,
+        random_state: int = 0,
+    ) -> Tuple[List[ValidationResult], Dict[str, Any]]:
+        """
+        Validate an in-memory DataFrame.
+
+        ``sample`` validates column statistics on a random subset (row
+        count when int, fraction when float); the table row count is
+        always the full one.
+        """
+        row_count = len(df)
+        scanned = df
+        if sample is not None and row_count > 0:
+            if isinstance(sample, float):
+                scanned = df.sample(frac=min(sample, 1.0), random_state=random_state)
+            elif sample < row_count:
+                scanned = df.sample(n=sample, random_state=random_state)
+
+        stats: Dict[str, ColumnStats] = {}
+        self._scan(scanned, stats)
+        results = self._results(list(df.columns), stats, row_count, len(scanned), [scanned])
+        return results, {"scanned_rows": len(scanned), "sampled": len(scanned) < row_count}
+
+    def run_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        sample: Optional[float] = None,
+        random_state: int = 0,
+    ) -> Tuple[List[ValidationResult], Dict[str, Any]]:
+        """
+        Validate a dataset delivered in chunks, holding one chunk at a time.
+
+        ``sample`` is a fraction of each chunk to scan. Rules that are not
+        compiled run on every chunk; the first failure is reported.
+        """
+        stats: Dict[str, ColumnStats] = {}
+        columns: List[str] = []
+        row_count = scanned_rows = n_chunks = 0
+        fallback_results: Dict[int, ValidationResult] = {}
+
+        for chunk in chunks:
+            n_chunks += 1
+            if not columns:
+                columns = list(chunk.columns)
+            row_count += len(chunk)
+            if sample is not None and len(chunk) > 0:
+                chunk = chunk.sample(frac=min(sample, 1.0), random_state=random_state + n_chunks)
+            scanned_rows += len(chunk)
+            self._scan(chunk, stats)
+            for i, rule in enumerate(self.fallback):
+                previous = fallback_results.get(i)
+                if previous is None or previous.success:
+                    fallback_results[i] = _run_rule(rule, chunk)
+
+        results = self._results(columns, stats, row_count, scanned_rows, [], fallback_results)
+        return results, {"scanned_rows": scanned_rows, "sampled": scanned_rows < row_count, "chunks": n_chunks}
+
+    def _results(
+        self,
+        columns: List[str],
+        stats: Dict[str, ColumnStats],
+        row_count: int,
+        scanned_rows: int,
+        frames: List[pd.DataFrame],
+        fallback_results: Optional[Dict[int, ValidationResult]] = None,
+    ) -> List[ValidationResult]:
+        results = []
+        fallback_index = 0
+        for rule in self.rules:
+            if not isinstance(rule, COMPILED_RULES):
+                if fallback_results is not None:
+                    result = fallback_results.get(fallback_index) or _run_rule(rule, pd.DataFrame(columns=columns))
+                else:
+                    result = _run_rule(rule, frames[0])
+                fallback_index += 1
+                results.append(result)
+                continue
+            try:
+                results.append(self._evaluate(rule, columns, stats, row_count, scanned_rows))
+            except Exception as e:
+                results.append(ValidationResult(
+                    rule_name=rule.name,
+                    success=False,
+                    message=f"Validation error: {str(e)}",
+                ))
+        return results
+
+    def _evaluate(
+        self,
+        rule: ValidationRule,
+        columns: List[str],
+        stats: Dict[str, ColumnStats],
+        row_count: int,
+        total: int,
+    ) -> ValidationResult:
+        if isinstance(rule, ExpectTableRowCountBetween):
+            success = True
+            if rule.min_rows is not None and row_count < rule.min_rows:
+                success = False
+            if rule.max_rows is not None and row_count > rule.max_rows:
+                success = False
+            return ValidationResult(
+                rule_name=rule.name,
+                success=success,
+                message=f"Table has {row_count} rows",
+                observed_value=row_count,
+                expected_value=f"[{rule.min_rows}, {rule.max_rows}]",
+            )
+
+        column = rule.column
+        if isinstance(rule, ExpectColumnToExist):
+            exists = column in columns
+            return ValidationResult(
+                rule_name=rule.name,
+                success=exists,
+                message=f"Column '{column}' {'exists' if exists else 'does not exist'}",
+                column=column,
+                observed_value=list(columns) if not exists else None,
+            )
+
+        if column not in columns:
+            return ValidationResult(
+                rule_name=rule.name,
+                success=False,
+                message=f"Column '{column}' does not exist",
+                column=column,
+            )
+        col_stats = stats.get(column, ColumnStats())
+
+        if isinstance(rule, ExpectColumnValuesNotNull):
+            null_ratio = col_stats.null_count / total if total > 0 else 0
+            return ValidationResult(
+                rule_name=rule.name,
+                success=null_ratio <= rule.threshold,
+                message=f"Column '{column}' has {null_ratio:.2%} nulls (threshold: {rule.threshold:.2%})",
+                column=column,
+                observed_value=null_ratio,
+                expected_value=f"<= {rule.threshold}",
+                details={"null_count": col_stats.null_count, "total_count": total},
+            )
+
+        if isinstance(rule, ExpectColumnValuesUnique):
+            hashes = np.concatenate(col_stats.hashes) if col_stats.hashes else np.empty(0, dtype=np.uint64)
+            unique = int(len(np.unique(hashes)))
+            duplicates = total - unique  # nulls count as duplicates, as nunique() does
+            return ValidationResult(
+                rule_name=rule.name,
+                success=duplicates == 0,
+                message=f"Column '{column}' has {duplicates} duplicate values",
+                column=column,
+                observed_value=unique,
+                expected_value=total,
+                details={"duplicates": duplicates, "unique_ratio": unique / total if total > 0 else 0},
+            )
+
+        if isinstance(rule, ExpectColumnValuesInRange):
+            if not col_stats.numeric:
+                return ValidationResult(
+                    rule_name=rule.name,
+                    success=False,
+                    message=f"Column '{column}' is not numeric",
+                    column=column,
+                )
+            violations = col_stats.range_violations.get((rule.min_value, rule.max_value), 0)
+            actual_min, actual_max = _py(col_stats.min), _py(col_stats.max)
+            return ValidationResult(
+                rule_name=rule.name,
+                success=violations == 0,
+                message=f"Column '{column}' has {violations} values outside range",
+                column=column,
+                observed_value=f"[{actual_min}, {actual_max}]",
+                expected_value=f"[{rule.min_value}, {rule.max_value}]",
+                details={"violations": violations, "min": actual_min, "max": actual_max},
+            )
+
+        # ExpectColumnValuesInSet
+        unexpected = col_stats.distinct_values - rule.value_set
+        return ValidationResult(
+            rule_name=rule.name,
+            success=len(unexpected) == 0,
+            message=f"Column '{column}' has {len(unexpected)} unexpected values",
+            column=column,
+            observed_value=list(col_stats.distinct_values)[:MAX_REPORTED_VALUES],
+            expected_value=list(rule.value_set)[:MAX_REPORTED_VALUES],
+            details={"unexpected_values": list(unexpected)[:MAX_REPORTED_VALUES]},
+        )
+
+
+def _run_rule(rule: ValidationRule, df: pd.DataFrame) -> ValidationResult:
+    try:
+        return rule.validate(df)
+    except Exception as e:
+        return ValidationResult(
+            rule_name=rule.name,
+            success=False,
+            message=f"Validation error: {str(e)}",
+        )
+
+
+def _py(value: Any) -> Any:
+    """numpy scalar -> Python scalar for JSON-friendly results."""
+    return value.item() if isinstance(value, np.generic) else value
@@ -5,10 +5,13 @@ Great Expectations-inspired data validation framework
 import pandas as pd
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 from datetime import datetime
 import logging
 
+if TYPE_CHECKING:
+    from .plan import ValidationPlan
+
 logger = logging.getLogger(__name__)
 
 
@@ -100,10 +103,12 @@ class DataValidator:
     def __init__(self, name: str):
         self.name = name
         self.rules: List[ValidationRule] = []
+        self._plan = None
     
     def add_rule(self, rule: ValidationRule) -> "DataValidator":
         """Add a validation rule (chainable)"""
         self.rules.append(rule)
+        self._plan = None
         return self
     
     def expect_column_to_exist(self, column: str) -> "DataValidator":
@@ -141,29 +146,55 @@ class DataValidator:
         from .expectations import ExpectTableRowCountBetween
         return self.add_rule(ExpectTableRowCountBetween(min_rows=min_rows, max_rows=max_rows))
     
-    def validate(self, df: pd.DataFrame) -> ValidationSuite:
-        """Run all validation rules against the DataFrame"""
-        results = []
+    def compile(self) -> "ValidationPlan":
+        """Compiled plan for the current rules (cached until rules change)"""
+        from .plan import ValidationPlan
+        if self._plan is None:
+            self._plan = ValidationPlan(self.rules)
+        return self._plan
+    
+    def validate(
+        self,
+        df: pd.DataFrame,
+        sample: Optional[Union[int, float]] = None,
+        random_state: int = 0,
+    ) -> ValidationSuite:
+        """
+        Run all validation rules against the DataFrame.
         
-        for rule in self.rules:
-            try:
-                result = rule.validate(df)
-                results.append(result)
-            except Exception as e:
-                results.append(ValidationResult(
-                    rule_name=rule.name,
-                    success=False,
-                    message=f"Validation error: {str(e)}",
-                ))
+        Rules are answered from one vectorized scan per column (see
+        ValidationPlan), so cost grows with columns, not rules. ``sample``
+        (rows or fraction) validates column statistics on a random subset.
+        """
+        results, scan_stats = self.compile().run(df, sample=sample, random_state=random_state)
         
         # Calculate statistics
         stats = {
             "row_count": len(df),
             "column_count": len(df.columns),
             "total_rules": len(self.rules),
-            "memory_bytes": df.memory_usage(deep=True).sum(),
+            "memory_bytes": int(df.memory_usage(deep=True).sum()),
+            **scan_stats,
         }
+        return self._suite(results, stats)
+    
+    def validate_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        sample: Optional[float] = None,
+        random_state: int = 0,
+    ) -> ValidationSuite:
+        """
+        Validate a dataset larger than memory, one chunk at a time.
         
+        Usage:
+            validator.validate_chunks(pd.read_csv(path, chunksize=100_000))
+        """
+        results, scan_stats = self.compile().run_chunks(chunks, sample=sample, random_state=random_state)
+        stats = {"total_rules": len(self.rules), **scan_stats}
+        return self._suite(results, stats)
+    
+    def _suite(self, results: List[ValidationResult], stats: Dict[str, Any]) -> ValidationSuite:
         all_passed = all(r.success for r in results)
         
         suite = ValidationSuite(
@@ -184,6 +215,7 @@ class DataValidator:
     def clear_rules(self) -> None:
         """Clear all rules"""
         self.rules.clear()
+        self._plan = None
     
     @classmethod
     def from_schema(cls, name: str, schema: Dict[str, Any]) -> "DataValidator":
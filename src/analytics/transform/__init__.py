@@ -1,6 +1,7 @@
 """Transform module - dbt-style data transformations"""
 from .models import Model, ModelConfig, SQLModel, PythonModel
-from .runner import TransformRunner
+from .runner import TransformRunner, RunResult
+from .state import ModelState, RunStateStore, FileRunStateStore
 
 __all__ = [
     "Model",
@@ -8,4 +9,8 @@ __all__ = [
     "SQLModel",
     "PythonModel",
     "TransformRunner",
+    "RunResult",
+    "ModelState",
+    "RunStateStore",
+    "FileRunStateStore",
 ]
@@ -4,8 +4,12 @@ dbt-inspired data transformation models
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from enum import Enum
+import asyncio
+import hashlib
+import inspect
+import json
 import pandas as pd
 import logging
 
@@ -29,8 +33,9 @@ class ModelConfig:
     schema: str = "analytics"
     tags: List[str] = field(default_factory=list)
     depends_on: List[str] = field(default_factory=list)  # Model dependencies
-    unique_key: Optional[str] = None  # For incremental
-    partition_by: Optional[str] = None
+    unique_key: Optional[str] = None  # For incremental: upsert key (comma-separated for composite)
+    partition_by: Optional[str] = None  # For incremental: rebuild only partitions touched by new data
+    watermark_column: Optional[str] = None  # For incremental: monotonically increasing column (e.g. updated_at)
     cluster_by: List[str] = field(default_factory=list)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -41,6 +46,9 @@ class ModelConfig:
             "schema": self.schema,
             "tags": self.tags,
             "depends_on": self.depends_on,
+            "unique_key": self.unique_key,
+            "partition_by": self.partition_by,
+            "watermark_column": self.watermark_column,
         }
 
 
@@ -52,6 +60,9 @@ class ModelResult:
     rows_affected: int
     execution_time_ms: float
     error: Optional[str] = None
+    skipped: bool = False  # Inputs unchanged since last successful run
+    watermark: Optional[str] = None  # Incremental high-water mark after this run
+    output_changed: bool = True  # False when an incremental run found no new data
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -60,6 +71,8 @@ class ModelResult:
             "rows_affected": self.rows_affected,
             "execution_time_ms": self.execution_time_ms,
             "error": self.error,
+            "skipped": self.skipped,
+            "watermark": self.watermark,
         }
 
 
@@ -76,6 +89,19 @@ class Model(ABC):
     def name(self) -> str:
         return self.config.name
     
+    @property
+    def is_persisted(self) -> bool:
+        """Whether the output survives between runs (and the model can be skipped)"""
+        return False
+    
+    def _definition(self) -> str:
+        return self.get_sql() or ""
+    
+    def fingerprint(self) -> str:
+        """Hash of the model definition; changes force a rebuild"""
+        payload = json.dumps(self.config.to_dict(), sort_keys=True, default=str) + "\n" + self._definition()
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
     @abstractmethod
     async def run(self, context: Dict[str, Any]) -> ModelResult:
         """Execute the model transformation"""
@@ -112,6 +138,14 @@ class SQLModel(Model):
     def get_sql(self) -> str:
         return self.sql
     
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.config.schema}.{self.name}"
+    
+    @property
+    def is_persisted(self) -> bool:
+        return self.config.materialization != MaterializationType.EPHEMERAL
+    
     def _resolve_refs(self, sql: str, context: Dict[str, Any]) -> str:
         """
         Resolve {{ ref('model_name') }} references.
@@ -141,6 +175,19 @@ class SQLModel(Model):
             # Resolve references
             resolved_sql = self._resolve_refs(self.sql, context)
             
+            if self.config.materialization == MaterializationType.INCREMENTAL:
+                rows_affected, watermark, output_changed = await self._run_incremental(
+                    connector, resolved_sql, context
+                )
+                return ModelResult(
+                    name=self.name,
+                    success=True,
+                    rows_affected=rows_affected,
+                    execution_time_ms=(time.time() - start_time) * 1000,
+                    watermark=watermark,
+                    output_changed=output_changed,
+                )
+            
             # Execute based on materialization
             if self.config.materialization == MaterializationType.VIEW:
                 create_sql = f"CREATE OR REPLACE VIEW {self.config.schema}.{self.name} AS {resolved_sql}"
@@ -174,6 +221,107 @@ class SQLModel(Model):
             )
 
 
+    async def _run_incremental(
+        self, connector, select_sql: str, context: Dict[str, Any]
+    ) -> Tuple[int, Optional[str], bool]:
+        """
+        Incremental materialization.
+        
+        - First build, full refresh or changed definition: build the whole table
+        - Otherwise stage rows past the stored watermark, then:
+            partition_by -> delete + recompute the partitions touched by new rows
+            unique_key   -> upsert (delete matching keys, insert staged rows)
+            neither      -> append staged rows
+        
+        Returns (rows_affected, new_watermark, output_changed)
+        """
+        target = self.qualified_name
+        staging = f"{target}__staging"
+        watermark_col = self.config.watermark_column or self.config.partition_by
+        
+        state_store = context.get("run_state")
+        previous = state_store.get(self.name) if state_store else None
+        first_build = (
+            context.get("full_refresh")
+            or previous is None
+            or previous.fingerprint != self.fingerprint()
+        )
+        
+        if first_build:
+            await connector.execute(f"DROP TABLE IF EXISTS {target}")
+            result = await connector.execute(f"CREATE TABLE {target} AS {select_sql}")
+            rows_affected = _row_count(result)
+            output_changed = True
+        else:
+            if watermark_col and previous.watermark is not None:
+                # Partition watermark is inclusive: the latest partition may still receive late rows
+                op = ">" if self.config.watermark_column else ">="
+                new_rows_sql = (
+                    f"SELECT * FROM ({select_sql}) AS src "
+                    f"WHERE src.{watermark_col} {op} {_sql_literal(previous.watermark)}"
+                )
+            else:
+                new_rows_sql = select_sql
+            
+            await connector.execute(f"DROP TABLE IF EXISTS {staging}")
+            await connector.execute(f"CREATE TABLE {staging} AS {new_rows_sql}")
+            try:
+                if self.config.partition_by:
+                    part = self.config.partition_by
+                    touched = f"(SELECT DISTINCT {part} FROM {staging})"
+                    await connector.execute(f"DELETE FROM {target} WHERE {part} IN {touched}")
+                    result = await connector.execute(
+                        f"INSERT INTO {target} SELECT * FROM ({select_sql}) AS src WHERE src.{part} IN {touched}"
+                    )
+                elif self.config.unique_key:
+                    keys = ", ".join(k.strip() for k in self.config.unique_key.split(","))
+                    await connector.execute(
+                        f"DELETE FROM {target} WHERE ({keys}) IN (SELECT {keys} FROM {staging})"
+                    )
+                    result = await connector.execute(f"INSERT INTO {target} SELECT * FROM {staging}")
+                else:
+                    result = await connector.execute(f"INSERT INTO {target} SELECT * FROM {staging}")
+            finally:
+                await connector.execute(f"DROP TABLE IF EXISTS {staging}")
+            rows_affected = _row_count(result)
+            output_changed = rows_affected > 0
+        
+        watermark = previous.watermark if previous and not first_build else None
+        if watermark_col:
+            max_result = await connector.execute(f"SELECT MAX({watermark_col}) AS watermark FROM {target}")
+            value = _first_value(max_result)
+            if value is not None:
+                watermark = str(value)
+        
+        logger.info(
+            f"Incremental model '{self.name}': {'full build' if first_build else 'merge'}, "
+            f"rows={rows_affected}, watermark={watermark}"
+        )
+        return rows_affected, watermark, output_changed
+
+
+def _sql_literal(value: Any) -> str:
+    """Quote a watermark value as a SQL string literal (cast implicitly by the engine)"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _row_count(result: Any) -> int:
+    return int(getattr(result, "row_count", 0) or 0)
+
+
+def _first_value(result: Any) -> Any:
+    """First column of the first row of a connector result"""
+    rows = getattr(result, "rows", None)
+    if not rows:
+        return None
+    row = rows[0]
+    if isinstance(row, dict):
+        return next(iter(row.values()), None)
+    if isinstance(row, (list, tuple)):
+        return row[0] if row else None
+    return row
+
+
 class PythonModel(Model):
     """
     Python-based transformation model.
@@ -200,8 +348,20 @@ class PythonModel(Model):
     def get_sql(self) -> None:
         return None
     
+    def _definition(self) -> str:
+        try:
+            return inspect.getsource(self.transform_fn)
+        except (OSError, TypeError):
+            return getattr(self.transform_fn, "__qualname__", repr(self.transform_fn))
+    
     async def run(self, context: Dict[str, Any]) -> ModelResult:
-        """Execute the Python transformation"""
+        """
+        Execute the Python transformation.
+        
+        When context['offload_python'] is set (parallel runs), the transform
+        runs in a worker thread so independent models overlap (pandas/numpy
+        release the GIL for most heavy operations).
+        """
         import time
         start_time = time.time()
         
@@ -216,7 +376,10 @@ class PythonModel(Model):
             context['ref'] = ref
             
             # Execute transformation
-            result_df = self.transform_fn(context)
+            if context.get('offload_python'):
+                result_df = await asyncio.to_thread(self.transform_fn, context)
+            else:
+                result_df = self.transform_fn(context)
             
             # Persist result based on materialization
             connector = context.get('connector')
@@ -7,8 +7,10 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import logging
 import asyncio
+import os
 
 from .models import Model, ModelResult
+from .state import RunStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,7 @@ class RunResult:
     results: List[ModelResult]
     total_time_ms: float
     run_at: datetime = field(default_factory=datetime.utcnow)
+    skipped_models: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -30,6 +33,7 @@ class RunResult:
             "total_models": self.total_models,
             "successful": self.successful_models,
             "failed": self.failed_models,
+            "skipped": self.skipped_models,
             "total_time_ms": self.total_time_ms,
             "run_at": self.run_at.isoformat(),
             "results": [r.to_dict() for r in self.results],
@@ -42,20 +46,24 @@ class TransformRunner:
     
     Features:
     - Dependency resolution (topological sort)
-    - Parallel execution where possible
+    - Level-parallel execution of independent models (concurrency-capped)
+    - Incremental materialization with persisted watermarks
+    - Skipping persisted models whose definition and upstream outputs are unchanged
     - Error handling and retry
     
     Usage:
-        runner = TransformRunner()
+        runner = TransformRunner(state_store=FileRunStateStore("data/transform_state.json"))
         runner.add_model(revenue_model)
         runner.add_model(expenses_model)
         runner.add_model(profit_model)  # depends on revenue and expenses
         
-        result = await runner.run(context)
+        result = await runner.run(context, parallel=True)
     """
     
-    def __init__(self):
+    def __init__(self, state_store: Optional[RunStateStore] = None, max_concurrency: Optional[int] = None):
         self.models: Dict[str, Model] = {}
+        self.state_store = state_store
+        self.max_concurrency = max_concurrency or os.cpu_count() or 4
     
     def add_model(self, model: Model) -> "TransformRunner":
         """Add a model to the runner (chainable)"""
@@ -105,11 +113,35 @@ class TransformRunner:
         
         return result
     
+    def _execution_levels(self, names: List[str]) -> List[List[str]]:
+        """
+        Group models into levels; every model only depends on models in
+        earlier levels, so models within a level can run concurrently.
+        
+        Args:
+            names: Model names in topological order
+        """
+        selected = set(names)
+        level_of: Dict[str, int] = {}
+        levels: List[List[str]] = []
+        
+        for name in names:
+            deps = [d for d in self.models[name].config.depends_on if d in selected]
+            level = max((level_of[d] + 1 for d in deps), default=0)
+            level_of[name] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(name)
+        
+        return levels
+    
     async def run(
         self, 
         context: Dict[str, Any],
         models: List[str] = None,
         parallel: bool = False,
+        max_concurrency: Optional[int] = None,
+        full_refresh: bool = False,
     ) -> RunResult:
         """
         Run transformation models.
@@ -118,6 +150,8 @@ class TransformRunner:
             context: Execution context (connectors, dataframes, etc.)
             models: Specific models to run (None = all)
             parallel: Run independent models in parallel
+            max_concurrency: Cap on concurrently running models (default: runner setting)
+            full_refresh: Rebuild incremental models from scratch and skip nothing
         """
         import time
         start_time = time.time()
@@ -146,32 +180,73 @@ class TransformRunner:
                     to_run.update(self.models[name].config.depends_on)
             execution_order = [m for m in execution_order if m in to_run]
         
-        results: List[ModelResult] = []
+        if self.state_store is not None:
+            context["run_state"] = self.state_store
+        context["full_refresh"] = full_refresh
+        context["offload_python"] = parallel
+        
+        results_by_name: Dict[str, ModelResult] = {}
         failed_models = set()
+        concurrency = (max_concurrency or self.max_concurrency) if parallel else 1
+        semaphore = asyncio.Semaphore(concurrency)
         
-        for model_name in execution_order:
+        async def execute(model_name: str) -> ModelResult:
             model = self.models[model_name]
             
             # Skip if any dependency failed
             if any(dep in failed_models for dep in model.config.depends_on):
-                results.append(ModelResult(
+                return ModelResult(
                     name=model_name,
                     success=False,
                     rows_affected=0,
                     execution_time_ms=0,
                     error="Dependency failed",
-                ))
-                failed_models.add(model_name)
-                continue
+                )
             
-            logger.info(f"Running model: {model_name}")
-            result = await model.run(context)
-            results.append(result)
+            upstream_versions = self._upstream_versions(model)
+            if not full_refresh and self._can_skip(model, upstream_versions):
+                logger.info(f"Skipping model (unchanged): {model_name}")
+                return ModelResult(
+                    name=model_name,
+                    success=True,
+                    rows_affected=0,
+                    execution_time_ms=0,
+                    skipped=True,
+                )
             
-            if not result.success:
-                failed_models.add(model_name)
-                logger.error(f"Model {model_name} failed: {result.error}")
+            async with semaphore:
+                logger.info(f"Running model: {model_name}")
+                result = await model.run(context)
+            
+            if self.state_store is not None:
+                self.state_store.record(
+                    name=model_name,
+                    fingerprint=model.fingerprint(),
+                    success=result.success,
+                    rows_affected=result.rows_affected,
+                    watermark=result.watermark,
+                    upstream_versions=upstream_versions,
+                    output_changed=result.output_changed,
+                )
+            return result
+        
+        for level in self._execution_levels(execution_order):
+            if parallel and len(level) > 1:
+                level_results = await asyncio.gather(*(execute(name) for name in level))
+            else:
+                level_results = [await execute(name) for name in level]
+            
+            for model_name, result in zip(level, level_results):
+                results_by_name[model_name] = result
+                if not result.success:
+                    failed_models.add(model_name)
+                    if result.error != "Dependency failed":
+                        logger.error(f"Model {model_name} failed: {result.error}")
+        
+        if self.state_store is not None:
+            self.state_store.save()
         
+        results = [results_by_name[name] for name in execution_order]
         total_time = (time.time() - start_time) * 1000
         successful = sum(1 for r in results if r.success)
         
@@ -182,8 +257,37 @@ class TransformRunner:
             failed_models=len(failed_models),
             results=results,
             total_time_ms=total_time,
+            skipped_models=sum(1 for r in results if r.skipped),
         )
     
+    def _upstream_versions(self, model: Model) -> Dict[str, int]:
+        """Current output versions of a model's upstream models"""
+        if self.state_store is None:
+            return {}
+        versions = {}
+        for dep in model.config.depends_on:
+            state = self.state_store.get(dep)
+            versions[dep] = state.output_version if state else 0
+        return versions
+    
+    def _can_skip(self, model: Model, upstream_versions: Dict[str, int]) -> bool:
+        """
+        A persisted model can be skipped when its definition is unchanged,
+        its last run succeeded, and none of its upstream models produced new
+        output since. Models reading raw sources (no model dependencies) always run.
+        """
+        if self.state_store is None or not model.is_persisted:
+            return False
+        if not model.config.depends_on or any(dep not in self.models for dep in model.config.depends_on):
+            return False
+        
+        state = self.state_store.get(model.name)
+        if state is None or not state.last_success:
+            return False
+        if state.fingerprint != model.fingerprint():
+            return False
+        return state.upstream_versions == upstream_versions
+    
     async def run_model(self, name: str, context: Dict[str, Any]) -> ModelResult:
         """Run a single model"""
         model = self.models.get(name)
@@ -0,0 +1,122 @@
+"""
+Transform Run State
+Persists per-model run state (fingerprint, watermark, output version)
+so incremental models only process new data and models whose inputs
+did not change can be skipped.
+"""
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelState:
+    """Last known state of a model"""
+    name: str
+    fingerprint: Optional[str] = None       # Hash of model definition
+    watermark: Optional[str] = None         # Max watermark value materialized
+    output_version: int = 0                 # Bumped whenever the model output changes
+    upstream_versions: Dict[str, int] = field(default_factory=dict)  # Upstream output versions consumed
+    last_success: bool = False
+    last_run_at: Optional[str] = None
+    rows_affected: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelState":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+class RunStateStore:
+    """
+    In-memory run state store.
+    Subclasses persist state between runs (see FileRunStateStore).
+    """
+
+    def __init__(self):
+        self._states: Dict[str, ModelState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[ModelState]:
+        with self._lock:
+            return self._states.get(name)
+
+    def put(self, state: ModelState) -> None:
+        with self._lock:
+            self._states[state.name] = state
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Forget state for one model (or all), forcing a full rebuild"""
+        with self._lock:
+            if name is None:
+                self._states.clear()
+            else:
+                self._states.pop(name, None)
+        self.save()
+
+    def save(self) -> None:
+        """Persist state (no-op for in-memory store)"""
+
+    def record(
+        self,
+        name: str,
+        fingerprint: str,
+        success: bool,
+        rows_affected: int,
+        watermark: Optional[str],
+        upstream_versions: Dict[str, int],
+        output_changed: bool,
+    ) -> ModelState:
+        """Record the outcome of a model run"""
+        previous = self.get(name) or ModelState(name=name)
+        state = ModelState(
+            name=name,
+            fingerprint=fingerprint if success else previous.fingerprint,
+            watermark=watermark if watermark is not None else previous.watermark,
+            output_version=previous.output_version + (1 if success and output_changed else 0),
+            upstream_versions=upstream_versions if success else previous.upstream_versions,
+            last_success=success,
+            last_run_at=datetime.utcnow().isoformat(),
+            rows_affected=rows_affected,
+        )
+        self.put(state)
+        return state
+
+
+class FileRunStateStore(RunStateStore):
+    """Run state persisted to a JSON file (written atomically)"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = Path(path)
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for name, state in data.get("models", {}).items():
+                self._states[name] = ModelState.from_dict(state)
+        except Exception as e:
+            logger.warning(f"Could not load transform run state from {self.path}: {e}")
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {
+                "updated_at": datetime.utcnow().isoformat(),
+                "models": {name: s.to_dict() for name, s in self._states.items()},
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+        os.replace(tmp_path, self.path)
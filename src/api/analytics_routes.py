@@ -5,6 +5,7 @@ New unified analytics API replacing the old analyze module.
 
 Endpoints:
 - POST /v1/analytics/chat - Chat with AI assistant
+- POST /v1/analytics/chat/stream - Chat with AI assistant (server-sent events)
 - GET  /v1/analytics/sessions - List conversation sessions
 - GET  /v1/analytics/sessions/{id} - Get session history
 - DELETE /v1/analytics/sessions/{id} - Delete session
@@ -30,6 +31,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Query, File, UploadFile, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -95,6 +97,37 @@ async def chat_with_assistant(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_with_assistant_stream(request: ChatRequest):
+    """
+    Streaming chat with the analytics AI assistant (text/event-stream).
+
+    Events: reasoning, delta, tool_call, tool_result, and a final `done`
+    carrying the same payload as POST /chat.
+    """
+    from src.analytics.assistant import get_agent
+    from src.llm.streaming import format_sse
+
+    agent = get_agent()
+
+    async def events():
+        try:
+            async for event, data in agent.chat_stream(
+                message=request.message,
+                session_id=request.session_id
+            ):
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/sessions")
 async def list_sessions(limit: int = Query(20, ge=1, le=100)):
     """List recent conversation sessions"""
@@ -10,7 +10,8 @@ import os
 import jwt
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jwt import PyJWKClient
+
+from src.api.token_verifier import JWKSCache, TokenVerifier, http_jwks_fetcher
 
 logger = logging.getLogger("erpx.auth")
 
@@ -69,47 +70,24 @@ class AnonymousUser(User):
         self.raw_token = {}
 
 
-# Cache JWKS client
-_jwks_client = None
+# Cached JWKS + verified-claims cache (see src/api/token_verifier.py)
+_token_verifier: TokenVerifier | None = None
 
 
-def get_jwks_client():
-    global _jwks_client
-    if _jwks_client is None:
-        try:
-            _jwks_client = PyJWKClient(JWKS_URL, cache_keys=True)
-        except Exception as e:
-            logger.warning(f"Failed to create JWKS client: {e}")
-    return _jwks_client
+def get_token_verifier() -> TokenVerifier:
+    global _token_verifier
+    if _token_verifier is None:
+        _token_verifier = TokenVerifier(
+            JWKSCache(http_jwks_fetcher(JWKS_URL)),
+            issuer=f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}",
+        )
+    return _token_verifier
 
 
 async def verify_token(token: str) -> dict:
     """Verify JWT token with Keycloak"""
     try:
-        jwks_client = get_jwks_client()
-        if jwks_client is None:
-            raise ValueError("JWKS client not available")
-
-        # Get signing key
-        signing_key = jwks_client.get_signing_key_from_jwt(token)
-
-        # Decode and verify
-        options = {
-            "verify_signature": True,
-            "verify_exp": True,
-            "verify_aud": False,  # Keycloak doesn't always set aud
-            "verify_iss": True,
-        }
-
-        decoded = jwt.decode(
-            token,
-            signing_key.key,
-            algorithms=["RS256"],
-            issuer=f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}",
-            options=options,
-        )
-
-        return decoded
+        return await get_token_verifier().verify(token)
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Phiên đăng nhập đã hết hạn. Vui lòng đăng nhập lại.")
@@ -4,6 +4,8 @@ ERPX AI Accounting - Document Routes (UI-Facing)
 Provides document-centric API endpoints for the UI.
 """
 
+import asyncio
+import json
 import logging
 import os
 import sys
@@ -11,10 +13,11 @@ import uuid
 from datetime import datetime
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Header, Query, BackgroundTasks, Depends, Request
 from pydantic import BaseModel
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse
 from src.api.auth import get_current_user, get_optional_user, User
+from src.api.pagination import count_cache, keyset_condition, paginate
 
 sys.path.insert(0, "/root/erp-ai")
 
@@ -88,6 +91,53 @@ def format_document(row: dict) -> dict:
     }
 
 
+def _json_field(value):
+    """Decode a jsonb column (asyncpg returns JSON text) to its Python value"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def format_document_summary(row: dict) -> dict:
+    """
+    Format a document row for list views.
+
+    Expects the slim list projection: no raw_text / full extracted_data, only
+    the extracted fields the list shows (x_* columns). Full OCR text, OCR
+    boxes and extracted fields come from GET /documents/{id}. invoice_date and
+    tax_amount are selected as jsonb (->) so they keep the JSON types that
+    format_document returns.
+    """
+    total_amount = row.get("ei_total_amount") or row.get("x_total_amount")
+    try:
+        total_amount = float(total_amount) if total_amount else None
+    except (TypeError, ValueError):
+        total_amount = None
+
+    return {
+        "id": str(row.get("id")),
+        "filename": row.get("filename"),
+        "content_type": row.get("content_type"),
+        "file_size": row.get("file_size"),
+        "status": row.get("status", "pending"),
+        "type": row.get("doc_type") or "other",
+        "document_type": row.get("doc_type") or "other",
+        "created_at": row.get("created_at").isoformat() if row.get("created_at") else None,
+        "updated_at": row.get("updated_at").isoformat() if row.get("updated_at") else None,
+        "invoice_no": row.get("ei_invoice_number") or row.get("x_invoice_no"),
+        "invoice_date": _json_field(row.get("x_invoice_date")),
+        "vendor_name": row.get("ei_vendor_name") or row.get("x_vendor_name"),
+        "vendor_tax_id": row.get("x_vendor_tax_id"),
+        "total_amount": total_amount,
+        "tax_amount": _json_field(row.get("x_tax_amount")),
+        "currency": row.get("x_currency") or "VND",
+        "file_url": f"/v1/files/{row.get('minio_bucket')}/{row.get('minio_key')}" if row.get("minio_key") else None,
+    }
+
+
 def format_proposal(row: dict) -> dict:
     """Format a proposal row for API response"""
     entries_raw = row.get("entries") or []
@@ -134,9 +184,16 @@ async def list_documents(
     status: Optional[str] = Query(None, description="Filter by status"),
     doc_type: Optional[str] = Query(None, alias="type", description="Filter by document type"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ) -> dict:
-    """List all documents with optional status and type filter."""
+    """
+    List documents with optional status and type filter.
+
+    Pages are keyset-paginated on (created_at, id): pass `next_cursor` back as
+    `cursor`. `total` is cached (or a planner estimate on very large tables,
+    flagged by `total_is_estimate`).
+    """
     pool = await get_db_pool()
     if not pool:
         raise HTTPException(status_code=503, detail="Database unavailable")
@@ -144,57 +201,97 @@ async def list_documents(
     async with pool.acquire() as conn:
         conditions = []
         params = []
-        param_idx = 1
 
         if status:
-            conditions.append(f"d.status = ${param_idx}")
             params.append(status)
-            param_idx += 1
-        
+            conditions.append(f"d.status = ${len(params)}")
+
         if doc_type:
-            conditions.append(f"d.doc_type = ${param_idx}")
             params.append(doc_type)
-            param_idx += 1
+            conditions.append(f"d.doc_type = ${len(params)}")
+
+        filter_where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        filter_params = list(params)
+
+        keyset, keyset_params = keyset_condition(cursor, "d.created_at", "d.id", len(params) + 1)
+        if keyset:
+            conditions.append(keyset)
+            params.extend(keyset_params)
 
         where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
-        
+
+        params.append(limit + 1)
+        page_clause = f"LIMIT ${len(params)}"
+        if not cursor and offset:
+            params.append(offset)
+            page_clause += f" OFFSET ${len(params)}"
+
+        # Slim projection: the heavy raw_text / extracted_data stay in the table
         query = f"""
             SELECT d.id, d.filename, d.content_type, d.file_size, d.status, d.doc_type,
-                   d.extracted_data, d.minio_bucket, d.minio_key, d.raw_text,
-                   d.created_at, d.updated_at,
+                   d.minio_bucket, d.minio_key, d.created_at, d.updated_at,
+                   d.extracted_data->'invoice_date' AS x_invoice_date,
+                   COALESCE(d.extracted_data->>'invoice_no', d.extracted_data->>'invoice_number') AS x_invoice_no,
+                   COALESCE(d.extracted_data->>'vendor_name', d.extracted_data->>'seller_name') AS x_vendor_name,
+                   COALESCE(d.extracted_data->>'vendor_tax_id', d.extracted_data->>'seller_tax_code') AS x_vendor_tax_id,
+                   d.extracted_data->>'total_amount' AS x_total_amount,
+                   d.extracted_data->'tax_amount' AS x_tax_amount,
+                   d.extracted_data->>'currency' AS x_currency,
                    ei.vendor_name as ei_vendor_name,
                    ei.total_amount as ei_total_amount,
                    ei.invoice_number as ei_invoice_number
             FROM documents d
             LEFT JOIN extracted_invoices ei ON d.id = ei.document_id
             {where_clause}
-            ORDER BY d.created_at DESC
-            LIMIT ${param_idx} OFFSET ${param_idx + 1}
+            ORDER BY d.created_at DESC, d.id DESC
+            {page_clause}
         """
-        
-        # Add limit and offset to params
-        params.append(limit)
-        params.append(offset)
 
         rows = await conn.fetch(query, *params)
-        
-        # Get count
-        count_query = f"SELECT COUNT(*) as total FROM documents d {where_clause}"
-        # For count we only need the filter params, not limit/offset
-        count_params = params[:-2] 
-        count_row = await conn.fetchrow(count_query, *count_params)
+        rows, next_cursor = paginate(rows, limit)
 
-        documents = [format_document(dict(row)) for row in rows]
-        total = count_row["total"] if count_row else 0
+        total, total_is_estimate = await count_cache.count(conn, "documents", filter_where, filter_params, alias="d")
 
         return {
-            "documents": documents,
+            "documents": [format_document_summary(dict(row)) for row in rows],
             "total": total,
+            "total_is_estimate": total_is_estimate,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
         }
 
 
+@router.get("/search")
+async def search_documents(
+    q: str = Query(..., min_length=1, description="Vendor, invoice number, tax ID or OCR text"),
+    doc_type: Optional[str] = Query(None, alias="type", description="Filter by document type"),
+    limit: int = Query(20, ge=1, le=100),
+    x_tenant_id: Optional[str] = Header(None, alias="X-Tenant-ID"),
+) -> dict:
+    """
+    Ranked fuzzy document search, scoped to the X-Tenant-ID tenant when sent.
+
+    Accent-insensitive and typo tolerant ("cong ty dien luc" finds
+    "Công ty Điện lực"); results are ordered by relevance `score`.
+    """
+    from src.datazones import resolve_tenant_id
+    from src.search import get_document_search
+
+    pool = await get_db_pool()
+    if not pool:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    async with pool.acquire() as conn:
+        tenant_uuid = await resolve_tenant_id(conn, x_tenant_id) if x_tenant_id else None
+        results = await get_document_search().search(
+            conn, q, doc_type=doc_type, limit=limit, tenant_id=tenant_uuid
+        )
+
+    return {"query": q, "results": results, "count": len(results)}
+
+
 @router.get("/{document_id}")
 async def get_document(document_id: str) -> dict:
     """Get a single document by ID."""
@@ -261,9 +358,9 @@ async def process_extraction_task(document_id: str):
                 return
 
             # Download from MinIO using wrapper
-            from src.storage import download_document
+            from src.storage import get_object_store
             try:
-                data = download_document(doc["minio_bucket"], doc["minio_key"])
+                data = await get_object_store().download(doc["minio_bucket"], doc["minio_key"])
             except Exception as e:
                 logger.error(f"Failed to download from MinIO: {e}")
                 await conn.execute("UPDATE documents SET status = 'failed', updated_at = NOW() WHERE id = $1", document_id)
@@ -966,6 +1063,7 @@ async def delete_document(
 
 @router.get("/{document_id}/preview", tags=["Documents"])
 async def preview_document(
+    request: Request,
     document_id: str,
     preview: bool = Query(True, description="Render XLSX as HTML if true"),
     user: User | None = Depends(get_optional_user)
@@ -1001,7 +1099,8 @@ async def preview_document(
         # but for a unified API, we better just call the logic.
         
         # Let's import the helper we just made
-        from src.storage import stream_document, download_document
+        from src.storage import ObjectNotFound, get_object_store, serve_object
+        store = get_object_store()
         bucket = doc["minio_bucket"]
         key = doc["minio_key"]
 
@@ -1011,8 +1110,8 @@ async def preview_document(
                 import pandas as pd
                 import io
                 
-                data = download_document(bucket, key)
-                df = pd.read_excel(io.BytesIO(data))
+                data = await store.download(bucket, key)
+                df = await asyncio.to_thread(pd.read_excel, io.BytesIO(data))
                 
                 html_table = df.to_html(
                     classes="min-w-full divide-y divide-gray-200", 
@@ -1052,27 +1151,11 @@ async def preview_document(
                 logger.error(f"XLSX preview error: {e}")
                 # Fallback to standard stream
 
-        # Standard Streaming
+        # Standard streaming (Range / ETag aware, off the event loop)
         try:
-            response_obj, content_type, size = stream_document(bucket, key)
-            
-            headers = {
-                "Content-Type": content_type,
-                "Cache-Control": "private, max-age=3600",
-                "Content-Disposition": f"inline; filename=\"{os.path.basename(key)}\""
-            }
-            if size:
-                headers["Content-Length"] = str(size)
-
-            def iterfile():
-                try:
-                    for chunk in response_obj.stream(32*1024):
-                        yield chunk
-                finally:
-                    response_obj.close()
-                    response_obj.release_conn()
-
-            return StreamingResponse(iterfile(), media_type=content_type, headers=headers)
+            return await serve_object(store, bucket, key, request)
+        except ObjectNotFound as e:
+             raise HTTPException(status_code=404, detail=f"Không tìm thấy tập tin: {str(e)}")
         except Exception as e:
              raise HTTPException(status_code=404, detail=f"Lỗi khi tải tập tin: {str(e)}")
 
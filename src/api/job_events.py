@@ -0,0 +1,311 @@
+"""
+Job Event Stream
+================
+Push-based job progress instead of polling /v1/jobs/{job_id}.
+
+update_job_state / create_job_state append to job_events and NOTIFY
+erpx_job_events. Each API worker holds a single LISTEN connection and fans
+notifications out to in-process subscribers (SSE / WebSocket), filtered by
+job or tenant. Clients resume with the last event id they saw; anything
+missed (reconnects, slow consumers) is replayed from job_events. Ids can
+commit out of order, so streams drop repeats by id rather than by "id <= last".
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, dataclass
+
+from src.datazones import JOB_EVENTS_CHANNEL
+
+logger = logging.getLogger("erpx.api.job_events")
+
+JOB_EVENT_QUEUE_SIZE = int(os.getenv("JOB_EVENT_QUEUE_SIZE", "256"))
+JOB_EVENT_HEARTBEAT_SECONDS = float(os.getenv("JOB_EVENT_HEARTBEAT_SECONDS", "15"))
+JOB_EVENT_REPLAY_LIMIT = 500
+# job_events ids are allocated before commit, so they can become visible out
+# of order: a resync re-reads this many ids below the highest one delivered,
+# and streams remember this many delivered ids to drop repeats.
+JOB_EVENT_REPLAY_OVERLAP = int(os.getenv("JOB_EVENT_REPLAY_OVERLAP", "200"))
+JOB_EVENT_DEDUP_WINDOW = 4 * JOB_EVENT_REPLAY_LIMIT
+
+# job_processing_state.current_state -> API job status (as in GET /v1/jobs/{job_id})
+JOB_STATUS_BY_STATE = {
+    "uploaded": "queued",
+    "extracting": "processing",
+    "extracted": "processing",
+    "proposing": "processing",
+    "proposed": "processing",
+    "approving": "processing",
+    "waiting_for_approval": "waiting_for_approval",
+    "posting": "processing",
+    "completed": "completed",
+    "failed": "failed",
+}
+
+TERMINAL_STATES = {"completed", "failed"}
+
+
+@dataclass
+class JobEvent:
+    id: int
+    job_id: str
+    state: str
+    tenant_id: str | None = None
+    previous_state: str | None = None
+    error: str | None = None
+    at: str | None = None
+
+    @property
+    def status(self) -> str:
+        return JOB_STATUS_BY_STATE.get(self.state, self.state)
+
+    @property
+    def terminal(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "JobEvent":
+        return cls(
+            id=int(payload["id"]),
+            job_id=payload["job_id"],
+            state=payload["state"],
+            tenant_id=str(payload["tenant_id"]) if payload.get("tenant_id") else None,
+            previous_state=payload.get("previous_state"),
+            error=payload.get("error"),
+            at=str(payload["at"]) if payload.get("at") else None,
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "JobEvent":
+        return cls(
+            id=row["id"],
+            job_id=row["job_id"],
+            state=row["state"],
+            tenant_id=str(row["tenant_id"]) if row["tenant_id"] else None,
+            previous_state=row["previous_state"],
+            error=row["error"],
+            at=row["created_at"].isoformat() if row["created_at"] else None,
+        )
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "status": self.status}
+
+
+def format_job_event_sse(event: JobEvent) -> str:
+    """SSE frame with the event id, so EventSource sends Last-Event-ID on reconnect."""
+    return f"id: {event.id}\nevent: job\ndata: {json.dumps(event.to_dict(), ensure_ascii=False)}\n\n"
+
+
+SSE_HEARTBEAT = ": ping\n\n"
+
+
+class JobEventSubscription:
+    """Bounded queue of events for one stream; overflow forces a DB resync."""
+
+    def __init__(self, job_id: str | None, tenant_id: str | None, queue_size: int):
+        self.job_id = job_id
+        self.tenant_id = tenant_id
+        self.queue: asyncio.Queue[JobEvent] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, event: JobEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class JobEventHub:
+    """
+    Per-process fan-out of job events to subscribers keyed by job and tenant.
+
+    Usage:
+        hub = get_job_event_hub()
+        await hub.attach_listener(listen_conn)   # one LISTEN per worker
+        async for event in stream_job_events(hub, fetch, job_id=...): ...
+    """
+
+    def __init__(self, queue_size: int = JOB_EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._by_job: dict[str, set[JobEventSubscription]] = {}
+        self._by_tenant: dict[str, set[JobEventSubscription]] = {}
+        self._listener_conn = None
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._by_job.values()) + sum(len(s) for s in self._by_tenant.values())
+
+    def subscribe(self, job_id: str | None = None, tenant_id: str | None = None) -> JobEventSubscription:
+        if not job_id and not tenant_id:
+            raise ValueError("job_id or tenant_id is required")
+        sub = JobEventSubscription(job_id, tenant_id, self.queue_size)
+        if job_id:
+            self._by_job.setdefault(job_id, set()).add(sub)
+        else:
+            self._by_tenant.setdefault(tenant_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: JobEventSubscription) -> None:
+        index, key = (self._by_job, sub.job_id) if sub.job_id else (self._by_tenant, sub.tenant_id)
+        subs = index.get(key)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del index[key]
+
+    def publish(self, event: JobEvent) -> None:
+        self.published += 1
+        for sub in self._by_job.get(event.job_id, ()):
+            sub.offer(event)
+        if event.tenant_id:
+            for sub in self._by_tenant.get(event.tenant_id, ()):
+                sub.offer(event)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            event = JobEvent.from_payload(json.loads(payload))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed job event notification: {e}")
+            return
+        self.publish(event)
+
+    async def attach_listener(self, conn):
+        """LISTEN for job events on a dedicated connection."""
+        await conn.add_listener(JOB_EVENTS_CHANNEL, self._on_notify)
+        self._listener_conn = conn
+        logger.info("Job event hub listening for changes")
+
+    async def detach_listener(self):
+        if self._listener_conn is not None:
+            try:
+                await self._listener_conn.remove_listener(JOB_EVENTS_CHANNEL, self._on_notify)
+            except Exception as e:
+                logger.warning(f"Failed to remove job event listener: {e}")
+            self._listener_conn = None
+
+
+class RecentIds:
+    """Bounded set of the most recently added event ids."""
+
+    def __init__(self, size: int = JOB_EVENT_DEDUP_WINDOW):
+        self.size = size
+        self._ids: dict[int, None] = {}  # insertion-ordered, oldest first
+
+    def add(self, event_id: int) -> bool:
+        """Record `event_id`; False if it was already seen."""
+        if event_id in self._ids:
+            return False
+        self._ids[event_id] = None
+        if len(self._ids) > self.size:
+            del self._ids[next(iter(self._ids))]
+        return True
+
+
+async def fetch_job_events(
+    conn,
+    job_id: str | None = None,
+    tenant_id: str | None = None,
+    after_id: int = 0,
+    limit: int = JOB_EVENT_REPLAY_LIMIT,
+) -> list[JobEvent]:
+    """Read persisted events after `after_id` for a job or tenant (oldest first)."""
+    column, value = ("job_id", job_id) if job_id else ("tenant_id::text", tenant_id)
+    rows = await conn.fetch(
+        f"""
+        SELECT id, job_id, tenant_id, state, previous_state, error, created_at
+        FROM job_events
+        WHERE {column} = $1 AND id > $2
+        ORDER BY id
+        LIMIT $3
+        """,
+        value,
+        after_id,
+        limit,
+    )
+    return [JobEvent.from_row(r) for r in rows]
+
+
+async def stream_job_events(
+    hub: JobEventHub,
+    fetch: Callable[[int], Awaitable[list[JobEvent]]],
+    job_id: str | None = None,
+    tenant_id: str | None = None,
+    last_event_id: int | None = None,
+    heartbeat: float = JOB_EVENT_HEARTBEAT_SECONDS,
+) -> AsyncIterator[JobEvent | None]:
+    """
+    Yield events for a job or tenant: persisted history first (a job's full
+    history, or everything after `last_event_id`), then live notifications.
+    Yields None every `heartbeat` seconds without events. A job stream ends
+    after its terminal event.
+
+    `fetch(after_id)` reads persisted events for the same job/tenant.
+    """
+    sub = hub.subscribe(job_id, tenant_id)  # before replay, so nothing falls in between
+    seen = RecentIds()
+    floor = last_event_id or 0  # the client already has everything up to here
+    high = floor  # highest id delivered
+
+    async def replay(overlap: int = 0):
+        nonlocal high
+        after_id = max(floor, high - overlap)
+        while True:
+            events = await fetch(after_id)
+            for event in events:
+                after_id = event.id
+                if seen.add(event.id):
+                    high = max(high, event.id)
+                    yield event
+            if len(events) < JOB_EVENT_REPLAY_LIMIT:
+                return
+
+    try:
+        if last_event_id is not None or job_id:
+            async for event in replay():
+                yield event
+                if job_id and event.terminal:
+                    return
+
+        while True:
+            if sub.overflowed:
+                # Consumer fell behind: drop the queue and catch up from the
+                # table, re-reading a window below `high` for late commits
+                sub.overflowed = False
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                async for event in replay(JOB_EVENT_REPLAY_OVERLAP):
+                    yield event
+                    if job_id and event.terminal:
+                        return
+                continue
+
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            # Notified after we subscribed, so new to this client unless replayed
+            # here; a lower id than `high` is a late commit, not a repeat
+            if not seen.add(event.id):
+                continue
+            high = max(high, event.id)
+            yield event
+            if job_id and event.terminal:
+                return
+    finally:
+        hub.unsubscribe(sub)
+
+
+_hub: JobEventHub | None = None
+
+
+def get_job_event_hub() -> JobEventHub:
+    """Get the process-wide job event hub."""
+    global _hub
+    if _hub is None:
+        _hub = JobEventHub()
+    return _hub
@@ -6,6 +6,7 @@ Main API service with all endpoints.
 Endpoints:
     POST /v1/upload - Upload document (PDF/Image/Excel)
     GET /v1/jobs/{job_id} - Get job status and result
+    GET /v1/jobs/{job_id}/events - Job progress stream (SSE)
     POST /v1/approve/{job_id} - Approve journal proposal
     GET /health - Health check
     GET /ready - Readiness check
@@ -18,13 +19,13 @@ import logging
 import os
 import sys
 import uuid
-from contextlib import asynccontextmanager
-from datetime import datetime
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 import uvicorn
-from fastapi import BackgroundTasks, FastAPI, File, Header, HTTPException, Query, UploadFile, Depends
+from fastapi import BackgroundTasks, FastAPI, File, Header, HTTPException, Query, Request, UploadFile, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse, HTMLResponse
 from pydantic import BaseModel, Field
@@ -37,7 +38,7 @@ from core.constants import API_VERSION
 
 # Import config and storage for health check
 # Import middleware and logging config
-from src.api.auth import get_current_user, get_optional_user, User
+from src.api.auth import AUTH_ENABLED, get_current_user, get_optional_user, get_token_verifier, User
 from src.api.document_routes import get_db_pool
 from src.api.document_routes import router as document_router
 # PR #34 New Routers
@@ -47,9 +48,20 @@ from api.reconciliation_routes import router as reconciliation_router
 from api.approval_routes import router as pr34_approval_router
 from api.agent_routes import router as agent_router
 from api.analyze_routes import router as analyze_router
+from api.middleware import ResourceMonitorMiddleware
+from api.resources import get_resource_sampler
 from src.api.logging_config import RequestIdFilter, SafeFormatter, setup_logging
 from src.api.analytics_routes import router as analytics_router
+from src.api.job_events import (
+    JOB_STATUS_BY_STATE,
+    SSE_HEARTBEAT,
+    fetch_job_events,
+    format_job_event_sse,
+    get_job_event_hub,
+    stream_job_events,
+)
 from src.api.middleware import RequestIdMiddleware, get_request_id
+from src.api.pagination import count_cache, keyset_condition, paginate
 
 # Import approval inbox module
 from src.approval.service import (
@@ -73,6 +85,7 @@ from src.core import config
 from src.datazones import (
     DataZone,
     JobState,
+    PipelineUnitOfWork,
     check_document_duplicate,
     compute_checksum,
     create_job_state,
@@ -80,6 +93,7 @@ from src.datazones import (
     get_job_state,
     get_job_zones,
     register_document_checksum,
+    resolve_tenant_id,
     track_zone_entry,
     update_job_state,
 )
@@ -105,14 +119,18 @@ from src.outbox import (
 from src.policy.engine import (
     evaluate_proposal as policy_evaluate_proposal,
 )
+from src.policy.engine import (
+    evaluate_proposals_batch as policy_evaluate_proposals_batch,
+)
 from src.policy.engine import (
     get_active_rules,
     get_policy_evaluation,
 )
+from src.policy.ruleset import get_rule_cache
 
 # Import schema validation
 from src.schemas.llm_output import coerce_and_validate
-from src.storage import get_minio_client, upload_document_v2
+from src.storage import get_minio_client, get_object_store
 from src.api.evidence import write_evidence
 
 # Import Temporal workflow starter (PR16)
@@ -498,6 +516,7 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
     tenant_id = file_info.get("tenant_id", "default")
     pipeline_start = time.time()
     conn = None
+    uow = None
     tenant_uuid = None  # Initialize for exception handler
 
     try:
@@ -508,23 +527,16 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
         conn = await get_db_connection()
 
         # =========== STEP 0: Create Document + Initialize State ===========
-        # First, ensure tenant exists
-        tenant_row = await conn.fetchrow("SELECT id FROM tenants WHERE code = $1", tenant_id)
-        if not tenant_row:
-            tenant_uuid_str = str(uuid.uuid4())
-            await conn.execute(
-                "INSERT INTO tenants (id, name, code) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING",
-                uuid.UUID(tenant_uuid_str),
-                f"Tenant {tenant_id}",
-                tenant_id,
-            )
-            tenant_row = await conn.fetchrow("SELECT id FROM tenants WHERE code = $1", tenant_id)
-
-        tenant_uuid = tenant_row["id"]
+        # Tenant ids are cached per process; a miss is one get-or-create statement
+        tenant_uuid = await resolve_tenant_id(conn, tenant_id)
         doc_uuid = uuid.UUID(job_id)
 
+        # State/audit/zone/evidence/metric writes are buffered per stage and
+        # flushed in one transaction at each stage boundary
+        uow = PipelineUnitOfWork(conn, job_id, str(tenant_uuid), request_id)
+
         # Create document record first (required for FK in data_zones)
-        await conn.execute(
+        uow.execute(
             """
             INSERT INTO documents 
             (id, tenant_id, job_id, filename, content_type, file_size, file_path, checksum, status)
@@ -550,14 +562,9 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
 
         if core_config.ENABLE_MINIO:
             try:
-                from src.storage import upload_document_v2 as minio_upload
-
-                # Read file content
-                with open(file_path, "rb") as f:
-                    file_data = f.read()
-
-                minio_bucket, minio_key, minio_checksum, minio_size = minio_upload(
-                    file_data=file_data,
+                # Streamed from disk, hashed while uploading
+                minio_bucket, minio_key, minio_checksum, minio_size = await get_object_store().upload_file(
+                    file_path,
                     filename=file_info.get("filename", "unknown.bin"),
                     content_type=file_info.get("content_type", "application/octet-stream"),
                     tenant_id=tenant_id,
@@ -565,7 +572,7 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
                 )
 
                 # Update document record with MinIO location
-                await conn.execute(
+                uow.execute(
                     """
                     UPDATE documents 
                     SET minio_bucket = $1, minio_key = $2, checksum = $3
@@ -584,40 +591,31 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
             logger.info(f"[{request_id}] MinIO disabled (ENABLE_MINIO=0)")
 
         # Now initialize state and audit
-        await create_job_state(conn, job_id, JobState.UPLOADED, str(tenant_uuid), request_id)
-        await append_audit_event(
-            conn,
-            job_id=job_id,
-            tenant_id=str(tenant_uuid),
-            event_type="received",
-            event_data={
+        uow.call(create_job_state, job_id, JobState.UPLOADED, str(tenant_uuid), request_id)
+        uow.audit(
+            "received",
+            {
                 "filename": file_info.get("filename"),
                 "content_type": file_info.get("content_type"),
                 "size": file_info.get("size"),
                 "checksum": file_info.get("checksum"),
             },
-            actor="system",
-            request_id=request_id,
         )
 
         # Track RAW zone
-        await track_zone_entry(
-            conn,
-            job_id=job_id,
-            zone=DataZone.RAW,
-            tenant_id=str(tenant_uuid),
-            document_id=job_id,
+        uow.zone(
+            DataZone.RAW,
             raw_file_uri=file_info.get("path"),
             checksum=file_info.get("checksum"),
             byte_count=file_info.get("size"),
-            request_id=request_id,
         )
 
         # Record upload metric
-        await record_counter(conn, "uploads_total", 1.0, {"tenant": tenant_id})
+        uow.counter("uploads_total", 1.0, {"tenant": tenant_id})
 
         # =========== STEP 1: Extract Text ===========
-        await update_job_state(conn, job_id, JobState.EXTRACTING, request_id=request_id)
+        uow.set_state(JobState.EXTRACTING)
+        await uow.flush()
 
         from src.llm import get_llm_client
 
@@ -650,7 +648,7 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
             "boxes": ocr_boxes,
             "page_dimensions": page_dims if 'page_dims' in dir() else {"width": 1000, "height": 1400}
         }
-        await conn.execute(
+        uow.execute(
             """UPDATE documents SET raw_text = $1, ocr_boxes = $2, updated_at = NOW() WHERE id = $3""",
             text[:65000] if text else "",  # Limit raw_text
             json.dumps(ocr_data),
@@ -658,47 +656,26 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
         )
 
         # 1.4 Evidence: EXTRACT
-        from src.api.evidence import write_evidence
-        await write_evidence(
-            document_id=job_id,
-            stage="extract",
+        uow.evidence(
+            "extract",
+            {"text_length": len(text), "ocr_latency_ms": ocr_latency_ms},
             action="extract_text",
             tenant_id=tenant_id,
-            output_summary={"text_length": len(text), "ocr_latency_ms": ocr_latency_ms}
         )
 
         # Record OCR metrics (ms-based histogram buckets)
-        await record_counter(conn, "ocr_calls_total", 1.0, {"tenant": tenant_id})
-        await record_latency(conn, "ocr_latency", float(ocr_latency_ms), labels={"tenant": tenant_id})
+        uow.counter("ocr_calls_total", 1.0, {"tenant": tenant_id})
+        uow.latency("ocr_latency", float(ocr_latency_ms), labels={"tenant": tenant_id})
 
         # Update state and track EXTRACTED zone
-        await update_job_state(
-            conn,
-            job_id,
-            JobState.EXTRACTED,
-            checkpoint_data={"text_length": len(text)},
-            request_id=request_id,
-        )
-        await track_zone_entry(
-            conn,
-            job_id=job_id,
-            zone=DataZone.EXTRACTED,
-            tenant_id=str(tenant_uuid),
-            document_id=job_id,
+        uow.set_state(JobState.EXTRACTED, checkpoint_data={"text_length": len(text)})
+        uow.zone(
+            DataZone.EXTRACTED,
             extracted_text_preview=text[:4000],
             byte_count=len(text.encode("utf-8")),
             processing_time_ms=ocr_latency_ms,
-            request_id=request_id,
-        )
-        await append_audit_event(
-            conn,
-            job_id=job_id,
-            tenant_id=str(tenant_uuid),
-            event_type="extracted",
-            event_data={"text_length": len(text), "ocr_latency_ms": ocr_latency_ms},
-            actor="system",
-            request_id=request_id,
         )
+        uow.audit("extracted", {"text_length": len(text), "ocr_latency_ms": ocr_latency_ms})
 
         # =========== PR14: Qdrant Embedding Storage ===========
         qdrant_points_upserted = 0
@@ -738,7 +715,8 @@ async def process_document_async(job_id: str, file_path: str, file_info: dict[st
             logger.info(f"[{request_id}] Qdrant disabled (ENABLE_QDRANT=0)")
 
         # =========== STEP 2: Call LLM ===========
-        await update_job_state(conn, job_id, JobState.PROPOSING, request_id=request_id)
+        uow.set_state(JobState.PROPOSING)
+        await uow.flush()
 
         llm_client = get_llm_client()
         model_name = llm_client.config.model
@@ -805,8 +783,8 @@ Trả về JSON theo format đã định."""
         llm_latency_ms = int((time.time() - llm_start) * 1000)
 
         # Record LLM metrics (ms-based histogram buckets)
-        await record_counter(conn, "llm_calls_total", 1.0, {"tenant": tenant_id, "model": model_name})
-        await record_latency(conn, "llm_latency", float(llm_latency_ms), labels={"tenant": tenant_id})
+        uow.counter("llm_calls_total", 1.0, {"tenant": tenant_id, "model": model_name})
+        uow.latency("llm_latency", float(llm_latency_ms), labels={"tenant": tenant_id})
 
         response["doc_id"] = job_id
         proposal = validate_proposal(response)
@@ -815,35 +793,30 @@ Trả về JSON theo format đã định."""
 
         # 1.2 Persist doc_type in documents table (Lưu DB đúng)
         doc_type = proposal.get("doc_type", "other")
-        await conn.execute(
+        uow.execute(
             "UPDATE documents SET doc_type = $1, updated_at = NOW() WHERE id = $2",
             doc_type, doc_uuid
         )
 
         # 1.4 Evidence: CLASSIFY
-        await write_evidence(
-            document_id=job_id,
-            stage="classify",
+        uow.evidence(
+            "classify",
+            {"doc_type": doc_type, "confidence": proposal.get("confidence")},
             action="classify_document",
             tenant_id=tenant_id,
-            output_summary={"doc_type": doc_type, "confidence": proposal.get("confidence")}
         )
 
-        await update_job_state(conn, job_id, JobState.PROPOSED, request_id=request_id)
+        uow.set_state(JobState.PROPOSED)
 
-        await append_audit_event(
-            conn,
-            job_id=job_id,
-            tenant_id=str(tenant_uuid),
-            event_type="llm_proposed",
-            event_data={
+        uow.audit(
+            "llm_proposed",
+            {
                 "model": model_name,
                 "llm_latency_ms": llm_latency_ms,
                 "confidence": proposal.get("confidence"),
                 "doc_type": proposal.get("doc_type"),
             },
             actor="llm",
-            request_id=request_id,
         )
 
         # =========== STEP 3: Policy Evaluation ===========
@@ -855,24 +828,20 @@ Trả về JSON theo format đã định."""
             request_id=request_id,
         )
 
-        await append_audit_event(
-            conn,
-            job_id=job_id,
-            tenant_id=str(tenant_uuid),
-            event_type="policy_evaluated",
-            event_data={
+        uow.audit(
+            "policy_evaluated",
+            {
                 "overall_result": policy_result.overall_result.value,
                 "auto_approved": policy_result.auto_approved,
                 "rules_passed": policy_result.rules_passed,
                 "rules_failed": policy_result.rules_failed,
             },
             actor="policy_engine",
-            request_id=request_id,
         )
 
         # Create audit evidence with full details
-        await create_audit_evidence(
-            conn,
+        uow.call(
+            create_audit_evidence,
             job_id=job_id,
             tenant_id=str(tenant_uuid),
             request_id=request_id,
@@ -892,30 +861,23 @@ Trả về JSON theo format đã định."""
         )
 
         # Track PROPOSED zone (silver)
-        await track_zone_entry(
-            conn,
-            job_id=job_id,
-            zone=DataZone.PROPOSED,
-            tenant_id=str(tenant_uuid),
-            document_id=job_id,
-            processing_time_ms=llm_latency_ms,
-            request_id=request_id,
-        )
+        uow.zone(DataZone.PROPOSED, processing_time_ms=llm_latency_ms)
 
         # 1.4 Evidence: PROPOSE
-        from src.api.evidence import write_evidence
-        await write_evidence(
-            document_id=job_id,
-            stage="propose",
-            action="generate_proposal",
-            tenant_id=tenant_id,
-            output_summary={
+        uow.evidence(
+            "propose",
+            {
                 "model": model_name,
                 "confidence": proposal.get("confidence"),
-                "entries_count": len(proposal.get("entries", []))
-            }
+                "entries_count": len(proposal.get("entries", [])),
+            },
+            action="generate_proposal",
+            tenant_id=tenant_id,
         )
 
+        # Evidence rows must exist before the governance decision updates them
+        await uow.flush()
+
         # =========== STEP 4: GOVERNANCE GATING (PR13.3) ===========
         # Branch based on policy result - MUST check BEFORE posting ledger
         needs_approval = policy_result.overall_result.value == "requires_review" or not policy_result.auto_approved
@@ -927,7 +889,7 @@ Trả về JSON theo format đã định."""
 
             # 1. Insert approval PENDING with job_id (NOT NULL)
             approval_id = uuid.uuid4()
-            await conn.execute(
+            uow.execute(
                 """
                 INSERT INTO approvals
                 (id, proposal_id, tenant_id, job_id, approver_name, action, status, comments)
@@ -945,32 +907,27 @@ Trả về JSON theo format đã định."""
             )
 
             # 2. Audit events
-            await append_audit_event(
-                conn,
-                job_id,
-                str(tenant_uuid),
+            uow.audit(
                 "needs_approval",
                 {
                     "reason": f"Policy result: {policy_result.overall_result.value}",
                     "rules_failed": policy_result.rules_failed,
                     "auto_approved": policy_result.auto_approved,
                 },
-                "policy_engine",
-                request_id,
-            )
-            await update_audit_decision(
-                conn, job_id, "waiting_approval", policy_result.overall_result.value, request_id
+                actor="policy_engine",
             )
+            uow.call(update_audit_decision, job_id, "waiting_approval", policy_result.overall_result.value, request_id)
 
             # 3. State machine - WAITING_FOR_APPROVAL
-            await update_job_state(conn, job_id, JobState.WAITING_FOR_APPROVAL, request_id=request_id)
+            uow.set_state(JobState.WAITING_FOR_APPROVAL)
 
             # 4. Metrics
-            await record_counter(conn, "approvals_pending_total", 1.0, {"tenant": str(tenant_uuid)})
+            uow.counter("approvals_pending_total", 1.0, {"tenant": str(tenant_uuid)})
 
             # 5. Update job store and STOP
             e2e_latency_ms = int((time.time() - pipeline_start) * 1000)
-            await record_latency(conn, "end_to_end_latency", float(e2e_latency_ms), labels={"tenant": str(tenant_uuid)})
+            uow.latency("end_to_end_latency", float(e2e_latency_ms), labels={"tenant": str(tenant_uuid)})
+            await uow.flush()
 
             job_store.update(job_id, status="waiting_for_approval", result=proposal)
             logger.info(f"[{request_id}] Job {job_id} stopped at WAITING_FOR_APPROVAL in {e2e_latency_ms}ms")
@@ -983,39 +940,32 @@ Trả về JSON theo format đã định."""
         logger.info(f"[{request_id}] Job {job_id} auto-approved - posting ledger")
 
         # 1. Audit auto_approved
-        await append_audit_event(
-            conn,
-            job_id,
-            str(tenant_uuid),
+        uow.audit(
             "auto_approved",
             {"reason": "Policy rules passed", "rules_passed": policy_result.rules_passed},
-            "policy_engine",
-            request_id,
+            actor="policy_engine",
         )
-        await record_counter(conn, "auto_approved_total", 1.0, {"tenant": str(tenant_uuid)})
-        await update_audit_decision(conn, job_id, "auto_approved", "Policy rules passed", request_id)
+        uow.counter("auto_approved_total", 1.0, {"tenant": str(tenant_uuid)})
+        uow.call(update_audit_decision, job_id, "auto_approved", "Policy rules passed", request_id)
 
         # =========== STEP 5: Persist to Golden Tables (only if auto-approved) ===========
-        await update_job_state(conn, job_id, JobState.POSTING, request_id=request_id)
+        uow.set_state(JobState.POSTING)
+        await uow.flush()
 
         # Call existing persist function with our connection
         persist_result = await persist_to_db_with_conn(conn, job_id, file_info, proposal, str(tenant_uuid), request_id)
 
         # Track POSTED zone (gold)
-        await track_zone_entry(
-            conn,
-            job_id=job_id,
-            zone=DataZone.POSTED,
-            tenant_id=str(tenant_uuid),
-            document_id=job_id,
+        uow.zone(
+            DataZone.POSTED,
             proposal_id=persist_result.get("proposal_id"),
             ledger_entry_id=persist_result.get("ledger_id"),
-            request_id=request_id,
         )
 
         # =========== STEP 6: Emit Outbox Event (only if auto-approved) ===========
-        await publish_event(
-            conn,
+        # Committed together with the COMPLETED state below
+        uow.call(
+            publish_event,
             event_type=EventType.LEDGER_POSTED,
             aggregate_type=AggregateType.LEDGER,
             aggregate_id=persist_result.get("ledger_id", job_id),
@@ -1032,35 +982,23 @@ Trả về JSON theo format đã định."""
             request_id=request_id,
         )
 
-        await record_counter(conn, "ledger_posted_total", 1.0, {"tenant": str(tenant_uuid)})
-        await append_audit_event(
-            conn,
-            job_id,
-            str(tenant_uuid),
+        uow.counter("ledger_posted_total", 1.0, {"tenant": str(tenant_uuid)})
+        uow.audit(
             "posted_to_ledger",
             {
                 "ledger_id": persist_result.get("ledger_id"),
                 "entry_number": persist_result.get("entry_number"),
             },
-            "system",
-            request_id,
         )
 
         # =========== STEP 7: Complete ===========
-        await update_job_state(conn, job_id, JobState.COMPLETED, request_id=request_id)
+        uow.set_state(JobState.COMPLETED)
 
         e2e_latency_ms = int((time.time() - pipeline_start) * 1000)
-        await record_latency(conn, "end_to_end_latency", float(e2e_latency_ms), labels={"tenant": str(tenant_uuid)})
+        uow.latency("end_to_end_latency", float(e2e_latency_ms), labels={"tenant": str(tenant_uuid)})
 
-        await append_audit_event(
-            conn,
-            job_id,
-            str(tenant_uuid),
-            "completed",
-            {"e2e_latency_ms": e2e_latency_ms, "doc_type": proposal.get("doc_type")},
-            "system",
-            request_id,
-        )
+        uow.audit("completed", {"e2e_latency_ms": e2e_latency_ms, "doc_type": proposal.get("doc_type")})
+        await uow.flush()
 
         job_store.update(job_id, status="completed", result=proposal)
         logger.info(f"[{request_id}] Job {job_id} completed in {e2e_latency_ms}ms: {proposal.get('doc_type')}")
@@ -1074,17 +1012,16 @@ Trả về JSON theo format đã định."""
             try:
                 # Use tenant_uuid if available, fallback to tenant_id string
                 t_id = str(tenant_uuid) if tenant_uuid else tenant_id
-                await update_job_state(conn, job_id, JobState.FAILED, error=str(e), request_id=request_id)
-                await append_audit_event(
-                    conn,
-                    job_id,
-                    t_id,
-                    "failed",
-                    {"error": str(e)[:1000]},
-                    "system",
-                    request_id,
-                )
-                await update_audit_decision(conn, job_id, "failed", str(e)[:500], request_id)
+                if uow is not None:
+                    try:
+                        await uow.flush()  # keep what the failed stage already did (metrics, evidence)
+                    except Exception:
+                        uow.discard()
+                failure = PipelineUnitOfWork(conn, job_id, t_id, request_id)
+                failure.set_state(JobState.FAILED, error=str(e))
+                failure.audit("failed", {"error": str(e)[:1000]})
+                failure.call(update_audit_decision, job_id, "failed", str(e)[:500], request_id)
+                await failure.flush()
             except Exception as audit_err:
                 logger.error(f"[{request_id}] Failed to record audit: {audit_err}")
 
@@ -1235,19 +1172,7 @@ async def persist_to_db_with_conn(
     Persist processing result to PostgreSQL golden tables using existing connection.
     Returns dict with created IDs.
     """
-    # Get or create tenant
-    tenant_row = await conn.fetchrow("SELECT id FROM tenants WHERE code = $1", tenant_id_str)
-    if not tenant_row:
-        tenant_uuid = str(uuid.uuid4())
-        await conn.execute(
-            "INSERT INTO tenants (id, name, code) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING",
-            uuid.UUID(tenant_uuid),
-            f"Tenant {tenant_id_str}",
-            tenant_id_str,
-        )
-        tenant_row = await conn.fetchrow("SELECT id FROM tenants WHERE code = $1", tenant_id_str)
-
-    tenant_uuid = tenant_row["id"]
+    tenant_uuid = await resolve_tenant_id(conn, tenant_id_str)
     doc_uuid = uuid.UUID(job_id)
 
     # 0. Insert into documents table (FK requirement)
@@ -1327,22 +1252,26 @@ async def persist_to_db_with_conn(
     )
 
     # 3. Insert journal_proposal_entries
-    for idx, entry in enumerate(entries):
-        entry_id = uuid.uuid4()
-        await conn.execute(
+    if entries:
+        await conn.executemany(
             """
             INSERT INTO journal_proposal_entries
             (id, proposal_id, account_code, account_name, debit_amount, credit_amount, line_order)
             VALUES ($1, $2, $3, $4, $5, $6, $7)
             ON CONFLICT DO NOTHING
             """,
-            entry_id,
-            proposal_id,
-            entry.get("account_code", ""),
-            entry.get("account_name", ""),
-            float(entry.get("debit", 0)),
-            float(entry.get("credit", 0)),
-            idx + 1,
+            [
+                (
+                    uuid.uuid4(),
+                    proposal_id,
+                    entry.get("account_code", ""),
+                    entry.get("account_name", ""),
+                    float(entry.get("debit", 0)),
+                    float(entry.get("credit", 0)),
+                    idx + 1,
+                )
+                for idx, entry in enumerate(entries)
+            ],
         )
 
     # 4. Insert approval with job_id
@@ -1426,22 +1355,26 @@ async def persist_to_db_with_conn(
         raise
 
     # 7. Insert ledger_lines
-    for idx, entry in enumerate(entries):
-        line_id = uuid.uuid4()
-        await conn.execute(
+    if entries:
+        await conn.executemany(
             """
             INSERT INTO ledger_lines
             (id, ledger_entry_id, account_code, account_name, debit_amount, credit_amount, line_order)
             VALUES ($1, $2, $3, $4, $5, $6, $7)
             ON CONFLICT DO NOTHING
             """,
-            line_id,
-            ledger_id,
-            entry.get("account_code", ""),
-            entry.get("account_name", ""),
-            float(entry.get("debit", 0)),
-            float(entry.get("credit", 0)),
-            idx + 1,
+            [
+                (
+                    uuid.uuid4(),
+                    ledger_id,
+                    entry.get("account_code", ""),
+                    entry.get("account_name", ""),
+                    float(entry.get("debit", 0)),
+                    float(entry.get("credit", 0)),
+                    idx + 1,
+                )
+                for idx, entry in enumerate(entries)
+            ],
         )
 
     logger.info(
@@ -1633,17 +1566,18 @@ async def correct_ocr_text_with_llm(
     boxes: list[dict],
     doc_type: str = "invoice"
 ) -> tuple[str, list[dict]]:
-    """Use LLM to correct OCR errors and improve text quality.
+    """Correct OCR errors with local rules first and the LLM only where needed.
     
-    This function takes raw OCR output and uses LLM to:
-    1. Fix common OCR errors (e.g., "Ngay." -> "Ngày:", "So 001" -> "Số: 001")
-    2. Correct Vietnamese diacritics that may have been missed
-    3. Fix spacing and punctuation issues
-    4. Normalize field labels for better extraction
+    Tiered (see src/processing/ocr_correction.py):
+    1. Lexicon/rule fixes on every box (e.g. "Ngay." -> "Ngày:", "HOA DON" -> "HÓA ĐƠN",
+       "04/O3/2010" -> "04/03/2010")
+    2. Only boxes below OCR_LLM_CONFIDENCE_THRESHOLD are batched to the LLM, with
+       their neighbouring lines as context
+    3. Corrected spans are written back to their boxes as `text_corrected`
     
     Args:
         raw_text: Raw OCR text with potential errors
-        boxes: List of OCR boxes with text and positions
+        boxes: List of OCR boxes with text, confidence and positions (reading order)
         doc_type: Type of document (invoice, receipt, etc.)
     
     Returns:
@@ -1653,68 +1587,23 @@ async def correct_ocr_text_with_llm(
         return raw_text, boxes
     
     try:
-        from src.llm import get_llm_client
+        from src.processing.ocr_correction import correct_ocr_boxes, correct_text_with_rules
         
-        # Build the correction prompt - supports multiple languages
-        system_prompt = """Bạn là chuyên gia sửa lỗi OCR cho hóa đơn và chứng từ đa ngôn ngữ (Việt, Anh, Nhật, Trung...).
-Nhiệm vụ: Sửa lỗi OCR trong văn bản mà KHÔNG thay đổi ý nghĩa hoặc bố cục.
-
-Các lỗi thường gặp cần sửa:
-1. Tiếng Việt: "Ngay." → "Ngày:", "HOA DON" → "HÓA ĐƠN", "Ma so thue" → "Mã số thuế:"
-2. Tiếng Anh: "TOIAL" → "TOTAL", "lnvoice" → "Invoice", "Amounl" → "Amount"
-3. Ký tự số/chữ bị nhầm: "O" → "0", "l" → "1", "S" → "5"
-4. Khoảng trắng: "(VATINVOICE)" → "(VAT INVOICE)", "E lectricity" → "Electricity"
-5. Ký hiệu tiền tệ: "E" → "£", "$" đúng vị trí
-6. Ngày tháng: "04/O3/2010" → "04/03/2010"
-
-Quy tắc:
-- Giữ nguyên ngôn ngữ gốc của văn bản
-- KHÔNG dịch văn bản sang ngôn ngữ khác
-- Chỉ sửa lỗi rõ ràng, KHÔNG đoán hay thêm thông tin
-- Giữ nguyên số tiền, ngày tháng nếu không chắc chắn
-- Trả về văn bản đã sửa, mỗi dòng trên một dòng riêng
-- KHÔNG thêm giải thích hay chú thích"""
-
-        correction_prompt = f"""Sửa lỗi OCR trong văn bản sau (giữ nguyên ngôn ngữ gốc):
-
----
-{raw_text[:2000]}
----
-
-Trả về văn bản đã sửa (chỉ văn bản, không giải thích):"""
-
-        client = get_llm_client()
-        response = await client.generate(
-            prompt=correction_prompt,
-            system=system_prompt,
-            temperature=0.1,  # Low temperature for consistency
-            max_tokens=2048,
-        )
+        if not boxes:
+            # No per-box confidences to target: rules only
+            corrected_text, corrections = correct_text_with_rules(raw_text)
+            return corrected_text, boxes
         
-        corrected_text = response.content.strip()
-        
-        # Validate: corrected text should be similar length (±30%)
-        if corrected_text and 0.7 < len(corrected_text) / len(raw_text) < 1.3:
-            logger.info(f"LLM OCR correction: {len(raw_text)} -> {len(corrected_text)} chars")
-            
-            # Update boxes with corrected text where possible
-            corrected_lines = corrected_text.split('\n')
-            corrected_boxes = []
-            
-            for i, box in enumerate(boxes):
-                new_box = box.copy()
-                # Try to find matching corrected line
-                if i < len(corrected_lines):
-                    new_box["text_corrected"] = corrected_lines[i]
-                corrected_boxes.append(new_box)
-            
-            return corrected_text, corrected_boxes
-        else:
-            logger.warning(f"LLM correction rejected: length mismatch {len(raw_text)} vs {len(corrected_text)}")
-            return raw_text, boxes
+        result = await correct_ocr_boxes(boxes)
+        logger.info(
+            f"OCR correction: {len(result.rule_corrections)} rule fixes, "
+            f"{result.llm_spans}/{len(boxes)} low-confidence spans sent to LLM in {result.llm_calls} call(s), "
+            f"{result.llm_rejected} rejected"
+        )
+        return result.text, result.boxes
             
     except Exception as e:
-        logger.warning(f"LLM OCR correction failed: {e}")
+        logger.warning(f"OCR correction failed: {e}")
         return raw_text, boxes
 
 async def extract_image(file_path: str) -> tuple[str, list, dict]:
@@ -1773,7 +1662,7 @@ async def extract_image(file_path: str) -> tuple[str, list, dict]:
                 pass
         
         if text:
-            # Step 4: LLM post-processing to correct OCR errors
+            # Step 4: Tiered OCR correction (rules, then LLM for low-confidence boxes)
             try:
                 text, boxes = await correct_ocr_text_with_llm(text, boxes)
             except Exception as llm_err:
@@ -1944,10 +1833,40 @@ async def lifespan(app: FastAPI):
     upload_dir = Path("/root/erp-ai/data/uploads")
     upload_dir.mkdir(parents=True, exist_ok=True)
 
+    # Policy rule cache: LISTEN for rule changes (falls back to TTL if unavailable)
+    policy_listen_conn = None
+    try:
+        policy_listen_conn = await get_db_connection()
+        await get_rule_cache().attach_listener(policy_listen_conn)
+    except Exception as e:
+        logger.warning(f"Policy rule listener unavailable, using TTL invalidation: {e}")
+        policy_listen_conn = None
+
+    # Job progress streams share the same LISTEN connection (one per worker)
+    if policy_listen_conn is not None:
+        try:
+            await get_job_event_hub().attach_listener(policy_listen_conn)
+        except Exception as e:
+            logger.warning(f"Job event listener unavailable, streams will only replay history: {e}")
+
+    # Background memory/disk sampling for ResourceMonitorMiddleware
+    get_resource_sampler().ensure_running()
+
+    # Prefetch/rotate JWKS in the background so verification never waits on Keycloak
+    if AUTH_ENABLED:
+        get_token_verifier().jwks.ensure_running()
+
     yield
 
     # Shutdown
     logger.info("ERPX AI API shutting down...")
+    await get_resource_sampler().stop()
+    if AUTH_ENABLED:
+        await get_token_verifier().jwks.stop()
+    if policy_listen_conn is not None:
+        await get_job_event_hub().detach_listener()
+        await get_rule_cache().detach_listener()
+        await policy_listen_conn.close()
 
 
 def create_app() -> FastAPI:
@@ -1963,6 +1882,9 @@ def create_app() -> FastAPI:
     # PR15: Setup OTEL instrumentation (before middlewares)
     setup_otel_instrumentation(app)
 
+    # Resource pressure / admission control for heavy uploads and OCR
+    app.add_middleware(ResourceMonitorMiddleware)
+
     # Request ID middleware (must be first for tracing)
     app.add_middleware(RequestIdMiddleware)
 
@@ -2139,24 +2061,55 @@ erpx_jobs_total {len(job_store.jobs)}
 async def list_journal_proposals(
     status: Optional[str] = Query(None, description="Filter by status (pending, approved, rejected)"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ) -> dict:
     """
-    List all journal proposals with document details.
+    List journal proposals with document details.
+
+    Keyset-paginated on (created_at, id). Debit/credit totals are aggregated
+    only for the rows on the page, not for the whole filtered set.
     """
     pool = await get_db_pool()
     if not pool:
         raise HTTPException(status_code=503, detail="Database unavailable")
 
     async with pool.acquire() as conn:
-        base_query = """
-            SELECT 
-                jp.id,
-                jp.document_id,
-                jp.status,
-                jp.ai_confidence,
-                jp.ai_reasoning,
-                jp.created_at,
+        conditions = []
+        params: list[Any] = []
+
+        if status:
+            params.append(status)
+            conditions.append(f"jp.status = ${len(params)}")
+
+        filter_where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        filter_params = list(params)
+
+        keyset, keyset_params = keyset_condition(cursor, "jp.created_at", "jp.id", len(params) + 1)
+        if keyset:
+            conditions.append(keyset)
+            params.extend(keyset_params)
+
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        params.append(limit + 1)
+        page_clause = f"LIMIT ${len(params)}"
+        if not cursor and offset:
+            params.append(offset)
+            page_clause += f" OFFSET ${len(params)}"
+
+        rows = await conn.fetch(
+            f"""
+            WITH page AS (
+                SELECT jp.id, jp.document_id, jp.invoice_id, jp.status,
+                       jp.ai_confidence, jp.ai_reasoning, jp.created_at
+                FROM journal_proposals jp
+                {where_clause}
+                ORDER BY jp.created_at DESC, jp.id DESC
+                {page_clause}
+            )
+            SELECT
+                page.*,
                 d.filename,
                 d.doc_type,
                 ei.vendor_name,
@@ -2166,40 +2119,26 @@ async def list_journal_proposals(
                 ei.total_amount,
                 ei.tax_amount as vat_amount,
                 ei.currency,
-                COALESCE(SUM(jpe.debit_amount), 0) as total_debit,
-                COALESCE(SUM(jpe.credit_amount), 0) as total_credit
-            FROM journal_proposals jp
-            LEFT JOIN documents d ON jp.document_id = d.id
-            LEFT JOIN extracted_invoices ei ON jp.invoice_id = ei.id
-            LEFT JOIN journal_proposal_entries jpe ON jp.id = jpe.proposal_id
-        """
+                totals.total_debit,
+                totals.total_credit
+            FROM page
+            LEFT JOIN documents d ON page.document_id = d.id
+            LEFT JOIN extracted_invoices ei ON page.invoice_id = ei.id
+            LEFT JOIN LATERAL (
+                SELECT COALESCE(SUM(jpe.debit_amount), 0) as total_debit,
+                       COALESCE(SUM(jpe.credit_amount), 0) as total_credit
+                FROM journal_proposal_entries jpe
+                WHERE jpe.proposal_id = page.id
+            ) totals ON TRUE
+            ORDER BY page.created_at DESC, page.id DESC
+            """,
+            *params,
+        )
+        rows, next_cursor = paginate(rows, limit)
 
-        if status:
-            rows = await conn.fetch(
-                base_query
-                + """
-                WHERE jp.status = $1
-                GROUP BY jp.id, d.id, ei.id
-                ORDER BY jp.created_at DESC
-                LIMIT $2 OFFSET $3
-                """,
-                status,
-                limit,
-                offset,
-            )
-            count_row = await conn.fetchrow("SELECT COUNT(*) as total FROM journal_proposals WHERE status = $1", status)
-        else:
-            rows = await conn.fetch(
-                base_query
-                + """
-                GROUP BY jp.id, d.id, ei.id
-                ORDER BY jp.created_at DESC
-                LIMIT $1 OFFSET $2
-                """,
-                limit,
-                offset,
-            )
-            count_row = await conn.fetchrow("SELECT COUNT(*) as total FROM journal_proposals")
+        total, total_is_estimate = await count_cache.count(
+            conn, "journal_proposals", filter_where, filter_params, alias="jp"
+        )
 
         proposals = []
         for row in rows:
@@ -2229,13 +2168,14 @@ async def list_journal_proposals(
                 }
             )
 
-        total = count_row["total"] if count_row else 0
-
         return {
             "proposals": proposals,
             "total": total,
+            "total_is_estimate": total_is_estimate,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
         }
 
 
@@ -2317,7 +2257,7 @@ async def upload_document(
 
     # 1. ALWAYS Upload to MinIO (Required for Preview & Temporal)
     try:
-        minio_bucket, minio_key, file_checksum, file_size = upload_document_v2(
+        minio_bucket, minio_key, file_checksum, file_size = await get_object_store().upload_bytes(
             content, file.filename, content_type, tenant_id=x_tenant_id, job_id=job_id
         )
         logger.info(f"MinIO upload: s3://{minio_bucket}/{minio_key}")
@@ -2448,19 +2388,7 @@ async def get_job_status_from_db(job_id: str) -> dict | None:
             # Map DB state to API status
             status = "unknown"
             if state_row:
-                state_map = {
-                    "uploaded": "queued",
-                    "extracting": "processing",
-                    "extracted": "processing",
-                    "proposing": "processing",
-                    "proposed": "processing",
-                    "approving": "processing",
-                    "waiting_for_approval": "waiting_for_approval",
-                    "posting": "processing",
-                    "completed": "completed",
-                    "failed": "failed",
-                }
-                status = state_map.get(state_row["current_state"], state_row["current_state"])
+                status = JOB_STATUS_BY_STATE.get(state_row["current_state"], state_row["current_state"])
 
             # Build file_info from documents table
             file_info = None
@@ -2564,10 +2492,53 @@ async def get_job_status(job_id: str):
 
 
 @app.get("/v1/jobs")
-async def list_jobs(limit: int = 100):
-    """List recent jobs"""
-    jobs = job_store.list_all(limit)
-    return {"jobs": jobs, "count": len(jobs)}
+async def list_jobs(limit: int = Query(100, ge=1, le=500), cursor: str | None = None):
+    """
+    List recent jobs (newest first).
+
+    Reads the durable job list (documents + job_processing_state) with keyset
+    pagination on (created_at, id); falls back to the in-process job cache
+    when the database is unavailable.
+    """
+    pool = await get_db_pool()
+    if not pool:
+        jobs = job_store.list_all(limit)
+        return {"jobs": jobs, "count": len(jobs), "next_cursor": None, "has_more": False}
+
+    params: list[Any] = []
+    keyset, keyset_params = keyset_condition(cursor, "d.created_at", "d.id", 1)
+    if keyset:
+        params.extend(keyset_params)
+    params.append(limit + 1)
+
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT d.id, d.job_id, d.filename, d.status, d.doc_type,
+                   s.current_state, d.created_at, d.updated_at
+            FROM documents d
+            LEFT JOIN job_processing_state s ON s.job_id = d.job_id
+            {"WHERE " + keyset if keyset else ""}
+            ORDER BY d.created_at DESC, d.id DESC
+            LIMIT ${len(params)}
+            """,
+            *params,
+        )
+    rows, next_cursor = paginate(rows, limit)
+
+    jobs = [
+        {
+            "job_id": row["job_id"],
+            "document_id": str(row["id"]),
+            "status": row["current_state"] or row["status"],
+            "filename": row["filename"],
+            "document_type": row["doc_type"],
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
+        }
+        for row in rows
+    ]
+    return {"jobs": jobs, "count": len(jobs), "next_cursor": next_cursor, "has_more": next_cursor is not None}
 
 
 # ===========================================================================
@@ -2648,6 +2619,112 @@ async def get_job_timeline(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ===========================================================================
+# Job Event Streams (push instead of polling /v1/jobs/{job_id})
+# ===========================================================================
+
+
+def _job_event_fetcher(job_id: str | None, tenant_id: str | None):
+    """Replay reader for stream_job_events (short-lived pool connection per read)."""
+
+    async def fetch(after_id: int):
+        pool = await get_db_pool()
+        if pool is None:
+            return []
+        try:
+            async with pool.acquire() as conn:
+                return await fetch_job_events(conn, job_id=job_id, tenant_id=tenant_id, after_id=after_id)
+        except Exception as e:
+            logger.warning(f"Job event replay failed: {e}")
+            return []
+
+    return fetch
+
+
+def _resume_id(request: Request, last_event_id: int | None) -> int | None:
+    """Resume point: EventSource's Last-Event-ID header, else ?last_event_id="""
+    header = request.headers.get("last-event-id")
+    if header and header.isdigit():
+        return int(header)
+    return last_event_id
+
+
+def _job_event_sse_response(job_id: str | None, tenant_id: str | None, last_event_id: int | None):
+    async def frames():
+        yield "retry: 3000\n\n"
+        stream = stream_job_events(
+            get_job_event_hub(),
+            _job_event_fetcher(job_id, tenant_id),
+            job_id=job_id,
+            tenant_id=tenant_id,
+            last_event_id=last_event_id,
+        )
+        async with aclosing(stream) as events:
+            async for event in events:
+                yield SSE_HEARTBEAT if event is None else format_job_event_sse(event)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/v1/jobs/{job_id}/events")
+async def stream_job_progress(job_id: str, request: Request, last_event_id: int | None = Query(None)):
+    """
+    Server-sent events for one job (text/event-stream).
+
+    Sends the job's state history, then each state change as it happens;
+    the stream closes after the completed/failed event. Each event carries
+    an `id` for resuming via Last-Event-ID.
+    """
+    return _job_event_sse_response(job_id, None, _resume_id(request, last_event_id))
+
+
+@app.get("/v1/job-events")
+async def stream_tenant_job_progress(
+    request: Request,
+    tenant_id: str = Query(..., description="Tenant UUID"),
+    last_event_id: int | None = Query(None),
+):
+    """
+    Server-sent events for every job of a tenant (batch uploads).
+
+    Live changes only, unless resuming with Last-Event-ID / last_event_id.
+    """
+    return _job_event_sse_response(None, tenant_id, _resume_id(request, last_event_id))
+
+
+@app.websocket("/v1/job-events/ws")
+async def job_progress_websocket(
+    websocket: WebSocket,
+    job_id: str | None = None,
+    tenant_id: str | None = None,
+    last_event_id: int | None = None,
+):
+    """WebSocket variant of the job event streams: one JSON message per event."""
+    if not job_id and not tenant_id:
+        await websocket.close(code=1008, reason="job_id or tenant_id is required")
+        return
+
+    await websocket.accept()
+    stream = stream_job_events(
+        get_job_event_hub(),
+        _job_event_fetcher(job_id, tenant_id),
+        job_id=job_id,
+        tenant_id=tenant_id,
+        last_event_id=last_event_id,
+    )
+    try:
+        async with aclosing(stream) as events:
+            async for event in events:
+                await websocket.send_json({"type": "ping"} if event is None else {"type": "job", **event.to_dict()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 # ===========================================================================
 # PR-8: Approval Inbox Endpoints
 # ===========================================================================
@@ -2659,6 +2736,7 @@ async def list_approvals(
     tenant_id: str | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
 ):
     """
     List approvals filtered by status.
@@ -2667,7 +2745,8 @@ async def list_approvals(
     - status: pending|approved|rejected (default: pending)
     - tenant_id: filter by tenant (optional)
     - limit: max results (default: 50)
-    - offset: pagination offset (default: 0)
+    - offset: pagination offset (default: 0, deprecated: use cursor)
+    - cursor: next_cursor from the previous page
 
     Returns list of approvals with proposal context.
     """
@@ -2678,18 +2757,34 @@ async def list_approvals(
                 conn,
                 tenant_id=tenant_id,
                 status=status,
-                limit=limit,
+                limit=limit + 1,
                 offset=offset,
+                cursor=cursor,
             )
+            approvals, next_cursor = paginate(approvals, limit)
+
+            count_where = "WHERE (action = $1 OR status = $1)"
+            count_params: list[Any] = [status]
+            if tenant_id:
+                count_where += " AND tenant_id = $2"
+                count_params.append(uuid.UUID(tenant_id) if len(tenant_id) > 10 else tenant_id)
+            total, total_is_estimate = await count_cache.count(conn, "approvals", count_where, count_params)
+
             return {
                 "approvals": approvals,
                 "count": len(approvals),
+                "total": total,
+                "total_is_estimate": total_is_estimate,
                 "limit": limit,
                 "offset": offset,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
                 "status_filter": status,
             }
         finally:
             await conn.close()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list approvals: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -3181,6 +3276,49 @@ async def evaluate_policy(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class PolicyBatchItem(BaseModel):
+    job_id: str
+    proposal: dict
+    proposal_id: str | None = None
+
+
+class PolicyBatchRequest(BaseModel):
+    items: list[PolicyBatchItem]
+    tenant_id: str | None = None
+
+
+@app.post("/v1/policy/evaluate/batch")
+async def evaluate_policy_batch(
+    request: PolicyBatchRequest,
+    x_request_id: str | None = Header(default=None),
+):
+    """
+    Evaluate many proposals against the tenant's compiled rule set.
+
+    Rules are loaded once for the batch and results are persisted with a
+    single bulk insert. Intended for batch invoice imports.
+    """
+    request_id = x_request_id or get_request_id()
+    try:
+        conn = await get_db_connection()
+        try:
+            evaluations = await policy_evaluate_proposals_batch(
+                conn,
+                [item.model_dump() for item in request.items],
+                tenant_id=request.tenant_id,
+                request_id=request_id,
+            )
+            return {
+                "evaluations": [e.to_dict() for e in evaluations],
+                "count": len(evaluations),
+            }
+        finally:
+            await conn.close()
+    except Exception as e:
+        logger.error(f"[{request_id}] Batch policy evaluation failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/v1/jobs/{job_id}/policy")
 async def get_job_policy(job_id: str):
     """
@@ -3579,6 +3717,23 @@ class SimulationResponse(BaseModel):
     status: str = "completed"
 
 
+class SimulationSweepRequest(BaseModel):
+    window_days: int = Field(30, ge=1, le=366)
+    mode: Literal["grid", "monte_carlo"] = "grid"
+    grid: dict[str, list[float]] | None = None  # revenue_multiplier / cost_multiplier / payment_delay_days
+    distributions: dict[str, Any] = {}  # Monte Carlo: per-assumption value or distribution spec
+    n_samples: int = Field(10_000, ge=1, le=200_000)
+    seed: int | None = None
+
+
+class SimulationSweepResponse(BaseModel):
+    simulation_id: str
+    mode: str
+    scenario_count: int
+    summary: dict[str, Any]
+    status: str = "completed"
+
+
 class SimulationDetailResponse(BaseModel):
     simulation_id: str
     tenant_id: str
@@ -3777,6 +3932,122 @@ async def create_simulation(request: SimulationRequest, x_tenant_id: str | None
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/v1/simulations/sweep", response_model=SimulationSweepResponse)
+async def create_simulation_sweep(request: SimulationSweepRequest, x_tenant_id: str | None = Header(default="default")):
+    """
+    Evaluate many scenarios against the latest forecast in one vectorized pass.
+
+    mode=grid: every combination of the grid axes (sensitivity surface).
+    mode=monte_carlo: n_samples scenarios drawn from `distributions`, with
+    percentile bands.
+
+    The aggregated result (summary, percentiles and bands, without the
+    per-scenario grid matrices) is persisted as a single scenario_simulations
+    row. Grids are capped at MAX_GRID_SCENARIOS scenarios.
+
+    Feature flag: ENABLE_SIMULATION (default: 1)
+    """
+    if os.getenv("ENABLE_SIMULATION", "1") != "1":
+        raise HTTPException(status_code=403, detail="Simulation feature is disabled")
+
+    try:
+        from datetime import date
+
+        from src.forecast.cashflow import compute_cashflow_forecast, get_latest_forecast, persist_forecast
+        from src.simulations.scenario import persist_simulation
+        from src.simulations.vectorized import (
+            grid_axes,
+            persisted_result,
+            run_grid_simulation,
+            run_monte_carlo_simulation,
+        )
+
+        if request.mode == "grid":
+            try:
+                grid_axes(request.grid)
+            except (TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid sweep parameters: {e}")
+
+        conn = await get_db_connection()
+        try:
+            tenant_uuid = await _get_tenant_uuid(conn, x_tenant_id or "default")
+
+            latest = await get_latest_forecast(conn, tenant_uuid)
+            if not latest:
+                forecast = await compute_cashflow_forecast(
+                    conn=conn,
+                    tenant_id=tenant_uuid,
+                    window_days=request.window_days,
+                )
+                forecast_id = await persist_forecast(conn, tenant_uuid, forecast)
+                latest = {"forecast_id": str(forecast_id), "forecast": forecast}
+
+            base_forecast = latest["forecast"]
+            base_forecast_id = uuid.UUID(latest["forecast_id"])
+
+            try:
+                if request.mode == "grid":
+                    result = run_grid_simulation(base_forecast, request.grid, request.window_days)
+                else:
+                    result = run_monte_carlo_simulation(
+                        base_forecast,
+                        request.distributions,
+                        n_samples=request.n_samples,
+                        window_days=request.window_days,
+                        seed=request.seed,
+                    )
+            except (KeyError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid sweep parameters: {e}")
+
+            simulation_id = await persist_simulation(
+                conn=conn,
+                tenant_id=tenant_uuid,
+                base_forecast_id=base_forecast_id,
+                base_as_of_date=date.fromisoformat(result["base_as_of_date"]),
+                inputs=request.model_dump(),
+                result=persisted_result(result),
+            )
+
+            await conn.execute(
+                """
+                INSERT INTO audit_events (id, job_id, tenant_id, event_type, event_data, created_at)
+                VALUES ($1, $2, $3, $4, $5, NOW())
+            """,
+                uuid.uuid4(),
+                simulation_id,
+                str(tenant_uuid),
+                "scenario_sweep_created",
+                json.dumps(
+                    {
+                        "simulation_id": str(simulation_id),
+                        "base_forecast_id": str(base_forecast_id),
+                        "mode": request.mode,
+                        "scenario_count": result["scenario_count"],
+                    }
+                ),
+            )
+
+            logger.info(
+                f"Created {request.mode} scenario sweep {simulation_id} "
+                f"({result['scenario_count']} scenarios) for tenant {tenant_uuid}"
+            )
+
+            return SimulationSweepResponse(
+                simulation_id=str(simulation_id),
+                mode=request.mode,
+                scenario_count=result["scenario_count"],
+                summary=result["summary"],
+            )
+        finally:
+            await conn.close()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to create simulation sweep: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/v1/simulations/{simulation_id}", response_model=SimulationDetailResponse)
 async def get_simulation_endpoint(simulation_id: str):
     """
@@ -3902,11 +4173,18 @@ async def trigger_cfo_insight(
         finally:
             await conn.close()
 
-        # Process in background (non-blocking)
+        # Process in background (non-blocking); source queries run concurrently on the pool
         async def _process_background():
             bg_conn = await get_db_connection()
             try:
-                await process_insight_async(bg_conn, insight_id, tenant_uuid, request.window_days)
+                await process_insight_async(
+                    bg_conn,
+                    insight_id,
+                    tenant_uuid,
+                    request.window_days,
+                    request.assumptions,
+                    pool=await get_db_pool(),
+                )
             except Exception as e:
                 logger.error(f"Background insight processing failed: {e}")
             finally:
@@ -3994,6 +4272,71 @@ async def get_latest_insights_endpoint(limit: int = 5, x_tenant_id: str | None =
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# (tenant, window_days) snapshots being refreshed, so stale reads trigger one refresh
+_cfo_snapshot_refreshing: set[tuple[uuid.UUID, int]] = set()
+
+
+@app.get("/v1/insights/cfo/snapshot")
+async def get_cfo_insight_snapshot(
+    window_days: int = Query(30, ge=1, le=366), x_tenant_id: str | None = Header(default="default")
+):
+    """
+    Ready CFO insight for the dashboard.
+
+    Served from cfo_insight_snapshots (regenerated by the outbox worker on
+    ledger.posted). A snapshot older than CFO_INSIGHT_SNAPSHOT_MAX_AGE is
+    returned as-is and refreshed in the background; a missing one is
+    generated now from the daily rollups.
+    """
+    if os.getenv("ENABLE_CFO_INSIGHTS", "1") != "1":
+        raise HTTPException(status_code=501, detail="CFO Insights feature is disabled")
+
+    from src.core import config as core_config
+    from src.insights.cfo import get_insight_snapshot, materialize_insight
+
+    pool = await get_db_pool()
+    if not pool:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    try:
+        async with pool.acquire() as conn:
+            tenant_uuid = await _get_tenant_uuid(conn, x_tenant_id or "default")
+            snapshot = await get_insight_snapshot(conn, tenant_uuid, window_days)
+
+        if snapshot is None:
+            result = await materialize_insight(None, tenant_uuid, window_days, pool=pool)
+            return {"window_days": window_days, "result": result, "stale": False}
+
+        age = (datetime.now(timezone.utc) - snapshot["generated_at"]).total_seconds()
+        stale = age > core_config.CFO_INSIGHT_SNAPSHOT_MAX_AGE
+        key = (tenant_uuid, window_days)
+        if stale and key not in _cfo_snapshot_refreshing:
+            _cfo_snapshot_refreshing.add(key)
+
+            async def _refresh():
+                try:
+                    await materialize_insight(None, tenant_uuid, window_days, pool=pool)
+                except Exception as e:
+                    logger.error(f"Background CFO snapshot refresh failed: {e}")
+                finally:
+                    _cfo_snapshot_refreshing.discard(key)
+
+            asyncio.create_task(_refresh())
+
+        return {
+            "window_days": window_days,
+            "result": snapshot["result"],
+            "generated_at": snapshot["generated_at"].isoformat(),
+            "stale": stale,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get CFO insight snapshot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ===========================================================================
 # PR22: System Evidence Endpoint for UI
 # ===========================================================================
@@ -4939,15 +5282,18 @@ async def _test_mlflow():
 
 @app.get("/v1/files/{bucket}/{key:path}")
 async def get_file(
+    request: Request,
     bucket: str, 
     key: str,
     preview: bool = Query(False, description="Render XLSX as HTML if true"),
     user: User | None = Depends(get_optional_user)  # Phase 2.1: Optional Auth for files
 ):
-    """Stream file from MinIO storage (Auth Required)."""
+    """Stream file from MinIO storage (Auth Required). Supports Range and If-None-Match."""
     try:
-        from src.storage import stream_document
-        
+        from src.storage import ObjectNotFound, get_object_store, serve_object
+
+        store = get_object_store()
+
         # Security: Prevent traversing up
         if ".." in key or key.startswith("/"):
              raise HTTPException(status_code=400, detail="Lòng dẫn không hợp lệ.")
@@ -4957,13 +5303,12 @@ async def get_file(
             try:
                 import pandas as pd
                 import io
-                from src.storage import download_document
-                
+
                 # Download full content
-                data = download_document(bucket, key)
-                
+                data = await store.download(bucket, key)
+
                 # Convert to HTML
-                df = pd.read_excel(io.BytesIO(data))
+                df = await asyncio.to_thread(pd.read_excel, io.BytesIO(data))
                 
                 # Premium styling: Sticky headers, Zebra stripes, Hover effects
                 html_table = df.to_html(
@@ -5017,36 +5362,13 @@ async def get_file(
                     content={"ui_message": f"Không thể hiển thị file Excel này: {str(e)}"}
                 )
 
-        # Standard Streaming using helper
+        # Standard streaming (Range / ETag aware, off the event loop)
         try:
-            response_obj, content_type, size = stream_document(bucket, key)
-        except Exception as e:
+            return await serve_object(store, bucket, key, request)
+        except ObjectNotFound as e:
             # Phase 2.3: Map Unauthorized/NotFound
             logger.error(f"MinIO streaming error: {e}")
             raise HTTPException(status_code=404, detail="Không tìm thấy tập tin hoặc không có quyền truy cập.")
-
-        # Phase 2.1: Optimize for browser caching/preview
-        headers = {
-            "Content-Type": content_type,
-            "Cache-Control": "private, max-age=3600",
-            "Content-Disposition": f"inline; filename=\"{os.path.basename(key)}\""
-        }
-        if size:
-            headers["Content-Length"] = str(size)
-
-        def iterfile():
-            try:
-                for chunk in response_obj.stream(32*1024):
-                    yield chunk
-            finally:
-                response_obj.close()
-                response_obj.release_conn()
-
-        return StreamingResponse(
-            iterfile(), 
-            media_type=content_type,
-            headers=headers
-        )
     except HTTPException:
         raise
     except Exception as e:
@@ -5167,88 +5489,85 @@ class ChatResponse(BaseModel):
     context: dict[str, Any] | None = None
 
 
-@app.post("/v1/copilot/chat", response_model=ChatResponse)
-async def chat_copilot(request: ChatRequest):
-    """
-    Chat with the ERPX Copilot with Agentic Capabilities.
-    """
-    try:
-        from src.llm.client import LLMClient
-        from src.copilot import tools
-        import json
+COPILOT_MODULE_TOOLS = {
+    "copilot": [
+        "list_pending_approvals",
+        "get_approval_statistics",
+        "get_approval",
+        "get_document_content",
+        "search_documents",
+        "get_document_ocr_boxes",
+    ],
+    "documents": [
+        "get_document_content",
+        "search_documents",
+        "get_document_ocr_boxes",
+    ],
+    "proposals": [
+        "list_pending_approvals",
+        "get_approval_statistics",
+        "get_approval",
+        "propose_approve",
+        "propose_reject",
+    ],
+    "approvals": [
+        "list_pending_approvals",
+        "get_approval_statistics",
+        "get_approval",
+        "propose_approve",
+        "propose_reject",
+    ],
+    "analyze": [
+        "get_approval_statistics",
+        "list_pending_approvals",
+    ],
+    "evidence": [
+        "list_pending_approvals",
+        "get_approval_statistics",
+    ],
+    "admin": [
+        "list_pending_approvals",
+        "get_approval_statistics",
+    ],
+}
+COPILOT_READ_ONLY_MODULES = {"copilot", "analyze", "evidence", "admin"}
 
-        context = request.context or {}
-        module = (context.get("module") or "copilot").lower()
-        module_aliases = {
-            "document": "documents",
-            "proposal": "proposals",
-            "approval": "approvals",
-        }
-        module = module_aliases.get(module, module)
-        session_id = context.get("session_id") or context.get("chat_session_id") or str(uuid.uuid4())
-        scope = context.get("scope") or {}
 
-        if context.get("confirmed_action"):
-            logger.warning("Confirmed action payload blocked in copilot chat")
-            return ChatResponse(
+def _prepare_copilot_chat(request: ChatRequest) -> dict[str, Any]:
+    """Resolve module/scope/session and build the agent system prompt for a copilot turn."""
+    from src.copilot import tools
+
+    context = request.context or {}
+    module = (context.get("module") or "copilot").lower()
+    module_aliases = {
+        "document": "documents",
+        "proposal": "proposals",
+        "approval": "approvals",
+    }
+    module = module_aliases.get(module, module)
+    session_id = context.get("session_id") or context.get("chat_session_id") or str(uuid.uuid4())
+    scope = context.get("scope") or {}
+
+    if context.get("confirmed_action"):
+        logger.warning("Confirmed action payload blocked in copilot chat")
+        return {
+            "module": module,
+            "session_id": session_id,
+            "blocked": ChatResponse(
                 response="Luồng xác nhận đã chuyển sang Agent Actions. Vui lòng xác nhận trong UI của module.",
                 context={"module": module, "session_id": session_id}
-            )
+            ),
+        }
 
-        client = LLMClient()
+    allowed_tools = COPILOT_MODULE_TOOLS.get(module, COPILOT_MODULE_TOOLS["copilot"])
+    tool_lines = []
+    for tool_name in allowed_tools:
+        tool_info = tools.COPILOT_TOOLS.get(tool_name)
+        if tool_info:
+            tool_lines.append(f"- {tool_name}: {tool_info['description']}")
+    tools_prompt = "\n".join(tool_lines) if tool_lines else "- (no tools)"
 
-        # 2. Agent Decision Loop
-        module_tools = {
-            "copilot": [
-                "list_pending_approvals",
-                "get_approval_statistics",
-                "get_approval",
-                "get_document_content",
-                "search_documents",
-                "get_document_ocr_boxes",
-            ],
-            "documents": [
-                "get_document_content",
-                "search_documents",
-                "get_document_ocr_boxes",
-            ],
-            "proposals": [
-                "list_pending_approvals",
-                "get_approval_statistics",
-                "get_approval",
-                "propose_approve",
-                "propose_reject",
-            ],
-            "approvals": [
-                "list_pending_approvals",
-                "get_approval_statistics",
-                "get_approval",
-                "propose_approve",
-                "propose_reject",
-            ],
-            "analyze": [
-                "get_approval_statistics",
-                "list_pending_approvals",
-            ],
-            "evidence": [
-                "list_pending_approvals",
-                "get_approval_statistics",
-            ],
-            "admin": [
-                "list_pending_approvals",
-                "get_approval_statistics",
-            ],
-        }
-        read_only_modules = {"copilot", "analyze", "evidence", "admin"}
-        allowed_tools = module_tools.get(module, module_tools["copilot"])
-        tool_lines = []
-        for tool_name in allowed_tools:
-            tool_info = tools.COPILOT_TOOLS.get(tool_name)
-            if tool_info:
-                tool_lines.append(f"- {tool_name}: {tool_info['description']}")
-        tools_prompt = "\n".join(tool_lines) if tool_lines else "- (no tools)"
-
-        system_prompt = f"""Bạn là ERPX Copilot, trợ lý kế toán AI cao cấp.
+    system_prompt = f"""Bạn là ERPX Copilot, trợ lý kế toán AI cao cấp.
 MODULE: {module}
 SCOPE: {json.dumps(scope, ensure_ascii=False)}
         
@@ -5270,16 +5589,207 @@ SCOPE: {json.dumps(scope, ensure_ascii=False)}
             "params": {{ ... parameters ... }},
             "response": "Text response to user (optional if tool is called)"
         }}
-        """
+    """
+
+    return {
+        "module": module,
+        "session_id": session_id,
+        "scope": scope,
+        "tenant_id": context.get("tenant_id") or scope.get("tenant_id"),
+        "allowed_tools": allowed_tools,
+        "system_prompt": system_prompt,
+        "blocked": None,
+    }
+
+
+async def _execute_copilot_decision(decision: dict[str, Any], chat: dict[str, Any]) -> ChatResponse:
+    """Run the tool chosen by the agent (read tools directly, write tools as proposals)."""
+    from src.copilot import tools
+
+    module = chat["module"]
+    session_id = chat["session_id"]
+    scope = chat["scope"]
+    allowed_tools = chat["allowed_tools"]
+
+    tool = decision.get("tool")
+    params = decision.get("params", {})
+    thought = decision.get("thought", "")
+
+    # 3. Execution Logic
+    if tool and tool not in allowed_tools:
+        return ChatResponse(
+            response="Module hiện tại không cho phép hành động này. Vui lòng dùng đúng module nghiệp vụ.",
+            context={"module": module, "session_id": session_id}
+        )
+
+    def apply_scope_param(param_key: str, scope_key: str) -> bool:
+        scoped_value = scope.get(scope_key) if isinstance(scope, dict) else None
+        if scoped_value:
+            if param_key in params and params[param_key] != scoped_value:
+                return False
+            params[param_key] = params.get(param_key) or scoped_value
+        return True
+    
+    # Read-Only Tools (Auto-Execute)
+    if tool == "list_pending_approvals":
+        LIMIT = params.get("limit", 10)
+        rows = await tools.list_pending_approvals(limit=LIMIT)
+        if not rows:
+            return ChatResponse(response="Hiện không có chứng từ nào chờ duyệt.")
         
-        # User prompt wrapper
-        prompt = request.message
+        # Format text response using enriched tool output
+        summary = "**Danh sách chờ duyệt:**\n"
+        for r in rows:
+            doc_name = r.get('doc_name') or "Tài liệu"
+            vendor = r.get('counterparty') or "Khách lẻ"
+            amount = r.get('amount') or 0
+            currency = r.get('currency') or "VND"
+            summary += f"- 📄 **{doc_name}** ({vendor}): {amount:,.0f} {currency} (ID: `{r['id']}`) - File: {r.get('file_name')}\n"
+        
+        return ChatResponse(response=summary)
+
+    elif tool == "get_approval_statistics":
+        stats = await tools.get_approval_statistics()
+        if "error" in stats:
+            return ChatResponse(response=f"⚠️ Lỗi lấy thống kê: {stats['error']}")
         
+        summary = "**Thống kê duyệt:**\n"
+        confirmed_pending = stats.get('pending', 0)
+        confirmed_approved = stats.get('approved', 0)
+        confirmed_rejected = stats.get('rejected', 0)
+        
+        summary += f"- ⏳ **Chờ duyệt**: {confirmed_pending}\n"
+        summary += f"- ✅ **Đã lấy**: {confirmed_approved}\n"
+        summary += f"- ❌ **Từ chối**: {confirmed_rejected}\n"
+        
+        total = confirmed_pending + confirmed_approved + confirmed_rejected
+        summary += f"\nTổng số chứng từ: **{total}**"
+        
+        return ChatResponse(response=summary)
+
+    elif tool == "get_approval":
+        if not apply_scope_param("approval_id", "approval_id"):
+            return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
+        approval_id = params.get("approval_id")
+        if not approval_id:
+            return ChatResponse(response="Tôi cần approval_id để tra cứu.")
+        approval = await tools.get_approval(approval_id)
+        if not approval:
+            return ChatResponse(response="Không tìm thấy chứng từ cần tra cứu.")
+        return ChatResponse(
+            response=(
+                f"**Chi tiết chứng từ:**\n"
+                f"- Nhà cung cấp: {approval.get('counterparty') or '-'}\n"
+                f"- Số tiền: {approval.get('amount') or 0:,.0f} {approval.get('currency') or 'VND'}\n"
+                f"- Trạng thái: {approval.get('status') or 'pending'}\n"
+                f"- Số hóa đơn: {approval.get('invoice_no') or '-'}"
+            )
+        )
+
+    elif tool == "get_document_content":
+        if not apply_scope_param("document_id", "document_id"):
+            return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
+        document_id = params.get("document_id")
+        if not document_id:
+            return ChatResponse(response="Tôi cần document_id để đọc nội dung.")
+        doc = await tools.get_document_content(document_id)
+        if not doc.get("found"):
+            return ChatResponse(response="Không tìm thấy chứng từ hoặc chưa có OCR.")
+        fields = doc.get("extracted_fields") or {}
+        return ChatResponse(
+            response=(
+                f"**Tóm tắt chứng từ:**\n"
+                f"- Vendor: {fields.get('vendor_name') or '-'}\n"
+                f"- Số HĐ: {fields.get('invoice_number') or '-'}\n"
+                f"- Ngày: {fields.get('invoice_date') or '-'}\n"
+                f"- Tổng tiền: {fields.get('total_amount') or 0:,.0f} {fields.get('currency') or 'VND'}\n"
+                f"- OCR confidence: {doc.get('ocr_confidence') or doc.get('doc_type_confidence') or 0}"
+            )
+        )
+
+    elif tool == "search_documents":
+        query = params.get("query") or ""
+        if not query:
+            return ChatResponse(response="Tôi cần từ khóa để tìm chứng từ.")
+        doc_type = params.get("doc_type")
+        limit = params.get("limit", 10)
+        results = await tools.search_documents(
+            query=query, doc_type=doc_type, limit=limit, tenant_id=chat.get("tenant_id")
+        )
+        if not results:
+            return ChatResponse(response="Không tìm thấy chứng từ phù hợp.")
+        lines = ["**Kết quả tìm kiếm:**"]
+        for r in results[:limit]:
+            lines.append(
+                f"- {r.get('vendor_name') or 'N/A'} | {r.get('invoice_number') or '-'} | "
+                f"{r.get('total_amount') or 0:,.0f} {r.get('currency') or 'VND'} "
+                f"(doc_id: {r.get('document_id') or '-'})"
+            )
+        return ChatResponse(response="\n".join(lines))
+
+    elif tool == "get_document_ocr_boxes":
+        if not apply_scope_param("document_id", "document_id"):
+            return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
+        document_id = params.get("document_id")
+        if not document_id:
+            return ChatResponse(response="Tôi cần document_id để lấy OCR boxes.")
+        boxes = await tools.get_document_ocr_boxes(document_id)
+        if boxes.get("error"):
+            return ChatResponse(response=f"Không lấy được OCR boxes: {boxes.get('error')}")
+        return ChatResponse(response="Đã sẵn sàng hiển thị OCR overlay cho chứng từ này.")
+
+    # Write Tools (Propose only)
+    elif tool in ["propose_approve", "propose_reject"]:
+        if module in COPILOT_READ_ONLY_MODULES:
+            return ChatResponse(response="Module hiện tại chỉ đọc. Vui lòng dùng Approvals/Proposals để đề xuất hành động.")
+        if not apply_scope_param("approval_id", "approval_id"):
+            return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
+        params["session_id"] = params.get("session_id") or session_id
+        approval_id = params.get("approval_id")
+        if not approval_id:
+            return ChatResponse(response="Tôi cần approval_id để đề xuất.")
+        result = await tools.COPILOT_TOOLS[tool]["function"](**params)
+        if not result or not result.get("success"):
+            return ChatResponse(response=result.get("error") if result else "Không thể tạo đề xuất.")
+        proposal_payload = {
+            "action_id": result.get("action_id"),
+            "action_type": result.get("action_type"),
+            "description": result.get("description"),
+            "status": result.get("status") or "proposed",
+            "requires_confirmation": True,
+        }
+        return ChatResponse(
+            response=result.get("message") or "Đã tạo đề xuất hành động.",
+            action_proposals=[proposal_payload],
+            context={"module": module, "session_id": session_id}
+        )
+
+    # Default / Conversational
+    return ChatResponse(
+        response=decision.get("response") or thought,
+        context={"module": module, "session_id": session_id}
+    )
+
+
+@app.post("/v1/copilot/chat", response_model=ChatResponse)
+async def chat_copilot(request: ChatRequest):
+    """
+    Chat with the ERPX Copilot with Agentic Capabilities.
+    """
+    try:
+        from src.llm.client import LLMClient
+
+        chat = _prepare_copilot_chat(request)
+        if chat["blocked"]:
+            return chat["blocked"]
+
+        client = LLMClient()
+
         # Call LLM
         try:
             decision = await client.generate_json(
-                prompt=prompt,
-                system=system_prompt,
+                prompt=request.message,
+                system=chat["system_prompt"],
                 temperature=0.1
             )
         except Exception as e:
@@ -5287,163 +5797,82 @@ SCOPE: {json.dumps(scope, ensure_ascii=False)}
             logger.warning(f"Agent JSON parse failed: {e}")
             return ChatResponse(response="I'm having trouble processing that request. Please try again.")
 
-        tool = decision.get("tool")
-        params = decision.get("params", {})
-        thought = decision.get("thought", "")
+        return await _execute_copilot_decision(decision, chat)
 
-        # 3. Execution Logic
-        if tool and tool not in allowed_tools:
-            return ChatResponse(
-                response="Module hiện tại không cho phép hành động này. Vui lòng dùng đúng module nghiệp vụ.",
-                context={"module": module, "session_id": session_id}
-            )
+    except Exception as e:
+        logger.error(f"Copilot chat failed: {e}")
+        return ChatResponse(response="Sorry, I encountered an internal system error.")
 
-        def apply_scope_param(param_key: str, scope_key: str) -> bool:
-            scoped_value = scope.get(scope_key) if isinstance(scope, dict) else None
-            if scoped_value:
-                if param_key in params and params[param_key] != scoped_value:
-                    return False
-                params[param_key] = params.get(param_key) or scoped_value
-            return True
-        
-        # Read-Only Tools (Auto-Execute)
-        if tool == "list_pending_approvals":
-            LIMIT = params.get("limit", 10)
-            rows = await tools.list_pending_approvals(limit=LIMIT)
-            if not rows:
-                return ChatResponse(response="Hiện không có chứng từ nào chờ duyệt.")
-            
-            # Format text response using enriched tool output
-            summary = "**Danh sách chờ duyệt:**\n"
-            for r in rows:
-                doc_name = r.get('doc_name') or "Tài liệu"
-                vendor = r.get('counterparty') or "Khách lẻ"
-                amount = r.get('amount') or 0
-                currency = r.get('currency') or "VND"
-                summary += f"- 📄 **{doc_name}** ({vendor}): {amount:,.0f} {currency} (ID: `{r['id']}`) - File: {r.get('file_name')}\n"
-            
-            return ChatResponse(response=summary)
 
-        elif tool == "get_approval_statistics":
-            stats = await tools.get_approval_statistics()
-            if "error" in stats:
-                return ChatResponse(response=f"⚠️ Lỗi lấy thống kê: {stats['error']}")
-            
-            summary = "**Thống kê duyệt:**\n"
-            confirmed_pending = stats.get('pending', 0)
-            confirmed_approved = stats.get('approved', 0)
-            confirmed_rejected = stats.get('rejected', 0)
-            
-            summary += f"- ⏳ **Chờ duyệt**: {confirmed_pending}\n"
-            summary += f"- ✅ **Đã lấy**: {confirmed_approved}\n"
-            summary += f"- ❌ **Từ chối**: {confirmed_rejected}\n"
-            
-            total = confirmed_pending + confirmed_approved + confirmed_rejected
-            summary += f"\nTổng số chứng từ: **{total}**"
-            
-            return ChatResponse(response=summary)
-
-        elif tool == "get_approval":
-            if not apply_scope_param("approval_id", "approval_id"):
-                return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
-            approval_id = params.get("approval_id")
-            if not approval_id:
-                return ChatResponse(response="Tôi cần approval_id để tra cứu.")
-            approval = await tools.get_approval(approval_id)
-            if not approval:
-                return ChatResponse(response="Không tìm thấy chứng từ cần tra cứu.")
-            return ChatResponse(
-                response=(
-                    f"**Chi tiết chứng từ:**\n"
-                    f"- Nhà cung cấp: {approval.get('counterparty') or '-'}\n"
-                    f"- Số tiền: {approval.get('amount') or 0:,.0f} {approval.get('currency') or 'VND'}\n"
-                    f"- Trạng thái: {approval.get('status') or 'pending'}\n"
-                    f"- Số hóa đơn: {approval.get('invoice_no') or '-'}"
-                )
-            )
+@app.post("/v1/copilot/chat/stream")
+async def chat_copilot_stream(request: ChatRequest):
+    """
+    Streaming variant of /v1/copilot/chat (text/event-stream).
+
+    Events:
+    - reasoning: {"text"} model thinking as it is generated
+    - delta: {"text"} incremental "response" text of the agent decision
+    - tool: {"tool", "params"} emitted as soon as the decision JSON is
+      complete; generation is cut off there and the tool runs immediately
+    - final: ChatResponse payload (same as the non-streaming endpoint)
+    """
+    from core.json_utils import safe_json_loads, try_parse_json_robust
+    from src.llm.client import LLMClient
+    from src.llm.streaming import JsonObjectDetector, format_sse, partial_string_field
 
-        elif tool == "get_document_content":
-            if not apply_scope_param("document_id", "document_id"):
-                return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
-            document_id = params.get("document_id")
-            if not document_id:
-                return ChatResponse(response="Tôi cần document_id để đọc nội dung.")
-            doc = await tools.get_document_content(document_id)
-            if not doc.get("found"):
-                return ChatResponse(response="Không tìm thấy chứng từ hoặc chưa có OCR.")
-            fields = doc.get("extracted_fields") or {}
-            return ChatResponse(
-                response=(
-                    f"**Tóm tắt chứng từ:**\n"
-                    f"- Vendor: {fields.get('vendor_name') or '-'}\n"
-                    f"- Số HĐ: {fields.get('invoice_number') or '-'}\n"
-                    f"- Ngày: {fields.get('invoice_date') or '-'}\n"
-                    f"- Tổng tiền: {fields.get('total_amount') or 0:,.0f} {fields.get('currency') or 'VND'}\n"
-                    f"- OCR confidence: {doc.get('ocr_confidence') or doc.get('doc_type_confidence') or 0}"
-                )
-            )
+    async def events():
+        try:
+            chat = _prepare_copilot_chat(request)
+            if chat["blocked"]:
+                yield format_sse("final", chat["blocked"].model_dump())
+                return
+
+            client = LLMClient()
+            detector = JsonObjectDetector()
+            decision = None
+            sent = 0
+
+            stream = client.stream(prompt=request.message, system=chat["system_prompt"], temperature=0.1)
+            async with aclosing(stream) as chunks:
+                async for chunk in chunks:
+                    if chunk.reasoning:
+                        yield format_sse("reasoning", {"text": chunk.reasoning})
+                    if not chunk.content:
+                        continue
 
-        elif tool == "search_documents":
-            query = params.get("query") or ""
-            if not query:
-                return ChatResponse(response="Tôi cần từ khóa để tìm chứng từ.")
-            doc_type = params.get("doc_type")
-            limit = params.get("limit", 10)
-            results = await tools.search_documents(query=query, doc_type=doc_type, limit=limit)
-            if not results:
-                return ChatResponse(response="Không tìm thấy chứng từ phù hợp.")
-            lines = ["**Kết quả tìm kiếm:**"]
-            for r in results[:limit]:
-                lines.append(
-                    f"- {r.get('vendor_name') or 'N/A'} | {r.get('invoice_number') or '-'} | "
-                    f"{r.get('total_amount') or 0:,.0f} {r.get('currency') or 'VND'} "
-                    f"(doc_id: {r.get('document_id') or '-'})"
-                )
-            return ChatResponse(response="\n".join(lines))
-
-        elif tool == "get_document_ocr_boxes":
-            if not apply_scope_param("document_id", "document_id"):
-                return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
-            document_id = params.get("document_id")
-            if not document_id:
-                return ChatResponse(response="Tôi cần document_id để lấy OCR boxes.")
-            boxes = await tools.get_document_ocr_boxes(document_id)
-            if boxes.get("error"):
-                return ChatResponse(response=f"Không lấy được OCR boxes: {boxes.get('error')}")
-            return ChatResponse(response="Đã sẵn sàng hiển thị OCR overlay cho chứng từ này.")
-
-        # Write Tools (Propose only)
-        elif tool in ["propose_approve", "propose_reject"]:
-            if module in read_only_modules:
-                return ChatResponse(response="Module hiện tại chỉ đọc. Vui lòng dùng Approvals/Proposals để đề xuất hành động.")
-            if not apply_scope_param("approval_id", "approval_id"):
-                return ChatResponse(response="Scope không khớp với yêu cầu. Vui lòng mở đúng chứng từ.")
-            params["session_id"] = params.get("session_id") or session_id
-            approval_id = params.get("approval_id")
-            if not approval_id:
-                return ChatResponse(response="Tôi cần approval_id để đề xuất.")
-            result = await tools.COPILOT_TOOLS[tool]["function"](**params)
-            if not result or not result.get("success"):
-                return ChatResponse(response=result.get("error") if result else "Không thể tạo đề xuất.")
-            proposal_payload = {
-                "action_id": result.get("action_id"),
-                "action_type": result.get("action_type"),
-                "description": result.get("description"),
-                "status": result.get("status") or "proposed",
-                "requires_confirmation": True,
-            }
-            return ChatResponse(
-                response=result.get("message") or "Đã tạo đề xuất hành động.",
-                action_proposals=[proposal_payload],
-                context={"module": module, "session_id": session_id}
-            )
+                    obj_text = detector.feed(chunk.content)
+                    response_text = partial_string_field(detector.buffer, "response")
+                    if len(response_text) > sent:
+                        yield format_sse("delta", {"text": response_text[sent:]})
+                        sent = len(response_text)
+
+                    if obj_text is not None:
+                        decision, _ = safe_json_loads(obj_text)
+                        if isinstance(decision, dict):
+                            break  # decision complete: stop generating, run the tool now
+
+            if not isinstance(decision, dict):
+                decision, err, _ = try_parse_json_robust(detector.buffer)
+                if not isinstance(decision, dict):
+                    logger.warning(f"Agent JSON parse failed (stream): {err}")
+                    yield format_sse(
+                        "final",
+                        ChatResponse(response="I'm having trouble processing that request. Please try again.").model_dump(),
+                    )
+                    return
 
-        # Default / Conversational
-        return ChatResponse(
-            response=decision.get("response") or thought,
-            context={"module": module, "session_id": session_id}
-        )
+            if decision.get("tool") and decision.get("tool") != "none":
+                yield format_sse("tool", {"tool": decision.get("tool"), "params": decision.get("params") or {}})
 
-    except Exception as e:
-        logger.error(f"Copilot chat failed: {e}")
-        return ChatResponse(response="Sorry, I encountered an internal system error.")
+            response = await _execute_copilot_decision(decision, chat)
+            yield format_sse("final", response.model_dump())
+
+        except Exception as e:
+            logger.error(f"Copilot chat stream failed: {e}")
+            yield format_sse("final", ChatResponse(response="Sorry, I encountered an internal system error.").model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,14 +6,14 @@ Adds request_id to every request for tracing.
 
 import uuid
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Import from core.logging for centralized request_id management
 from core.logging import get_request_id, reset_request_id, set_request_id
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
+class RequestIdMiddleware:
     """
     Middleware that extracts or generates a request ID for every request.
 
@@ -21,27 +21,40 @@ class RequestIdMiddleware(BaseHTTPMiddleware):
     1. X-Request-Id header
     2. X-Trace-Id header
     3. Generate new UUID
+
+    Pure ASGI, so the context var stays set for the whole response
+    (including streamed bodies) without BaseHTTPMiddleware's extra task.
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Extract from headers or generate new
+        headers = Headers(scope=scope)
         request_id = (
-            request.headers.get("X-Request-Id")
-            or request.headers.get("X-Trace-Id")
+            headers.get("X-Request-Id")
+            or headers.get("X-Trace-Id")
             or str(uuid.uuid4())[:8]  # Short UUID for readability
         )
 
         # Store in request.state for endpoint access
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add request_id to response headers for tracing
+                MutableHeaders(scope=message)["X-Request-Id"] = request_id
+            await send(message)
 
         # Store in context var for logging - get token for proper reset
         token = set_request_id(request_id)
-
         try:
-            response = await call_next(request)
-            # Add request_id to response headers for tracing
-            response.headers["X-Request-Id"] = request_id
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
             # Reset to previous context value using token (async-safe)
             reset_request_id(token)
@@ -0,0 +1,127 @@
+"""
+ERPX AI Accounting - List Pagination Helpers
+============================================
+Keyset (cursor) pagination on (created_at, id) and cached/estimated totals
+for the list endpoints (documents, journal proposals, approvals, jobs).
+
+Keyset pages cost the same at any depth (an index range scan on
+created_at DESC), unlike LIMIT/OFFSET which re-reads every skipped row.
+
+Usage:
+    where, params = keyset_condition(cursor, "d.created_at", "d.id", len(params) + 1)
+    rows = await conn.fetch(sql + " ORDER BY d.created_at DESC, d.id DESC LIMIT $n", ..., limit + 1)
+    rows, next_cursor = paginate(rows, limit)
+    total, estimated = await count_cache.count(conn, "documents", where_sql, filter_params)
+"""
+
+import base64
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+
+logger = logging.getLogger("erpx.api.pagination")
+
+COUNT_CACHE_TTL = float(os.getenv("LIST_COUNT_CACHE_TTL", "30"))
+# Unfiltered totals above this come from pg_class.reltuples instead of COUNT(*)
+EXACT_COUNT_THRESHOLD = int(os.getenv("LIST_EXACT_COUNT_THRESHOLD", "100000"))
+
+
+def encode_cursor(created_at: datetime | str, row_id: Any) -> str:
+    """Opaque cursor for the row a page ended on (created_at as datetime or ISO string)."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps({"t": created_at, "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor; 400 if it was not produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), payload["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_condition(
+    cursor: str | None, created_col: str, id_col: str, param_idx: int, id_cast: str = "uuid"
+) -> tuple[str | None, list]:
+    """
+    SQL condition selecting rows after the cursor in (created_at DESC, id DESC)
+    order, and its parameters (numbered from param_idx).
+    """
+    if not cursor:
+        return None, []
+    created_at, row_id = decode_cursor(cursor)
+    condition = f"({created_col}, {id_col}) < (${param_idx}::timestamptz, ${param_idx + 1}::{id_cast})"
+    return condition, [created_at, row_id]
+
+
+def paginate(rows: Sequence, limit: int, created_key: str = "created_at", id_key: str = "id") -> tuple[list, str | None]:
+    """
+    Trim a `limit + 1` fetch to one page and build the next cursor
+    (None on the last page).
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last[created_key], last[id_key])
+
+
+class CountCache:
+    """
+    Short-lived cache of list totals keyed by (table, filter SQL, params).
+
+    Unfiltered counts on large tables use the planner estimate
+    (pg_class.reltuples); filtered counts are exact but cached for
+    COUNT_CACHE_TTL seconds, so paging through a list costs one COUNT(*)
+    per TTL instead of one per page.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL, exact_threshold: int = EXACT_COUNT_THRESHOLD):
+        self.ttl = ttl
+        self.exact_threshold = exact_threshold
+        self._entries: dict[tuple, tuple[float, int, bool]] = {}
+
+    async def count(
+        self, conn, table: str, where: str = "", params: Sequence = (), alias: str = ""
+    ) -> tuple[int, bool]:
+        """Return (total, is_estimate) for `SELECT COUNT(*) FROM table alias where`."""
+        key = (table, where, tuple(str(p) for p in params))
+        cached = self._entries.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < self.ttl:
+            return cached[1], cached[2]
+
+        total, estimated = None, False
+        if not where:
+            estimate = await conn.fetchval(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass($1)", table
+            )
+            if estimate is not None and estimate >= self.exact_threshold:
+                total, estimated = int(estimate), True
+
+        if total is None:
+            total = await conn.fetchval(f"SELECT COUNT(*) FROM {table} {alias} {where}", *params) or 0
+
+        if len(self._entries) > 1024:
+            self._entries.clear()
+        self._entries[key] = (now, total, estimated)
+        return total, estimated
+
+    def invalidate(self, table: str | None = None) -> None:
+        if table is None:
+            self._entries.clear()
+        else:
+            self._entries = {k: v for k, v in self._entries.items() if k[0] != table}
+
+
+count_cache = CountCache()
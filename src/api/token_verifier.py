@@ -0,0 +1,265 @@
+"""
+ERPX AI - Token Verification
+============================
+Keeps JWT verification off the network and mostly off the CPU:
+
+- JWKSCache:      holds the IdP signing keys as an immutable {kid: key}
+                  snapshot, refreshed by a background task and on demand
+                  (rate-limited, single-flight) when a token names an
+                  unknown kid. If the IdP is unreachable the last good key
+                  set keeps serving.
+- ClaimsCache:    bounded LRU of verified claims keyed by the token's
+                  SHA256, expiring at the token's own ``exp``
+- TokenVerifier:  cache lookup, then RS256 verification with a cached key
+
+A repeat request with the same bearer token costs one hash and one dict
+lookup instead of a signature check (and never a Keycloak round-trip).
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+import jwt
+
+logger = logging.getLogger("erpx.auth")
+
+JWKS_REFRESH_INTERVAL = float(os.getenv("JWKS_REFRESH_INTERVAL", "300"))
+# Minimum gap between on-demand refreshes triggered by unknown kids
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
+# Upper bound on how long verified claims are reused, whatever the token's exp
+AUTH_CLAIMS_CACHE_TTL = float(os.getenv("AUTH_CLAIMS_CACHE_TTL", "300"))
+
+
+class JWKSUnavailable(Exception):
+    """No signing keys have ever been loaded and the IdP cannot be reached."""
+
+    pass
+
+
+def http_jwks_fetcher(url: str, timeout: float = JWKS_FETCH_TIMEOUT) -> Callable[[], Awaitable[dict]]:
+    """Async JWKS document fetcher for ``url``."""
+
+    async def fetch() -> dict:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            return resp.json()
+
+    return fetch
+
+
+def parse_jwks(data: dict) -> dict[str, jwt.PyJWK]:
+    """Signing keys by kid; encryption and unsupported keys are skipped."""
+    keys = {}
+    for jwk in data.get("keys", []):
+        if jwk.get("use", "sig") != "sig" or "kid" not in jwk:
+            continue
+        try:
+            keys[jwk["kid"]] = jwt.PyJWK.from_dict(jwk)
+        except (jwt.PyJWKError, jwt.InvalidKeyError) as e:
+            logger.debug(f"[JWKS] Skipping key {jwk.get('kid')}: {e}")
+    return keys
+
+
+class JWKSCache:
+    """Signing keys for one issuer, refreshed in the background."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[dict]],
+        refresh_interval: float = JWKS_REFRESH_INTERVAL,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._clock = clock
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._loaded = False
+        self._last_attempt = float("-inf")
+        self._inflight: asyncio.Task | None = None
+        self._task: asyncio.Task | None = None
+        self.fetches = 0
+
+    @property
+    def kids(self) -> set[str]:
+        return set(self._keys)
+
+    async def refresh(self) -> bool:
+        """Reload keys; concurrent callers share one fetch. False if it failed."""
+        task = self._inflight
+        if task is None or task.done():
+            task = self._inflight = asyncio.ensure_future(self._load())
+        return await asyncio.shield(task)
+
+    async def _load(self) -> bool:
+        self._last_attempt = self._clock()
+        self.fetches += 1
+        try:
+            keys = parse_jwks(await self._fetch())
+        except Exception as e:
+            if self._loaded:
+                logger.warning(f"[JWKS] Refresh failed, keeping {len(self._keys)} cached keys: {e}")
+            else:
+                logger.error(f"[JWKS] Could not load signing keys: {e}")
+            return False
+        if not keys:
+            logger.warning("[JWKS] IdP returned no usable signing keys; keeping previous set")
+            return False
+        if set(keys) != set(self._keys):
+            logger.info(f"[JWKS] Loaded signing keys: {sorted(keys)}")
+        self._keys = keys
+        self._loaded = True
+        return True
+
+    async def get_key(self, kid: str | None) -> jwt.PyJWK:
+        """
+        Key for ``kid``. An unknown kid triggers at most one refresh per
+        min_refresh_interval, so forged kids cannot hammer the IdP.
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        if not self._loaded or self._clock() - self._last_attempt >= self.min_refresh_interval:
+            await self.refresh()
+            key = self._keys.get(kid)
+            if key is not None:
+                return key
+        if not self._loaded:
+            raise JWKSUnavailable("Signing keys unavailable")
+        raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"[JWKS] Background refresh failed: {e}")
+            # Retry sooner while nothing has ever loaded
+            await asyncio.sleep(self.refresh_interval if self._loaded else min(self.refresh_interval, 5.0))
+
+    def ensure_running(self) -> None:
+        """Start background prefetch/rotation on the current loop if not already running there."""
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run(), name="jwks-refresh")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+class ClaimsCache:
+    """LRU of verified claims by token hash; entries die at the token's exp."""
+
+    def __init__(
+        self,
+        max_size: int = AUTH_CLAIMS_CACHE_SIZE,
+        max_ttl: float = AUTH_CLAIMS_CACHE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, key: bytes, claims: dict) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = self._clock() + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TokenVerifier:
+    """Verify bearer tokens against a JWKSCache, reusing verified claims."""
+
+    def __init__(
+        self,
+        jwks: JWKSCache,
+        issuer: str | None,
+        algorithms: tuple[str, ...] = ("RS256",),
+        cache: ClaimsCache | None = None,
+    ):
+        self.jwks = jwks
+        self.issuer = issuer
+        self.algorithms = list(algorithms)
+        self.cache = cache if cache is not None else ClaimsCache()
+        self.options = {
+            "verify_signature": True,
+            "verify_exp": True,
+            "verify_aud": False,  # Keycloak doesn't always set aud
+            "verify_iss": issuer is not None,
+        }
+
+    async def verify(self, token: str) -> dict:
+        """
+        Decoded claims for ``token``.
+
+        Raises jwt.InvalidTokenError (incl. ExpiredSignatureError) for bad
+        tokens and JWKSUnavailable if no keys could ever be loaded.
+        """
+        cache_key = self.cache.key(token)
+        claims = self.cache.get(cache_key)
+        if claims is not None:
+            return dict(claims)
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await self.jwks.get_key(kid)
+        claims = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=self.algorithms,
+            issuer=self.issuer,
+            options=self.options,
+        )
+        self.cache.put(cache_key, claims)
+        return dict(claims)
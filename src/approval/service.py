@@ -28,6 +28,7 @@ async def list_pending_approvals(
     status: str = "pending",
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[dict]:
     """
     List approvals with given status.
@@ -37,7 +38,8 @@ async def list_pending_approvals(
         tenant_id: Filter by tenant (optional)
         status: Filter by status (pending/approved/rejected)
         limit: Max results
-        offset: Pagination offset
+        offset: Pagination offset (ignored when cursor is given)
+        cursor: Keyset cursor on (created_at, id) from src.api.pagination
 
     Returns:
         List of approval records with proposal context
@@ -77,11 +79,19 @@ async def list_pending_approvals(
         query += " AND a.tenant_id = $2"
         params.append(uuid.UUID(tenant_id) if isinstance(tenant_id, str) and len(tenant_id) > 10 else tenant_id)
 
+    if cursor:
+        from src.api.pagination import keyset_condition
+
+        keyset, keyset_params = keyset_condition(cursor, "a.created_at", "a.id", len(params) + 1)
+        query += f" AND {keyset}"
+        params.extend(keyset_params)
+        offset = 0
+
     # Use numbered parameters correctly for limit and offset
     limit_idx = len(params) + 1
     offset_idx = len(params) + 2
     
-    query += f" ORDER BY a.created_at DESC LIMIT ${limit_idx} OFFSET ${offset_idx}"
+    query += f" ORDER BY a.created_at DESC, a.id DESC LIMIT ${limit_idx} OFFSET ${offset_idx}"
     params.append(limit)
     params.append(offset)
 
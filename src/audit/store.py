@@ -34,6 +34,70 @@ def truncate_text(text: str | None, max_length: int) -> str:
     return text[: max_length - 3] + "..."
 
 
+AUDIT_EVENT_INSERT_SQL = """
+    INSERT INTO audit_events (id, job_id, tenant_id, request_id, event_type, event_data, actor)
+    VALUES ($1, $2, $3, $4::text, $5, $6, $7)
+"""
+
+# Lightweight per-stage evidence (extract/classify/propose) in audit_evidence
+EVIDENCE_LOG_INSERT_SQL = """
+    INSERT INTO audit_evidence (
+        id, document_id, job_id, tenant_id, llm_stage, decision,
+        llm_input_preview, llm_output_raw, created_at, updated_at
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW(), NOW())
+"""
+
+
+def audit_event_row(
+    job_id: str,
+    tenant_id: str,
+    event_type: str,
+    event_data: dict | None = None,
+    actor: str = "system",
+    request_id: str | None = None,
+) -> tuple:
+    """Parameters for AUDIT_EVENT_INSERT_SQL (the first element is the new event id)."""
+    return (
+        uuid.uuid4(),
+        uuid.UUID(job_id) if job_id else None,
+        tenant_id,
+        request_id,
+        event_type,
+        json.dumps(event_data or {}),
+        actor,
+    )
+
+
+def evidence_log_row(
+    document_id: str | None,
+    stage: str,
+    output_summary: dict | str,
+    decision: str = "info",
+    job_id: str | None = None,
+    input_preview: str | None = None,
+    action: str | None = None,
+    tenant_id: str | None = None,
+) -> tuple:
+    """Parameters for EVIDENCE_LOG_INSERT_SQL."""
+    if isinstance(output_summary, dict):
+        if action:
+            output_summary["action"] = action
+        output_summary = json.dumps(output_summary, ensure_ascii=False)
+
+    doc_uuid = uuid.UUID(str(document_id)) if document_id else None
+    job_uuid = uuid.UUID(str(job_id)) if job_id else doc_uuid
+    return (
+        str(uuid.uuid4()),
+        doc_uuid,
+        job_uuid,
+        str(tenant_id) if tenant_id else "default",  # DB requires not null
+        stage,
+        decision,
+        input_preview,
+        output_summary,
+    )
+
+
 async def create_audit_evidence(
     conn,
     job_id: str,
@@ -176,24 +240,11 @@ async def append_audit_event(
     Returns:
         Created event UUID
     """
-    event_id = str(uuid.uuid4())
-
-    await conn.execute(
-        """
-        INSERT INTO audit_events (id, job_id, tenant_id, request_id, event_type, event_data, actor)
-        VALUES ($1, $2, $3, $4::text, $5, $6, $7)
-        """,
-        uuid.UUID(event_id),
-        uuid.UUID(job_id) if job_id else None,
-        tenant_id,
-        request_id,
-        event_type,
-        json.dumps(event_data or {}),
-        actor,
-    )
+    row = audit_event_row(job_id, tenant_id, event_type, event_data, actor, request_id)
+    await conn.execute(AUDIT_EVENT_INSERT_SQL, *row)
 
     logger.debug(f"[{request_id}] Audit event {event_type} for job {job_id}")
-    return event_id
+    return str(row[0])
 
 
 async def get_audit_evidence(conn, job_id: str) -> dict | None:
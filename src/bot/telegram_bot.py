@@ -11,6 +11,7 @@ Features:
 """
 
 import asyncio
+import json
 import logging
 import os
 import sys
@@ -103,6 +104,54 @@ async def get_job_status(job_id: str) -> dict[str, Any]:
         return response.json()
 
 
+async def watch_job_events(job_id: str, max_reconnects: int = 5):
+    """
+    Follow a job's progress stream (SSE) until it finishes, reconnecting with
+    the last seen event id. Yields job event dicts.
+    """
+    last_event_id = None
+    reconnects = 0
+    while reconnects <= max_reconnects:
+        headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+        try:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=None)) as client:
+                async with client.stream(
+                    "GET", f"{API_BASE_URL}/v1/jobs/{job_id}/events", headers=headers
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        event = json.loads(line[5:])
+                        last_event_id = event["id"]
+                        reconnects = 0
+                        yield event
+                        if event.get("status") in ("completed", "failed"):
+                            return
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Job event stream for {job_id} interrupted: {e}")
+        reconnects += 1
+        await asyncio.sleep(min(2**reconnects, 30))
+
+
+async def notify_job_progress(bot, chat_id: int, job_id: str):
+    """Push a message when the job needs approval or finishes (no /status polling)."""
+    messages = {
+        "waiting_for_approval": f"⚠️ Job `{job_id}` đang chờ duyệt.\nDùng /approve {job_id} hoặc /reject {job_id}",
+        "completed": f"✅ Job `{job_id}` đã xử lý xong.\nDùng /status {job_id} để xem kết quả",
+        "failed": f"❌ Job `{job_id}` xử lý thất bại.\nDùng /status {job_id} để xem lỗi",
+    }
+    try:
+        async for event in watch_job_events(job_id):
+            text = messages.get(event.get("status"))
+            if text:
+                await bot.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
+    except Exception as e:
+        logger.error(f"Job progress notification failed for {job_id}: {e}")
+    finally:
+        bot_state.pending_jobs.pop(job_id, None)
+
+
 async def approve_job(job_id: str, approved: bool, notes: str = "", approver_id: str = "") -> dict[str, Any]:
     """Approve or reject job"""
     async with httpx.AsyncClient() as client:
@@ -347,9 +396,10 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         job_id = result.get("job_id", "")
         bot_state.pending_jobs[job_id] = {"user_id": user.id, "filename": filename}
+        context.application.create_task(notify_job_progress(context.bot, update.effective_chat.id, job_id))
 
         await update.message.reply_text(
-            f"✅ Đã nhận hóa đơn!\n\n📋 *Job ID:* `{job_id}`\n⏳ Đang xử lý...\n\nDùng /status {job_id} để xem kết quả",
+            f"✅ Đã nhận hóa đơn!\n\n📋 *Job ID:* `{job_id}`\n⏳ Đang xử lý...\n\nBot sẽ báo khi có kết quả",
             parse_mode="Markdown",
         )
 
@@ -388,13 +438,14 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         job_id = result.get("job_id", "")
         bot_state.pending_jobs[job_id] = {"user_id": user.id, "filename": filename}
+        context.application.create_task(notify_job_progress(context.bot, update.effective_chat.id, job_id))
 
         await update.message.reply_text(
             f"✅ Đã nhận file!\n\n"
             f"📋 *Job ID:* `{job_id}`\n"
             f"📄 *File:* {filename}\n"
             f"⏳ Đang xử lý...\n\n"
-            f"Dùng /status {job_id} để xem kết quả",
+            f"Bot sẽ báo khi có kết quả",
             parse_mode="Markdown",
         )
 
@@ -15,7 +15,9 @@ import uuid
 from typing import Any, List, Dict, Optional
 
 from src.approval import service as approval_service
+from src.datazones import resolve_tenant_id
 from src.db import get_connection, get_pool
+from src.search import get_document_search
 
 logger = logging.getLogger(__name__)
 
@@ -184,72 +186,32 @@ async def get_document_content(document_id: str) -> Dict[str, Any]:
 async def search_documents(
     query: str,
     doc_type: Optional[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    tenant_id: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
-    Search documents by vendor name, invoice number, or other fields.
+    Ranked fuzzy search over vendor name, invoice number, tax ID and OCR text.
+
+    Matching is accent-insensitive ("cong ty" finds "Công ty") and tolerates
+    typos; see src/search.
     
     Args:
-        query: Search term (matches vendor_name, invoice_number)
+        query: Search term
         doc_type: Optional filter by document type
         limit: Max results to return
+        tenant_id: Restrict results to this tenant (tenant code, as in X-Tenant-ID)
     
     Returns:
-        List of matching documents with basic info
+        List of matching documents with basic info and a relevance score,
+        best match first
     """
     try:
         pool = await get_pool()
         async with pool.acquire() as conn:
-            # Build search query
-            search_pattern = f"%{query}%"
-            
-            if doc_type:
-                rows = await conn.fetch(
-                    """
-                    SELECT 
-                        ei.id, ei.document_id, ei.vendor_name, ei.invoice_number,
-                        ei.invoice_date, ei.total_amount, ei.currency,
-                        d.doc_type, d.filename
-                    FROM extracted_invoices ei
-                    LEFT JOIN documents d ON ei.document_id = d.id
-                    WHERE (ei.vendor_name ILIKE $1 OR ei.invoice_number ILIKE $1)
-                    AND d.doc_type = $2
-                    ORDER BY ei.created_at DESC
-                    LIMIT $3
-                    """,
-                    search_pattern, doc_type, limit
-                )
-            else:
-                rows = await conn.fetch(
-                    """
-                    SELECT 
-                        ei.id, ei.document_id, ei.vendor_name, ei.invoice_number,
-                        ei.invoice_date, ei.total_amount, ei.currency,
-                        d.doc_type, d.filename
-                    FROM extracted_invoices ei
-                    LEFT JOIN documents d ON ei.document_id = d.id
-                    WHERE ei.vendor_name ILIKE $1 OR ei.invoice_number ILIKE $1
-                    ORDER BY ei.created_at DESC
-                    LIMIT $2
-                    """,
-                    search_pattern, limit
-                )
-            
-            results = []
-            for row in rows:
-                results.append({
-                    "id": str(row.get("id")),
-                    "document_id": str(row.get("document_id")) if row.get("document_id") else None,
-                    "vendor_name": row.get("vendor_name"),
-                    "invoice_number": row.get("invoice_number"),
-                    "invoice_date": str(row.get("invoice_date")) if row.get("invoice_date") else None,
-                    "total_amount": float(row.get("total_amount") or 0),
-                    "currency": row.get("currency") or "VND",
-                    "doc_type": row.get("doc_type"),
-                    "filename": row.get("filename")
-                })
-            
-            return results
+            tenant_uuid = await resolve_tenant_id(conn, tenant_id) if tenant_id else None
+            return await get_document_search().search(
+                conn, query, doc_type=doc_type, limit=limit, tenant_id=tenant_uuid
+            )
             
     except Exception as e:
         logger.error(f"Error searching documents: {e}")
@@ -501,7 +463,7 @@ COPILOT_TOOLS = {
     },
     "search_documents": {
         "function": search_documents,
-        "description": "Search documents by vendor name or invoice number",
+        "description": "Fuzzy search documents by vendor name, invoice number, tax ID or OCR text (accent-insensitive)",
         "parameters": {"query": "str", "doc_type": "str (optional)", "limit": "int (default 10)"},
         "requires_confirmation": False
     },
@@ -5,6 +5,7 @@ PR-10: Data lineage and idempotency services.
 """
 
 from .idempotency import (
+    JOB_EVENTS_CHANNEL,
     IdempotencyStatus,
     JobState,
     can_retry_job,
@@ -27,6 +28,7 @@ from .tracker import (
     supersede_zone,
     track_zone_entry,
 )
+from .unit_of_work import PipelineUnitOfWork, resolve_tenant_id
 
 __all__ = [
     # Tracker
@@ -50,4 +52,8 @@ __all__ = [
     "create_job_state",
     "update_job_state",
     "can_retry_job",
+    "JOB_EVENTS_CHANNEL",
+    # Unit of work
+    "PipelineUnitOfWork",
+    "resolve_tenant_id",
 ]
@@ -165,11 +165,21 @@ async def complete_idempotency_key(
 # ===========================================================================
 
 
+def _tenant_uuid(tenant_id: uuid.UUID | str | None) -> uuid.UUID | None:
+    """Tenant UUID, or None for a missing or non-UUID value (resolve codes first)."""
+    if tenant_id is None or isinstance(tenant_id, uuid.UUID):
+        return tenant_id
+    try:
+        return uuid.UUID(str(tenant_id))
+    except ValueError:
+        return None
+
+
 async def check_document_duplicate(
     conn,
     checksum: str,
     file_size: int,
-    tenant_id: str | None = None,
+    tenant_id: uuid.UUID | str | None = None,
 ) -> dict | None:
     """
     Check if document was already processed.
@@ -182,9 +192,10 @@ async def check_document_duplicate(
     """
     params = [checksum, file_size]
 
-    if tenant_id:
+    tenant_uuid = _tenant_uuid(tenant_id)
+    if tenant_uuid:
         query += " AND (tenant_id IS NULL OR tenant_id = $3)"
-        params.append(uuid.UUID(tenant_id) if len(str(tenant_id)) > 10 else None)
+        params.append(tenant_uuid)
 
     row = await conn.fetchrow(query, *params)
 
@@ -201,6 +212,39 @@ async def check_document_duplicate(
     }
 
 
+DOCUMENT_CHECKSUM_INSERT_SQL = """
+    INSERT INTO document_checksums
+    (id, tenant_id, file_checksum, file_size, filename, content_type,
+     first_job_id, document_id)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+    ON CONFLICT (file_checksum, tenant_id) DO UPDATE
+    SET last_seen_at = NOW(),
+        duplicate_count = document_checksums.duplicate_count + 1
+"""
+
+
+def document_checksum_row(
+    checksum: str,
+    file_size: int,
+    job_id: str,
+    tenant_id: uuid.UUID | str | None = None,
+    document_id: str | None = None,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> tuple:
+    """Parameters for DOCUMENT_CHECKSUM_INSERT_SQL (first element is the record id)."""
+    return (
+        uuid.uuid4(),
+        _tenant_uuid(tenant_id),
+        checksum,
+        file_size,
+        filename,
+        content_type,
+        job_id,
+        uuid.UUID(document_id) if document_id else None,
+    )
+
+
 async def register_document_checksum(
     conn,
     checksum: str,
@@ -217,30 +261,11 @@ async def register_document_checksum(
 
     Returns checksum record ID.
     """
-    checksum_id = uuid.uuid4()
-
-    await conn.execute(
-        """
-        INSERT INTO document_checksums
-        (id, tenant_id, file_checksum, file_size, filename, content_type,
-         first_job_id, document_id)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        ON CONFLICT (file_checksum, tenant_id) DO UPDATE
-        SET last_seen_at = NOW(),
-            duplicate_count = document_checksums.duplicate_count + 1
-        """,
-        checksum_id,
-        uuid.UUID(tenant_id) if tenant_id and len(str(tenant_id)) > 10 else None,
-        checksum,
-        file_size,
-        filename,
-        content_type,
-        job_id,
-        uuid.UUID(document_id) if document_id else None,
-    )
+    row = document_checksum_row(checksum, file_size, job_id, tenant_id, document_id, filename, content_type)
+    await conn.execute(DOCUMENT_CHECKSUM_INSERT_SQL, *row)
 
     logger.info(f"[{request_id}] Registered document checksum: {checksum[:16]}...")
-    return str(checksum_id)
+    return str(row[0])
 
 
 # ===========================================================================
@@ -271,6 +296,26 @@ async def get_job_state(conn, job_id: str) -> dict | None:
     }
 
 
+# Every job state change is appended to job_events (migration 020) and
+# published on this channel in the same statement; src/api/job_events.py
+# fans it out to SSE/WebSocket subscribers.
+JOB_EVENTS_CHANNEL = "erpx_job_events"
+
+# Appended to a CTE named `changed` that RETURNs the job_processing_state row
+_EMIT_JOB_EVENT_SQL = f"""
+, event AS (
+    INSERT INTO job_events (job_id, tenant_id, state, previous_state, error)
+    SELECT job_id, tenant_id, current_state, previous_state, last_error FROM changed
+    RETURNING id, job_id, tenant_id, state, previous_state, error, created_at
+)
+SELECT id, previous_state, pg_notify('{JOB_EVENTS_CHANNEL}', json_build_object(
+    'id', id, 'job_id', job_id, 'tenant_id', tenant_id, 'state', state,
+    'previous_state', previous_state, 'error', left(error, 500), 'at', created_at
+)::text)
+FROM event
+"""
+
+
 async def create_job_state(
     conn,
     job_id: str,
@@ -278,16 +323,20 @@ async def create_job_state(
     tenant_id: str | None = None,
     request_id: str | None = None,
 ) -> str:
-    """Create initial job state."""
+    """Create initial job state (and emit its first job event)."""
     state_id = uuid.uuid4()
 
     await conn.execute(
         """
-        INSERT INTO job_processing_state
-        (id, job_id, tenant_id, current_state, request_id)
-        VALUES ($1, $2, $3, $4, $5::text)
-        ON CONFLICT (job_id) DO NOTHING
-        """,
+        WITH changed AS (
+            INSERT INTO job_processing_state
+            (id, job_id, tenant_id, current_state, request_id)
+            VALUES ($1, $2, $3, $4, $5::text)
+            ON CONFLICT (job_id) DO NOTHING
+            RETURNING job_id, tenant_id, current_state, previous_state, last_error
+        )
+        """
+        + _EMIT_JOB_EVENT_SQL,
         state_id,
         job_id,
         uuid.UUID(tenant_id) if tenant_id and len(str(tenant_id)) > 10 else None,
@@ -308,39 +357,40 @@ async def update_job_state(
     request_id: str | None = None,
 ) -> bool:
     """
-    Update job processing state.
+    Update job processing state and NOTIFY job event subscribers.
 
+    One round trip: previous_state is taken from the row being updated.
     Returns True if updated, False if job not found.
     """
-    # Get current state
-    current = await get_job_state(conn, job_id)
-
-    if not current:
-        logger.warning(f"[{request_id}] Job state not found: {job_id}")
-        return False
-
-    await conn.execute(
+    row = await conn.fetchrow(
         """
-        UPDATE job_processing_state
-        SET current_state = $1,
-            previous_state = $2,
-            checkpoint_data = COALESCE($3::jsonb, checkpoint_data),
-            last_error = $4::text,
-            attempts = CASE WHEN $4::text IS NOT NULL THEN attempts + 1 ELSE attempts END,
-            state_changed_at = NOW(),
-            updated_at = NOW(),
-            request_id = $5::text
-        WHERE job_id = $6
-        """,
+        WITH changed AS (
+            UPDATE job_processing_state
+            SET current_state = $1,
+                previous_state = current_state,
+                checkpoint_data = COALESCE($2::jsonb, checkpoint_data),
+                last_error = $3::text,
+                attempts = CASE WHEN $3::text IS NOT NULL THEN attempts + 1 ELSE attempts END,
+                state_changed_at = NOW(),
+                updated_at = NOW(),
+                request_id = $4::text
+            WHERE job_id = $5
+            RETURNING job_id, tenant_id, current_state, previous_state, last_error
+        )
+        """
+        + _EMIT_JOB_EVENT_SQL,
         new_state.value,
-        current["current_state"],
         json.dumps(checkpoint_data) if checkpoint_data else None,
         error,
         request_id,
         job_id,
     )
 
-    logger.info(f"[{request_id}] Updated job state: {job_id} {current['current_state']} -> {new_state.value}")
+    if row is None:
+        logger.warning(f"[{request_id}] Job state not found: {job_id}")
+        return False
+
+    logger.info(f"[{request_id}] Updated job state: {job_id} {row['previous_state']} -> {new_state.value}")
     return True
 
 
@@ -38,6 +38,49 @@ class ZoneStatus(str, Enum):
     ARCHIVED = "archived"
 
 
+ZONE_ENTRY_INSERT_SQL = """
+    INSERT INTO data_zones
+    (id, job_id, tenant_id, document_id, zone, status,
+     raw_file_uri, extracted_text_preview, proposal_id, ledger_entry_id,
+     checksum, byte_count, processing_time_ms, request_id)
+    VALUES ($1, $2, $3, $4, $5, $6, $7::text, $8::text, $9, $10,
+            $11::text, $12::integer, $13::integer, $14::text)
+"""
+
+
+def zone_entry_row(
+    job_id: str,
+    zone: DataZone,
+    tenant_id: str | None = None,
+    document_id: str | None = None,
+    raw_file_uri: str | None = None,
+    extracted_text_preview: str | None = None,
+    proposal_id: str | None = None,
+    ledger_entry_id: str | None = None,
+    checksum: str | None = None,
+    byte_count: int | None = None,
+    processing_time_ms: int | None = None,
+    request_id: str | None = None,
+) -> tuple:
+    """Parameters for ZONE_ENTRY_INSERT_SQL (the first element is the new zone record id)."""
+    return (
+        uuid.uuid4(),
+        job_id,
+        uuid.UUID(tenant_id) if tenant_id and len(str(tenant_id)) > 10 else None,
+        uuid.UUID(document_id) if document_id else None,
+        zone.value,
+        ZoneStatus.ACTIVE.value,
+        raw_file_uri,
+        (extracted_text_preview or "")[:4000] if extracted_text_preview else None,
+        uuid.UUID(proposal_id) if proposal_id else None,
+        uuid.UUID(ledger_entry_id) if ledger_entry_id else None,
+        checksum,
+        byte_count,
+        processing_time_ms,
+        request_id,
+    )
+
+
 async def track_zone_entry(
     conn,
     job_id: str,
@@ -65,35 +108,24 @@ async def track_zone_entry(
     Returns:
         Zone record ID
     """
-    zone_id = uuid.uuid4()
-
-    await conn.execute(
-        """
-        INSERT INTO data_zones
-        (id, job_id, tenant_id, document_id, zone, status,
-         raw_file_uri, extracted_text_preview, proposal_id, ledger_entry_id,
-         checksum, byte_count, processing_time_ms, request_id)
-        VALUES ($1, $2, $3, $4, $5, $6, $7::text, $8::text, $9, $10,
-                $11::text, $12::integer, $13::integer, $14::text)
-        """,
-        zone_id,
+    row = zone_entry_row(
         job_id,
-        uuid.UUID(tenant_id) if tenant_id and len(str(tenant_id)) > 10 else None,
-        uuid.UUID(document_id) if document_id else None,
-        zone.value,
-        ZoneStatus.ACTIVE.value,
+        zone,
+        tenant_id,
+        document_id,
         raw_file_uri,
-        (extracted_text_preview or "")[:4000] if extracted_text_preview else None,
-        uuid.UUID(proposal_id) if proposal_id else None,
-        uuid.UUID(ledger_entry_id) if ledger_entry_id else None,
+        extracted_text_preview,
+        proposal_id,
+        ledger_entry_id,
         checksum,
         byte_count,
         processing_time_ms,
         request_id,
     )
+    await conn.execute(ZONE_ENTRY_INSERT_SQL, *row)
 
     logger.info(f"[{request_id}] Job {job_id} entered zone {zone.value}")
-    return str(zone_id)
+    return str(row[0])
 
 
 async def get_job_zones(conn, job_id: str) -> list[dict]:
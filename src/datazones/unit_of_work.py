@@ -0,0 +1,215 @@
+"""
+ERPX AI Accounting - Pipeline Unit of Work
+==========================================
+Batches the bookkeeping writes of a document pipeline stage.
+
+A stage buffers its job-state, audit, zone, evidence and metric writes and
+flushes them together: one transaction, ordered statements first, then one
+executemany per table. A document costs a handful of flushes instead of
+~20 sequential single-row round trips.
+
+Usage:
+    uow = PipelineUnitOfWork(conn, job_id, tenant_uuid, request_id)
+    uow.set_state(JobState.EXTRACTED, checkpoint_data={...})
+    uow.audit("extracted", {"text_length": 1234})
+    uow.zone(DataZone.EXTRACTED, byte_count=1234)
+    uow.latency("ocr_latency", 850)
+    await uow.flush()
+"""
+
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.audit.store import (
+    AUDIT_EVENT_INSERT_SQL,
+    EVIDENCE_LOG_INSERT_SQL,
+    audit_event_row,
+    evidence_log_row,
+)
+from src.observability.metrics import METRIC_INSERT_SQL, MetricType, latency_rows, metric_row
+
+from .idempotency import JobState, update_job_state
+from .tracker import ZONE_ENTRY_INSERT_SQL, DataZone, zone_entry_row
+
+logger = logging.getLogger("erpx.datazones")
+
+
+class PipelineUnitOfWork:
+    """
+    Buffered writes for one job; `flush()` applies them atomically.
+
+    Ordered operations (`execute`, `call`, `set_state`) run first, in the
+    order they were queued, so rows other writes depend on (documents,
+    proposals) exist before the log rows that reference them. Consecutive
+    `execute` calls with the same SQL are sent as one executemany.
+
+    Evidence rows are best effort, as with write_evidence(): they are
+    written under a savepoint and a failure is logged, not raised.
+    """
+
+    def __init__(self, conn, job_id: str, tenant_id: str | None = None, request_id: str | None = None):
+        self.conn = conn
+        self.job_id = job_id
+        self.tenant_id = tenant_id
+        self.request_id = request_id
+        self._ops: list[tuple] = []
+        self._zones: list[tuple] = []
+        self._audit: list[tuple] = []
+        self._evidence: list[tuple] = []
+        self._metrics: list[tuple] = []
+        self.flushes = 0
+        self.statements = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._ops) + len(self._zones) + len(self._audit) + len(self._evidence) + len(self._metrics)
+
+    # --- ordered operations -------------------------------------------------
+
+    def execute(self, sql: str, *args) -> None:
+        """Queue a statement."""
+        self._ops.append((sql, args))
+
+    def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Queue `await fn(conn, *args, **kwargs)` for the flush transaction."""
+        self._ops.append((fn, args, kwargs))
+
+    def set_state(self, state: JobState, checkpoint_data: dict | None = None, error: str | None = None) -> None:
+        self.call(
+            update_job_state,
+            self.job_id,
+            state,
+            checkpoint_data=checkpoint_data,
+            error=error,
+            request_id=self.request_id,
+        )
+
+    # --- batched log rows ---------------------------------------------------
+
+    def audit(self, event_type: str, event_data: dict | None = None, actor: str = "system") -> None:
+        self._audit.append(
+            audit_event_row(self.job_id, self.tenant_id, event_type, event_data, actor, self.request_id)
+        )
+
+    def zone(self, zone: DataZone, **fields) -> None:
+        fields.setdefault("document_id", self.job_id)
+        self._zones.append(
+            zone_entry_row(self.job_id, zone, tenant_id=self.tenant_id, request_id=self.request_id, **fields)
+        )
+
+    def evidence(
+        self,
+        stage: str,
+        output_summary: dict | str,
+        action: str | None = None,
+        decision: str = "info",
+        input_preview: str | None = None,
+        tenant_id: str | None = None,
+    ) -> None:
+        self._evidence.append(
+            evidence_log_row(
+                self.job_id, stage, output_summary, decision, self.job_id, input_preview, action, tenant_id
+            )
+        )
+
+    def counter(self, metric_name: str, increment: float = 1.0, labels: dict | None = None) -> None:
+        self._metrics.append(metric_row(metric_name, increment, MetricType.COUNTER, labels))
+
+    def latency(self, metric_name: str, latency_ms: float, labels: dict | None = None) -> None:
+        self._metrics.extend(latency_rows(metric_name, latency_ms, labels))
+
+    # --- flushing -----------------------------------------------------------
+
+    def discard(self) -> None:
+        """Drop everything buffered since the last flush."""
+        self._ops, self._zones, self._audit, self._evidence, self._metrics = [], [], [], [], []
+
+    async def flush(self) -> None:
+        """Write everything buffered in one transaction."""
+        if not self.pending:
+            return
+        ops, zones, audit, evidence, metrics = self._ops, self._zones, self._audit, self._evidence, self._metrics
+        self.discard()
+
+        async with self.conn.transaction():
+            for op in _coalesce(ops):
+                if callable(op[0]):
+                    fn, args, kwargs = op
+                    await fn(self.conn, *args, **kwargs)
+                elif len(op[1]) == 1:
+                    await self.conn.execute(op[0], *op[1][0])
+                else:
+                    await self.conn.executemany(op[0], op[1])
+                self.statements += 1
+
+            for sql, rows in (
+                (ZONE_ENTRY_INSERT_SQL, zones),
+                (AUDIT_EVENT_INSERT_SQL, audit),
+                (METRIC_INSERT_SQL, metrics),
+            ):
+                if rows:
+                    await self.conn.executemany(sql, rows)
+                    self.statements += 1
+
+            if evidence:
+                try:
+                    async with self.conn.transaction():
+                        await self.conn.executemany(EVIDENCE_LOG_INSERT_SQL, evidence)
+                except Exception as e:
+                    logger.error(f"[{self.request_id}] Failed to write evidence for job {self.job_id}: {e}")
+                self.statements += 1
+
+        self.flushes += 1
+        logger.debug(
+            f"[{self.request_id}] Job {self.job_id}: flushed {len(ops)} ops, "
+            f"{len(zones) + len(audit) + len(evidence) + len(metrics)} log rows"
+        )
+
+
+def _coalesce(ops: list[tuple]) -> list[tuple]:
+    """Group runs of the same SQL into (sql, [args, ...]); calls pass through."""
+    grouped: list[tuple] = []
+    for op in ops:
+        if callable(op[0]):
+            grouped.append(op)
+        elif grouped and grouped[-1][0] == op[0]:
+            grouped[-1][1].append(op[1])
+        else:
+            grouped.append((op[0], [op[1]]))
+    return grouped
+
+
+# ===========================================================================
+# Tenant lookup
+# ===========================================================================
+
+_tenant_ids: dict[str, uuid.UUID] = {}
+
+_RESOLVE_TENANT_SQL = """
+    WITH ins AS (
+        INSERT INTO tenants (id, name, code)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (code) DO NOTHING
+        RETURNING id
+    )
+    SELECT id FROM ins
+    UNION ALL
+    SELECT id FROM tenants WHERE code = $3
+    LIMIT 1
+"""
+
+
+async def resolve_tenant_id(conn, code: str) -> uuid.UUID:
+    """
+    Tenant UUID for a tenant code, creating the tenant on first use.
+
+    Tenant ids never change once created, so they are cached per process;
+    a miss costs a single get-or-create statement.
+    """
+    tenant_id = _tenant_ids.get(code)
+    if tenant_id is None:
+        tenant_id = await conn.fetchval(_RESOLVE_TENANT_SQL, uuid.uuid4(), f"Tenant {code}", code)
+        _tenant_ids[code] = tenant_id
+    return tenant_id
@@ -32,11 +32,11 @@ async def get_pool() -> Pool:
     if _pool is None:
         _pool = await asyncpg.create_pool(
             config.DATABASE_URL,
-            min_size=2,
-            max_size=10,
+            min_size=config.DB_POOL_MIN_SIZE,
+            max_size=config.DB_POOL_MAX_SIZE,
             command_timeout=60,
         )
-        logger.info("Database pool created")
+        logger.info(f"Database pool created (size {config.DB_POOL_MIN_SIZE}-{config.DB_POOL_MAX_SIZE})")
     return _pool
 
 
@@ -321,6 +321,38 @@ class ConfidenceValidator(OutputValidator):
         return True, "", warnings
 
 
+class SourceGroundingValidator(OutputValidator):
+    """
+    Warn when extracted values have no evidence in the source document.
+
+    Uses a per-document guardrails.evidence_index.SourceEvidenceIndex shared
+    with the R2 OutputValidator, PolicyChecker and EvidenceStore.
+    """
+
+    NUMERIC_FIELDS = ["total_amount", "vat_amount"]
+    STRING_FIELDS = ["invoice_number", "invoice_no", "vendor_tax_id", "tax_id"]
+
+    def __init__(self, evidence_index):
+        self.evidence_index = evidence_index
+
+    def validate(self, data: dict[str, Any]) -> tuple[bool, str, list[str]]:
+        warnings = []
+        if self.evidence_index is None or self.evidence_index.is_empty:
+            return True, "", warnings
+
+        for field_name in self.NUMERIC_FIELDS:
+            value = data.get(field_name)
+            if isinstance(value, (int, float)) and value and not self.evidence_index.value_in_source(value):
+                warnings.append(f"{field_name}={value} not found in source document")
+
+        for field_name in self.STRING_FIELDS:
+            value = data.get(field_name)
+            if value and isinstance(value, str) and not self.evidence_index.string_in_source(value):
+                warnings.append(f"{field_name}='{value}' not found in source document")
+
+        return True, "", warnings
+
+
 # ===========================================================================
 # OPA Policy Client
 # ===========================================================================
@@ -421,17 +453,25 @@ class GuardrailsEngine:
 
         return len(errors) == 0, errors, warnings
 
-    def validate_output(self, data: dict[str, Any]) -> tuple[bool, list[str], list[str]]:
+    def validate_output(self, data: dict[str, Any], evidence_index=None) -> tuple[bool, list[str], list[str]]:
         """
         Validate output data.
 
+        Args:
+            evidence_index: Optional SourceEvidenceIndex for the source document;
+                enables source-grounding checks
+
         Returns:
             (is_valid, errors, warnings)
         """
         errors = []
         warnings = []
 
-        for name, validator in self.output_validators:
+        validators = self.output_validators
+        if evidence_index is not None:
+            validators = [*validators, ("source", SourceGroundingValidator(evidence_index))]
+
+        for name, validator in validators:
             try:
                 valid, msg, warns = validator.validate(data)
 
@@ -445,7 +485,9 @@ class GuardrailsEngine:
 
         return len(errors) == 0, errors, warnings
 
-    def process(self, input_data: dict[str, Any], output_data: dict[str, Any]) -> dict[str, Any]:
+    def process(
+        self, input_data: dict[str, Any], output_data: dict[str, Any], evidence_index=None
+    ) -> dict[str, Any]:
         """
         Full guardrails processing.
 
@@ -471,7 +513,7 @@ class GuardrailsEngine:
         result["all_warnings"].extend(warnings)
 
         # Validate output
-        valid, errors, warnings = self.validate_output(output_data)
+        valid, errors, warnings = self.validate_output(output_data, evidence_index=evidence_index)
         result["output_validation"] = {"valid": valid, "errors": errors, "warnings": warnings}
         result["all_errors"].extend(errors)
         result["all_warnings"].extend(warnings)
@@ -514,7 +556,7 @@ def validate_document_input(file_size: int, content_type: str, text: str | None
     return valid, errors
 
 
-def validate_proposal_output(data: dict[str, Any]) -> tuple[bool, list[str], list[str]]:
+def validate_proposal_output(data: dict[str, Any], evidence_index=None) -> tuple[bool, list[str], list[str]]:
     """Quick output validation"""
     engine = get_guardrails_engine()
-    return engine.validate_output(data)
+    return engine.validate_output(data, evidence_index=evidence_index)
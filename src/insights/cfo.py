@@ -6,14 +6,22 @@ Generates deterministic insights and recommendations based on:
 - ledger_entries, ledger_lines (actual transactions)
 - cashflow_forecasts (PR20)
 - scenario_simulations (PR20)
+- sensitivity surface over the latest forecast (vectorized grid simulation)
+
+Ledger and vendor figures come from per-tenant, per-day rollups kept up to
+date by triggers (migration 022), so an insight reads at most window_days
+rows whatever the ledger size. With a pool, the four source queries run
+concurrently. cfo_insight_snapshots holds a ready result per tenant and
+window, regenerated by the outbox worker on ledger.posted.
 
 No external LLM calls - fully deterministic for CI compatibility.
 """
 
+import asyncio
 import json
 import logging
 import uuid
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Any
 
@@ -21,16 +29,20 @@ logger = logging.getLogger(__name__)
 
 
 async def generate_cfo_insight(
-    conn, tenant_id: uuid.UUID, window_days: int = 30, assumptions: dict | None = None
+    conn, tenant_id: uuid.UUID, window_days: int = 30, assumptions: dict | None = None, pool=None
 ) -> dict[str, Any]:
     """
     Generate CFO insights from ledger data and forecasts.
 
     Args:
-        conn: Async database connection (asyncpg)
+        conn: Async database connection (asyncpg); may be None when pool is given
+        pool: Optional asyncpg pool; source queries then run concurrently
         tenant_id: Tenant UUID
         window_days: Days of historical data to analyze
-        assumptions: Optional parameters for analysis
+        assumptions: Optional parameters for analysis:
+            - sensitivity: True (default grid) or a grid dict
+              (revenue_multiplier / cost_multiplier / payment_delay_days)
+              to include a full sensitivity surface
 
     Returns:
         Insight result dict with summary, findings, recommendations, references
@@ -40,10 +52,9 @@ async def generate_cfo_insight(
     start_date = end_date - timedelta(days=window_days)
 
     # Gather data
-    ledger_stats = await _get_ledger_stats(conn, tenant_id, start_date, end_date)
-    top_vendors = await _get_top_vendors(conn, tenant_id, start_date, end_date)
-    forecast_data = await _get_latest_forecast(conn, tenant_id)
-    simulation_data = await _get_latest_simulation(conn, tenant_id)
+    ledger_stats, top_vendors, forecast_data, simulation_data = await _gather_sources(
+        conn, pool, tenant_id, start_date, end_date
+    )
 
     # Generate insights
     findings = _generate_findings(ledger_stats, top_vendors, forecast_data, simulation_data)
@@ -70,25 +81,50 @@ async def generate_cfo_insight(
         },
     }
 
+    sensitivity_grid = (assumptions or {}).get("sensitivity")
+    if sensitivity_grid and forecast_data:
+        result["sensitivity"] = _build_sensitivity(forecast_data, sensitivity_grid)
+
     return result
 
 
+async def _gather_sources(conn, pool, tenant_id: uuid.UUID, start_date: date, end_date: date) -> tuple:
+    """
+    Run the four independent source queries: concurrently on pooled
+    connections when a pool is given, else one after another on conn
+    (an asyncpg connection runs one query at a time).
+    """
+    queries = (
+        lambda c: _get_ledger_stats(c, tenant_id, start_date, end_date),
+        lambda c: _get_top_vendors(c, tenant_id, start_date, end_date),
+        lambda c: _get_latest_forecast(c, tenant_id),
+        lambda c: _get_latest_simulation(c, tenant_id),
+    )
+    if pool is None:
+        return tuple([await query(conn) for query in queries])
+
+    async def run(query):
+        async with pool.acquire() as pooled:
+            return await query(pooled)
+
+    return tuple(await asyncio.gather(*(run(query) for query in queries)))
+
+
 async def _get_ledger_stats(conn, tenant_id: uuid.UUID, start_date: date, end_date: date) -> dict:
-    """Get aggregated ledger statistics for the period."""
+    """Get aggregated ledger statistics for the period (from ledger_daily_stats)."""
     row = await conn.fetchrow(
         """
         SELECT 
-            COUNT(DISTINCT le.id) as entry_count,
-            COALESCE(SUM(ll.debit_amount), 0) as total_debit,
-            COALESCE(SUM(ll.credit_amount), 0) as total_credit,
-            COALESCE(SUM(ll.debit_amount), 0) - COALESCE(SUM(ll.credit_amount), 0) as net_position,
-            MIN(le.entry_date) as first_entry_date,
-            MAX(le.entry_date) as last_entry_date
-        FROM ledger_entries le
-        LEFT JOIN ledger_lines ll ON ll.ledger_entry_id = le.id
-        WHERE le.tenant_id = $1
-          AND le.entry_date >= $2
-          AND le.entry_date <= $3
+            COALESCE(SUM(entry_count), 0)::int as entry_count,
+            COALESCE(SUM(total_debit), 0) as total_debit,
+            COALESCE(SUM(total_credit), 0) as total_credit,
+            COALESCE(SUM(total_debit), 0) - COALESCE(SUM(total_credit), 0) as net_position,
+            MIN(day) FILTER (WHERE entry_count > 0) as first_entry_date,
+            MAX(day) FILTER (WHERE entry_count > 0) as last_entry_date
+        FROM ledger_daily_stats
+        WHERE tenant_id = $1
+          AND day >= $2
+          AND day <= $3
     """,
         tenant_id,
         start_date,
@@ -109,21 +145,19 @@ async def _get_ledger_stats(conn, tenant_id: uuid.UUID, start_date: date, end_da
 
 
 async def _get_top_vendors(conn, tenant_id: uuid.UUID, start_date: date, end_date: date, limit: int = 5) -> list:
-    """Get top vendors by transaction volume."""
+    """Get top vendors by transaction volume (from vendor_daily_stats)."""
     rows = await conn.fetch(
         """
         SELECT 
-            ei.vendor_name,
-            COUNT(*) as transaction_count,
-            SUM(ei.total_amount) as total_amount
-        FROM extracted_invoices ei
-        JOIN documents d ON d.id = ei.document_id
-        WHERE ei.tenant_id = $1
-          AND ei.invoice_date >= $2
-          AND ei.invoice_date <= $3
-          AND ei.vendor_name IS NOT NULL
-          AND ei.vendor_name != ''
-        GROUP BY ei.vendor_name
+            vendor_name,
+            SUM(transaction_count)::int as transaction_count,
+            SUM(total_amount) as total_amount
+        FROM vendor_daily_stats
+        WHERE tenant_id = $1
+          AND day >= $2
+          AND day <= $3
+        GROUP BY vendor_name
+        HAVING SUM(transaction_count) > 0
         ORDER BY total_amount DESC NULLS LAST
         LIMIT $4
     """,
@@ -206,6 +240,18 @@ async def _get_latest_simulation(conn, tenant_id: uuid.UUID) -> dict | None:
     }
 
 
+def _build_sensitivity(forecast_data: dict, grid: dict | bool) -> dict:
+    """Sensitivity surface of the latest forecast (one vectorized pass over the grid)."""
+    from src.simulations.vectorized import run_grid_simulation
+
+    forecast = forecast_data.get("forecast", {})
+    return run_grid_simulation(
+        forecast,
+        grid=grid if isinstance(grid, dict) else None,
+        window_days=forecast_data.get("window_days") or forecast.get("window_days"),
+    )
+
+
 def _generate_findings(
     ledger_stats: dict, top_vendors: list, forecast_data: dict | None, simulation_data: dict | None
 ) -> list[dict]:
@@ -656,12 +702,109 @@ async def get_latest_insights(conn, tenant_id: uuid.UUID, limit: int = 5) -> lis
     return result_list
 
 
+# ============================================================
+# Snapshots (materialized insights for the CFO dashboard)
+# ============================================================
+
+DEFAULT_SNAPSHOT_WINDOW_DAYS = 30
+
+
+async def get_insight_snapshot(conn, tenant_id: uuid.UUID, window_days: int = DEFAULT_SNAPSHOT_WINDOW_DAYS) -> dict | None:
+    """Latest materialized insight for a tenant/window, or None."""
+    row = await conn.fetchrow(
+        """
+        SELECT result, generated_at
+        FROM cfo_insight_snapshots
+        WHERE tenant_id = $1 AND window_days = $2
+    """,
+        tenant_id,
+        window_days,
+    )
+
+    if not row:
+        return None
+
+    result = row["result"]
+    if isinstance(result, str):
+        result = json.loads(result)
+
+    return {"result": result, "generated_at": row["generated_at"]}
+
+
+async def save_insight_snapshot(
+    conn, tenant_id: uuid.UUID, window_days: int, result: dict, generated_at: datetime
+) -> None:
+    """Upsert a snapshot; an older generation never overwrites a newer one."""
+    await conn.execute(
+        """
+        INSERT INTO cfo_insight_snapshots (tenant_id, window_days, result, generated_at)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (tenant_id, window_days) DO UPDATE
+        SET result = EXCLUDED.result, generated_at = EXCLUDED.generated_at
+        WHERE cfo_insight_snapshots.generated_at <= EXCLUDED.generated_at
+    """,
+        tenant_id,
+        window_days,
+        json.dumps(result),
+        generated_at,
+    )
+
+
+async def materialize_insight(
+    conn, tenant_id: uuid.UUID, window_days: int = DEFAULT_SNAPSHOT_WINDOW_DAYS, pool=None
+) -> dict:
+    """Generate and store the snapshot for one window; returns the result."""
+    # Stamp with the start time: everything committed before it is included
+    generated_at = datetime.now(timezone.utc)
+    result = await generate_cfo_insight(conn, tenant_id, window_days, pool=pool)
+    if pool is not None:
+        async with pool.acquire() as pooled:
+            await save_insight_snapshot(pooled, tenant_id, window_days, result, generated_at)
+    else:
+        await save_insight_snapshot(conn, tenant_id, window_days, result, generated_at)
+    return result
+
+
+async def refresh_insight_snapshots(conn, tenant_id: uuid.UUID, since: datetime | None = None) -> int:
+    """
+    Regenerate every snapshot window of a tenant (at least the default one).
+
+    Snapshots generated at or after ``since`` are skipped, so a burst of
+    ledger.posted events for one tenant costs one regeneration.
+    Returns the number of snapshots regenerated.
+    """
+    rows = await conn.fetch(
+        "SELECT window_days, generated_at FROM cfo_insight_snapshots WHERE tenant_id = $1",
+        tenant_id,
+    )
+    generated = {row["window_days"]: row["generated_at"] for row in rows}
+    generated.setdefault(DEFAULT_SNAPSHOT_WINDOW_DAYS, None)
+
+    refreshed = 0
+    for window_days, generated_at in sorted(generated.items()):
+        if since is not None and generated_at is not None and generated_at >= since:
+            continue
+        await materialize_insight(conn, tenant_id, window_days)
+        refreshed += 1
+
+    if refreshed:
+        logger.info(f"Refreshed {refreshed} CFO insight snapshot(s) for tenant {tenant_id}")
+    return refreshed
+
+
 # ============================================================
 # Background processing function
 # ============================================================
 
 
-async def process_insight_async(conn, insight_id: uuid.UUID, tenant_id: uuid.UUID, window_days: int = 30) -> dict:
+async def process_insight_async(
+    conn,
+    insight_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    window_days: int = 30,
+    assumptions: dict | None = None,
+    pool=None,
+) -> dict:
     """
     Process insight generation in background.
     Updates status: queued -> running -> completed/failed
@@ -672,7 +815,7 @@ async def process_insight_async(conn, insight_id: uuid.UUID, tenant_id: uuid.UUI
         await update_insight_status(conn, insight_id, "running")
 
         # Generate insight
-        result = await generate_cfo_insight(conn, tenant_id, window_days)
+        result = await generate_cfo_insight(conn, tenant_id, window_days, assumptions, pool=pool)
 
         # Update to completed
         await update_insight_status(conn, insight_id, "completed", result=result)
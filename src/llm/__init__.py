@@ -1,5 +1,7 @@
 # ERPX AI - LLM Client Module
 # DO Agent qwen3-32b ONLY - No local LLM support
+from .batching import BatchDocument, BatchResult, LLMBatcher
 from .client import LLMClient, get_llm_client
+from .streaming import StreamChunk
 
-__all__ = ["LLMClient", "get_llm_client"]
+__all__ = ["BatchDocument", "BatchResult", "LLMBatcher", "LLMClient", "StreamChunk", "get_llm_client"]
@@ -0,0 +1,279 @@
+"""
+ERPX AI - Multi-document LLM Batching
+=====================================
+Packs several small documents into one structured LLM request, so the system
+prompt and shared instructions are sent once per pack instead of once per
+document:
+
+    batcher = LLMBatcher(system=WORKER_SYSTEM_PROMPT, validate=check_proposal)
+    results = await batcher.run([BatchDocument("INV-1", text1), BatchDocument("INV-2", text2)])
+
+Pack sizes are chosen from token estimates: a pack is closed when the next
+document would push it past LLM_BATCH_MAX_INPUT_TOKENS, when the expected
+output would pass LLM_BATCH_MAX_OUTPUT_TOKENS, or at LLM_BATCH_MAX_DOCS.
+The model answers with one JSON object keyed by document id; each member is
+demultiplexed and validated on its own, and only members that are missing
+or invalid are retried as single-document requests.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from src.core import config
+
+logger = logging.getLogger("erpx.llm.batching")
+
+# Conservative for Vietnamese text (diacritics tokenize worse than English)
+CHARS_PER_TOKEN = 3
+
+# documents are truncated like the single-document proposal prompt
+MAX_DOC_CHARS = 4000
+
+PACK_PROMPT_TEMPLATE = """{instructions}
+
+Có {count} chứng từ bên dưới, mỗi chứng từ nằm giữa <document id="..."> và </document>.
+Xử lý TỪNG chứng từ độc lập, không trộn thông tin giữa các chứng từ.
+
+{documents}
+
+Trả về MỘT JSON object duy nhất, kết quả của mỗi chứng từ theo format đã định:
+{{"results": {{"<id>": {{...}}}}}}
+Bắt buộc có đủ {count} id: {ids}"""
+
+SINGLE_PROMPT_TEMPLATE = """{instructions}
+
+---
+{text}
+---
+
+Trả về JSON theo format đã định."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (no tokenizer round-trip)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class BatchDocument:
+    """One member of a batch: caller-chosen id plus the text to analyse."""
+
+    doc_id: str
+    text: str
+
+
+@dataclass
+class BatchResult:
+    """Per-document outcome of LLMBatcher.run()."""
+
+    doc_id: str
+    data: Any = None
+    error: str | None = None
+    batched: bool = False  # answered inside a multi-document pack
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def plan_packs(
+    documents: list[BatchDocument],
+    max_docs: int,
+    max_input_tokens: int,
+    max_output_tokens: int,
+    output_tokens_per_doc: int,
+    overhead_tokens: int = 0,
+) -> list[list[BatchDocument]]:
+    """
+    Greedily group documents (in order) into packs that fit the token budgets.
+
+    A document that does not fit any pack on its own still gets a pack of
+    one, i.e. a plain single-document request.
+    """
+    per_pack = max(1, min(max_docs, max_output_tokens // max(output_tokens_per_doc, 1)))
+    packs: list[list[BatchDocument]] = []
+    current: list[BatchDocument] = []
+    current_tokens = overhead_tokens
+
+    for doc in documents:
+        tokens = estimate_tokens(doc.text)
+        if current and (len(current) >= per_pack or current_tokens + tokens > max_input_tokens):
+            packs.append(current)
+            current, current_tokens = [], overhead_tokens
+        current.append(doc)
+        current_tokens += tokens
+
+    if current:
+        packs.append(current)
+    return packs
+
+
+def duplicate_ids(ids: list[str]) -> list[str]:
+    """Ids that occur more than once, in first-seen order."""
+    return [doc_id for doc_id, count in Counter(ids).items() if count > 1]
+
+
+def _demux(response: Any, ids: list[str]) -> dict[str, Any]:
+    """Map a pack response back to document ids (tolerates list-shaped results)."""
+    if not isinstance(response, dict):
+        return {}
+    results = response.get("results", response)
+    if isinstance(results, list):
+        return {str(item.get("doc_id") or item.get("id")): item for item in results if isinstance(item, dict)}
+    if isinstance(results, dict):
+        return {doc_id: results.get(doc_id) for doc_id in ids if doc_id in results}
+    return {}
+
+
+class LLMBatcher:
+    """
+    Batch inference on top of LLMClient.generate_json.
+
+    ``validate`` receives one document's raw result and returns the value to
+    keep; raising rejects the result and sends that document to an
+    individual retry.
+    """
+
+    def __init__(
+        self,
+        system: str,
+        instructions: str = "",
+        validate: Callable[[dict[str, Any]], Any] | None = None,
+        client=None,
+        max_docs: int | None = None,
+        max_input_tokens: int | None = None,
+        max_output_tokens: int | None = None,
+        output_tokens_per_doc: int | None = None,
+        concurrency: int | None = None,
+        max_doc_chars: int = MAX_DOC_CHARS,
+        temperature: float = 0.2,
+    ):
+        if client is None:
+            from src.llm import get_llm_client
+
+            client = get_llm_client()
+
+        self.client = client
+        self.system = system
+        self.instructions = instructions
+        self.validate = validate
+        self.max_docs = max_docs or config.LLM_BATCH_MAX_DOCS
+        self.max_input_tokens = max_input_tokens or config.LLM_BATCH_MAX_INPUT_TOKENS
+        self.max_output_tokens = max_output_tokens or config.LLM_BATCH_MAX_OUTPUT_TOKENS
+        self.output_tokens_per_doc = output_tokens_per_doc or config.LLM_BATCH_OUTPUT_TOKENS_PER_DOC
+        self.concurrency = concurrency or config.LLM_BATCH_CONCURRENCY
+        self.max_doc_chars = max_doc_chars
+        self.temperature = temperature
+
+        self.requests = 0
+        self.retries = 0
+
+    def plan(self, documents: list[BatchDocument]) -> list[list[BatchDocument]]:
+        """Pack plan for ``documents`` under this batcher's budgets."""
+        overhead = estimate_tokens(self.system) + estimate_tokens(self.instructions) + 100
+        return plan_packs(
+            [BatchDocument(d.doc_id, d.text[: self.max_doc_chars]) for d in documents],
+            max_docs=self.max_docs,
+            max_input_tokens=self.max_input_tokens,
+            max_output_tokens=self.max_output_tokens,
+            output_tokens_per_doc=self.output_tokens_per_doc,
+            overhead_tokens=overhead,
+        )
+
+    async def run(self, documents: list[BatchDocument], request_id: str = "") -> list[BatchResult]:
+        """Process ``documents``; results come back in input order."""
+        ids = [d.doc_id for d in documents]
+        duplicates = duplicate_ids(ids)
+        if duplicates:
+            raise ValueError(f"Batch document ids must be unique, repeated: {', '.join(duplicates)}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        packs = self.plan(documents)
+        outcomes = await asyncio.gather(
+            *(self._run_pack(pack, semaphore, f"{request_id}-p{i}") for i, pack in enumerate(packs))
+        )
+
+        by_id = {r.doc_id: r for results in outcomes for r in results}
+        logger.info(
+            f"[{request_id}] LLM batch: {len(documents)} docs in {len(packs)} packs, "
+            f"{self.requests} requests ({self.retries} individual retries)"
+        )
+        return [by_id[doc_id] for doc_id in ids]
+
+    async def _run_pack(
+        self, pack: list[BatchDocument], semaphore: asyncio.Semaphore, request_id: str
+    ) -> list[BatchResult]:
+        if len(pack) == 1:
+            return [await self._run_single(pack[0], semaphore, request_id)]
+
+        ids = [d.doc_id for d in pack]
+        prompt = PACK_PROMPT_TEMPLATE.format(
+            instructions=self.instructions,
+            count=len(pack),
+            documents="\n\n".join(f'<document id="{d.doc_id}">\n{d.text}\n</document>' for d in pack),
+            ids=", ".join(ids),
+        )
+
+        try:
+            async with semaphore:
+                self.requests += 1
+                response = await self.client.generate_json(
+                    prompt=prompt,
+                    system=self.system,
+                    temperature=self.temperature,
+                    max_tokens=min(self.max_output_tokens, self.output_tokens_per_doc * len(pack) + 100),
+                    request_id=request_id,
+                )
+            members = _demux(response, ids)
+        except Exception as e:
+            logger.warning(f"[{request_id}] Pack of {len(pack)} failed, retrying individually: {e}")
+            members = {}
+
+        results: dict[str, BatchResult] = {}
+        retry: list[BatchDocument] = []
+        for doc in pack:
+            item = members.get(doc.doc_id)
+            if not isinstance(item, dict):
+                retry.append(doc)
+                continue
+            try:
+                data = self.validate(item) if self.validate else item
+            except Exception as e:
+                logger.info(f"[{request_id}] {doc.doc_id} invalid in pack, retrying individually: {e}")
+                retry.append(doc)
+                continue
+            results[doc.doc_id] = BatchResult(doc.doc_id, data=data, batched=True, attempts=1)
+
+        if retry:
+            self.retries += len(retry)
+            retried = await asyncio.gather(
+                *(self._run_single(doc, semaphore, f"{request_id}-{doc.doc_id}", attempts=1) for doc in retry)
+            )
+            results.update((r.doc_id, r) for r in retried)
+
+        return [results[doc_id] for doc_id in ids]
+
+    async def _run_single(
+        self, doc: BatchDocument, semaphore: asyncio.Semaphore, request_id: str, attempts: int = 0
+    ) -> BatchResult:
+        prompt = SINGLE_PROMPT_TEMPLATE.format(instructions=self.instructions, text=doc.text)
+        try:
+            async with semaphore:
+                self.requests += 1
+                response = await self.client.generate_json(
+                    prompt=prompt,
+                    system=self.system,
+                    temperature=self.temperature,
+                    max_tokens=max(self.output_tokens_per_doc, 2048),
+                    request_id=request_id,
+                )
+            data = self.validate(response) if self.validate else response
+        except Exception as e:
+            logger.warning(f"[{request_id}] {doc.doc_id} failed: {e}")
+            return BatchResult(doc.doc_id, error=str(e), attempts=attempts + 1)
+        return BatchResult(doc.doc_id, data=data, attempts=attempts + 1)
+
@@ -21,7 +21,7 @@ import os
 import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator
 
 import httpx
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
@@ -34,6 +34,8 @@ from core.json_utils import (
     try_parse_json_robust,
 )
 
+from .streaming import SSE_DONE, StreamChunk, iter_sse_data, parse_stream_chunk
+
 # Configure logging
 logger = logging.getLogger("erpx.llm")
 
@@ -156,6 +158,7 @@ class LLMClient:
     - JSON schema enforcement
     - Circuit breaker (basic)
     - Async support (new)
+    - Token streaming (stream)
 
     Usage:
         client = LLMClient()
@@ -167,6 +170,9 @@ class LLMClient:
         )
         # Sync (legacy)
         response = client.generate_sync(...)
+        # Streaming
+        async for chunk in client.stream(prompt="..."):
+            print(chunk.content, end="")
     """
 
     def __init__(self, config: LLMConfig | None = None):
@@ -399,6 +405,89 @@ class LLMClient:
             self._record_failure()
             raise
 
+    async def stream(
+        self,
+        prompt: str,
+        system: str = "",
+        json_schema: dict | None = None,
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+        request_id: str = "",
+        trace_id: str = "",
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream LLM response chunks as they are generated (Async).
+
+        Yields StreamChunk objects with incremental `content` and `reasoning`
+        (qwen3 thinking); the final chunk carries `finish_reason` / `usage`.
+        Not retried: a retry after tokens were yielded would duplicate output.
+        Closing the iterator early (e.g. once a tool call is complete) aborts
+        the upstream request.
+        """
+        request = self._prepare_request_object(
+            prompt, system, json_schema, temperature, max_tokens, request_id, trace_id
+        )
+        body, headers = self._prepare_request_body_and_headers(request)
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+        headers["Accept"] = "text/event-stream"
+
+        start_time = time.time()
+        first_token_ms = None
+        output_tokens = 0
+
+        logger.info(f"[{request.request_id}] DO Agent request (stream): model={self.config.model}")
+
+        try:
+            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
+                async with client.stream(
+                    "POST", f"{self.config.url}/api/v1/chat/completions", json=body, headers=headers
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    self._record_success()
+
+                    async for data in iter_sse_data(response.aiter_lines()):
+                        if data == SSE_DONE:
+                            break
+                        try:
+                            chunk = parse_stream_chunk(json.loads(data))
+                        except json.JSONDecodeError:
+                            logger.warning(f"[{request.request_id}] Skipping malformed stream chunk: {data[:100]}")
+                            continue
+
+                        if first_token_ms is None and (chunk.content or chunk.reasoning):
+                            first_token_ms = (time.time() - start_time) * 1000
+                        if chunk.usage:
+                            output_tokens = chunk.usage.get("completion_tokens", output_tokens)
+                        yield chunk
+
+        except httpx.TimeoutException as e:
+            self._record_failure()
+            latency_ms = (time.time() - start_time) * 1000
+            logger.error(f"[{request.request_id}] DO Agent stream TIMEOUT after {latency_ms:.0f}ms")
+            raise LLMTimeoutError(f"DO Agent timeout after {latency_ms:.0f}ms") from e
+
+        except httpx.HTTPStatusError as e:
+            self._record_failure()
+            logger.error(
+                f"[{request.request_id}] DO Agent HTTP error: "
+                f"status={e.response.status_code} body={e.response.text[:200]}"
+            )
+            raise LLMInferenceError(f"DO Agent HTTP {e.response.status_code}: {e.response.text[:200]}") from e
+
+        except httpx.TransportError as e:
+            self._record_failure()
+            logger.error(f"[{request.request_id}] DO Agent stream transport error: {e}")
+            raise LLMInferenceError(f"DO Agent stream failed: {e}") from e
+
+        logger.info(
+            f"[{request.request_id}] DO Agent stream complete: "
+            f"first_token={first_token_ms or 0:.0f}ms total={(time.time() - start_time) * 1000:.0f}ms "
+            f"tokens={output_tokens}"
+        )
+
     def generate_json_sync(
         self,
         prompt: str,
@@ -0,0 +1,191 @@
+"""
+ERPX AI - LLM Streaming Helpers
+===============================
+Incremental parsing for LLMClient.stream():
+
+- iter_sse_data(): server-sent event `data:` payloads from a line stream
+- parse_stream_chunk(): OpenAI-style chat.completion.chunk -> StreamChunk
+- JsonObjectDetector: spots the first complete JSON object (tool call /
+  agent decision) in partial output, so callers can act on it before the
+  generation finishes
+- partial_string_field(): decoded prefix of a JSON string field that is
+  still being generated (e.g. the "response" of a copilot decision)
+- format_sse(): encode an event for a text/event-stream response
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+SSE_DONE = "[DONE]"
+
+
+@dataclass
+class StreamChunk:
+    """One incremental piece of a streamed completion"""
+
+    content: str = ""
+    reasoning: str = ""
+    finish_reason: str | None = None
+    usage: dict[str, Any] | None = None
+
+
+async def iter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield the data of each server-sent event (multi-line data joined with newlines)."""
+    data: list[str] = []
+    async for line in lines:
+        line = line.rstrip("\r")
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            continue  # comment / keep-alive
+        if line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+
+def parse_stream_chunk(payload: dict[str, Any]) -> StreamChunk:
+    """Convert a chat.completion.chunk payload into a StreamChunk."""
+    chunk = StreamChunk(usage=payload.get("usage") or None)
+    choices = payload.get("choices") or []
+    if choices:
+        choice = choices[0]
+        delta = choice.get("delta") or choice.get("message") or {}
+        chunk.content = delta.get("content") or ""
+        # Qwen3 streams its thinking separately
+        chunk.reasoning = delta.get("reasoning_content") or ""
+        chunk.finish_reason = choice.get("finish_reason")
+    return chunk
+
+
+class JsonObjectDetector:
+    """
+    Finds the first complete top-level JSON object in streamed text.
+
+    Scanning is incremental (each character is looked at once) and aware of
+    strings and escapes, so braces inside string values do not confuse it.
+
+    Usage:
+        detector = JsonObjectDetector()
+        for piece in stream:
+            obj_text = detector.feed(piece)
+            if obj_text is not None:
+                ...  # complete object available, generation may still be running
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.start = -1
+        self.end = -1
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end >= 0
+
+    @property
+    def object_text(self) -> str | None:
+        return self.buffer[self.start : self.end] if self.complete else None
+
+    def feed(self, text: str) -> str | None:
+        """Append text; return the object text the first time it closes."""
+        self.buffer += text
+        if self.complete:
+            return None
+
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self.start < 0:
+                if ch == "{":
+                    self.start = i
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = i + 1
+                    self._pos = self.end
+                    return self.object_text
+        self._pos = len(buffer)
+        return None
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def partial_string_field(text: str, key: str) -> str:
+    """
+    Decoded value of the JSON string field `key` in possibly truncated JSON,
+    up to the last fully received character ("" if the field has not started).
+    """
+    match = re.search(rf'"{re.escape(key)}"\s*:\s*"', text)
+    if not match:
+        return ""
+
+    out = []
+    i = match.end()
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            break
+        if ch != "\\":
+            out.append(ch)
+            i += 1
+            continue
+        if i + 1 >= n:
+            break  # escape not complete yet
+        esc = text[i + 1]
+        if esc == "u":
+            hex_digits = text[i + 2 : i + 6]
+            if len(hex_digits) < 4:
+                break
+            try:
+                code = int(hex_digits, 16)
+            except ValueError:
+                i += 6
+                continue
+            if 0xD800 <= code < 0xDC00:
+                # Surrogate pair: wait for the low half
+                low = text[i + 6 : i + 12]
+                if len(low) < 6:
+                    break
+                if low.startswith("\\u"):
+                    try:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (int(low[2:], 16) - 0xDC00)
+                        i += 6
+                    except ValueError:
+                        pass
+            out.append(chr(code))
+            i += 6
+            continue
+        out.append(_ESCAPES.get(esc, esc))
+        i += 2
+    return "".join(out)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event; data is JSON-encoded."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
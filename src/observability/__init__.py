@@ -4,11 +4,23 @@ ERPX Observability Module
 PR-12: Metrics, evaluation, and alerting.
 """
 
+from .evaluation import (
+    CaseOutcome,
+    CaseResult,
+    EvalReport,
+    EvalRunner,
+    LatencyHistogram,
+    ReplayLLM,
+    StageTimer,
+    compare_to_baseline,
+)
+
 from .metrics import (
     AlertCondition,
     AlertSeverity,
     MetricType,
     add_evaluation_case,
+    add_evaluation_cases,
     check_alerts,
     complete_evaluation_run,
     create_evaluation_run,
@@ -43,9 +55,19 @@ __all__ = [
     # Evaluation
     "create_evaluation_run",
     "add_evaluation_case",
+    "add_evaluation_cases",
     "complete_evaluation_run",
     "get_evaluation_run",
     "list_evaluation_runs",
+    # Evaluation harness
+    "EvalRunner",
+    "EvalReport",
+    "CaseOutcome",
+    "CaseResult",
+    "StageTimer",
+    "LatencyHistogram",
+    "ReplayLLM",
+    "compare_to_baseline",
     # Alerting
     "check_alerts",
     "fire_alert",
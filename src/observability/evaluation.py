@@ -0,0 +1,375 @@
+"""
+ERPX AI Accounting - Evaluation Harness
+=======================================
+Shared runner for scripts/run_eval.py and the pilot/benchmark scripts:
+
+- cases run concurrently, at most EVAL_CONCURRENCY at a time
+- each case times its stages (``with timer.stage("llm"): ...``); the report
+  has p50/p95/p99 and bucket counts per stage and for the whole case
+- LLM responses can be recorded to a cassette file and replayed, so CI runs
+  are deterministic and never touch the network
+- reports are saved as JSON and compared against a stored baseline; p50/p95
+  slowdowns beyond EVAL_REGRESSION_TOLERANCE, new errors or an accuracy drop
+  are reported as regressions
+
+    runner = EvalRunner(concurrency=8)
+    report = await runner.run("accuracy", cases, evaluate_case)
+    regressions = compare_to_baseline(report.to_dict(), load_report(path))
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from .metrics import LATENCY_BUCKETS_MS
+
+logger = logging.getLogger("erpx.observability.evaluation")
+
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "8"))
+EVAL_LLM_CASSETTE = os.getenv("EVAL_LLM_CASSETTE", "tests/fixtures/eval_llm_cassette.json")
+# Relative p50/p95 slowdown that counts as a regression...
+EVAL_REGRESSION_TOLERANCE = float(os.getenv("EVAL_REGRESSION_TOLERANCE", "0.25"))
+# ...as long as it is also at least this many milliseconds (timer noise)
+EVAL_REGRESSION_MIN_MS = float(os.getenv("EVAL_REGRESSION_MIN_MS", "5"))
+EVAL_ACCURACY_TOLERANCE = float(os.getenv("EVAL_ACCURACY_TOLERANCE", "0.0"))
+
+LLM_MODES = ("live", "record", "replay")
+
+
+# ===========================================================================
+# Latency statistics
+# ===========================================================================
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile (same as Postgres PERCENTILE_CONT)."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class LatencyHistogram:
+    """Latency samples (ms) with percentile and bucket summaries."""
+
+    def __init__(self, values: list[float] | None = None, buckets: list[float] = LATENCY_BUCKETS_MS):
+        self.values: list[float] = list(values or [])
+        self.buckets = buckets
+
+    def add(self, latency_ms: float):
+        self.values.append(latency_ms)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def summary(self) -> dict[str, Any]:
+        values = sorted(self.values)
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "avg_ms": sum(values) / len(values),
+            "min_ms": values[0],
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+            "max_ms": values[-1],
+            # cumulative, like metrics.histogram_rows
+            "buckets": {
+                **{f"le_{b}": sum(v <= b for v in values) for b in self.buckets},
+                "le_inf": len(values),
+            },
+        }
+
+
+class StageTimer:
+    """Wall time per named stage of one case; repeated stages accumulate."""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+# ===========================================================================
+# Recorded LLM responses
+# ===========================================================================
+
+
+class CassetteMiss(LookupError):
+    """Replay mode found no recorded response for a request."""
+
+
+class ReplayLLM:
+    """
+    generate_json() in front of an LLM client, backed by a JSON cassette.
+
+    live: pass through. record: pass through and store every response.
+    replay: answer only from the cassette (CassetteMiss otherwise). Requests
+    are keyed by prompt, system prompt, schema and temperature, never by
+    request_id, so repeated runs hit the same entries.
+    """
+
+    def __init__(self, client=None, path: str | Path = EVAL_LLM_CASSETTE, mode: str = "replay"):
+        if mode not in LLM_MODES:
+            raise ValueError(f"Unknown LLM mode: {mode}")
+        self.mode = mode
+        self.path = Path(path)
+        self._client = client
+        self._dirty = False
+        self.entries: dict[str, dict] = {}
+        if mode != "live" and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @property
+    def client(self):
+        if self._client is None:
+            from src.llm import get_llm_client
+
+            self._client = get_llm_client()
+        return self._client
+
+    @staticmethod
+    def key(prompt: str, system: str = "", schema: dict | None = None, temperature: float = 0.3) -> str:
+        raw = json.dumps([prompt, system, schema, temperature], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def generate_json(
+        self,
+        prompt: str,
+        system: str = "",
+        schema: dict | None = None,
+        temperature: float = 0.3,
+        **kwargs,
+    ) -> dict[str, Any]:
+        key = self.key(prompt, system, schema, temperature)
+        if self.mode == "replay":
+            entry = self.entries.get(key)
+            if entry is None:
+                raise CassetteMiss(f"No recorded LLM response for prompt {prompt[:60]!r}; re-record with --llm-mode record")
+            return copy.deepcopy(entry["response"])
+
+        start = time.perf_counter()
+        response = await self.client.generate_json(
+            prompt=prompt, system=system, schema=schema, temperature=temperature, **kwargs
+        )
+        if self.mode == "record":
+            self.entries[key] = {
+                "prompt": prompt[:200],
+                "response": response,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+            self._dirty = True
+        return response
+
+    def save(self):
+        """Write recorded responses (record mode only; no-op when unchanged)."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        tmp.replace(self.path)
+        self._dirty = False
+        logger.info(f"Recorded {len(self.entries)} LLM responses to {self.path}")
+
+
+# ===========================================================================
+# Runner and report
+# ===========================================================================
+
+
+@dataclass
+class CaseResult:
+    """Outcome of one evaluation case."""
+
+    name: str
+    case_number: int
+    result: str  # pass, fail, error
+    latency_ms: float
+    stages: dict[str, float] = field(default_factory=dict)
+    input_data: dict | None = None
+    expected_output: dict | None = None
+    actual_output: dict | None = None
+    error_message: str | None = None
+    confidence: float | None = None
+
+
+@dataclass
+class CaseOutcome:
+    """What an evaluate function returns for a case that did not raise."""
+
+    result: str
+    actual_output: dict | None = None
+    error_message: str | None = None
+    confidence: float | None = None
+
+
+@dataclass
+class EvalReport:
+    run_type: str
+    cases: list[CaseResult]
+    wall_seconds: float
+    concurrency: int
+    llm_mode: str = "live"
+
+    def summary(self) -> dict[str, Any]:
+        total = len(self.cases)
+        passed = sum(c.result == "pass" for c in self.cases)
+        stage_names = sorted({s for c in self.cases for s in c.stages})
+        return {
+            "total_cases": total,
+            "passed_cases": passed,
+            "failed_cases": sum(c.result == "fail" for c in self.cases),
+            "error_cases": sum(c.result == "error" for c in self.cases),
+            "accuracy": passed / total if total else None,
+            "wall_seconds": self.wall_seconds,
+            "cases_per_second": total / self.wall_seconds if self.wall_seconds else None,
+            "latency": LatencyHistogram([c.latency_ms for c in self.cases]).summary(),
+            "stages": {
+                name: LatencyHistogram([c.stages[name] for c in self.cases if name in c.stages]).summary()
+                for name in stage_names
+            },
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run_type": self.run_type,
+            "llm_mode": self.llm_mode,
+            "concurrency": self.concurrency,
+            "summary": self.summary(),
+            "cases": [asdict(c) for c in self.cases],
+        }
+
+    def save(self, path: str | Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2, default=str)
+
+
+class EvalRunner:
+    """Run evaluation cases concurrently with per-stage timing."""
+
+    def __init__(self, concurrency: int = EVAL_CONCURRENCY, llm_mode: str = "live"):
+        self.concurrency = max(1, concurrency)
+        self.llm_mode = llm_mode
+
+    async def run(
+        self,
+        run_type: str,
+        cases: list[dict],
+        evaluate: Callable[[dict, StageTimer], Awaitable[CaseOutcome]],
+    ) -> EvalReport:
+        """
+        ``cases`` are dicts with at least ``name`` (``input``/``expected`` are
+        kept in the report). ``evaluate(case, timer)`` raising marks the case
+        as an error; results come back in case order.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_case(i: int, case: dict) -> CaseResult:
+            async with semaphore:
+                timer = StageTimer()
+                start = time.perf_counter()
+                try:
+                    outcome = await evaluate(case, timer)
+                except Exception as e:
+                    outcome = CaseOutcome(result="error", error_message=f"{type(e).__name__}: {e}")
+                latency_ms = (time.perf_counter() - start) * 1000
+
+            result = CaseResult(
+                name=case["name"],
+                case_number=i + 1,
+                result=outcome.result,
+                latency_ms=latency_ms,
+                stages=timer.stages,
+                input_data=case.get("input"),
+                expected_output=case.get("expected"),
+                actual_output=outcome.actual_output,
+                error_message=outcome.error_message,
+                confidence=outcome.confidence,
+            )
+            if result.result == "pass":
+                logger.debug(f"  ✅ {result.name}: pass ({latency_ms:.0f}ms)")
+            else:
+                logger.info(f"  ❌ {result.name}: {result.result} ({latency_ms:.0f}ms) - {result.error_message}")
+            return result
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run_case(i, case) for i, case in enumerate(cases)))
+        return EvalReport(
+            run_type=run_type,
+            cases=list(results),
+            wall_seconds=time.perf_counter() - start,
+            concurrency=self.concurrency,
+            llm_mode=self.llm_mode,
+        )
+
+
+# ===========================================================================
+# Baselines
+# ===========================================================================
+
+
+def load_report(path: str | Path) -> dict[str, Any] | None:
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float = EVAL_REGRESSION_TOLERANCE,
+    min_ms: float = EVAL_REGRESSION_MIN_MS,
+    accuracy_tolerance: float = EVAL_ACCURACY_TOLERANCE,
+) -> list[str]:
+    """Regressions of ``report`` against ``baseline`` (both EvalReport.to_dict())."""
+    if (report["run_type"], report["llm_mode"]) != (baseline["run_type"], baseline["llm_mode"]):
+        raise ValueError(
+            f"Baseline is a {baseline['run_type']}/{baseline['llm_mode']} run, "
+            f"report is {report['run_type']}/{report['llm_mode']}"
+        )
+    current, base = report["summary"], baseline["summary"]
+    regressions = []
+
+    if current["accuracy"] is not None and base["accuracy"] is not None:
+        if current["accuracy"] < base["accuracy"] - accuracy_tolerance:
+            regressions.append(f"accuracy {base['accuracy']:.3f} -> {current['accuracy']:.3f}")
+    if current["error_cases"] > base["error_cases"]:
+        regressions.append(f"errors {base['error_cases']} -> {current['error_cases']}")
+
+    timings = [("case", current["latency"], base["latency"])]
+    timings += [
+        (f"stage {name}", stats, base["stages"][name])
+        for name, stats in current["stages"].items()
+        if name in base["stages"]
+    ]
+    for label, now, before in timings:
+        if not now.get("count") or not before.get("count"):
+            continue
+        for stat in ("p50_ms", "p95_ms"):
+            if now[stat] > before[stat] * (1 + tolerance) and now[stat] - before[stat] >= min_ms:
+                regressions.append(f"{label} {stat[:3]} {before[stat]:.1f}ms -> {now[stat]:.1f}ms")
+    return regressions
@@ -51,6 +51,50 @@ class AlertCondition(str, Enum):
 # ===========================================================================
 
 
+METRIC_INSERT_SQL = """
+    INSERT INTO system_metrics
+    (metric_name, metric_type, value, labels, bucket)
+    VALUES ($1, $2, $3, $4, $5::varchar)
+"""
+
+LATENCY_BUCKETS_MS = [50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def metric_row(
+    metric_name: str,
+    value: float,
+    metric_type: MetricType = MetricType.GAUGE,
+    labels: dict | None = None,
+    bucket: str | None = None,
+) -> tuple:
+    """Parameters for METRIC_INSERT_SQL."""
+    return (metric_name, metric_type.value, value, json.dumps(labels) if labels else "{}", bucket)
+
+
+def histogram_rows(
+    metric_name: str,
+    value: float,
+    buckets: list[float] = [0.1, 0.5, 1.0, 2.0, 5.0, 10.0],
+    labels: dict | None = None,
+) -> list[tuple]:
+    """Rows for every bucket `value` falls into, plus the +Inf bucket."""
+    rows = [
+        metric_row(metric_name, 1.0, MetricType.HISTOGRAM, labels, f"le_{bucket}")
+        for bucket in buckets
+        if value <= bucket
+    ]
+    rows.append(metric_row(metric_name, 1.0, MetricType.HISTOGRAM, labels, "le_inf"))
+    return rows
+
+
+def latency_rows(metric_name: str, latency_ms: float, labels: dict | None = None) -> list[tuple]:
+    """Gauge `{name}_ms` plus `{name}_histogram` bucket rows."""
+    return [
+        metric_row(f"{metric_name}_ms", latency_ms, MetricType.GAUGE, labels),
+        *histogram_rows(f"{metric_name}_histogram", latency_ms, LATENCY_BUCKETS_MS, labels),
+    ]
+
+
 async def record_metric(
     conn,
     metric_name: str,
@@ -70,18 +114,13 @@ async def record_metric(
         labels: Dimension labels (e.g., {"tenant": "abc", "endpoint": "/upload"})
         bucket: For histograms, the bucket label
     """
-    await conn.execute(
-        """
-        INSERT INTO system_metrics
-        (metric_name, metric_type, value, labels, bucket)
-        VALUES ($1, $2, $3, $4, $5::varchar)
-        """,
-        metric_name,
-        metric_type.value,
-        value,
-        json.dumps(labels) if labels else "{}",
-        bucket,
-    )
+    await conn.execute(METRIC_INSERT_SQL, *metric_row(metric_name, value, metric_type, labels, bucket))
+
+
+async def record_metrics(conn, rows: list[tuple]):
+    """Record several metric rows in one round trip."""
+    if rows:
+        await conn.executemany(METRIC_INSERT_SQL, rows)
 
 
 async def record_counter(conn, metric_name: str, increment: float = 1.0, labels: dict | None = None):
@@ -102,24 +141,12 @@ async def record_histogram(
     labels: dict | None = None,
 ):
     """Record histogram value into appropriate buckets."""
-    for bucket in buckets:
-        if value <= bucket:
-            await record_metric(conn, metric_name, 1.0, MetricType.HISTOGRAM, labels, f"le_{bucket}")
-    # Always record +Inf bucket
-    await record_metric(conn, metric_name, 1.0, MetricType.HISTOGRAM, labels, "le_inf")
+    await record_metrics(conn, histogram_rows(metric_name, value, buckets, labels))
 
 
 async def record_latency(conn, metric_name: str, latency_ms: float, labels: dict | None = None):
-    """Record latency in milliseconds."""
-    await record_gauge(conn, f"{metric_name}_ms", latency_ms, labels)
-    # Also record in histogram buckets
-    await record_histogram(
-        conn,
-        f"{metric_name}_histogram",
-        latency_ms,
-        buckets=[50, 100, 200, 500, 1000, 2000, 5000, 10000],
-        labels=labels,
-    )
+    """Record latency in milliseconds (gauge and histogram buckets in one round trip)."""
+    await record_metrics(conn, latency_rows(metric_name, latency_ms, labels))
 
 
 # ===========================================================================
@@ -249,35 +276,34 @@ async def create_evaluation_run(
     return str(run_id)
 
 
-async def add_evaluation_case(
-    conn,
+EVALUATION_CASE_INSERT_SQL = """
+    INSERT INTO evaluation_cases
+    (id, run_id, case_name, case_number, input_data, expected_output,
+     actual_output, result, latency_ms, confidence, error_message, diff)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+"""
+
+
+def evaluation_case_row(
     run_id: str,
     case_name: str,
     input_data: dict,
     expected_output: dict | None,
     actual_output: dict | None,
-    result: str,  # pass, fail, error, skip
+    result: str,
     latency_ms: float | None = None,
     confidence: float | None = None,
     error_message: str | None = None,
     case_number: int | None = None,
-) -> str:
-    """Add a test case to an evaluation run."""
-    case_id = uuid.uuid4()
-
+) -> tuple:
+    """Parameters for EVALUATION_CASE_INSERT_SQL (new case id first)."""
     # Compute diff if both expected and actual exist
     diff = None
     if expected_output and actual_output:
         diff = compute_diff(expected_output, actual_output)
 
-    await conn.execute(
-        """
-        INSERT INTO evaluation_cases
-        (id, run_id, case_name, case_number, input_data, expected_output,
-         actual_output, result, latency_ms, confidence, error_message, diff)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-        """,
-        case_id,
+    return (
+        uuid.uuid4(),
         uuid.UUID(run_id),
         case_name,
         case_number,
@@ -291,7 +317,44 @@ async def add_evaluation_case(
         json.dumps(diff) if diff else None,
     )
 
-    return str(case_id)
+
+async def add_evaluation_case(
+    conn,
+    run_id: str,
+    case_name: str,
+    input_data: dict,
+    expected_output: dict | None,
+    actual_output: dict | None,
+    result: str,  # pass, fail, error, skip
+    latency_ms: float | None = None,
+    confidence: float | None = None,
+    error_message: str | None = None,
+    case_number: int | None = None,
+) -> str:
+    """Add a test case to an evaluation run."""
+    row = evaluation_case_row(
+        run_id,
+        case_name,
+        input_data,
+        expected_output,
+        actual_output,
+        result,
+        latency_ms,
+        confidence,
+        error_message,
+        case_number,
+    )
+    await conn.execute(EVALUATION_CASE_INSERT_SQL, *row)
+
+    return str(row[0])
+
+
+async def add_evaluation_cases(conn, run_id: str, cases: list[dict]) -> int:
+    """Add several cases (add_evaluation_case keyword dicts) in one round trip."""
+    rows = [evaluation_case_row(run_id, **case) for case in cases]
+    if rows:
+        await conn.executemany(EVALUATION_CASE_INSERT_SQL, rows)
+    return len(rows)
 
 
 def compute_diff(expected: dict, actual: dict) -> dict:
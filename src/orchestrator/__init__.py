@@ -37,6 +37,8 @@ except ImportError:
 
 sys.path.insert(0, "/root/erp-ai")
 
+from governance.evidence_store import get_evidence_store
+from guardrails.evidence_index import SourceEvidenceIndex
 from src.guardrails import GuardrailsEngine, get_guardrails_engine
 from src.llm import LLMClient, get_llm_client
 from src.rag import search_accounting_context
@@ -394,6 +396,17 @@ Trả về JSON bút toán."""
     return state
 
 
+def _extraction_evidence(extracted: dict[str, Any]) -> dict[str, Any]:
+    """Evidence section for the values the proposal is built from"""
+    numbers = [
+        {"label": name, "value": extracted[name], "source": "llm"}
+        for name in ("total_amount", "vat_amount")
+        if isinstance(extracted.get(name), (int, float)) and extracted[name]
+    ]
+    snippets = [extracted["invoice_no"]] if isinstance(extracted.get("invoice_no"), str) else []
+    return {"evidence": {"numbers_found": numbers, "key_text_snippets": snippets}}
+
+
 async def validate_proposal_node(state: DocumentState) -> DocumentState:
     """Node: Validate proposal with guardrails"""
     logger.info(f"[{state['job_id']}] Validating proposal")
@@ -401,6 +414,9 @@ async def validate_proposal_node(state: DocumentState) -> DocumentState:
     try:
         engine = get_guardrails_engine()
 
+        # One source index per document, shared by the validators and the evidence store
+        evidence_index = SourceEvidenceIndex(state["raw_text"])
+
         # Validate input
         input_data = {
             "file_size": state["file_info"].get("size", 0),
@@ -409,10 +425,22 @@ async def validate_proposal_node(state: DocumentState) -> DocumentState:
         }
 
         # Validate output
-        result = engine.process(input_data, state["proposal"])
+        result = engine.process(input_data, state["proposal"], evidence_index=evidence_index)
 
         state["validation_result"] = result
 
+        try:
+            # File I/O: keep it off the event loop
+            await asyncio.to_thread(
+                get_evidence_store().store_from_output,
+                state["job_id"],
+                state.get("tenant_id") or "default",
+                _extraction_evidence(state.get("extracted_data") or {}),
+                evidence_index=evidence_index,
+            )
+        except Exception as e:
+            logger.warning(f"[{state['job_id']}] Evidence storage failed: {e}")
+
         # Update status based on validation
         if not result["overall_valid"]:
             state["status"] = "failed"
@@ -11,7 +11,7 @@ import json
 import logging
 import os
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
 import httpx
@@ -52,6 +52,7 @@ class OutboxWorker:
         self._running = False
         self._http_client: httpx.AsyncClient | None = None
         self._temporal_client = None
+        self._batch_fetched_at: datetime | None = None
 
     async def start(self):
         """Start the worker."""
@@ -102,6 +103,8 @@ class OutboxWorker:
                 limit=self.batch_size,
                 max_attempts=self.max_attempts,
             )
+            # Every event in this batch was committed before this instant
+            self._batch_fetched_at = datetime.now(timezone.utc)
 
             if not events:
                 return
@@ -288,12 +291,33 @@ class OutboxWorker:
         # Built-in handlers
         if handler_name == "audit_log_handler":
             logger.info(f"AUDIT: {event['event_type']} {event['aggregate_type']}:{event['aggregate_id']}")
+        elif handler_name == "cfo_insight_refresh":
+            return await self._refresh_cfo_insights(event, handler_name)
         else:
             logger.warning(f"Unknown internal handler: {handler_name}")
 
         return {"status_code": 200, "handler": handler_name}
 
 
+    async def _refresh_cfo_insights(self, event: dict, handler_name: str) -> dict:
+        """Regenerate the tenant's CFO insight snapshots after a posting."""
+        import uuid
+
+        from src.insights.cfo import refresh_insight_snapshots
+
+        tenant_id = event.get("tenant_id") or event["payload"].get("tenant_id")
+        if not tenant_id:
+            return {"status_code": 200, "handler": handler_name, "skipped": True}
+
+        conn = await self.db_connection_factory()
+        try:
+            # Snapshots already regenerated since this batch was fetched cover the event
+            refreshed = await refresh_insight_snapshots(conn, uuid.UUID(str(tenant_id)), since=self._batch_fetched_at)
+        finally:
+            await conn.close()
+        return {"status_code": 200, "handler": handler_name, "refreshed": refreshed}
+
+
 # ===========================================================================
 # Standalone Worker Entry Point
 # ===========================================================================
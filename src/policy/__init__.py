@@ -10,9 +10,17 @@ from .engine import (
     RuleEvaluation,
     RuleResult,
     evaluate_proposal,
+    evaluate_proposals_batch,
     get_active_rules,
     get_policy_evaluation,
     save_policy_evaluation,
+    save_policy_evaluations_batch,
+)
+from .ruleset import (
+    CompiledRuleSet,
+    PolicyRuleCache,
+    compile_rules,
+    get_rule_cache,
 )
 
 __all__ = [
@@ -21,7 +29,13 @@ __all__ = [
     "RuleEvaluation",
     "PolicyEvaluation",
     "evaluate_proposal",
+    "evaluate_proposals_batch",
     "get_active_rules",
     "get_policy_evaluation",
     "save_policy_evaluation",
+    "save_policy_evaluations_batch",
+    "CompiledRuleSet",
+    "PolicyRuleCache",
+    "compile_rules",
+    "get_rule_cache",
 ]
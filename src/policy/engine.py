@@ -323,6 +323,16 @@ def evaluate_vendor_allowlist(
         except re.error:
             pass
 
+    return vendor_allowlist_result(rule_name, mode, proposal_vendor, matched)
+
+
+def vendor_allowlist_result(
+    rule_name: str,
+    mode: str,
+    proposal_vendor: str,
+    matched: bool,
+) -> RuleEvaluation:
+    """Build the allowlist/denylist evaluation once the vendor match is known."""
     if mode == "allow":
         if matched:
             return RuleEvaluation(
@@ -400,21 +410,19 @@ async def get_active_rules(conn, tenant_id: str | None = None) -> list[dict]:
     ]
 
 
-async def evaluate_proposal(
-    conn,
+def _apply_rules(
+    rules,
     proposal: dict,
     job_id: str,
     proposal_id: str | None = None,
-    tenant_id: str | None = None,
     request_id: str | None = None,
 ) -> PolicyEvaluation:
     """
-    Evaluate a proposal against all active policy rules.
+    Run compiled rules against one proposal (no I/O).
 
-    Returns:
-        PolicyEvaluation with overall result and per-rule details
+    Args:
+        rules: Sequence of CompiledRule (see src.policy.ruleset)
     """
-    rules = await get_active_rules(conn, tenant_id)
     evaluations: list[RuleEvaluation] = []
 
     passed = 0
@@ -423,16 +431,9 @@ async def evaluate_proposal(
     has_auto_reject = False
 
     for rule in rules:
-        rule_type = rule["rule_type"]
-        evaluator = RULE_EVALUATORS.get(rule_type)
-
-        if not evaluator:
-            logger.warning(f"[{request_id}] Unknown rule type: {rule_type}")
-            continue
-
         try:
-            result = evaluator(proposal, rule["config"], rule["name"])
-            result.action_on_fail = rule["action_on_fail"]
+            result = rule.evaluate(proposal)
+            result.action_on_fail = rule.action_on_fail
             evaluations.append(result)
 
             if result.result == RuleResult.PASS:
@@ -445,11 +446,11 @@ async def evaluate_proposal(
                 warned += 1
 
         except Exception as e:
-            logger.error(f"[{request_id}] Rule evaluation error ({rule['name']}): {e}")
+            logger.error(f"[{request_id}] Rule evaluation error ({rule.name}): {e}")
             evaluations.append(
                 RuleEvaluation(
-                    rule_name=rule["name"],
-                    rule_type=rule_type,
+                    rule_name=rule.name,
+                    rule_type=rule.rule_type,
                     result=RuleResult.WARN,
                     message=f"Evaluation error: {str(e)}",
                     action_on_fail="warn_only",
@@ -469,7 +470,7 @@ async def evaluate_proposal(
         # Auto-approve only if all threshold checks passed
         auto_approved = any(e.rule_type == "threshold" and e.result == RuleResult.PASS for e in evaluations)
 
-    evaluation = PolicyEvaluation(
+    return PolicyEvaluation(
         job_id=job_id,
         proposal_id=proposal_id,
         overall_result=overall,
@@ -480,16 +481,117 @@ async def evaluate_proposal(
         auto_approved=auto_approved,
     )
 
+
+async def evaluate_proposal(
+    conn,
+    proposal: dict,
+    job_id: str,
+    proposal_id: str | None = None,
+    tenant_id: str | None = None,
+    request_id: str | None = None,
+) -> PolicyEvaluation:
+    """
+    Evaluate a proposal against all active policy rules.
+
+    Rules come from the per-tenant compiled rule-set cache.
+
+    Returns:
+        PolicyEvaluation with overall result and per-rule details
+    """
+    from .ruleset import get_rule_cache
+
+    ruleset = await get_rule_cache().get(conn, tenant_id)
+    evaluation = _apply_rules(ruleset.rules, proposal, job_id, proposal_id, request_id)
+
     # Persist evaluation to DB
     await save_policy_evaluation(conn, evaluation, tenant_id, request_id)
 
     logger.info(
-        f"[{request_id}] Policy evaluation for {job_id}: {overall.value} (pass={passed}, fail={failed}, warn={warned})"
+        f"[{request_id}] Policy evaluation for {job_id}: {evaluation.overall_result.value} "
+        f"(pass={evaluation.rules_passed}, fail={evaluation.rules_failed}, warn={evaluation.rules_warned})"
     )
 
     return evaluation
 
 
+async def evaluate_proposals_batch(
+    conn,
+    items: list[dict],
+    tenant_id: str | None = None,
+    request_id: str | None = None,
+    persist: bool = True,
+) -> list[PolicyEvaluation]:
+    """
+    Evaluate many proposals against one compiled rule set.
+
+    Rules are loaded (or taken from cache) once for the whole batch and all
+    results are persisted with a single executemany.
+
+    Args:
+        items: List of dicts with keys:
+            - proposal: Proposal dict (entries, total_amount, vendor, ...)
+            - job_id: Job ID
+            - proposal_id: Optional proposal UUID
+        persist: Write results to policy_evaluations
+
+    Returns:
+        PolicyEvaluation per item, in input order
+    """
+    from .ruleset import get_rule_cache
+
+    if not items:
+        return []
+
+    ruleset = await get_rule_cache().get(conn, tenant_id)
+    evaluations = [
+        _apply_rules(
+            ruleset.rules,
+            item.get("proposal") or {},
+            item["job_id"],
+            item.get("proposal_id"),
+            request_id,
+        )
+        for item in items
+    ]
+
+    if persist:
+        await save_policy_evaluations_batch(conn, evaluations, tenant_id, request_id)
+
+    counts: dict[str, int] = {}
+    for e in evaluations:
+        counts[e.overall_result.value] = counts.get(e.overall_result.value, 0) + 1
+    logger.info(f"[{request_id}] Batch policy evaluation: {len(evaluations)} proposals, {counts}")
+
+    return evaluations
+
+
+_INSERT_POLICY_EVALUATION = """
+    INSERT INTO policy_evaluations
+    (job_id, proposal_id, tenant_id, overall_result, rules_passed, 
+     rules_failed, rules_warned, details, auto_approved, request_id)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::text)
+"""
+
+
+def _evaluation_row(
+    evaluation: PolicyEvaluation,
+    tenant_id: str | None,
+    request_id: str | None,
+) -> tuple:
+    return (
+        evaluation.job_id,
+        uuid.UUID(evaluation.proposal_id) if evaluation.proposal_id else None,
+        uuid.UUID(tenant_id) if tenant_id and len(str(tenant_id)) > 10 else None,
+        evaluation.overall_result.value,
+        evaluation.rules_passed,
+        evaluation.rules_failed,
+        evaluation.rules_warned,
+        json.dumps([d.to_dict() for d in evaluation.details]),
+        evaluation.auto_approved,
+        request_id,
+    )
+
+
 async def save_policy_evaluation(
     conn,
     evaluation: PolicyEvaluation,
@@ -498,28 +600,27 @@ async def save_policy_evaluation(
 ):
     """Save policy evaluation to database."""
     try:
-        await conn.execute(
-            """
-            INSERT INTO policy_evaluations
-            (job_id, proposal_id, tenant_id, overall_result, rules_passed, 
-             rules_failed, rules_warned, details, auto_approved, request_id)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::text)
-            """,
-            evaluation.job_id,
-            uuid.UUID(evaluation.proposal_id) if evaluation.proposal_id else None,
-            uuid.UUID(tenant_id) if tenant_id and len(str(tenant_id)) > 10 else None,
-            evaluation.overall_result.value,
-            evaluation.rules_passed,
-            evaluation.rules_failed,
-            evaluation.rules_warned,
-            json.dumps([d.to_dict() for d in evaluation.details]),
-            evaluation.auto_approved,
-            request_id,
-        )
+        await conn.execute(_INSERT_POLICY_EVALUATION, *_evaluation_row(evaluation, tenant_id, request_id))
     except Exception as e:
         logger.error(f"[{request_id}] Failed to save policy evaluation: {e}")
 
 
+async def save_policy_evaluations_batch(
+    conn,
+    evaluations: list[PolicyEvaluation],
+    tenant_id: str | None = None,
+    request_id: str | None = None,
+):
+    """Save many policy evaluations with one executemany."""
+    if not evaluations:
+        return
+    try:
+        rows = [_evaluation_row(e, tenant_id, request_id) for e in evaluations]
+        await conn.executemany(_INSERT_POLICY_EVALUATION, rows)
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to save {len(evaluations)} policy evaluations: {e}")
+
+
 async def get_policy_evaluation(
     conn,
     job_id: str,
@@ -0,0 +1,289 @@
+"""
+ERPX AI Accounting - Compiled Policy Rule Sets
+==============================================
+Per-tenant cache of compiled policy rules.
+
+Rules are loaded from `policy_rules` once per tenant, their configs are parsed
+and pre-processed (vendor lists become a frozen set + single regex, thresholds
+become floats), and the result is reused for every proposal until the rule set
+changes.
+
+Invalidation:
+- `policy_rules_changed` NOTIFY (migration 016 trigger) when a listener is attached
+- TTL fallback (POLICY_RULE_CACHE_TTL seconds) for workers without a listener
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
+
+from .engine import (
+    RULE_EVALUATORS,
+    RuleEvaluation,
+    RuleResult,
+    evaluate_threshold,
+    get_active_rules,
+    vendor_allowlist_result,
+)
+
+logger = logging.getLogger("erpx.policy.ruleset")
+
+POLICY_RULES_CHANNEL = "policy_rules_changed"
+DEFAULT_CACHE_TTL = float(os.getenv("POLICY_RULE_CACHE_TTL", "60"))
+
+# Bound on memoized vendor lookups per compiled allowlist rule
+_VENDOR_MEMO_SIZE = 4096
+
+
+class VendorMatcher:
+    """
+    Pre-compiled vendor pattern matcher.
+
+    Equivalent to checking each pattern with `pattern in vendor`,
+    `vendor in pattern` and `re.search(pattern, vendor)`, but done with one
+    set lookup, one substring scan and one combined regex.
+    """
+
+    __slots__ = ("exact", "_haystack", "_regex", "_fallback", "_memo")
+
+    def __init__(self, vendors: list[str]):
+        patterns = [str(p).lower().strip() for p in vendors]
+        self.exact = frozenset(patterns)
+        # NUL never occurs in vendor names, so `vendor in haystack` <=> vendor is a substring of some pattern
+        self._haystack = "\x00".join(patterns)
+
+        alternatives = [re.escape(p) for p in patterns]
+        valid_regexes = []
+        for p in patterns:
+            try:
+                valid_regexes.append(re.compile(p))
+                alternatives.append(f"(?:{p})")
+            except re.error:
+                pass
+
+        self._fallback: list[re.Pattern] | None = None
+        try:
+            self._regex = re.compile("|".join(alternatives))
+        except re.error:
+            # Patterns with inline global flags cannot be combined; match them one by one
+            self._regex = re.compile("|".join(re.escape(p) for p in patterns))
+            self._fallback = valid_regexes
+        self._memo: dict[str, bool] = {}
+
+    def matches(self, vendor: str) -> bool:
+        cached = self._memo.get(vendor)
+        if cached is not None:
+            return cached
+
+        matched = (
+            vendor in self.exact
+            or vendor in self._haystack
+            or self._regex.search(vendor) is not None
+            or (self._fallback is not None and any(r.search(vendor) for r in self._fallback))
+        )
+
+        if len(self._memo) >= _VENDOR_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[vendor] = matched
+        return matched
+
+
+# ===========================================================================
+# Compilation
+# ===========================================================================
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A policy rule with its config parsed and bound to an evaluator."""
+
+    name: str
+    rule_type: str
+    action_on_fail: str
+    evaluate: Callable[[dict], RuleEvaluation]
+
+
+@dataclass
+class CompiledRuleSet:
+    """All active rules for one tenant, ready for evaluation."""
+
+    tenant_key: str | None
+    rules: tuple[CompiledRule, ...]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def _evaluate_vendor_compiled(
+    proposal: dict,
+    matcher: VendorMatcher | None,
+    mode: str,
+    rule_name: str,
+) -> RuleEvaluation:
+    proposal_vendor = (proposal.get("vendor") or "").lower().strip()
+
+    if matcher is None:
+        return RuleEvaluation(
+            rule_name=rule_name,
+            rule_type="vendor_allowlist",
+            result=RuleResult.SKIP,
+            message="No vendor list configured",
+        )
+
+    if not proposal_vendor:
+        return RuleEvaluation(
+            rule_name=rule_name,
+            rule_type="vendor_allowlist",
+            result=RuleResult.WARN,
+            message="No vendor name in proposal",
+            action_on_fail="warn_only",
+        )
+
+    return vendor_allowlist_result(rule_name, mode, proposal_vendor, matcher.matches(proposal_vendor))
+
+
+def compile_rule(rule: dict) -> CompiledRule | None:
+    """Compile one rule row (as returned by `get_active_rules`). Returns None for unknown types."""
+    rule_type = rule["rule_type"]
+    config = rule.get("config") or {}
+    name = rule["name"]
+
+    if rule_type == "vendor_allowlist":
+        vendors = config.get("vendors", [])
+        matcher = VendorMatcher(vendors) if vendors else None
+        evaluate = partial(
+            _evaluate_vendor_compiled,
+            matcher=matcher,
+            mode=config.get("mode", "allow"),
+            rule_name=name,
+        )
+    elif rule_type == "threshold":
+        threshold_config = dict(config)
+        try:
+            threshold_config["max_amount"] = float(config.get("max_amount", 10000000))
+        except (TypeError, ValueError):
+            pass  # Leave as-is; the evaluator reports the bad config per proposal
+        evaluate = partial(evaluate_threshold, config=threshold_config, rule_name=name)
+    else:
+        evaluator = RULE_EVALUATORS.get(rule_type)
+        if not evaluator:
+            logger.warning(f"Unknown rule type: {rule_type} (rule {name})")
+            return None
+        evaluate = partial(evaluator, config=config, rule_name=name)
+
+    return CompiledRule(
+        name=name,
+        rule_type=rule_type,
+        action_on_fail=rule.get("action_on_fail"),
+        evaluate=evaluate,
+    )
+
+
+def compile_rules(rules: list[dict], tenant_key: str | None = None) -> CompiledRuleSet:
+    """Compile a list of rule rows into a rule set, preserving priority order."""
+    compiled = tuple(c for c in (compile_rule(r) for r in rules) if c is not None)
+    return CompiledRuleSet(tenant_key=tenant_key, rules=compiled)
+
+
+# ===========================================================================
+# Cache
+# ===========================================================================
+
+
+def _tenant_key(tenant_id: str | None) -> str | None:
+    """Normalize tenant id the same way `get_active_rules` does."""
+    if tenant_id and len(str(tenant_id)) > 10:
+        return str(uuid.UUID(str(tenant_id)))
+    return None
+
+
+class PolicyRuleCache:
+    """
+    Per-tenant compiled rule-set cache.
+
+    Usage:
+        cache = get_rule_cache()
+        await cache.attach_listener(listen_conn)   # optional, enables NOTIFY invalidation
+        ruleset = await cache.get(conn, tenant_id)
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: dict[str | None, CompiledRuleSet] = {}
+        self._locks: dict[str | None, asyncio.Lock] = {}
+        self._listener_conn = None
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, conn, tenant_id: str | None = None) -> CompiledRuleSet:
+        """Return the compiled rule set for a tenant, loading it on miss/expiry."""
+        key = _tenant_key(tenant_id)
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(entry):
+            self.hits += 1
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry):
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            rules = await get_active_rules(conn, key)
+            entry = compile_rules(rules, key)
+            self._entries[key] = entry
+            return entry
+
+    def _expired(self, entry: CompiledRuleSet) -> bool:
+        return self.ttl > 0 and (time.monotonic() - entry.loaded_at) > self.ttl
+
+    def invalidate(self, tenant_id: str | None = None):
+        """
+        Drop cached rule sets.
+
+        System rules (tenant_id NULL) apply to every tenant, so invalidating
+        without a tenant clears the whole cache.
+        """
+        key = _tenant_key(tenant_id)
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self.invalidate(payload or None)
+        except ValueError:
+            self.invalidate(None)
+        logger.debug(f"Policy rule cache invalidated (payload={payload!r})")
+
+    async def attach_listener(self, conn):
+        """LISTEN for rule changes on a dedicated connection."""
+        await conn.add_listener(POLICY_RULES_CHANNEL, self._on_notify)
+        self._listener_conn = conn
+        logger.info("Policy rule cache listening for changes")
+
+    async def detach_listener(self):
+        if self._listener_conn is not None:
+            try:
+                await self._listener_conn.remove_listener(POLICY_RULES_CHANNEL, self._on_notify)
+            except Exception as e:
+                logger.warning(f"Failed to remove policy rule listener: {e}")
+            self._listener_conn = None
+
+
+_rule_cache: PolicyRuleCache | None = None
+
+
+def get_rule_cache() -> PolicyRuleCache:
+    """Get the process-wide rule cache."""
+    global _rule_cache
+    if _rule_cache is None:
+        _rule_cache = PolicyRuleCache()
+    return _rule_cache
@@ -0,0 +1,345 @@
+"""
+ERPX AI Accounting - Tiered OCR Correction
+==========================================
+Corrects OCR output box by box instead of asking the LLM to rewrite the
+whole page:
+
+1. Rules (every box, no LLM): Vietnamese label lexicon ("HOA DON" ->
+   "HÓA ĐƠN", "Ma so thue" -> "Mã số thuế"), label punctuation
+   ("Ngay." -> "Ngày:"), English label typos ("TOIAL" -> "TOTAL") and
+   letters misread inside numbers ("04/O3/2010" -> "04/03/2010")
+2. LLM (low-confidence boxes only): boxes still below
+   OCR_LLM_CONFIDENCE_THRESHOLD that contain words are sent in one numbered
+   batch, each with its neighbouring lines as read-only context
+3. Corrected spans are mapped back onto their boxes by index; an LLM
+   correction that changes any digit is rejected
+
+On a clean scan nothing reaches the LLM.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+LLM_CONFIDENCE_THRESHOLD = float(os.getenv("OCR_LLM_CONFIDENCE_THRESHOLD", "0.85"))
+LLM_MAX_SPANS_PER_CALL = int(os.getenv("OCR_LLM_MAX_SPANS", "40"))
+LLM_CONTEXT_LINES = int(os.getenv("OCR_LLM_CONTEXT_LINES", "1"))
+
+# Folded (unaccented, lowercase) phrase -> canonical form
+LABEL_LEXICON = {
+    "hoa don gia tri gia tang": "hóa đơn giá trị gia tăng",
+    "hoa don ban hang": "hóa đơn bán hàng",
+    "hoa don dien tu": "hóa đơn điện tử",
+    "hoa don": "hóa đơn",
+    "ma so thue": "mã số thuế",
+    "ky hieu": "ký hiệu",
+    "mau so": "mẫu số",
+    "so tai khoan": "số tài khoản",
+    "don vi ban hang": "đơn vị bán hàng",
+    "nguoi ban hang": "người bán hàng",
+    "nguoi mua hang": "người mua hàng",
+    "ho ten nguoi mua hang": "họ tên người mua hàng",
+    "ten don vi": "tên đơn vị",
+    "dia chi": "địa chỉ",
+    "dien thoai": "điện thoại",
+    "hinh thuc thanh toan": "hình thức thanh toán",
+    "ten hang hoa, dich vu": "tên hàng hóa, dịch vụ",
+    "ten hang hoa": "tên hàng hóa",
+    "don vi tinh": "đơn vị tính",
+    "so luong": "số lượng",
+    "don gia": "đơn giá",
+    "thanh tien": "thành tiền",
+    "cong tien hang": "cộng tiền hàng",
+    "thue suat": "thuế suất",
+    "tien thue gtgt": "tiền thuế GTGT",
+    "thue gtgt": "thuế GTGT",
+    "tong cong tien thanh toan": "tổng cộng tiền thanh toán",
+    "tong cong": "tổng cộng",
+    "so tien viet bang chu": "số tiền viết bằng chữ",
+    "chiet khau": "chiết khấu",
+}
+
+# Labels whose trailing colon is often misread as "." / ";" / ","
+COLON_LABELS = {
+    "ngay": "ngày",
+    "so": "số",
+    "ma so thue": "mã số thuế",
+    "ky hieu": "ký hiệu",
+    "mau so": "mẫu số",
+    "dia chi": "địa chỉ",
+    "dien thoai": "điện thoại",
+    "so tai khoan": "số tài khoản",
+    "ten don vi": "tên đơn vị",
+    "hinh thuc thanh toan": "hình thức thanh toán",
+    "don vi ban hang": "đơn vị bán hàng",
+}
+
+ENGLISH_TYPOS = {
+    "toial": "total",
+    "tolal": "total",
+    "subtolal": "subtotal",
+    "lnvoice": "Invoice",  # "l" misread for a capital I
+    "invoicc": "invoice",
+    "amounl": "amount",
+    "arnount": "amount",
+    "quantlty": "quantity",
+    "vatinvoice": "vat invoice",
+}
+
+_LEXICON_RE = re.compile(
+    r"(?<![0-9a-z])(" + "|".join(re.escape(k) for k in sorted(LABEL_LEXICON, key=len, reverse=True)) + r")(?![0-9a-z])"
+)
+_COLON_RE = re.compile(
+    r"^(\s*)(" + "|".join(re.escape(k) for k in sorted(COLON_LABELS, key=len, reverse=True)) + r")\s*[.;,](?=\s|$)"
+)
+_NO_COLON_NUMBER_RE = re.compile(r"^(\s*)(so)\s+(?=[0-9])")
+_DATE_WORDS_RE = re.compile(r"(?<![0-9a-z])ngay\s+(\d{1,2})\s+thang\s+(\d{1,2})\s+nam\s+(\d{4})")
+_ENGLISH_RE = re.compile(r"(?<![0-9a-z])(" + "|".join(ENGLISH_TYPOS) + r")(?![0-9a-z])")
+_NUMERIC_TOKEN_RE = re.compile(r"(?<![A-Za-z])[0-9OolI][0-9OolI/.,:-]*[0-9OolI](?![A-Za-z])")
+_DIGIT_FIXES = str.maketrans({"O": "0", "o": "0", "l": "1", "I": "1"})
+
+
+@dataclass
+class OCRCorrectionResult:
+    """Outcome of the tiered correction for one document"""
+
+    text: str
+    boxes: list[dict[str, Any]]
+    rule_corrections: list[str] = field(default_factory=list)
+    llm_spans: int = 0
+    llm_calls: int = 0
+    llm_rejected: int = 0
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip diacritics character by character (same length as input)."""
+    out = []
+    for ch in text:
+        if ch in "đĐ":
+            out.append("d")
+            continue
+        base = unicodedata.normalize("NFD", ch)[0]
+        out.append(base.lower() if len(base.lower()) == 1 else ch)
+    return "".join(out)
+
+
+def _match_case(original: str, canonical: str) -> str:
+    """Apply the casing style of the OCR'd span to the canonical phrase."""
+    if original.lower() == canonical.lower():
+        return original
+    letters = [c for c in original if c.isalpha()]
+    if letters and all(c.isupper() for c in letters):
+        return canonical.upper()
+    if original[:1].isupper():
+        return canonical[:1].upper() + canonical[1:]
+    return canonical
+
+
+def _label_with_colon(match: re.Match, original: str, suffix: str) -> str:
+    indent = match.group(1)
+    label = original[len(indent) : len(indent) + len(match.group(2))]
+    return indent + _match_case(label, COLON_LABELS[match.group(2)]) + suffix
+
+
+def _replace_folded(text: str, pattern: re.Pattern, replacement) -> tuple[str, list[str]]:
+    """Run `pattern` on the folded text and splice replacements into the original."""
+    folded = _fold(text)
+    if len(folded) != len(text):
+        return text, []
+    pieces, fixes, last = [], [], 0
+    for match in pattern.finditer(folded):
+        original = text[match.start() : match.end()]
+        new = replacement(match, original)
+        if new != original:
+            pieces.append(text[last : match.start()])
+            pieces.append(new)
+            fixes.append(f"{original} -> {new}")
+            last = match.end()
+    if not fixes:
+        return text, []
+    pieces.append(text[last:])
+    return "".join(pieces), fixes
+
+
+def correct_line_with_rules(line: str) -> tuple[str, list[str]]:
+    """Apply the local lexicon/rule corrections to one OCR line."""
+    line = unicodedata.normalize("NFC", line)
+    corrections: list[str] = []
+
+    def fix_digits(match: re.Match) -> str:
+        token = match.group(0)
+        if sum(c.isdigit() for c in token) < 2:
+            return token
+        fixed = token.translate(_DIGIT_FIXES)
+        if fixed != token:
+            corrections.append(f"{token} -> {fixed}")
+        return fixed
+
+    line = _NUMERIC_TOKEN_RE.sub(fix_digits, line)
+
+    steps = [
+        (_DATE_WORDS_RE, lambda m, orig: _match_case(orig, f"ngày {m.group(1)} tháng {m.group(2)} năm {m.group(3)}")),
+        (_LEXICON_RE, lambda m, orig: _match_case(orig, LABEL_LEXICON[m.group(1)])),
+        (_ENGLISH_RE, lambda m, orig: _match_case(orig, ENGLISH_TYPOS[m.group(1)])),
+        (_COLON_RE, lambda m, orig: _label_with_colon(m, orig, ":")),
+        (_NO_COLON_NUMBER_RE, lambda m, orig: _label_with_colon(m, orig, ": ")),
+    ]
+    for pattern, replacement in steps:
+        line, fixes = _replace_folded(line, pattern, replacement)
+        corrections.extend(fixes)
+
+    return line, corrections
+
+
+def correct_text_with_rules(text: str) -> tuple[str, list[str]]:
+    """Line-by-line rule correction of a full OCR text."""
+    corrections: list[str] = []
+    lines = []
+    for line in text.split("\n"):
+        fixed, fixes = correct_line_with_rules(line)
+        lines.append(fixed)
+        corrections.extend(fixes)
+    return "\n".join(lines), corrections
+
+
+def _digits(text: str) -> str:
+    return "".join(c for c in text if c.isdigit())
+
+
+def _needs_llm(text: str, confidence: float | None, threshold: float) -> bool:
+    """Low-confidence spans with words in them; numbers are left as OCR'd."""
+    if confidence is None or confidence >= threshold:
+        return False
+    return sum(c.isalpha() for c in text) >= 2
+
+
+def build_span_prompt(lines: list[str], span_indices: list[int], context_lines: int = LLM_CONTEXT_LINES) -> str:
+    """Numbered prompt with the spans to fix ([n]) and read-only context lines."""
+    selected = set(span_indices)
+    shown: list[int] = []
+    for i in span_indices:
+        for j in range(max(0, i - context_lines), min(len(lines), i + context_lines + 1)):
+            if not shown or j > shown[-1]:
+                shown.append(j)
+
+    rows = []
+    previous = None
+    for j in shown:
+        if previous is not None and j != previous + 1:
+            rows.append("    ...")
+        prefix = f"[{j}]" if j in selected else "   "
+        rows.append(f"{prefix} {lines[j]}")
+        previous = j
+
+    return (
+        "Sửa lỗi OCR cho các dòng được đánh số [n] (giữ nguyên ngôn ngữ gốc). "
+        "Các dòng không đánh số chỉ là ngữ cảnh, KHÔNG sửa.\n\n"
+        + "\n".join(rows)
+        + '\n\nTrả về JSON dạng {"n": "dòng đã sửa"} chỉ cho các dòng đánh số.'
+    )
+
+
+SPAN_SYSTEM_PROMPT = """Bạn là chuyên gia sửa lỗi OCR cho hóa đơn và chứng từ đa ngôn ngữ (Việt, Anh, Nhật, Trung...).
+Chỉ sửa lỗi rõ ràng (dấu tiếng Việt, ký tự bị nhận nhầm, khoảng trắng). KHÔNG dịch, KHÔNG đoán thêm thông tin,
+KHÔNG thay đổi chữ số. Trả về JSON, không giải thích."""
+
+
+async def _correct_spans_with_llm(
+    lines: list[str], span_indices: list[int], client, context_lines: int
+) -> tuple[dict[int, str], int]:
+    """One LLM call for a batch of spans; returns ({index: corrected}, rejected count)."""
+    prompt = build_span_prompt(lines, span_indices, context_lines)
+    result = await client.generate_json(
+        prompt=prompt,
+        system=SPAN_SYSTEM_PROMPT,
+        schema={"type": "object"},
+        temperature=0.1,
+        max_tokens=max(256, 64 * len(span_indices)),
+        allow_self_fix=False,
+    )
+
+    corrected: dict[int, str] = {}
+    rejected = 0
+    wanted = set(span_indices)
+    for key, value in (result or {}).items():
+        try:
+            idx = int(str(key).strip("[] "))
+        except ValueError:
+            continue
+        if idx not in wanted or not isinstance(value, str) or not value.strip():
+            continue
+        original = lines[idx]
+        value = value.strip()
+        if _digits(value) != _digits(original) or not 0.5 <= len(value) / max(len(original), 1) <= 2.0:
+            rejected += 1
+            continue
+        corrected[idx] = value
+    return corrected, rejected
+
+
+async def correct_ocr_boxes(
+    boxes: list[dict[str, Any]],
+    use_llm: bool = True,
+    confidence_threshold: float = LLM_CONFIDENCE_THRESHOLD,
+    max_spans_per_call: int = LLM_MAX_SPANS_PER_CALL,
+    context_lines: int = LLM_CONTEXT_LINES,
+    client=None,
+) -> OCRCorrectionResult:
+    """
+    Tiered correction of OCR boxes in reading order.
+
+    Each box keeps its original `text`; boxes that changed get
+    `text_corrected` and `correction` ("rules" or "llm"). The returned text
+    is the corrected lines joined by newlines.
+    """
+    lines: list[str] = []
+    methods: list[str | None] = []
+    rule_corrections: list[str] = []
+
+    for box in boxes:
+        text = box.get("text") or ""
+        fixed, fixes = correct_line_with_rules(text)
+        lines.append(fixed)
+        methods.append("rules" if fixed != text else None)
+        rule_corrections.extend(fixes)
+
+    spans = [i for i, box in enumerate(boxes) if _needs_llm(lines[i], box.get("confidence"), confidence_threshold)]
+
+    result = OCRCorrectionResult(text="", boxes=[], rule_corrections=rule_corrections, llm_spans=len(spans))
+
+    if spans and use_llm:
+        if client is None:
+            from src.llm import get_llm_client
+
+            client = get_llm_client()
+        batches = [spans[i : i + max_spans_per_call] for i in range(0, len(spans), max_spans_per_call)]
+        outcomes = await asyncio.gather(
+            *(_correct_spans_with_llm(lines, batch, client, context_lines) for batch in batches),
+            return_exceptions=True,
+        )
+        result.llm_calls = len(batches)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                logger.warning(f"LLM span correction failed: {outcome}")
+                continue
+            corrected, rejected = outcome
+            result.llm_rejected += rejected
+            for idx, value in corrected.items():
+                if value != lines[idx]:
+                    lines[idx] = value
+                    methods[idx] = "llm"
+
+    for box, line, method in zip(boxes, lines, methods):
+        new_box = box.copy()
+        if method:
+            new_box["text_corrected"] = line
+            new_box["correction"] = method
+        result.boxes.append(new_box)
+    result.text = "\n".join(lines)
+    return result
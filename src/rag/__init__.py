@@ -26,6 +26,7 @@ QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 QDRANT_URL = core_config.QDRANT_URL or f"http://{QDRANT_HOST}:{QDRANT_PORT}"
 
 COLLECTION_NAME = os.getenv("QDRANT_COLLECTION", "accounting_kb")
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 EMBEDDING_DIM = 384  # For sentence-transformers/all-MiniLM-L6-v2
 
 # =============================================================================
@@ -42,7 +43,7 @@ def get_embedding_model():
         try:
             from sentence_transformers import SentenceTransformer
 
-            _embedding_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
             logger.info("SentenceTransformer model loaded: all-MiniLM-L6-v2")
         except ImportError:
             logger.warning("sentence-transformers not available")
@@ -100,12 +101,31 @@ class SearchResult:
     source: str
 
 
+def _load_codecs() -> dict:
+    from src.rag.quantization import load_collection_codecs
+
+    try:
+        return load_collection_codecs()
+    except Exception as e:
+        logger.error(f"Invalid RAG_COMPRESSION, collections stay uncompressed: {e}")
+        return {}
+
+
 class QdrantClient:
     """Qdrant vector database client"""
 
-    def __init__(self, url: str = QDRANT_URL):
+    def __init__(self, url: str = QDRANT_URL, codecs: dict | None = None):
         self.url = url
         self.client = httpx.Client(timeout=30.0)
+        # collection -> EmbeddingCodec (RAG_COMPRESSION, see src/rag/quantization.py)
+        self.codecs = codecs if codecs is not None else _load_codecs()
+
+    def _reduce(self, collection_name: str, vectors: list[list[float]]) -> list[list[float]]:
+        """Client-side dimension reduction for compressed collections (quantization is server-side)"""
+        codec = self.codecs.get(collection_name)
+        if codec is None or not vectors:
+            return vectors
+        return codec.reduce(vectors).tolist()
 
     async def health_check(self) -> bool:
         """Check if Qdrant is healthy"""
@@ -127,6 +147,14 @@ class QdrantClient:
 
             # Create collection
             payload = {"vectors": {"size": EMBEDDING_DIM, "distance": "Cosine"}}
+            codec = self.codecs.get(collection_name)
+            if codec is not None:
+                payload["vectors"]["size"] = codec.output_dim(EMBEDDING_DIM)
+                quantization = codec.config.qdrant_quantization_config()
+                if quantization:
+                    # Quantized vectors in RAM, originals on disk for rescoring
+                    payload["vectors"]["on_disk"] = True
+                    payload["quantization_config"] = quantization
             resp = self.client.put(f"{self.url}/collections/{collection_name}", json=payload)
 
             if resp.status_code in [200, 201]:
@@ -154,7 +182,7 @@ class QdrantClient:
             return 0
 
         # Generate embeddings
-        embeddings = generate_embeddings_batch(texts)
+        embeddings = self._reduce(collection_name, generate_embeddings_batch(texts))
         if not embeddings:
             logger.error("Failed to generate embeddings")
             return 0
@@ -201,6 +229,29 @@ class QdrantClient:
         logger.info(f"Upserted {total_upserted} documents to {collection_name}")
         return total_upserted
 
+    def upsert_points(self, collection_name: str, points: list[dict[str, Any]]) -> None:
+        """Upsert pre-embedded {"id", "vector", "payload"} points (raises on failure)"""
+        if collection_name in self.codecs:
+            vectors = self._reduce(collection_name, [p["vector"] for p in points])
+            points = [{**p, "vector": v} for p, v in zip(points, vectors)]
+        resp = self.client.put(
+            f"{self.url}/collections/{collection_name}/points", json={"points": points}, params={"wait": "true"}
+        )
+        resp.raise_for_status()
+
+    def delete_points(self, collection_name: str, ids: list[str]) -> None:
+        """Delete points by ID (raises on failure)"""
+        resp = self.client.post(
+            f"{self.url}/collections/{collection_name}/points/delete", json={"points": list(ids)}, params={"wait": "true"}
+        )
+        resp.raise_for_status()
+
+    def count(self, collection_name: str = COLLECTION_NAME) -> int:
+        """Exact number of points in a collection (raises on failure)"""
+        resp = self.client.post(f"{self.url}/collections/{collection_name}/points/count", json={"exact": True})
+        resp.raise_for_status()
+        return int(resp.json()["result"]["count"])
+
     def search(
         self,
         query: str,
@@ -228,44 +279,81 @@ class QdrantClient:
             logger.error("Failed to generate query embedding")
             return []
 
-        # Build search request
-        search_params = {
-            "vector": query_embedding,
-            "limit": limit,
-            "with_payload": True,
-            "score_threshold": score_threshold,
-        }
+        return self.search_vectors_batch([query_embedding], limit, score_threshold, filter_dict, collection_name)[0]
+
+    @staticmethod
+    def _filter(filter_dict: dict[str, Any] | None) -> dict | None:
+        if not filter_dict:
+            return None
+        return {"must": [{"key": k, "match": {"value": v}} for k, v in filter_dict.items()]}
+
+    @staticmethod
+    def _to_result(hit: dict) -> SearchResult:
+        payload = hit.get("payload") or {}
+        return SearchResult(
+            id=str(hit.get("id", "")),
+            score=hit.get("score", 0.0),
+            text=payload.get("text", ""),
+            metadata={k: v for k, v in payload.items() if k != "text"},
+            source=payload.get("source", "unknown"),
+        )
+
+    def search_vectors_batch(
+        self,
+        vectors: list[list[float]],
+        limit: int = 5,
+        score_threshold: float | None = 0.5,
+        filter_dict: dict[str, Any] | None = None,
+        collection_name: str = COLLECTION_NAME,
+    ) -> list[list[SearchResult]]:
+        """Nearest neighbours for several query vectors in one request (empty lists on failure)"""
+        if not vectors:
+            return []
 
-        # Add filter if provided
-        if filter_dict:
-            search_params["filter"] = {"must": [{"key": k, "match": {"value": v}} for k, v in filter_dict.items()]}
+        codec = self.codecs.get(collection_name)
+        search_params = codec.config.qdrant_search_params() if codec else None
+        searches = []
+        for vector in self._reduce(collection_name, vectors):
+            params = {"vector": vector, "limit": limit, "with_payload": True}
+            if search_params:
+                params["params"] = search_params
+            if score_threshold is not None:
+                params["score_threshold"] = score_threshold
+            qfilter = self._filter(filter_dict)
+            if qfilter:
+                params["filter"] = qfilter
+            searches.append(params)
 
         try:
-            resp = self.client.post(f"{self.url}/collections/{collection_name}/points/search", json=search_params)
+            resp = self.client.post(
+                f"{self.url}/collections/{collection_name}/points/search/batch", json={"searches": searches}
+            )
 
             if resp.status_code != 200:
                 logger.error(f"Search failed: {resp.text}")
-                return []
-
-            results = []
-            data = resp.json()
-
-            for hit in data.get("result", []):
-                payload = hit.get("payload", {})
-                result = SearchResult(
-                    id=str(hit.get("id", "")),
-                    score=hit.get("score", 0.0),
-                    text=payload.get("text", ""),
-                    metadata={k: v for k, v in payload.items() if k != "text"},
-                    source=payload.get("source", "unknown"),
-                )
-                results.append(result)
+                return [[] for _ in vectors]
 
-            return results
+            return [[self._to_result(hit) for hit in hits] for hits in resp.json().get("result", [])]
 
         except Exception as e:
             logger.error(f"Search failed: {e}")
-            return []
+            return [[] for _ in vectors]
+
+    def scroll_payloads(self, collection_name: str = COLLECTION_NAME, page_size: int = 256):
+        """Yield (id, payload) for every point, without vectors"""
+        offset = None
+        while True:
+            body = {"limit": page_size, "with_payload": True, "with_vector": False}
+            if offset is not None:
+                body["offset"] = offset
+            resp = self.client.post(f"{self.url}/collections/{collection_name}/points/scroll", json=body)
+            resp.raise_for_status()
+            result = resp.json().get("result", {})
+            for point in result.get("points", []):
+                yield str(point["id"]), point.get("payload") or {}
+            offset = result.get("next_page_offset")
+            if offset is None:
+                return
 
     def delete_collection(self, collection_name: str = COLLECTION_NAME) -> bool:
         """Delete a collection"""
@@ -316,34 +404,31 @@ def ingest_accounting_knowledge(
     - title: Document title
     - category: e.g., "thong_tu", "chuan_muc", "huong_dan"
     - url: Source URL (optional)
+
+    Ingestion is incremental (see src.rag.ingest): only chunks not already in
+    the collection are embedded. Returns the number of chunks embedded.
     """
+    from src.rag.hybrid import LexicalIndexSink
+    from src.rag.ingest import KBIngester
+
     client = get_qdrant_client()
+    client.ensure_collection(COLLECTION_NAME)
 
-    texts = []
-    metadatas = []
-
-    for doc in documents:
-        text = doc.get("text", "")
-        if not text:
-            continue
-
-        # Chunk long documents
-        chunks = chunk_text(text, chunk_size=1000, overlap=100)
-
-        for i, chunk in enumerate(chunks):
-            texts.append(chunk)
-            metadatas.append(
-                {
-                    "title": doc.get("title", "Untitled"),
-                    "category": doc.get("category", "general"),
-                    "source": source,
-                    "url": doc.get("url", ""),
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                }
-            )
+    docs = [
+        {
+            "key": f"{source}:{doc.get('url') or doc.get('title', 'Untitled')}",
+            "text": doc["text"],
+            "source": source,
+            "title": doc.get("title", "Untitled"),
+            "category": doc.get("category", "general"),
+            "url": doc.get("url", ""),
+        }
+        for doc in documents
+        if doc.get("text")
+    ]
 
-    return client.upsert_documents(texts, metadatas)
+    ingester = KBIngester(LexicalIndexSink(client), generate_embeddings_batch, EMBEDDING_MODEL_NAME)
+    return ingester.ingest(COLLECTION_NAME, docs).embedded
 
 
 def chunk_text(
@@ -387,6 +472,9 @@ def search_accounting_context(
     """
     Search for relevant accounting context.
 
+    Hybrid retrieval (BM25 + dense, RRF-fused, see src.rag.hybrid), so exact
+    account codes and circular numbers match even when embeddings do not.
+
     Args:
         query: The search query
         limit: Maximum results
@@ -395,18 +483,19 @@ def search_accounting_context(
     Returns:
         List of relevant documents
     """
-    client = get_qdrant_client()
+    return search_accounting_context_batch([query], limit, category)[0]
 
-    filter_dict = None
-    if category:
-        filter_dict = {"category": category}
 
-    return client.search(
-        query=query,
-        limit=limit,
-        score_threshold=0.5,
-        filter_dict=filter_dict,
-    )
+def search_accounting_context_batch(
+    queries: list[str],
+    limit: int = 5,
+    category: str | None = None,
+) -> list[list[SearchResult]]:
+    """search_accounting_context for several queries (one embedding call, one Qdrant request)"""
+    from src.rag.hybrid import get_hybrid_retriever
+
+    filter_dict = {"category": category} if category else None
+    return get_hybrid_retriever().search_batch(queries, limit=limit, filter_dict=filter_dict, score_threshold=0.5)
 
 
 def format_context_for_llm(results: list[SearchResult]) -> str:
@@ -651,6 +740,7 @@ __all__ = [
     "generate_embeddings_batch",
     "ingest_accounting_knowledge",
     "search_accounting_context",
+    "search_accounting_context_batch",
     "format_context_for_llm",
     "chunk_text",
     "bootstrap_tt200_knowledge",
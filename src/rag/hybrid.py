@@ -0,0 +1,439 @@
+"""
+ERPX AI Accounting - Hybrid Retrieval
+=====================================
+Dense MiniLM search alone misses exact identifiers ("TK 1331",
+"Thông tư 200", tax IDs). HybridRetriever combines:
+
+- BM25Index:       local inverted index kept alongside each Qdrant collection
+                   (LexicalIndexSink updates it during ingestion). Tokens are
+                   lower-cased and accent-folded, and letter/digit runs are
+                   split, so "TK1331", "tk 1331" and "TK 1331" all match.
+- Qdrant:          dense nearest neighbours, one batch request for all queries
+- RRF:             reciprocal-rank fusion of both rankings
+- CrossEncoderReranker (optional, RAG_RERANK_MODEL): rescored top candidates,
+                   as many as the measured per-pair cost allows within
+                   RAG_RERANK_BUDGET_MS
+
+``search_batch`` embeds all queries in one model call and sends one Qdrant
+request. Offline eval: scripts/eval_rag_retrieval.py.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from src.core import DATA_DIR
+from src.rag import COLLECTION_NAME, SearchResult, generate_embeddings_batch, get_qdrant_client
+
+logger = logging.getLogger(__name__)
+
+KB_LEXICAL_INDEX_DIR = os.getenv("KB_LEXICAL_INDEX_DIR", os.path.join(DATA_DIR, "kb_lexical"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# Candidates taken from each retriever before fusion
+RAG_CANDIDATES = int(os.getenv("RAG_CANDIDATES", "20"))
+# Empty disables reranking, e.g. cross-encoder/ms-marco-MiniLM-L-6-v2
+RAG_RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "")
+RAG_RERANK_BUDGET_MS = float(os.getenv("RAG_RERANK_BUDGET_MS", "150"))
+RAG_RERANK_TOP_N = int(os.getenv("RAG_RERANK_TOP_N", "20"))
+# Pairs per query scored even when over budget, so the cost estimate can recover
+RERANK_PROBE_PAIRS = 2
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+")
+
+
+def fold(text: str) -> str:
+    """Lower-case and strip Vietnamese diacritics ("Thông tư" -> "thong tu")."""
+    text = unicodedata.normalize("NFD", text.lower()).replace("đ", "d")
+    return "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+class BM25Index:
+    """In-memory Okapi BM25 over chunk texts, persisted as JSON."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, text_key: str = "text"):
+        self.k1 = k1
+        self.b = b
+        self.text_key = text_key
+        self._lock = threading.RLock()
+        self.docs: dict[str, dict[str, Any]] = {}  # id -> payload (incl. text)
+        self._postings: dict[str, dict[str, int]] = {}  # term -> {id: tf}
+        self._terms: dict[str, list[str]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc_id: str, payload: dict[str, Any]) -> None:
+        with self._lock:
+            self.remove(doc_id)
+            terms = Counter(tokenize(payload.get(self.text_key) or ""))
+            self.docs[doc_id] = payload
+            self._terms[doc_id] = list(terms)
+            self._lengths[doc_id] = sum(terms.values())
+            self._total_length += self._lengths[doc_id]
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            payload = self.docs.pop(doc_id, None)
+            if payload is None:
+                return False
+            self._total_length -= self._lengths.pop(doc_id)
+            for term in self._terms.pop(doc_id):
+                postings = self._postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+            return True
+
+    def search(
+        self, query: str, limit: int = 10, filter_dict: dict[str, Any] | None = None
+    ) -> list[tuple[str, float]]:
+        with self._lock:
+            n = len(self.docs)
+            if n == 0:
+                return []
+            avg_length = self._total_length / n or 1.0
+            scores: dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            if filter_dict:
+                scores = {
+                    d: s for d, s in scores.items()
+                    if all(self.docs[d].get(k) == v for k, v in filter_dict.items())
+                }
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = json.dumps(
+                {"k1": self.k1, "b": self.b, "text_key": self.text_key, "docs": self.docs}, ensure_ascii=False
+            )
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75), text_key=data.get("text_key", "text"))
+        for doc_id, payload in data.get("docs", {}).items():
+            index.add(doc_id, payload)
+        return index
+
+
+# collection -> (index, mtime_ns of the file it was loaded from or saved to)
+_indexes: dict[str, tuple[BM25Index, int | None]] = {}
+_indexes_lock = threading.Lock()
+
+
+def lexical_index_path(collection: str) -> Path:
+    return Path(KB_LEXICAL_INDEX_DIR) / f"{collection}.json"
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_lexical_index(collection: str = COLLECTION_NAME) -> BM25Index:
+    """
+    Shared BM25 index for a collection: loaded from disk and reloaded when the
+    file changes (e.g. another worker ingested), or rebuilt from the
+    collection's payloads for points ingested before it existed. Empty or
+    failed loads are not cached, so the next call tries again.
+    """
+    path = lexical_index_path(collection)
+    with _indexes_lock:
+        mtime = _mtime_ns(path)
+        cached = _indexes.get(collection)
+        if cached is not None and cached[1] == mtime:
+            return cached[0]
+        index = BM25Index()
+        try:
+            if mtime is not None:
+                index = BM25Index.load(path)
+            else:
+                for point_id, payload in get_qdrant_client().scroll_payloads(collection):
+                    index.add(point_id, payload)
+                if len(index):
+                    index.save(path)
+                    mtime = _mtime_ns(path)
+                    logger.info(f"[RAG] Built lexical index for {collection}: {len(index)} chunks")
+        except Exception as e:
+            logger.warning(f"[RAG] Lexical index for {collection} unavailable: {e}")
+            # Keep serving the last good index (dense only if there is none)
+            return cached[0] if cached is not None else index
+        if len(index):
+            _indexes[collection] = (index, mtime)
+        else:
+            _indexes.pop(collection, None)
+        return index
+
+
+class LexicalIndexSink:
+    """Vector sink wrapper that mirrors upserts/deletes into the BM25 indexes."""
+
+    def __init__(
+        self,
+        inner,
+        index_for: Callable[[str], BM25Index] = get_lexical_index,
+        path_for: Callable[[str], Path] = lexical_index_path,
+    ):
+        self.inner = inner
+        self.index_for = index_for
+        self.path_for = path_for
+        # Indexes changed since the last flush (held so flush saves the same objects)
+        self._touched: dict[str, BM25Index] = {}
+
+    def _index(self, collection: str) -> BM25Index:
+        index = self._touched.get(collection)
+        if index is None:
+            index = self._touched[collection] = self.index_for(collection)
+        return index
+
+    def upsert_points(self, collection: str, points: list[dict[str, Any]]):
+        result = self.inner.upsert_points(collection, points)
+        index = self._index(collection)
+        for p in points:
+            index.add(str(p["id"]), p["payload"])
+        return result
+
+    def delete_points(self, collection: str, ids: Sequence[str]):
+        result = self.inner.delete_points(collection, ids)
+        index = self._index(collection)
+        for doc_id in ids:
+            index.remove(str(doc_id))
+        return result
+
+    def count(self, collection: str) -> int:
+        return self.inner.count(collection)
+
+    def flush(self) -> None:
+        """Persist the indexes changed since the last flush."""
+        for collection in sorted(self._touched):
+            self._touched[collection].save(self.path_for(collection))
+        self._touched.clear()
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = RAG_RRF_K, weights: Sequence[float] | None = None
+) -> list[tuple[str, float]]:
+    """Fuse ranked ID lists: score(d) = sum_i w_i / (k + rank_i(d)), rank from 1."""
+    weights = weights or [1.0] * len(rankings)
+    scores: dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class CrossEncoderReranker:
+    """
+    Rerank fused candidates with a small CPU cross-encoder. The number of
+    (query, chunk) pairs scored is capped so the measured cost stays within
+    budget_ms, but at least RERANK_PROBE_PAIRS per query are always scored so
+    the cost estimate keeps updating (a slow call does not switch reranking
+    off for good). Hits past the reranked head are rescaled below it, so a
+    result list carries one score scale.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RAG_RERANK_MODEL,
+        budget_ms: float = RAG_RERANK_BUDGET_MS,
+        max_candidates: int = RAG_RERANK_TOP_N,
+        scorer: Callable[[list[tuple[str, str]]], Sequence[float]] | None = None,
+    ):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.max_candidates = max_candidates
+        self._scorer = scorer
+        self._model = None
+        self.ms_per_pair: float | None = None  # EWMA of observed cost
+
+    def _load_model(self) -> None:
+        """Load and warm the model, so timed calls measure scoring only."""
+        if self._scorer is not None or self._model is not None:
+            return
+        from sentence_transformers import CrossEncoder
+
+        model = CrossEncoder(self.model_name, device="cpu")
+        model.predict([("warm up", "warm up")], show_progress_bar=False)
+        self._model = model
+
+    def _score(self, pairs: list[tuple[str, str]]) -> Sequence[float]:
+        if self._scorer is not None:
+            return self._scorer(pairs)
+        return self._model.predict(pairs, show_progress_bar=False)
+
+    def pairs_per_query(self, n_queries: int) -> int:
+        if self.ms_per_pair is None:
+            return self.max_candidates
+        budgeted = int(self.budget_ms / self.ms_per_pair) // max(1, n_queries)
+        return min(self.max_candidates, max(RERANK_PROBE_PAIRS, budgeted))
+
+    def rerank_batch(self, queries: list[str], results: list[list[SearchResult]]) -> list[list[SearchResult]]:
+        per_query = self.pairs_per_query(len(queries))
+        pairs, spans = [], []
+        for query, hits in zip(queries, results):
+            top = hits[:per_query]
+            spans.append((len(pairs), len(top)))
+            pairs.extend((query, hit.text) for hit in top)
+        if not pairs:
+            return results
+
+        try:
+            self._load_model()
+            start = time.perf_counter()
+            scores = list(self._score(pairs))
+        except Exception as e:
+            logger.warning(f"[RAG] Rerank skipped: {e}")
+            return results
+        cost = (time.perf_counter() - start) * 1000 / len(pairs)
+        self.ms_per_pair = cost if self.ms_per_pair is None else 0.7 * self.ms_per_pair + 0.3 * cost
+
+        reranked = []
+        for hits, (offset, count) in zip(results, spans):
+            scored = [
+                replace(hit, score=1 / (1 + math.exp(-float(s))), metadata={**hit.metadata, "rerank_score": float(s)})
+                for hit, s in zip(hits[:count], scores[offset : offset + count])
+            ]
+            scored.sort(key=lambda hit: -hit.metadata["rerank_score"])
+            if scored:
+                scored += _rescale_tail(hits[count:], hits[count - 1].score, scored[-1].score)
+            reranked.append(scored or hits)
+        return reranked
+
+
+def _rescale_tail(tail: list[SearchResult], head_fused: float, head_score: float) -> list[SearchResult]:
+    """Put unreranked hits on the reranker's scale, below the reranked head, in fused order."""
+    if head_fused <= 0:
+        return [replace(hit, score=0.0) for hit in tail]
+    return [replace(hit, score=head_score * min(1.0, hit.score / head_fused)) for hit in tail]
+
+
+class HybridRetriever:
+    """BM25 + dense retrieval fused with RRF, optionally reranked."""
+
+    def __init__(
+        self,
+        dense=None,
+        lexical: BM25Index | None = None,
+        embed_batch: Callable[[list[str]], list[list[float]]] = generate_embeddings_batch,
+        reranker: CrossEncoderReranker | None = None,
+        collection: str = COLLECTION_NAME,
+        candidates: int = RAG_CANDIDATES,
+        rrf_k: int = RAG_RRF_K,
+    ):
+        self.dense = dense if dense is not None else get_qdrant_client()
+        self._lexical = lexical
+        self.embed_batch = embed_batch
+        self.reranker = reranker
+        self.collection = collection
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    @property
+    def lexical(self) -> BM25Index:
+        """The injected index, else the shared one (picks up reloads after ingestion)."""
+        return self._lexical if self._lexical is not None else get_lexical_index(self.collection)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filter_dict: dict[str, Any] | None = None,
+        score_threshold: float | None = 0.5,
+    ) -> list[SearchResult]:
+        return self.search_batch([query], limit, filter_dict, score_threshold)[0]
+
+    def search_batch(
+        self,
+        queries: list[str],
+        limit: int = 5,
+        filter_dict: dict[str, Any] | None = None,
+        score_threshold: float | None = 0.5,
+    ) -> list[list[SearchResult]]:
+        """Results for each query; score_threshold applies to the dense leg only."""
+        if not queries:
+            return []
+
+        vectors = self.embed_batch(queries)
+        if len(vectors) == len(queries):
+            dense_hits = self.dense.search_vectors_batch(
+                vectors, self.candidates, score_threshold, filter_dict, self.collection
+            )
+        else:
+            dense_hits = [[] for _ in queries]
+
+        # Normalise so a chunk ranked first by both retrievers scores 1.0
+        best = 2 / (self.rrf_k + 1)
+        index = self.lexical
+        fused_results = []
+        for query, dense in zip(queries, dense_hits):
+            lexical = index.search(query, self.candidates, filter_dict)
+            by_id = {hit.id: hit for hit in dense}
+            fused = reciprocal_rank_fusion([[hit.id for hit in dense], [d for d, _ in lexical]], self.rrf_k)
+
+            results = []
+            for doc_id, score in fused[: max(limit, self.candidates)]:
+                hit = by_id.get(doc_id) or self._lexical_result(index, doc_id)
+                if hit is not None:
+                    results.append(replace(hit, score=min(1.0, score / best)))
+            fused_results.append(results)
+
+        if self.reranker is not None:
+            fused_results = self.reranker.rerank_batch(queries, fused_results)
+        return [results[:limit] for results in fused_results]
+
+    def _lexical_result(self, index: BM25Index, doc_id: str) -> SearchResult | None:
+        payload = index.docs.get(doc_id)
+        if payload is None:
+            return None
+        text_key = index.text_key
+        return SearchResult(
+            id=doc_id,
+            score=0.0,
+            text=payload.get(text_key, ""),
+            metadata={k: v for k, v in payload.items() if k != text_key},
+            source=payload.get("source", "unknown"),
+        )
+
+
+_retriever: HybridRetriever | None = None
+
+
+def get_hybrid_retriever() -> HybridRetriever:
+    """Singleton retriever over the accounting knowledge base"""
+    global _retriever
+    if _retriever is None:
+        reranker = CrossEncoderReranker() if RAG_RERANK_MODEL else None
+        _retriever = HybridRetriever(reranker=reranker)
+    return _retriever
@@ -0,0 +1,271 @@
+"""
+ERPX AI Accounting - Incremental Knowledge Base Ingestion
+=========================================================
+Re-running a bootstrap over an unchanged corpus should cost a few hashes,
+not a full re-embed. KBIngester therefore:
+
+- gives every chunk a content-addressed point ID (UUID from the SHA256 of
+  its text), so re-ingesting the same chunk overwrites instead of
+  duplicating, and identical chunks from different sources share one point
+- keeps a per-collection manifest (source -> chunk IDs, embedding model) so
+  only chunks not yet in the collection are embedded; chunks that vanished
+  from a changed source are deleted
+- pipelines the work: chunking and batched embedding run on the caller's
+  thread while previous batches are upserted concurrently
+
+A source is recorded in the manifest only after all of its new chunks were
+upserted, so an interrupted run is simply resumed by the next one.
+
+Vector stores only need ``upsert_points(collection, points)`` (points are
+{"id", "vector", "payload"} dicts) and ``delete_points(collection, ids)``;
+src.rag.QdrantClient and data_layer.QdrantMock provide both, and
+QdrantLibrarySink adapts a ``qdrant_client.QdrantClient``. A sink's optional
+``flush()`` is called at the end of each run (see hybrid.LexicalIndexSink).
+A sink's ``count(collection)`` is checked against the manifest before a run:
+if the collection holds fewer points than the manifest lists (it was
+recreated or wiped), the manifest is discarded and everything re-embedded.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.core import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+KB_MANIFEST_DIR = os.getenv("KB_MANIFEST_DIR", os.path.join(DATA_DIR, "kb_manifests"))
+KB_EMBED_BATCH_SIZE = int(os.getenv("KB_EMBED_BATCH_SIZE", "64"))
+KB_UPSERT_CONCURRENCY = int(os.getenv("KB_UPSERT_CONCURRENCY", "4"))
+
+# Manifest entry holding chunk IDs whose delete failed (retried next run)
+STALE_KEY = "__stale__"
+
+
+def chunk_id(text: str) -> str:
+    """Content-addressed point ID (Qdrant accepts UUIDs and integers only)."""
+    return str(uuid.UUID(hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]))
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+
+class IngestManifest:
+    """Chunk IDs already stored in one collection, by source (a JSON file)."""
+
+    def __init__(self, path: Path, model: str):
+        self.path = Path(path)
+        self.model = model
+        self.sources: dict[str, list[str]] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+                data = {}
+            if data.get("model") == model:
+                self.sources = data.get("sources", {})
+            elif data:
+                logger.info(f"Embedding model changed ({data.get('model')} -> {model}); re-embedding {self.path.stem}")
+
+    def known_ids(self) -> set[str]:
+        return {cid for ids in self.sources.values() for cid in ids}
+
+    def stored_ids(self) -> set[str]:
+        """Chunk IDs of recorded sources (excludes pending stale deletes)."""
+        return {cid for source, ids in self.sources.items() if source != STALE_KEY for cid in ids}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"model": self.model, "sources": self.sources}))
+        os.replace(tmp, self.path)
+
+
+class QdrantLibrarySink:
+    """upsert_points/delete_points on top of a qdrant_client.QdrantClient."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def upsert_points(self, collection: str, points: list[dict[str, Any]]) -> None:
+        from qdrant_client.models import PointStruct
+
+        self.client.upsert(collection_name=collection, points=[PointStruct(**p) for p in points])
+
+    def delete_points(self, collection: str, ids: Sequence[str]) -> None:
+        from qdrant_client.models import PointIdsList
+
+        self.client.delete(collection_name=collection, points_selector=PointIdsList(points=list(ids)))
+
+    def count(self, collection: str) -> int:
+        return self.client.count(collection_name=collection, exact=True).count
+
+
+class KBIngester:
+    """
+    Incremental, pipelined ingestion of documents into vector collections.
+
+    Documents are dicts with ``text``, a stable manifest ``key`` (defaults to
+    ``source``, e.g. URL or file path) and any extra payload fields.
+    """
+
+    def __init__(
+        self,
+        sink,
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        model: str,
+        chunker: Callable[[str], list[str]] | None = None,
+        manifest_dir: str | None = None,
+        batch_size: int = KB_EMBED_BATCH_SIZE,
+        upsert_concurrency: int = KB_UPSERT_CONCURRENCY,
+        text_key: str = "text",
+    ):
+        if chunker is None:
+            from src.rag import chunk_text as chunker
+        self.sink = sink
+        self.embed = embed
+        self.model = model
+        self.chunker = chunker
+        self.manifest_dir = Path(manifest_dir or KB_MANIFEST_DIR)
+        self.batch_size = max(1, batch_size)
+        self.upsert_concurrency = max(1, upsert_concurrency)
+        self.text_key = text_key
+
+    def manifest(self, collection: str) -> IngestManifest:
+        manifest = IngestManifest(self.manifest_dir / f"{collection}.json", self.model)
+        count = getattr(self.sink, "count", None)
+        expected = len(manifest.stored_ids())
+        if count is None or not expected:
+            return manifest
+        try:
+            actual = count(collection)
+        except Exception as e:
+            logger.warning(f"Cannot count points in {collection}, trusting manifest: {e}")
+            return manifest
+        if actual < expected:
+            # Collection recreated or wiped behind the manifest's back: re-embed everything
+            logger.warning(f"{collection} holds {actual} points but manifest lists {expected}; resetting manifest")
+            stale = manifest.sources.get(STALE_KEY)
+            manifest.sources = {STALE_KEY: stale} if stale else {}
+        return manifest
+
+    def ingest(self, collection: str, documents: Iterable[dict[str, Any]]) -> IngestStats:
+        stats = IngestStats()
+        manifest = self.manifest(collection)
+        stored = manifest.known_ids()
+        queued: dict[str, set[str]] = {}  # chunk id -> sources waiting on its upsert
+        new_sources: dict[str, list[str]] = {}
+        failed_sources: set[str] = set()
+        pending: list[tuple[str, str, dict]] = []
+        inflight: dict[Future, list[str]] = {}
+
+        def reap(done) -> None:
+            for future in done:
+                ids = inflight.pop(future)
+                if future.exception() is not None:
+                    logger.error(f"Upsert of {len(ids)} chunks into {collection} failed: {future.exception()}")
+                    stats.failed += len(ids)
+                    for cid in ids:
+                        failed_sources.update(queued.get(cid, ()))
+
+        def flush(pool: ThreadPoolExecutor) -> None:
+            batch = pending[:]
+            pending.clear()
+            try:
+                vectors = self.embed([text for _, text, _ in batch])
+                if len(vectors) != len(batch):
+                    raise ValueError(f"embedder returned {len(vectors)} vectors for {len(batch)} texts")
+            except Exception as e:
+                logger.error(f"Embedding {len(batch)} chunks for {collection} failed: {e}")
+                stats.failed += len(batch)
+                for cid, _, _ in batch:
+                    failed_sources.update(queued.get(cid, ()))
+                return
+            stats.embedded += len(batch)
+            points = [
+                {"id": cid, "vector": [float(x) for x in vector], "payload": payload}
+                for (cid, _, payload), vector in zip(batch, vectors)
+            ]
+            # Bound memory: wait for a slot before queuing more upserts
+            while len(inflight) >= self.upsert_concurrency * 2:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                reap(done)
+            inflight[pool.submit(self.sink.upsert_points, collection, points)] = [p["id"] for p in points]
+
+        with ThreadPoolExecutor(max_workers=self.upsert_concurrency, thread_name_prefix="kb-upsert") as pool:
+            for doc in documents:
+                text = doc.get("text") or ""
+                source = str(doc.get("key") or doc.get("source") or chunk_id(text))
+                stats.documents += 1
+                chunks = [c for c in self.chunker(text) if c.strip()] if text.strip() else []
+                ids = [chunk_id(c) for c in chunks]
+                new_sources[source] = list(dict.fromkeys(ids))
+                stats.chunks += len(chunks)
+                now = datetime.utcnow().isoformat()
+                extra = {k: v for k, v in doc.items() if k not in ("text", "key")}
+                for i, (cid, chunk) in enumerate(zip(ids, chunks)):
+                    if cid in stored:
+                        stats.skipped += 1
+                        continue
+                    if cid in queued:  # duplicate chunk already on its way in this run
+                        queued[cid].add(source)
+                        stats.skipped += 1
+                        continue
+                    queued[cid] = {source}
+                    payload = {
+                        **extra,
+                        self.text_key: chunk,
+                        "chunk_index": i,
+                        "total_chunks": len(chunks),
+                        "content_hash": hashlib.sha256(chunk.encode("utf-8")).hexdigest(),
+                        "ingested_at": now,
+                    }
+                    pending.append((cid, chunk, payload))
+                    if len(pending) >= self.batch_size:
+                        flush(pool)
+            if pending:
+                flush(pool)
+            reap(wait(inflight).done)
+
+        # Record what is now stored, then drop chunks no source references any more.
+        # Sources absent from this run are left alone.
+        previous = manifest.known_ids()
+        manifest.sources.pop(STALE_KEY, None)
+        for source, ids in new_sources.items():
+            if source not in failed_sources:
+                manifest.sources[source] = ids
+        stale = sorted(previous - manifest.known_ids())
+        if stale:
+            try:
+                self.sink.delete_points(collection, stale)
+                stats.deleted = len(stale)
+            except Exception as e:
+                # Leave them in the manifest so the next run retries the delete
+                logger.error(f"Deleting {len(stale)} stale chunks from {collection} failed: {e}")
+                manifest.sources[STALE_KEY] = stale
+        manifest.save()
+        flush = getattr(self.sink, "flush", None)
+        if flush is not None:
+            flush()
+
+        logger.info(
+            f"[KB] {collection}: {stats.documents} docs, {stats.chunks} chunks, "
+            f"{stats.embedded} embedded, {stats.skipped} unchanged, {stats.deleted} deleted, {stats.failed} failed"
+        )
+        return stats
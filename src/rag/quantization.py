@@ -0,0 +1,423 @@
+"""
+ERPX AI Accounting - Embedding Compression
+==========================================
+Per-collection compression of embedding vectors:
+
+- dimension reduction: Matryoshka-style truncation to the first ``dims``
+  components, or a PCA projection fitted on a sample
+- scalar quantization: int8 (per-dimension ranges from a calibration
+  sample) or binary (sign bits, Hamming similarity)
+- rescoring: candidates found on the quantized codes (oversampled) are
+  re-ranked with float32 copies of the reduced vectors, kept in a
+  disk-backed file and read back (np.memmap) only for the candidates
+
+In-process search (data_layer.QdrantMock, benchmarks) uses CompressedVectors.
+Against a real Qdrant the reduction happens client-side (src.rag.QdrantClient
+and the OCR embedding service) and quantization/rescoring is delegated to
+Qdrant's own quantization_config / search params.
+
+Collections are configured with RAG_COMPRESSION, e.g.
+``accounting_kb=int8:256,erp_ai_docs=binary`` (quantization[:dims[:pca]]).
+PCA codecs must be fitted first and saved to KB_CODEC_DIR/<collection>.npz.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.core import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+RAG_COMPRESSION = os.getenv("RAG_COMPRESSION", "")
+KB_CODEC_DIR = os.getenv("KB_CODEC_DIR", os.path.join(DATA_DIR, "kb_codecs"))
+# Directory for the disk-backed rescoring vectors (default: system temp dir)
+RAG_RESCORE_DIR = os.getenv("RAG_RESCORE_DIR") or None
+
+QUANTIZATIONS = ("none", "int8", "binary")
+REDUCTIONS = ("truncate", "pca")
+
+# Bits set in each 16-bit value, for Hamming distance on packed codes
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+# Smallest batch int8 ranges are fitted on when a codec calibrates itself
+MIN_CALIBRATION = 256
+# Bytes of float32 per upcast tile: codes are converted and scored in tiles
+# that stay in cache instead of round-tripping a large temporary via RAM
+_TILE_BYTES = 1 << 20
+# Query batches at least this large score binary codes by unpacking + matmul
+_UNPACK_MIN_QUERIES = 4
+
+
+@dataclass
+class CompressionConfig:
+    quantization: str = "none"
+    dims: int | None = None
+    reduction: str = "truncate"
+    rescore: bool = True
+    oversampling: float = 4.0
+
+    def __post_init__(self):
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {self.quantization}")
+        if self.reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction: {self.reduction}")
+
+    def qdrant_quantization_config(self) -> dict | None:
+        """quantization_config for Qdrant's collection API (originals stay on disk)."""
+        if self.quantization == "int8":
+            return {"scalar": {"type": "int8", "quantile": 0.99, "always_ram": True}}
+        if self.quantization == "binary":
+            return {"binary": {"always_ram": True}}
+        return None
+
+    def qdrant_search_params(self) -> dict | None:
+        if self.quantization == "none":
+            return None
+        return {"quantization": {"rescore": self.rescore, "oversampling": self.oversampling}}
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def _tile_rows(dim: int) -> int:
+    return max(16, _TILE_BYTES // (4 * dim))
+
+
+class EmbeddingCodec:
+    """Reduce, quantize and score embeddings for one collection."""
+
+    def __init__(self, config: CompressionConfig | None = None):
+        self.config = config or CompressionConfig()
+        self.mean: np.ndarray | None = None  # PCA
+        self.components: np.ndarray | None = None  # PCA, (dims, input_dim)
+        self.offset: np.ndarray | None = None  # int8
+        self.scale: np.ndarray | None = None  # int8
+
+    @property
+    def needs_fit(self) -> bool:
+        pca = self.config.reduction == "pca" and self.config.dims and self.components is None
+        int8 = self.config.quantization == "int8" and self.scale is None
+        return bool(pca or int8)
+
+    def output_dim(self, input_dim: int) -> int:
+        return min(self.config.dims or input_dim, input_dim)
+
+    def fit(self, vectors, quantile: float = 0.99) -> "EmbeddingCodec":
+        """Fit PCA and int8 ranges on a sample of (float) embeddings."""
+        x = _normalize(np.asarray(vectors, dtype=np.float32))
+        if self.config.reduction == "pca" and self.config.dims:
+            if len(x) < self.config.dims:
+                raise ValueError(f"PCA to {self.config.dims} dims needs at least {self.config.dims} samples")
+            self.mean = x.mean(axis=0)
+            _, _, vt = np.linalg.svd(x - self.mean, full_matrices=False)
+            self.components = vt[: self.config.dims].astype(np.float32)
+        if self.config.quantization == "int8":
+            reduced = self.reduce(x)
+            lo = np.quantile(reduced, 1 - quantile, axis=0)
+            hi = np.quantile(reduced, quantile, axis=0)
+            self.offset = lo.astype(np.float32)
+            self.scale = np.maximum((hi - lo) / 255.0, 1e-8).astype(np.float32)
+        return self
+
+    def calibrate(self, vectors) -> None:
+        """
+        Make the codec usable from the first vectors it sees: int8 ranges are
+        fitted on the batch if it is large enough, otherwise set to +-4 sigma
+        of a random unit vector. PCA cannot be guessed and must be fitted.
+        """
+        if self.config.reduction == "pca" and self.config.dims and self.components is None:
+            raise ValueError("PCA codec must be fitted before adding vectors")
+        if self.config.quantization == "int8" and self.scale is None:
+            x = np.asarray(vectors, dtype=np.float32)
+            if len(x) >= MIN_CALIBRATION:
+                self.fit(x)
+            else:
+                dim = self.output_dim(x.shape[1])
+                self.offset = np.full(dim, -4 / np.sqrt(dim), dtype=np.float32)
+                self.scale = np.full(dim, 8 / np.sqrt(dim) / 255.0, dtype=np.float32)
+
+    def reduce(self, vectors) -> np.ndarray:
+        """L2-normalised float32 vectors in the reduced space."""
+        x = np.asarray(vectors, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None, :]
+        dims = self.config.dims
+        if dims and dims < x.shape[1]:
+            if self.config.reduction == "pca":
+                if self.components is None:
+                    raise ValueError("PCA codec is not fitted")
+                x = (_normalize(x) - self.mean) @ self.components.T
+            else:
+                x = x[:, :dims]
+        return _normalize(x)
+
+    def quantize(self, reduced: np.ndarray) -> np.ndarray:
+        q = self.config.quantization
+        if q == "int8":
+            if self.scale is None:
+                raise ValueError("int8 codec is not fitted")
+            codes = np.rint((reduced - self.offset) / self.scale) - 128
+            return np.clip(codes, -128, 127).astype(np.int8)
+        if q == "binary":
+            return np.packbits(reduced > 0, axis=1)
+        return reduced.astype(np.float32)
+
+    def dequantize(self, codes: np.ndarray, dim: int) -> np.ndarray:
+        q = self.config.quantization
+        if q == "int8":
+            return (codes.astype(np.float32) + 128) * self.scale + self.offset
+        if q == "binary":
+            return np.unpackbits(codes, axis=1, count=dim).astype(np.float32) * 2 - 1
+        return codes
+
+    def encode(self, vectors) -> np.ndarray:
+        return self.quantize(self.reduce(vectors))
+
+    def approx_scores(self, queries_reduced: np.ndarray, codes: np.ndarray, dim: int) -> np.ndarray:
+        """
+        Similarity of reduced queries (m, dim) to all codes -> (m, n), higher
+        is better. Codes are upcast tile by tile, once per batch of queries.
+        """
+        q = self.config.quantization
+        out = np.empty((len(queries_reduced), len(codes)), dtype=np.float32)
+        rows = _tile_rows(dim)
+        if q == "int8":
+            # q . (offset + scale * (c + 128)) without dequantizing every row
+            qs = queries_reduced * self.scale
+            base = queries_reduced @ self.offset + 128 * qs.sum(axis=1)
+            tile = np.empty((min(rows, len(codes)), dim), dtype=np.float32)
+            for start in range(0, len(codes), rows):
+                block = codes[start : start + rows]
+                np.copyto(tile[: len(block)], block)
+                out[:, start : start + len(block)] = qs @ tile[: len(block)].T
+            out += base[:, None]
+            return out
+        if q == "binary":
+            qbits = np.packbits(queries_reduced > 0, axis=1)
+            if len(queries_reduced) < _UNPACK_MIN_QUERIES and codes.shape[1] % 2 == 0:
+                # Few queries: popcount(xor) on 16-bit words
+                words = codes.view(np.uint16)
+                for i, qw in enumerate(qbits.view(np.uint16)):
+                    hamming = _POPCOUNT[np.bitwise_xor(words, qw)].sum(axis=1, dtype=np.int32)
+                    out[i] = 1.0 - 2.0 * hamming / dim
+                return out
+            # Many queries: +-1 matmul, equal to 1 - 2 * hamming / dim
+            signs = (np.unpackbits(qbits, axis=1, count=dim).astype(np.float32) * 2 - 1) / dim
+            for start in range(0, len(codes), rows):
+                out[:, start : start + rows] = signs @ self.dequantize(codes[start : start + rows], dim).T
+            return out
+        return queries_reduced @ codes.T
+
+    # -- persistence (PCA/int8 state for the real client) --
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {k: v for k, v in vars(self).items() if isinstance(v, np.ndarray)}
+        np.savez(path, config=np.array(json.dumps(asdict(self.config))), **arrays)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EmbeddingCodec":
+        data = np.load(path)
+        codec = cls(CompressionConfig(**json.loads(str(data["config"]))))
+        for name in ("mean", "components", "offset", "scale"):
+            if name in data:
+                setattr(codec, name, data[name])
+        return codec
+
+
+class RescoreVectors:
+    """
+    Append-only float32 rows in an unlinked temporary file. Only the rows
+    asked for are paged in (np.memmap), so rescoring copies stay on disk.
+    float32 rather than float16: numpy's float16 upcast costs more than the
+    extra disk reads.
+    """
+
+    def __init__(self, dim: int, directory: str | None = RAG_RESCORE_DIR):
+        self.dim = dim
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._rows = 0
+        self._map: np.memmap | None = None
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows * self.dim * 4
+
+    def append(self, vectors: np.ndarray) -> None:
+        self._file.seek(0, os.SEEK_END)
+        np.ascontiguousarray(vectors, dtype=np.float32).tofile(self._file)
+        self._file.flush()
+        self._rows += len(vectors)
+        self._map = None
+
+    def take(self, rows) -> np.ndarray:
+        """Copies of the given rows."""
+        if self._map is None:
+            self._map = np.memmap(self._file, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        return np.asarray(self._map[rows])
+
+    def keep(self, rows: np.ndarray) -> None:
+        """Rewrite the file with only ``rows`` (in that order)."""
+        kept = self.take(rows) if len(rows) else np.zeros((0, self.dim), dtype=np.float32)
+        self._map = None
+        self._file.seek(0)
+        self._file.truncate()
+        self._rows = 0
+        self.append(kept)
+
+
+class CompressedVectors:
+    """
+    Brute-force vector storage over quantized codes, with float32 rescoring
+    from disk. Rows are appended; deleted rows are tombstoned and compacted lazily.
+    """
+
+    def __init__(self, codec: EmbeddingCodec, rescore_dir: str | None = RAG_RESCORE_DIR):
+        self.codec = codec
+        self.rescore_dir = rescore_dir
+        self.dim: int | None = None
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._codes: np.ndarray | None = None
+        self._floats: RescoreVectors | None = None  # reduced vectors on disk (rescoring)
+        self._alive: np.ndarray = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> dict[str, int]:
+        """Bytes held in RAM (codes) and on disk (rescoring vectors)."""
+        codes = 0 if self._codes is None else self._codes.nbytes
+        floats = 0 if self._floats is None else self._floats.nbytes
+        return {"codes": codes, "rescore": floats}
+
+    def add(self, ids: list[str], vectors) -> None:
+        x = np.asarray(vectors, dtype=np.float32)
+        if self.codec.needs_fit:
+            self.codec.calibrate(x)
+        reduced = self.codec.reduce(x)
+        codes = self.codec.quantize(reduced)
+        if self.dim is None:
+            self.dim = reduced.shape[1]
+        for pid in ids:
+            if pid in self._rows:
+                self._alive[self._rows.pop(pid)] = False
+        start = len(self._ids)
+        self._ids.extend(ids)
+        self._rows.update({pid: start + i for i, pid in enumerate(ids)})
+        self._codes = codes if self._codes is None else np.concatenate([self._codes, codes])
+        if self.codec.config.rescore and self.codec.config.quantization != "none":
+            if self._floats is None:
+                self._floats = RescoreVectors(self.dim, self.rescore_dir)
+            self._floats.append(reduced)
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        self._maybe_compact()
+
+    def remove(self, ids) -> int:
+        removed = 0
+        for pid in ids:
+            row = self._rows.pop(pid, None)
+            if row is not None:
+                self._alive[row] = False
+                removed += 1
+        self._maybe_compact()
+        return removed
+
+    def _maybe_compact(self) -> None:
+        dead = len(self._ids) - len(self._rows)
+        if dead and dead * 4 >= len(self._ids):
+            keep = np.flatnonzero(self._alive)
+            self._ids = [self._ids[i] for i in keep]
+            self._rows = {pid: i for i, pid in enumerate(self._ids)}
+            self._codes = self._codes[keep]
+            if self._floats is not None:
+                self._floats.keep(keep)
+            self._alive = np.ones(len(keep), dtype=bool)
+
+    def vector(self, pid: str) -> list[float] | None:
+        row = self._rows.get(pid)
+        if row is None:
+            return None
+        if self._floats is not None:
+            return self._floats.take([row])[0].tolist()
+        return self.codec.dequantize(self._codes[row : row + 1], self.dim)[0].tolist()
+
+    def search(self, query, limit: int = 5, allowed: set[str] | None = None) -> list[tuple[str, float]]:
+        """Top ``limit`` (id, cosine) pairs; ``allowed`` restricts to those ids."""
+        return self.search_batch([query], limit, allowed)[0]
+
+    def search_batch(self, queries, limit: int = 5, allowed: set[str] | None = None) -> list[list[tuple[str, float]]]:
+        """search() for several queries, scanning the codes once."""
+        queries = np.asarray(queries, dtype=np.float32)
+        if not self._rows or len(queries) == 0:
+            return [[] for _ in queries]
+        if allowed is None:
+            rows = np.flatnonzero(self._alive)
+        else:
+            rows = np.array(sorted(self._rows[pid] for pid in allowed if pid in self._rows), dtype=np.int64)
+        if len(rows) == 0:
+            return [[] for _ in queries]
+        reduced = self.codec.reduce(queries)
+        codes = self._codes if len(rows) == len(self._ids) else self._codes[rows]
+        all_scores = self.codec.approx_scores(reduced, codes, self.dim)
+
+        rescore = self._floats is not None
+        k = min(len(rows), max(limit, int(limit * self.codec.config.oversampling)) if rescore else limit)
+        if k < len(rows):
+            tops = np.argpartition(all_scores, len(rows) - k, axis=1)[:, len(rows) - k :]
+        else:
+            tops = np.broadcast_to(np.arange(len(rows)), (len(all_scores), len(rows)))
+        if rescore:
+            # One sorted read of every candidate row from disk for the whole batch
+            wanted, inverse = np.unique(rows[tops], return_inverse=True)
+            candidates = self._floats.take(wanted)
+            inverse = inverse.reshape(tops.shape)
+        results = []
+        for i, top in enumerate(tops):
+            scores = candidates[inverse[i]] @ reduced[i] if rescore else all_scores[i, top]
+            order = np.argsort(-scores, kind="stable")[:limit]
+            results.append([(self._ids[rows[top[j]]], float(scores[j])) for j in order])
+        return results
+
+
+def parse_compression_spec(spec: str) -> dict[str, CompressionConfig]:
+    """``name=int8:256:pca,other=binary`` -> {collection: CompressionConfig}."""
+    configs = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        name, _, value = item.partition("=")
+        parts = value.split(":")
+        configs[name.strip()] = CompressionConfig(
+            quantization=parts[0] or "none",
+            dims=int(parts[1]) if len(parts) > 1 and parts[1] else None,
+            reduction=parts[2] if len(parts) > 2 and parts[2] else "truncate",
+        )
+    return configs
+
+
+def load_collection_codecs(spec: str = RAG_COMPRESSION, codec_dir: str = KB_CODEC_DIR) -> dict[str, EmbeddingCodec]:
+    """Codecs for collections named in RAG_COMPRESSION (fitted state from codec_dir)."""
+    codecs = {}
+    for collection, config in parse_compression_spec(spec).items():
+        path = Path(codec_dir) / f"{collection}.npz"
+        if path.exists():
+            codec = EmbeddingCodec.load(path)
+            codec.config = config
+        else:
+            codec = EmbeddingCodec(config)
+        if config.reduction == "pca" and config.dims and codec.components is None:
+            raise ValueError(f"RAG_COMPRESSION: PCA codec for {collection} not found at {path}")
+        codecs[collection] = codec
+    return codecs
+
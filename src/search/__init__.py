@@ -0,0 +1,18 @@
+"""
+ERPX AI Accounting - Document Search
+====================================
+Vietnamese-aware fuzzy search for the copilot and documents API.
+"""
+
+from .memory import InMemorySearchIndex
+from .normalize import normalize_text, tokenize, trigrams
+from .service import DocumentSearch, get_document_search
+
+__all__ = [
+    "DocumentSearch",
+    "InMemorySearchIndex",
+    "get_document_search",
+    "normalize_text",
+    "tokenize",
+    "trigrams",
+]
@@ -0,0 +1,129 @@
+"""
+ERPX AI Accounting - In-Memory Search Index
+===========================================
+Pure-Python inverted index with the same ranking model as the Postgres
+search query (src/search/service.py):
+
+- short fields (vendor, invoice number, tax ID): trigram word similarity,
+  1.0 for a substring match
+- OCR text: fraction of query words present, weighted OCR_WEIGHT
+
+Used in tests and when the Postgres search migration is not available.
+"""
+
+from collections import Counter, defaultdict
+from typing import Any
+
+from .normalize import normalize_text, tokenize, trigrams
+
+FIELDS = ("vendor_name", "invoice_number", "vendor_tax_id")
+MIN_SIMILARITY = 0.5
+OCR_WEIGHT = 0.5
+
+
+class InMemorySearchIndex:
+    """
+    Usage:
+        index = InMemorySearchIndex()
+        index.add("inv-1", {"vendor_name": "Công ty ABC", "raw_text": "..."}, payload={...})
+        index.search("cong ty abc")  # [(score, payload), ...]
+    """
+
+    def __init__(self, min_similarity: float = MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self._fields: dict[str, dict[str, str]] = {}  # doc_id -> field -> normalized text
+        self._payloads: dict[str, dict[str, Any]] = {}
+        self._trigram_postings: dict[str, set[tuple[str, str]]] = defaultdict(set)  # trigram -> {(doc_id, field)}
+        self._trigram_counts: dict[tuple[str, str], int] = {}
+        self._token_postings: dict[str, set[str]] = defaultdict(set)  # OCR word -> {doc_id}
+        self._doc_tokens: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def add(self, doc_id: str, fields: dict[str, Any], payload: dict[str, Any] | None = None) -> None:
+        """Index (or re-index) a document."""
+        if doc_id in self._fields:
+            self.remove(doc_id)
+
+        normalized = {}
+        for field in FIELDS:
+            text = normalize_text(fields.get(field))
+            if not text:
+                continue
+            normalized[field] = text
+            grams = trigrams(text)
+            self._trigram_counts[(doc_id, field)] = len(grams)
+            for gram in grams:
+                self._trigram_postings[gram].add((doc_id, field))
+
+        tokens = set(tokenize(normalize_text(fields.get("raw_text"))))
+        for token in tokens:
+            self._token_postings[token].add(doc_id)
+
+        self._fields[doc_id] = normalized
+        self._doc_tokens[doc_id] = tokens
+        self._payloads[doc_id] = payload if payload is not None else dict(fields)
+
+    def remove(self, doc_id: str) -> None:
+        for field, text in self._fields.pop(doc_id, {}).items():
+            self._trigram_counts.pop((doc_id, field), None)
+            for gram in trigrams(text):
+                postings = self._trigram_postings.get(gram)
+                if postings is not None:
+                    postings.discard((doc_id, field))
+                    if not postings:
+                        del self._trigram_postings[gram]
+        for token in self._doc_tokens.pop(doc_id, set()):
+            postings = self._token_postings.get(token)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._token_postings[token]
+        self._payloads.pop(doc_id, None)
+
+    def clear(self) -> None:
+        self.__init__(self.min_similarity)
+
+    def search(self, query: str, limit: int = 10, filter_fn=None) -> list[tuple[float, dict[str, Any]]]:
+        """Ranked (score, payload) matches, best first."""
+        q = normalize_text(query)
+        if not q:
+            return []
+
+        scores: dict[str, float] = {}
+
+        # Short fields: trigram overlap counted straight from the postings
+        q_grams = trigrams(q)
+        if q_grams:
+            shared = Counter()
+            for gram in q_grams:
+                shared.update(self._trigram_postings.get(gram, ()))
+            best: dict[str, float] = {}
+            for (doc_id, field), count in shared.items():
+                similarity = count / len(q_grams)
+                if q in self._fields[doc_id][field]:
+                    similarity = 1.0
+                if similarity >= self.min_similarity and similarity > best.get(doc_id, 0.0):
+                    best[doc_id] = similarity
+            scores.update(best)
+
+        # OCR text: word coverage
+        q_tokens = set(tokenize(q))
+        if q_tokens:
+            hits = Counter()
+            for token in q_tokens:
+                hits.update(self._token_postings.get(token, ()))
+            for doc_id, count in hits.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + OCR_WEIGHT * count / len(q_tokens)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for doc_id, score in ranked:
+            payload = self._payloads[doc_id]
+            if filter_fn is not None and not filter_fn(payload):
+                continue
+            results.append((round(score, 4), payload))
+            if len(results) >= limit:
+                break
+        return results
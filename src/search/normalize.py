@@ -0,0 +1,42 @@
+"""
+ERPX AI Accounting - Search Normalization
+=========================================
+Vietnamese-aware text normalization shared by the Postgres search column
+(erpx_search_normalize() in migration 018) and the in-memory index, so
+"Công ty Điện lực" and "cong ty dien luc" produce the same search text.
+"""
+
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# Letters NFD does not decompose
+_TRANSLATE = str.maketrans({"đ": "d", "Đ": "d"})
+
+
+def normalize_text(text: str | None) -> str:
+    """Unaccent, lowercase and collapse whitespace."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFD", str(text).translate(_TRANSLATE))
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def tokenize(normalized: str) -> list[str]:
+    """Alphanumeric words of already-normalized text."""
+    return _TOKEN_RE.findall(normalized)
+
+
+def trigrams(normalized: str) -> set[str]:
+    """
+    pg_trgm-style trigrams: each word padded with two leading spaces and one
+    trailing space, so similarity scores track Postgres word_similarity().
+    """
+    grams: set[str] = set()
+    for word in tokenize(normalized):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
@@ -0,0 +1,224 @@
+"""
+ERPX AI Accounting - Document Search Service
+============================================
+Ranked fuzzy search over extracted invoices (vendor, invoice number, tax ID)
+and document OCR text.
+
+Backends:
+- postgres (default): normalized search_text / search_tsv generated columns
+  (migration 018), served by trigram and full-text GIN indexes
+- memory: InMemorySearchIndex built from the same rows; only with
+  SEARCH_BACKEND=memory (tests, single-process demos)
+
+If the migration is missing, postgres search degrades to a plain ILIKE query
+over vendor name / invoice number / tax ID (tenant-scoped, LIMITed) and
+retries the indexed query after SEARCH_INDEX_RETRY_SECONDS.
+"""
+
+import logging
+import os
+import time
+import uuid
+from typing import Any
+
+import asyncpg
+
+from .memory import OCR_WEIGHT, InMemorySearchIndex
+from .normalize import normalize_text
+
+logger = logging.getLogger("erpx.search")
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "postgres")
+MEMORY_INDEX_TTL = float(os.getenv("SEARCH_MEMORY_INDEX_TTL", "300"))
+INDEX_RETRY_SECONDS = float(os.getenv("SEARCH_INDEX_RETRY_SECONDS", "60"))
+
+# Raised by SEARCH_SQL when migration 018 (columns, pg_trgm) is not applied
+MISSING_INDEX_ERRORS = (asyncpg.UndefinedColumnError, asyncpg.UndefinedFunctionError, asyncpg.UndefinedObjectError)
+
+# Each CTE is served by its own index; hits are merged and ranked once.
+# $1 normalized query, $2 LIKE pattern, $3 doc_type (nullable), $4 limit,
+# $5 tenant UUID (nullable)
+SEARCH_SQL = f"""
+    WITH field_hits AS (
+        SELECT ei.id AS invoice_id,
+               CASE WHEN ei.search_text LIKE $2 THEN 1.0
+                    ELSE word_similarity($1, ei.search_text) END AS score
+        FROM extracted_invoices ei
+        WHERE (ei.search_text %> $1 OR ei.search_text LIKE $2)
+          AND ($5::uuid IS NULL OR ei.tenant_id = $5::uuid)
+        ORDER BY score DESC
+        LIMIT $4 * 4
+    ),
+    text_hits AS (
+        SELECT ei.id AS invoice_id,
+               {OCR_WEIGHT} * ts_rank_cd(d.search_tsv, q, 32) AS score
+        FROM documents d
+        JOIN extracted_invoices ei ON ei.document_id = d.id,
+             plainto_tsquery('simple', $1) q
+        WHERE d.search_tsv @@ q
+          AND ($5::uuid IS NULL OR ei.tenant_id = $5::uuid)
+        ORDER BY score DESC
+        LIMIT $4 * 4
+    ),
+    ranked AS (
+        SELECT invoice_id, SUM(score) AS score
+        FROM (SELECT * FROM field_hits UNION ALL SELECT * FROM text_hits) hits
+        GROUP BY invoice_id
+    )
+    SELECT
+        ei.id, ei.document_id, ei.vendor_name, ei.invoice_number, ei.vendor_tax_id,
+        ei.invoice_date, ei.total_amount, ei.currency,
+        d.doc_type, d.filename,
+        r.score
+    FROM ranked r
+    JOIN extracted_invoices ei ON ei.id = r.invoice_id
+    LEFT JOIN documents d ON ei.document_id = d.id
+    WHERE $3::text IS NULL OR d.doc_type = $3
+    ORDER BY r.score DESC, ei.created_at DESC
+    LIMIT $4
+"""
+
+# Pre-migration fallback: unranked substring match on the invoice fields
+# $1 ILIKE pattern, $2 doc_type (nullable), $3 limit, $4 tenant UUID (nullable)
+FALLBACK_SEARCH_SQL = """
+    SELECT
+        ei.id, ei.document_id, ei.vendor_name, ei.invoice_number, ei.vendor_tax_id,
+        ei.invoice_date, ei.total_amount, ei.currency,
+        d.doc_type, d.filename
+    FROM extracted_invoices ei
+    LEFT JOIN documents d ON ei.document_id = d.id
+    WHERE (ei.vendor_name ILIKE $1 OR ei.invoice_number ILIKE $1 OR ei.vendor_tax_id ILIKE $1)
+      AND ($2::text IS NULL OR d.doc_type = $2)
+      AND ($4::uuid IS NULL OR ei.tenant_id = $4::uuid)
+    ORDER BY ei.created_at DESC
+    LIMIT $3
+"""
+
+MEMORY_INDEX_SQL = """
+    SELECT
+        ei.id, ei.document_id, ei.vendor_name, ei.invoice_number, ei.vendor_tax_id,
+        ei.invoice_date, ei.total_amount, ei.currency, ei.tenant_id::text AS tenant_id,
+        d.doc_type, d.filename, d.raw_text
+    FROM extracted_invoices ei
+    LEFT JOIN documents d ON ei.document_id = d.id
+    ORDER BY ei.created_at DESC
+"""
+
+
+def like_pattern(normalized_query: str) -> str:
+    """'%query%' with LIKE wildcards in the query escaped."""
+    escaped = normalized_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def format_hit(row: Any, score: float | None = None) -> dict[str, Any]:
+    """Search result in the shape copilot search_documents has always returned."""
+    result = {
+        "id": str(row.get("id")),
+        "document_id": str(row.get("document_id")) if row.get("document_id") else None,
+        "vendor_name": row.get("vendor_name"),
+        "invoice_number": row.get("invoice_number"),
+        "vendor_tax_id": row.get("vendor_tax_id"),
+        "invoice_date": str(row.get("invoice_date")) if row.get("invoice_date") else None,
+        "total_amount": float(row.get("total_amount") or 0),
+        "currency": row.get("currency") or "VND",
+        "doc_type": row.get("doc_type"),
+        "filename": row.get("filename"),
+    }
+    if score is not None:
+        result["score"] = round(float(score), 4)
+    return result
+
+
+class DocumentSearch:
+    """Ranked document search with Postgres and in-memory backends."""
+
+    def __init__(self, backend: str | None = None):
+        self.backend = backend or SEARCH_BACKEND
+        self.memory_index = InMemorySearchIndex()
+        self._memory_loaded_at: float | None = None
+        self._memory_tenants: dict[str, str | None] = {}
+        # monotonic time before which the indexed query is not retried
+        self._index_retry_at = 0.0
+
+    async def search(
+        self,
+        conn,
+        query: str,
+        doc_type: str | None = None,
+        limit: int = 10,
+        tenant_id: uuid.UUID | str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Ranked hits for `query`. `tenant_id` is the tenant UUID (resolve
+        X-Tenant-ID codes with src.datazones.resolve_tenant_id first).
+        """
+        if not normalize_text(query):
+            return []
+
+        if self.backend == "memory":
+            return await self._search_memory(conn, query, doc_type, limit, tenant_id)
+
+        if time.monotonic() >= self._index_retry_at:
+            try:
+                return await self._search_postgres(conn, query, doc_type, limit, tenant_id)
+            except MISSING_INDEX_ERRORS as e:
+                logger.warning(f"Indexed search unavailable ({e}); using ILIKE search (apply migration 018)")
+                self._index_retry_at = time.monotonic() + INDEX_RETRY_SECONDS
+
+        return await self._search_fallback(conn, query, doc_type, limit, tenant_id)
+
+    async def _search_postgres(
+        self, conn, query: str, doc_type: str | None, limit: int, tenant_id: uuid.UUID | str | None
+    ) -> list[dict[str, Any]]:
+        normalized = normalize_text(query)
+        rows = await conn.fetch(SEARCH_SQL, normalized, like_pattern(normalized), doc_type, limit, tenant_id)
+        return [format_hit(row, row.get("score")) for row in rows]
+
+    async def _search_fallback(
+        self, conn, query: str, doc_type: str | None, limit: int, tenant_id: uuid.UUID | str | None
+    ) -> list[dict[str, Any]]:
+        rows = await conn.fetch(FALLBACK_SEARCH_SQL, like_pattern(query.strip()), doc_type, limit, tenant_id)
+        return [format_hit(row) for row in rows]
+
+    async def _search_memory(
+        self, conn, query: str, doc_type: str | None, limit: int, tenant_id: uuid.UUID | str | None
+    ) -> list[dict[str, Any]]:
+        await self.refresh_memory_index(conn)
+        tenants = self._memory_tenants
+
+        def filter_fn(hit: dict) -> bool:
+            if doc_type and hit.get("doc_type") != doc_type:
+                return False
+            return tenant_id is None or tenants.get(hit["id"]) == str(tenant_id)
+
+        return [{**hit, "score": score} for score, hit in self.memory_index.search(query, limit, filter_fn)]
+
+    async def refresh_memory_index(self, conn, force: bool = False) -> None:
+        """(Re)build the in-memory index from the database when stale."""
+        if conn is None:
+            return
+        loaded_at = self._memory_loaded_at
+        if not force and loaded_at is not None and time.monotonic() - loaded_at < MEMORY_INDEX_TTL:
+            return
+
+        rows = await conn.fetch(MEMORY_INDEX_SQL)
+        index = InMemorySearchIndex(self.memory_index.min_similarity)
+        tenants = {}
+        for row in rows:
+            index.add(str(row.get("id")), dict(row), payload=format_hit(row))
+            tenants[str(row.get("id"))] = row.get("tenant_id")
+        self.memory_index = index
+        self._memory_tenants = tenants
+        self._memory_loaded_at = time.monotonic()
+        logger.info(f"Built in-memory search index over {len(index)} invoices")
+
+
+_document_search: DocumentSearch | None = None
+
+
+def get_document_search() -> DocumentSearch:
+    global _document_search
+    if _document_search is None:
+        _document_search = DocumentSearch()
+    return _document_search
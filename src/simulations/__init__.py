@@ -1,2 +1,12 @@
 # src/simulations/__init__.py
 """Scenario simulation module for PR20."""
+
+from .scenario import run_scenario_simulation
+from .vectorized import run_grid_simulation, run_monte_carlo_simulation, simulate_scenarios
+
+__all__ = [
+    "run_scenario_simulation",
+    "run_grid_simulation",
+    "run_monte_carlo_simulation",
+    "simulate_scenarios",
+]
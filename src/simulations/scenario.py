@@ -19,6 +19,29 @@ from typing import Any
 logger = logging.getLogger(__name__)
 
 
+def decompose_daily_net(avg_daily_net: float) -> tuple[float, float]:
+    """
+    Split an average daily net flow into (revenue, cost) components.
+
+    Heuristic: if positive, treat as net revenue; if negative, net cost.
+    """
+    if avg_daily_net >= 0:
+        base_revenue = abs(avg_daily_net) * 1.5  # Gross revenue estimate
+        base_cost = abs(avg_daily_net) * 0.5  # Costs that offset
+    else:
+        base_revenue = abs(avg_daily_net) * 0.3  # Some revenue
+        base_cost = abs(avg_daily_net) * 1.3  # Higher costs
+    return base_revenue, base_cost
+
+
+def baseline_by_date(base_forecast: dict[str, Any]) -> dict[str, float]:
+    """Map ISO date -> baseline expected_net (first entry wins, as before)."""
+    lookup: dict[str, float] = {}
+    for bd in base_forecast.get("daily", []):
+        lookup.setdefault(bd.get("date"), bd.get("expected_net", 0))
+    return lookup
+
+
 def run_scenario_simulation(
     tenant_id: uuid.UUID, base_forecast: dict[str, Any], inputs: dict[str, Any]
 ) -> dict[str, Any]:
@@ -46,19 +69,12 @@ def run_scenario_simulation(
     cost_mult = float(assumptions.get("cost_multiplier", 1.0))
     delay_days = int(assumptions.get("payment_delay_days", 0))
 
-    # Get baseline daily values
-    baseline_daily = base_forecast.get("daily", [])
+    # Get baseline daily values (indexed by date: one lookup per projected day)
+    baseline_lookup = baseline_by_date(base_forecast)
     avg_daily_net = float(base_forecast.get("avg_daily_net", 0))
 
     # Decompose avg_daily_net into revenue and cost components
-    # Heuristic: if positive, treat as net revenue; if negative, net cost
-    # For simulation, we assume a 60/40 split for illustration
-    if avg_daily_net >= 0:
-        base_revenue = abs(avg_daily_net) * 1.5  # Gross revenue estimate
-        base_cost = abs(avg_daily_net) * 0.5  # Costs that offset
-    else:
-        base_revenue = abs(avg_daily_net) * 0.3  # Some revenue
-        base_cost = abs(avg_daily_net) * 1.3  # Higher costs
+    base_revenue, base_cost = decompose_daily_net(avg_daily_net)
 
     # Apply multipliers
     sim_revenue = base_revenue * revenue_mult
@@ -81,12 +97,8 @@ def run_scenario_simulation(
 
         proj_date = as_of_date + timedelta(days=i)
 
-        # Find baseline value for same date
-        baseline_val = 0.0
-        for bd in baseline_daily:
-            if bd.get("date") == proj_date.isoformat():
-                baseline_val = bd.get("expected_net", 0)
-                break
+        # Baseline value for same date
+        baseline_val = baseline_lookup.get(proj_date.isoformat(), 0.0)
 
         projected_daily.append(
             {
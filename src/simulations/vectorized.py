@@ -0,0 +1,304 @@
+# src/simulations/vectorized.py
+"""
+Vectorized scenario simulation - many what-if scenarios in one NumPy pass.
+
+Each scenario is (revenue_multiplier, cost_multiplier, payment_delay_days)
+applied to the same baseline forecast, with exactly the arithmetic of
+run_scenario_simulation: a flat projected daily net that starts after the
+payment delay. Scenarios are rows, projected days are columns.
+
+- run_grid_simulation: full grid (sensitivity surface) with summary matrices
+- run_monte_carlo_simulation: sampled assumptions with percentile bands
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+
+from .scenario import baseline_by_date, decompose_daily_net
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Sensitivity surface used by the CFO insight flow: 13 x 13 x 5 = 845 scenarios
+DEFAULT_GRID = {
+    "revenue_multiplier": [round(0.7 + 0.05 * i, 2) for i in range(13)],
+    "cost_multiplier": [round(0.7 + 0.05 * i, 2) for i in range(13)],
+    "payment_delay_days": [0, 7, 14, 21, 30],
+}
+
+MAX_SCENARIOS = 1_000_000
+# A grid is a cross product: cap it well below MAX_SCENARIOS
+MAX_GRID_SCENARIOS = 10_000
+# Cumulative-path values materialized at once when computing percentile bands
+BAND_CHUNK_ELEMENTS = 4_000_000
+
+
+@dataclass
+class ScenarioBatch:
+    """Per-scenario results of one vectorized pass (arrays of length n_scenarios)"""
+
+    revenue_multiplier: np.ndarray
+    cost_multiplier: np.ndarray
+    payment_delay_days: np.ndarray
+    daily_net: np.ndarray  # Projected daily net once payments start
+    total_projected: np.ndarray
+    total_delta: np.ndarray
+    impact_percent: np.ndarray
+    baseline: np.ndarray  # Baseline expected_net per projected day (window_days,)
+    total_baseline: float
+    as_of_date: date
+    window_days: int
+
+    def __len__(self) -> int:
+        return len(self.total_projected)
+
+    def cumulative_paths(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Cumulative projected net per scenario for days start+1..stop, shape (n_scenarios, stop - start)"""
+        days = np.arange(start + 1, (self.window_days if stop is None else stop) + 1)
+        active_days = np.clip(days[None, :] - self.payment_delay_days[:, None], 0, None)
+        return self.daily_net[:, None] * active_days
+
+    def scenario(self, i: int) -> dict[str, Any]:
+        return {
+            "revenue_multiplier": float(self.revenue_multiplier[i]),
+            "cost_multiplier": float(self.cost_multiplier[i]),
+            "payment_delay_days": int(self.payment_delay_days[i]),
+            "total_projected_net": float(self.total_projected[i]),
+            "total_delta": float(self.total_delta[i]),
+            "impact_percent": float(self.impact_percent[i]),
+        }
+
+
+def _window(base_forecast: dict[str, Any], window_days: int | None) -> tuple[date, int]:
+    as_of_date = date.fromisoformat(base_forecast.get("as_of_date", date.today().isoformat()))
+    return as_of_date, int(window_days or base_forecast.get("window_days", 30))
+
+
+def baseline_vector(base_forecast: dict[str, Any], as_of_date: date, window_days: int) -> np.ndarray:
+    """Baseline expected_net for days 1..window_days after as_of_date (0 where missing)"""
+    lookup = baseline_by_date(base_forecast)
+    return np.array(
+        [float(lookup.get((as_of_date + timedelta(days=i)).isoformat(), 0.0)) for i in range(1, window_days + 1)]
+    )
+
+
+def simulate_scenarios(
+    base_forecast: dict[str, Any],
+    revenue_multipliers,
+    cost_multipliers,
+    payment_delay_days,
+    window_days: int | None = None,
+) -> ScenarioBatch:
+    """
+    Evaluate all scenarios at once. The three assumption arrays are
+    broadcast against each other.
+    """
+    as_of_date, window_days = _window(base_forecast, window_days)
+    rev, cost, delay = np.broadcast_arrays(
+        np.asarray(revenue_multipliers, dtype=float),
+        np.asarray(cost_multipliers, dtype=float),
+        np.asarray(payment_delay_days, dtype=int),
+    )
+    rev, cost, delay = rev.ravel(), cost.ravel(), delay.ravel()
+    if len(rev) > MAX_SCENARIOS:
+        raise ValueError(f"Too many scenarios: {len(rev)} (max {MAX_SCENARIOS})")
+
+    baseline = baseline_vector(base_forecast, as_of_date, window_days)
+    total_baseline = round(float(baseline.sum()), 2)
+
+    base_revenue, base_cost = decompose_daily_net(float(base_forecast.get("avg_daily_net", 0)))
+    daily_net = np.round(base_revenue * rev - base_cost * cost, 2)
+
+    # Flow is zero until the delay has passed, then flat: no per-day loop needed
+    active_days = np.clip(window_days - delay, 0, window_days)
+    total_projected = np.round(daily_net * active_days, 2)
+    total_delta = np.round(total_projected - total_baseline, 2)
+    if total_baseline != 0:
+        impact_percent = np.round(total_delta / total_baseline * 100, 2)
+    else:
+        impact_percent = np.zeros_like(total_delta)
+
+    return ScenarioBatch(
+        revenue_multiplier=rev,
+        cost_multiplier=cost,
+        payment_delay_days=delay,
+        daily_net=daily_net,
+        total_projected=total_projected,
+        total_delta=total_delta,
+        impact_percent=impact_percent,
+        baseline=baseline,
+        total_baseline=total_baseline,
+        as_of_date=as_of_date,
+        window_days=window_days,
+    )
+
+
+def cumulative_bands(batch: ScenarioBatch, percentiles) -> np.ndarray:
+    """
+    Per-day percentiles of cumulative projected net, shape (len(percentiles), window_days).
+    Computed a block of days at a time so at most BAND_CHUNK_ELEMENTS path
+    values exist at once.
+    """
+    days_per_chunk = max(1, BAND_CHUNK_ELEMENTS // max(1, len(batch)))
+    bands = np.empty((len(percentiles), batch.window_days))
+    for start in range(0, batch.window_days, days_per_chunk):
+        stop = min(start + days_per_chunk, batch.window_days)
+        bands[:, start:stop] = np.percentile(batch.cumulative_paths(start, stop), percentiles, axis=0)
+    return bands
+
+
+def _summary(batch: ScenarioBatch) -> dict[str, Any]:
+    """Median outcome plus best/worst scenarios"""
+    median_delta = round(float(np.median(batch.total_delta)), 2)
+    return {
+        "total_baseline_net": batch.total_baseline,
+        "total_projected_net": round(float(np.median(batch.total_projected)), 2),
+        "total_delta": median_delta,
+        "impact_percent": round(median_delta / batch.total_baseline * 100, 2) if batch.total_baseline else 0,
+        "best_case": batch.scenario(int(np.argmax(batch.total_delta))),
+        "worst_case": batch.scenario(int(np.argmin(batch.total_delta))),
+    }
+
+
+def grid_axes(grid: dict[str, list] | None = None) -> dict[str, list]:
+    """Grid axes with defaults for missing assumptions; ValueError above MAX_GRID_SCENARIOS"""
+    grid = grid or DEFAULT_GRID
+    axes = {
+        "revenue_multiplier": [float(v) for v in grid.get("revenue_multiplier", [1.0])],
+        "cost_multiplier": [float(v) for v in grid.get("cost_multiplier", [1.0])],
+        "payment_delay_days": [int(v) for v in grid.get("payment_delay_days", [0])],
+    }
+    count = int(np.prod([len(values) for values in axes.values()]))
+    if count > MAX_GRID_SCENARIOS:
+        raise ValueError(f"Grid has {count} scenarios (max {MAX_GRID_SCENARIOS})")
+    return axes
+
+
+def run_grid_simulation(
+    base_forecast: dict[str, Any],
+    grid: dict[str, list] | None = None,
+    window_days: int | None = None,
+) -> dict[str, Any]:
+    """
+    Evaluate every combination of the grid axes.
+
+    Args:
+        base_forecast: The baseline forecast dict (from cashflow.py)
+        grid: Values per assumption (revenue_multiplier, cost_multiplier,
+            payment_delay_days); missing axes default to the neutral value
+
+    Returns:
+        Axes plus summary matrices indexed [revenue][cost][delay]
+    """
+    axes = grid_axes(grid)
+    rev, cost, delay = np.meshgrid(
+        axes["revenue_multiplier"], axes["cost_multiplier"], axes["payment_delay_days"], indexing="ij"
+    )
+    batch = simulate_scenarios(base_forecast, rev, cost, delay, window_days)
+    shape = rev.shape
+
+    return {
+        "mode": "grid",
+        "window_days": batch.window_days,
+        "base_as_of_date": batch.as_of_date.isoformat(),
+        "scenario_count": len(batch),
+        "axes": axes,
+        "matrices": {
+            "total_projected_net": batch.total_projected.reshape(shape).tolist(),
+            "total_delta": batch.total_delta.reshape(shape).tolist(),
+            "impact_percent": batch.impact_percent.reshape(shape).tolist(),
+        },
+        "summary": _summary(batch),
+    }
+
+
+def persisted_result(result: dict[str, Any]) -> dict[str, Any]:
+    """A sweep result without its per-scenario matrices (kept out of scenario_simulations)"""
+    return {key: value for key, value in result.items() if key != "matrices"}
+
+
+def _sample(rng: np.random.Generator, spec: Any, n: int, default: float) -> np.ndarray:
+    """Draw n values for one assumption from a fixed value or distribution spec"""
+    if spec is None:
+        return np.full(n, default, dtype=float)
+    if isinstance(spec, (int, float)):
+        return np.full(n, float(spec))
+
+    kind = spec.get("distribution", "normal")
+    if kind == "normal":
+        return rng.normal(spec.get("mean", default), spec.get("std", 0.0), n)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], n)
+    if kind == "triangular":
+        return rng.triangular(spec["low"], spec.get("mode", default), spec["high"], n)
+    if kind == "choice":
+        return rng.choice(np.asarray(spec["values"], dtype=float), n, p=spec.get("weights"))
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def run_monte_carlo_simulation(
+    base_forecast: dict[str, Any],
+    distributions: dict[str, Any],
+    n_samples: int = 10_000,
+    window_days: int | None = None,
+    seed: int | None = None,
+    percentiles: tuple[int, ...] = DEFAULT_PERCENTILES,
+) -> dict[str, Any]:
+    """
+    Sample scenario assumptions and summarize the outcome distribution.
+
+    Args:
+        distributions: Per assumption, either a fixed number or a spec such as
+            {"distribution": "normal", "mean": 1.0, "std": 0.1},
+            {"distribution": "uniform", "low": 0, "high": 30},
+            {"distribution": "triangular", "low": 0.8, "mode": 1.0, "high": 1.1},
+            {"distribution": "choice", "values": [0, 15, 30], "weights": [...]}
+        n_samples: Number of scenarios
+        seed: RNG seed for reproducible runs
+
+    Returns:
+        Percentiles of the totals, per-day percentile bands of cumulative
+        projected net, and downside probabilities
+    """
+    rng = np.random.default_rng(seed)
+    rev = np.clip(_sample(rng, distributions.get("revenue_multiplier"), n_samples, 1.0), 0, None)
+    cost = np.clip(_sample(rng, distributions.get("cost_multiplier"), n_samples, 1.0), 0, None)
+    delay = np.clip(np.rint(_sample(rng, distributions.get("payment_delay_days"), n_samples, 0)), 0, None)
+
+    batch = simulate_scenarios(base_forecast, rev, cost, delay.astype(int), window_days)
+
+    pct = np.asarray(percentiles, dtype=float)
+    labels = [f"p{p:g}" for p in pct]
+    totals = {
+        name: dict(zip(labels, np.round(np.percentile(values, pct), 2).tolist()))
+        for name, values in (
+            ("total_projected_net", batch.total_projected),
+            ("total_delta", batch.total_delta),
+            ("impact_percent", batch.impact_percent),
+        )
+    }
+    bands = np.round(cumulative_bands(batch, pct), 2)
+
+    return {
+        "mode": "monte_carlo",
+        "window_days": batch.window_days,
+        "base_as_of_date": batch.as_of_date.isoformat(),
+        "scenario_count": len(batch),
+        "seed": seed,
+        "percentiles": totals,
+        "bands": {
+            "dates": [(batch.as_of_date + timedelta(days=i)).isoformat() for i in range(1, batch.window_days + 1)],
+            "cumulative_baseline_net": np.round(np.cumsum(batch.baseline), 2).tolist(),
+            "cumulative_projected_net": dict(zip(labels, bands.tolist())),
+        },
+        "probabilities": {
+            "negative_total": round(float(np.mean(batch.total_projected < 0)), 4),
+            "below_baseline": round(float(np.mean(batch.total_delta < 0)), 4),
+        },
+        "summary": _summary(batch),
+    }
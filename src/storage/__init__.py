@@ -40,13 +40,19 @@ def get_minio_client() -> Minio:
     return _client
 
 
+_known_buckets: set[str] = set()
+
+
 def ensure_bucket(bucket_name: str):
-    """Ensure bucket exists, create if not"""
+    """Ensure bucket exists, create if not (checked once per process)"""
+    if bucket_name in _known_buckets:
+        return
     client = get_minio_client()
     try:
         if not client.bucket_exists(bucket_name):
             client.make_bucket(bucket_name)
             logger.info(f"Created bucket: {bucket_name}")
+        _known_buckets.add(bucket_name)
     except S3Error as e:
         logger.error(f"Error ensuring bucket {bucket_name}: {e}")
         raise
@@ -67,6 +73,37 @@ def upload_document_v2(
     """
     Upload document to MinIO.
 
+    Returns:
+        Tuple of (bucket, key, checksum, size)
+    """
+    # Calculate checksum
+    checksum = hashlib.sha256(file_data).hexdigest()
+
+    return upload_document_stream(
+        io.BytesIO(file_data),
+        length=len(file_data),
+        checksum=checksum,
+        filename=filename,
+        content_type=content_type,
+        tenant_id=tenant_id,
+        job_id=job_id,
+    )
+
+
+def upload_document_stream(
+    file_obj: BinaryIO,
+    length: int,
+    checksum: str,
+    filename: str,
+    content_type: str,
+    tenant_id: str = "default",
+    job_id: str | None = None,
+) -> tuple[str, str, str, int]:
+    """
+    Upload document to MinIO from an open file, without reading it into memory.
+
+    The caller supplies the SHA256 checksum (e.g. hashed in chunks beforehand).
+
     Returns:
         Tuple of (bucket, key, checksum, size)
     """
@@ -80,9 +117,6 @@ def upload_document_v2(
     if not job_id:
         job_id = str(uuid.uuid4())
 
-    # Calculate checksum
-    checksum = hashlib.sha256(file_data).hexdigest()
-
     # Build key path: raw/{tenant_id}/{yyyy}/{mm}/{job_id}/{filename}
     now = datetime.utcnow()
     key = f"raw/{tenant_id}/{now.year}/{now.month:02d}/{job_id}/{filename}"
@@ -92,8 +126,8 @@ def upload_document_v2(
         client.put_object(
             bucket,
             key,
-            io.BytesIO(file_data),
-            length=len(file_data),
+            file_obj,
+            length=length,
             content_type=content_type,
             metadata={
                 "job_id": job_id,
@@ -103,8 +137,8 @@ def upload_document_v2(
                 "uploaded_at": now.isoformat(),
             },
         )
-        logger.info(f"Uploaded document to minio://{bucket}/{key} ({len(file_data)} bytes)")
-        return bucket, key, checksum, len(file_data)
+        logger.info(f"Uploaded document to minio://{bucket}/{key} ({length} bytes)")
+        return bucket, key, checksum, length
 
     except S3Error as e:
         logger.error(f"Failed to upload to MinIO: {e}")
@@ -125,12 +159,16 @@ def upload_file_object(
     Returns:
         Tuple of (bucket, key, checksum, size)
     """
-    # Read file data for checksum calculation
-    file_data = file_obj.read()
-    file_obj.seek(0)  # Reset for potential re-read
-
-    return upload_document_v2(
-        file_data=file_data,
+    # Hash in chunks, then rewind and stream (never holds the whole file)
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: file_obj.read(1024 * 1024), b""):
+        sha.update(chunk)
+    file_obj.seek(0)
+
+    return upload_document_stream(
+        file_obj,
+        length=file_size,
+        checksum=sha.hexdigest(),
         filename=filename,
         content_type=content_type,
         tenant_id=tenant_id,
@@ -257,10 +295,26 @@ def list_documents(bucket: str, prefix: str = "", limit: int = 1000) -> list:
         raise
 
 
+from .async_store import (  # noqa: E402
+    LocalObjectStore,
+    MinioObjectStore,
+    ObjectNotFound,
+    ObjectStore,
+    get_object_store,
+    serve_object,
+)
+
 __all__ = [
+    "LocalObjectStore",
+    "MinioObjectStore",
+    "ObjectNotFound",
+    "ObjectStore",
+    "get_object_store",
+    "serve_object",
     "get_minio_client",
     "ensure_bucket",
     "upload_document_v2",
+    "upload_document_stream",
     "upload_file_object",
     "download_document",
     "stream_document",
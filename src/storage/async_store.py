@@ -0,0 +1,423 @@
+"""
+ERPX AI Accounting - Async Object Storage
+=========================================
+Async facade over object storage for request handlers:
+
+    store = get_object_store()
+    bucket, key, checksum, size = await store.upload_stream(file_obj, "hd.pdf", "application/pdf", tenant_id, job_id)
+    return await serve_object(store, bucket, key, request)
+
+- MinioObjectStore runs the (blocking) MinIO SDK on a bounded thread pool
+  (STORAGE_MAX_WORKERS), so uploads and downloads never stall the event
+  loop. Uploads are multipart (STORAGE_PART_SIZE_MB parts) and hashed
+  incrementally while the SDK reads them; bucket existence is checked once.
+- LocalObjectStore keeps objects under STORAGE_LOCAL_ROOT with the same
+  API; used by tests and by STORAGE_BACKEND=local for development.
+- serve_object() answers Range and If-None-Match requests from object
+  metadata, so previews can seek and browsers revalidate with a 304.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable
+
+from src.core import config
+
+logger = logging.getLogger("erpx.storage")
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ObjectInfo:
+    """Object metadata (stat) used for conditional and range responses."""
+
+    size: int
+    etag: str
+    content_type: str = "application/octet-stream"
+    last_modified: datetime | None = None
+    metadata: dict = field(default_factory=dict)
+
+
+class ObjectNotFound(Exception):
+    """Raised when a bucket/key does not exist."""
+
+    pass
+
+
+class HashingReader:
+    """File-like wrapper that SHA256-hashes and counts bytes as they are read."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.raw.read(n)
+        self.sha256.update(data)
+        self.size += len(data)
+        return data
+
+    @property
+    def checksum(self) -> str:
+        return self.sha256.hexdigest()
+
+
+class ObjectBody:
+    """Open object (or byte range) read chunk by chunk off the event loop."""
+
+    def __init__(self, read: Callable[[int], bytes], close: Callable[[], None], executor=None):
+        self._read = read
+        self._close = close
+        self._executor = executor
+
+    async def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(self._executor, self._read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await loop.run_in_executor(self._executor, self._close)
+
+
+def raw_document_key(tenant_id: str, job_id: str, filename: str) -> str:
+    """raw/{tenant_id}/{yyyy}/{mm}/{job_id}/{filename}, as upload_document_v2."""
+    now = datetime.utcnow()
+    return f"raw/{tenant_id}/{now.year}/{now.month:02d}/{job_id}/{filename}"
+
+
+class ObjectStore(ABC):
+    """Shared upload helpers; backends implement the _put/stat/open/delete primitives."""
+
+    bucket: str
+
+    async def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        filename: str,
+        content_type: str,
+        tenant_id: str = "default",
+        job_id: str | None = None,
+        length: int = -1,
+    ) -> tuple[str, str, str, int]:
+        """
+        Upload from an open file without reading it into memory.
+
+        Returns:
+            Tuple of (bucket, key, checksum, size), like upload_document_v2
+        """
+        job_id = job_id or str(uuid.uuid4())
+        key = raw_document_key(tenant_id, job_id, filename)
+        reader = HashingReader(file_obj)
+        metadata = {
+            "job_id": job_id,
+            "tenant_id": tenant_id,
+            "original_filename": filename,
+            "uploaded_at": datetime.utcnow().isoformat(),
+        }
+        await self._put(self.bucket, key, reader, length, content_type, metadata)
+        logger.info(f"Uploaded document to {self.bucket}/{key} ({reader.size} bytes)")
+        return self.bucket, key, reader.checksum, reader.size
+
+    async def upload_bytes(
+        self, data: bytes, filename: str, content_type: str, tenant_id: str = "default", job_id: str | None = None
+    ) -> tuple[str, str, str, int]:
+        return await self.upload_stream(io.BytesIO(data), filename, content_type, tenant_id, job_id, len(data))
+
+    async def upload_file(
+        self, path: str | Path, filename: str, content_type: str, tenant_id: str = "default", job_id: str | None = None
+    ) -> tuple[str, str, str, int]:
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            return await self.upload_stream(f, filename, content_type, tenant_id, job_id, os.fstat(f.fileno()).st_size)
+        finally:
+            f.close()
+
+    async def download(self, bucket: str, key: str) -> bytes:
+        body = await self.open(bucket, key)
+        return b"".join([chunk async for chunk in body.iter_chunks(1024 * 1024)])
+
+    @abstractmethod
+    async def _put(self, bucket, key, reader, length, content_type, metadata):
+        """Store `length` bytes (-1 if unknown) read from `reader` under bucket/key."""
+
+    @abstractmethod
+    async def stat(self, bucket: str, key: str) -> ObjectInfo:
+        """Object metadata; raises ObjectNotFound."""
+
+    @abstractmethod
+    async def open(self, bucket: str, key: str, offset: int = 0, length: int | None = None) -> ObjectBody:
+        """Open the object, or `length` bytes from `offset`; raises ObjectNotFound."""
+
+    @abstractmethod
+    async def delete(self, bucket: str, key: str) -> None:
+        """Remove the object (no error if it is already gone)."""
+
+
+class MinioObjectStore(ObjectStore):
+    """MinIO SDK on a bounded thread pool."""
+
+    def __init__(self, client=None, bucket: str | None = None, max_workers: int | None = None):
+        from src.storage import get_minio_client
+
+        self.client = client or get_minio_client()
+        self.bucket = bucket or config.MINIO_BUCKET
+        self.part_size = config.STORAGE_PART_SIZE_MB * 1024 * 1024
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.STORAGE_MAX_WORKERS, thread_name_prefix="storage"
+        )
+        self._buckets: set[str] = set()
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    async def _ensure_bucket(self, bucket: str):
+        if bucket in self._buckets:
+            return
+        if not await self._run(self.client.bucket_exists, bucket):
+            await self._run(self.client.make_bucket, bucket)
+            logger.info(f"Created bucket: {bucket}")
+        self._buckets.add(bucket)
+
+    async def _put(self, bucket, key, reader, length, content_type, metadata):
+        await self._ensure_bucket(bucket)
+        await self._run(
+            self.client.put_object,
+            bucket,
+            key,
+            reader,
+            length=length,
+            content_type=content_type,
+            metadata=metadata,
+            part_size=self.part_size,
+        )
+
+    async def stat(self, bucket: str, key: str) -> ObjectInfo:
+        from minio.error import S3Error
+
+        try:
+            st = await self._run(self.client.stat_object, bucket, key)
+        except S3Error as e:
+            raise ObjectNotFound(f"{bucket}/{key}") from e
+        return ObjectInfo(
+            size=st.size,
+            etag=st.etag,
+            content_type=st.content_type or "application/octet-stream",
+            last_modified=st.last_modified,
+            metadata=dict(st.metadata) if st.metadata else {},
+        )
+
+    async def open(self, bucket: str, key: str, offset: int = 0, length: int | None = None) -> ObjectBody:
+        from minio.error import S3Error
+
+        try:
+            resp = await self._run(self.client.get_object, bucket, key, offset=offset, length=length or 0)
+        except S3Error as e:
+            raise ObjectNotFound(f"{bucket}/{key}") from e
+
+        def close():
+            resp.close()
+            resp.release_conn()
+
+        return ObjectBody(resp.read, close, self.executor)
+
+    async def delete(self, bucket: str, key: str) -> None:
+        await self._run(self.client.remove_object, bucket, key)
+
+
+class LocalObjectStore(ObjectStore):
+    """
+    Filesystem stand-in: objects at {root}/{bucket}/{key}, metadata in
+    {root}/.meta/{bucket}/{key}.json. ETags are MD5 like single-part S3.
+    """
+
+    def __init__(self, root: str | Path | None = None, bucket: str | None = None):
+        self.root = Path(root or config.STORAGE_LOCAL_ROOT)
+        self.bucket = bucket or config.MINIO_BUCKET
+
+    def _paths(self, bucket: str, key: str) -> tuple[Path, Path]:
+        if ".." in Path(key).parts or key.startswith("/"):
+            raise ValueError(f"Invalid object key: {key}")
+        return self.root / bucket / key, self.root / ".meta" / bucket / f"{key}.json"
+
+    def _write(self, bucket, key, reader, content_type, metadata):
+        path, meta_path = self._paths(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        md5 = hashlib.md5()
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                md5.update(chunk)
+                out.write(chunk)
+        os.replace(tmp, path)
+        meta = {"etag": md5.hexdigest(), "content_type": content_type, "metadata": metadata}
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    async def _put(self, bucket, key, reader, length, content_type, metadata):
+        await asyncio.to_thread(self._write, bucket, key, reader, content_type, metadata)
+
+    def _stat(self, bucket: str, key: str) -> ObjectInfo:
+        path, meta_path = self._paths(bucket, key)
+        if not path.is_file():
+            raise ObjectNotFound(f"{bucket}/{key}")
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        st = path.stat()
+        return ObjectInfo(
+            size=st.st_size,
+            etag=meta.get("etag") or f"{int(st.st_mtime_ns)}-{st.st_size}",
+            content_type=meta.get("content_type") or "application/octet-stream",
+            last_modified=datetime.utcfromtimestamp(st.st_mtime),
+            metadata=meta.get("metadata", {}),
+        )
+
+    async def stat(self, bucket: str, key: str) -> ObjectInfo:
+        return await asyncio.to_thread(self._stat, bucket, key)
+
+    async def open(self, bucket: str, key: str, offset: int = 0, length: int | None = None) -> ObjectBody:
+        path, _ = self._paths(bucket, key)
+        try:
+            f = await asyncio.to_thread(open, path, "rb")
+        except FileNotFoundError as e:
+            raise ObjectNotFound(f"{bucket}/{key}") from e
+        f.seek(offset)
+        remaining = [length]
+
+        def read(n: int) -> bytes:
+            if remaining[0] is not None:
+                n = min(n, remaining[0])
+                if n <= 0:
+                    return b""
+            data = f.read(n)
+            if remaining[0] is not None:
+                remaining[0] -= len(data)
+            return data
+
+        return ObjectBody(read, f.close)
+
+    async def delete(self, bucket: str, key: str) -> None:
+        path, meta_path = self._paths(bucket, key)
+        for p in (path, meta_path):
+            await asyncio.to_thread(p.unlink, True)
+
+
+# =============================================================================
+# HTTP serving (Range / If-None-Match)
+# =============================================================================
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None | bool:
+    """
+    Parse a single-range ``Range`` header into an inclusive (start, end).
+
+    Returns None when absent or unsupported (serve the whole object) and
+    False when unsatisfiable (416).
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None  # multi-range or malformed: ignore, like most servers
+    start_s, end_s = m.groups()
+    if not start_s:  # suffix: last N bytes
+        suffix = int(end_s)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(start_s)
+    end = min(int(end_s), size - 1) if end_s else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    return any(tag.strip().removeprefix("W/").strip('"') == bare for tag in if_none_match.split(","))
+
+
+async def serve_object(
+    store: ObjectStore,
+    bucket: str,
+    key: str,
+    request,
+    filename: str | None = None,
+    content_type: str | None = None,
+    cache_control: str = "private, max-age=3600",
+):
+    """
+    Stream an object as an HTTP response honouring Range and If-None-Match.
+
+    Raises ObjectNotFound if the object does not exist.
+    """
+    from fastapi.responses import Response, StreamingResponse
+
+    info = await store.stat(bucket, key)
+    etag = f'"{info.etag.strip(chr(34))}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        "Content-Disposition": f'inline; filename="{filename or os.path.basename(key)}"',
+    }
+    media_type = content_type or info.content_type
+
+    if etag_matches(request.headers.get("if-none-match"), info.etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = parse_range(request.headers.get("range"), info.size)
+    if byte_range is False:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{info.size}"})
+
+    if byte_range:
+        start, end = byte_range
+        body = await store.open(bucket, key, offset=start, length=end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(body.iter_chunks(), status_code=206, media_type=media_type, headers=headers)
+
+    body = await store.open(bucket, key)
+    headers["Content-Length"] = str(info.size)
+    return StreamingResponse(body.iter_chunks(), media_type=media_type, headers=headers)
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_store: ObjectStore | None = None
+
+
+def get_object_store() -> ObjectStore:
+    """Process-wide store selected by STORAGE_BACKEND (minio | local)."""
+    global _store
+    if _store is None:
+        if config.STORAGE_BACKEND == "local":
+            _store = LocalObjectStore()
+        else:
+            _store = MinioObjectStore()
+        logger.info(f"Object store: {type(_store).__name__}")
+    return _store
@@ -0,0 +1,118 @@
+"""
+ERPX AI - Stage Activities
+==========================
+Temporal activities for StagedDocumentWorkflow, one group per task queue:
+
+- DB_ACTIVITIES   (TEMPORAL_DB_TASK_QUEUE):  begin/record/apply/failure, PR17 finalize
+- OCR_ACTIVITIES  (TEMPORAL_OCR_TASK_QUEUE): download + OCR
+- LLM_ACTIVITIES  (TEMPORAL_LLM_TASK_QUEUE): embedding + LLM proposal
+
+Database activities use the worker's process-wide pool (src.db.get_pool).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from temporalio import activity
+
+from src.db import get_pool
+from src.workflows.activities_pr17 import finalize_posting_activity, finalize_rejection_activity
+from src.workflows.pipeline_stages import (
+    apply_proposal,
+    begin_job,
+    download_document_file,
+    extract_document_text,
+    generate_proposal,
+    load_document,
+    record_extraction,
+    record_failure,
+)
+
+logger = logging.getLogger("erpx.activities.staged")
+
+
+# ===========================================================================
+# db
+# ===========================================================================
+
+
+@activity.defn
+async def begin_job_activity(job_id: str) -> dict[str, Any]:
+    """Load the document and start its job state; returns file_info for later stages."""
+    async with (await get_pool()).acquire() as conn:
+        file_info = await load_document(conn, job_id)
+        return await begin_job(conn, job_id, file_info, request_id=job_id)
+
+
+@activity.defn
+async def record_extraction_activity(job_id: str, file_info: dict[str, Any], extraction: dict[str, Any]) -> None:
+    async with (await get_pool()).acquire() as conn:
+        await record_extraction(conn, job_id, file_info, extraction, request_id=job_id)
+
+
+@activity.defn
+async def apply_proposal_activity(
+    job_id: str,
+    file_info: dict[str, Any],
+    extraction: dict[str, Any],
+    proposed: dict[str, Any],
+    pipeline_start: float,
+) -> str:
+    async with (await get_pool()).acquire() as conn:
+        return await apply_proposal(conn, job_id, file_info, extraction, proposed, pipeline_start, request_id=job_id)
+
+
+@activity.defn
+async def record_failure_activity(job_id: str, file_info: dict[str, Any], error: str) -> None:
+    async with (await get_pool()).acquire() as conn:
+        await record_failure(conn, job_id, file_info, error, request_id=job_id)
+
+
+# ===========================================================================
+# cpu-ocr
+# ===========================================================================
+
+
+@activity.defn
+def extract_text_activity(job_id: str, file_info: dict[str, Any]) -> dict[str, Any]:
+    """
+    Download and OCR a document.
+
+    Synchronous on purpose: OCR is CPU-bound and blocking, so the OCR worker
+    runs this on its thread pool (WORKER_OCR_CONCURRENCY threads) instead
+    of stalling its event loop.
+    """
+    activity.logger.info(f"[{job_id}] extract_text_activity starting")
+    path = download_document_file(job_id, file_info)
+    try:
+        return asyncio.run(extract_document_text(path, file_info.get("content_type", "")))
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# ===========================================================================
+# llm
+# ===========================================================================
+
+
+@activity.defn
+async def propose_activity(job_id: str, file_info: dict[str, Any], text: str) -> dict[str, Any]:
+    activity.logger.info(f"[{job_id}] propose_activity starting")
+    return await generate_proposal(job_id, file_info, text, request_id=job_id)
+
+
+DB_ACTIVITIES = [
+    begin_job_activity,
+    record_extraction_activity,
+    apply_proposal_activity,
+    record_failure_activity,
+    finalize_posting_activity,
+    finalize_rejection_activity,
+]
+OCR_ACTIVITIES = [extract_text_activity]
+LLM_ACTIVITIES = [propose_activity]
@@ -0,0 +1,131 @@
+"""
+ERPX AI - Staged Document Workflow
+==================================
+DocumentWorkflowPR17 with each pipeline stage on its own task queue:
+
+    begin_job (db) -> extract_text (cpu-ocr) -> record_extraction (db)
+        -> propose (llm) -> apply_proposal (db) [-> approval signal -> finalize (db)]
+
+OCR workers scale on CPU nodes and LLM workers on cheap I/O nodes; the db
+worker also runs the workflow tasks. Enabled with TEMPORAL_STAGED_QUEUES=1.
+"""
+
+from datetime import timedelta
+from typing import Optional
+
+from temporalio import workflow
+from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError
+
+with workflow.unsafe.imports_passed_through():
+    from src.core import config
+    from src.workflows.activities_pr17 import (
+        finalize_posting_activity,
+        finalize_rejection_activity,
+    )
+    from src.workflows.activities_staged import (
+        apply_proposal_activity,
+        begin_job_activity,
+        extract_text_activity,
+        propose_activity,
+        record_extraction_activity,
+        record_failure_activity,
+    )
+
+STAGE_RETRY = RetryPolicy(
+    initial_interval=timedelta(seconds=5),
+    backoff_coefficient=2.0,
+    maximum_interval=timedelta(minutes=1),
+    maximum_attempts=3,
+)
+
+
+@workflow.defn
+class StagedDocumentWorkflow:
+    """
+    Document processing with per-stage task queues and human approval support.
+
+    Signals match DocumentWorkflowPR17, so signal_workflow_approval works for
+    either workflow.
+    """
+
+    def __init__(self):
+        self._approval_decision: Optional[str] = None  # "approve" or "reject"
+
+    @workflow.signal
+    async def signal_approve(self) -> None:
+        """Signal to approve the pending job."""
+        self._approval_decision = "approve"
+
+    @workflow.signal
+    async def signal_reject(self) -> None:
+        """Signal to reject the pending job."""
+        self._approval_decision = "reject"
+
+    async def _db(self, activity, *args, timeout: timedelta = timedelta(minutes=2)):
+        return await workflow.execute_activity(
+            activity,
+            args=list(args),
+            task_queue=config.TEMPORAL_DB_TASK_QUEUE,
+            start_to_close_timeout=timeout,
+            retry_policy=STAGE_RETRY,
+        )
+
+    @workflow.run
+    async def run(self, job_id: str) -> str:
+        workflow.logger.info(f"[{job_id}] StagedDocumentWorkflow starting")
+        pipeline_start = workflow.now().timestamp()
+        file_info: dict = {}
+
+        try:
+            file_info = await self._db(begin_job_activity, job_id)
+
+            extraction = await workflow.execute_activity(
+                extract_text_activity,
+                args=[job_id, file_info],
+                task_queue=config.TEMPORAL_OCR_TASK_QUEUE,
+                start_to_close_timeout=timedelta(minutes=10),
+                retry_policy=STAGE_RETRY,
+            )
+            await self._db(record_extraction_activity, job_id, file_info, extraction)
+
+            proposed = await workflow.execute_activity(
+                propose_activity,
+                args=[job_id, file_info, extraction["text"]],
+                task_queue=config.TEMPORAL_LLM_TASK_QUEUE,
+                start_to_close_timeout=timedelta(minutes=5),
+                retry_policy=STAGE_RETRY,
+            )
+            result = await self._db(
+                apply_proposal_activity,
+                job_id,
+                file_info,
+                extraction,
+                proposed,
+                pipeline_start,
+                timeout=timedelta(minutes=5),
+            )
+        except ActivityError as e:
+            error = str(e.cause or e)
+            workflow.logger.error(f"[{job_id}] StagedDocumentWorkflow failed: {error}")
+            await self._db(record_failure_activity, job_id, file_info, error)
+            raise
+
+        workflow.logger.info(f"[{job_id}] Initial processing result: {result}")
+        if result != "waiting_for_approval":
+            return result
+
+        # Wait for signal (with long timeout - approvals can take days)
+        try:
+            await workflow.wait_condition(
+                lambda: self._approval_decision is not None,
+                timeout=timedelta(days=30),
+            )
+        except TimeoutError:
+            workflow.logger.warning(f"[{job_id}] Approval timeout, staying at waiting_for_approval")
+            return "waiting_for_approval"
+
+        finalize = finalize_posting_activity if self._approval_decision == "approve" else finalize_rejection_activity
+        final_result = await self._db(finalize, job_id, timeout=timedelta(minutes=5))
+        workflow.logger.info(f"[{job_id}] StagedDocumentWorkflow finished: {final_result}")
+        return final_result
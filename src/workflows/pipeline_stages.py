@@ -0,0 +1,509 @@
+"""
+ERPX AI - Document Pipeline Stages
+==================================
+The worker pipeline split by resource profile, so each stage can run on its
+own Temporal task queue and be scaled independently:
+
+- db      begin_job / record_extraction / apply_proposal / record_failure
+          short transactions on the process-wide pool
+- cpu-ocr extract_document_text: download + OCR, no database access
+- llm     generate_proposal: embedding upsert + LLM call, no database access;
+          generate_proposals_batched packs many small documents per LLM call
+
+Stage inputs and outputs are plain dicts so they can travel as Temporal
+payloads. run_document_pipeline (activities_pr16) chains the same stages
+inside a single activity.
+"""
+
+import logging
+import os
+import tempfile
+import time
+import uuid
+from typing import Any
+
+from src.audit.store import create_audit_evidence, update_audit_decision
+from src.core import config
+from src.datazones import DataZone, JobState, PipelineUnitOfWork, create_job_state
+from src.llm.batching import BatchDocument, BatchResult, LLMBatcher
+
+logger = logging.getLogger("erpx.workflows.stages")
+
+# documents.raw_text keeps this much; also bounds the Temporal payload size
+MAX_STAGE_TEXT = 65000
+
+WORKER_SYSTEM_PROMPT = """Bạn là chuyên gia kế toán Việt Nam. Nhiệm vụ:
+1. Phân loại hóa đơn (mua hàng/bán hàng/chi phí/khác)
+2. Trích xuất thông tin: số HĐ, ngày, nhà cung cấp, tổng tiền, thuế VAT
+3. Đề xuất bút toán kế toán theo TT200
+4. Giải thích lý do
+
+Trả về JSON với format:
+{
+    "doc_type": "purchase_invoice|sales_invoice|expense|other",
+    "vendor": "tên nhà cung cấp",
+    "invoice_no": "số hóa đơn",
+    "invoice_date": "YYYY-MM-DD",
+    "total_amount": số tiền,
+    "vat_amount": tiền thuế,
+    "entries": [
+        {"account_code": "xxx", "account_name": "tên TK", "debit": số, "credit": số, "description": "mô tả"}
+    ],
+    "explanation": "giải thích bút toán",
+    "confidence": 0.0-1.0,
+    "needs_human_review": true/false,
+    "risks": ["danh sách rủi ro nếu có"]
+}"""
+
+
+# ===========================================================================
+# db stages
+# ===========================================================================
+
+
+async def load_document(conn, job_id: str) -> dict[str, Any]:
+    """Document record (with MinIO location and tenant) for a job, as file_info."""
+    row = await conn.fetchrow(
+        """
+        SELECT d.id, d.tenant_id, d.filename, d.content_type, d.file_size,
+               d.minio_bucket, d.minio_key, d.checksum, t.code as tenant_code
+        FROM documents d
+        JOIN tenants t ON d.tenant_id = t.id
+        WHERE d.job_id = $1
+        """,
+        job_id,
+    )
+    if not row:
+        raise ValueError(f"Document not found for job_id: {job_id}")
+
+    return {
+        "filename": row["filename"],
+        "content_type": row["content_type"],
+        "size": row["file_size"],
+        "checksum": row["checksum"],
+        "minio_bucket": row["minio_bucket"],
+        "minio_key": row["minio_key"],
+        "tenant_id": row["tenant_code"],
+        "tenant_uuid": str(row["tenant_id"]),
+    }
+
+
+async def begin_job(conn, job_id: str, file_info: dict[str, Any], request_id: str | None = None) -> dict[str, Any]:
+    """Create the job state and move it to EXTRACTING. Returns file_info with tenant_uuid."""
+    file_info = dict(file_info)
+    if not file_info.get("tenant_uuid"):
+        tenant_id = file_info.get("tenant_id", "default")
+        tenant_uuid = await conn.fetchval("SELECT id FROM tenants WHERE code = $1", tenant_id)
+        if tenant_uuid is None:
+            raise ValueError(f"Tenant not found: {tenant_id}")
+        file_info["tenant_uuid"] = str(tenant_uuid)
+
+    uow = PipelineUnitOfWork(conn, job_id, file_info["tenant_uuid"], request_id)
+    uow.call(create_job_state, job_id, JobState.UPLOADED, file_info["tenant_uuid"], request_id)
+    uow.set_state(JobState.EXTRACTING)
+    await uow.flush()
+    return file_info
+
+
+async def record_extraction(
+    conn,
+    job_id: str,
+    file_info: dict[str, Any],
+    extraction: dict[str, Any],
+    request_id: str | None = None,
+) -> None:
+    """Persist OCR output and move the job to PROPOSING."""
+    import json
+
+    tenant_id = file_info.get("tenant_id", "default")
+    text = extraction["text"]
+    ocr_latency_ms = extraction["ocr_latency_ms"]
+
+    uow = PipelineUnitOfWork(conn, job_id, file_info["tenant_uuid"], request_id)
+    uow.execute(
+        """UPDATE documents SET raw_text = $1, ocr_boxes = $2, updated_at = NOW() WHERE id = $3""",
+        text,
+        json.dumps({"boxes": extraction["ocr_boxes"], "page_dimensions": extraction["page_dimensions"]}),
+        uuid.UUID(job_id),
+    )
+    uow.counter("ocr_calls_total", 1.0, {"tenant": tenant_id})
+    uow.latency("ocr_latency", float(ocr_latency_ms), labels={"tenant": tenant_id})
+    uow.set_state(JobState.EXTRACTED, checkpoint_data={"text_length": extraction["text_length"]})
+    uow.zone(
+        DataZone.EXTRACTED,
+        extracted_text_preview=text[:4000],
+        byte_count=extraction["byte_count"],
+        processing_time_ms=ocr_latency_ms,
+    )
+    uow.audit(
+        "extracted",
+        {"text_length": extraction["text_length"], "ocr_latency_ms": ocr_latency_ms},
+        actor="worker",
+    )
+    uow.set_state(JobState.PROPOSING)
+    await uow.flush()
+
+
+async def apply_proposal(
+    conn,
+    job_id: str,
+    file_info: dict[str, Any],
+    extraction: dict[str, Any],
+    proposed: dict[str, Any],
+    pipeline_start: float,
+    request_id: str | None = None,
+) -> str:
+    """
+    Policy evaluation, proposal persistence and governance gating.
+
+    Returns the terminal state (waiting_for_approval/completed).
+    """
+    from src.api.main import persist_proposal_only, persist_to_db_with_conn
+    from src.outbox import AggregateType, EventType, publish_event
+    from src.policy.engine import evaluate_proposal as policy_evaluate
+
+    tenant_id = file_info.get("tenant_id", "default")
+    tenant_uuid = file_info["tenant_uuid"]
+    proposal = proposed["proposal"]
+    model_name = proposed["model_name"]
+    llm_latency_ms = proposed["llm_latency_ms"]
+
+    uow = PipelineUnitOfWork(conn, job_id, tenant_uuid, request_id)
+    uow.counter("llm_calls_total", 1.0, {"tenant": tenant_id, "model": model_name})
+    uow.latency("llm_latency", float(llm_latency_ms), labels={"tenant": tenant_id})
+    uow.set_state(JobState.PROPOSED)
+    uow.audit(
+        "llm_proposed",
+        {
+            "model": model_name,
+            "llm_latency_ms": llm_latency_ms,
+            "confidence": proposal.get("confidence"),
+            "doc_type": proposal.get("doc_type"),
+        },
+        actor="llm",
+    )
+
+    # =========== Policy Evaluation ===========
+    policy_result = await policy_evaluate(
+        conn,
+        proposal=proposal,
+        job_id=job_id,
+        tenant_id=tenant_uuid,
+        request_id=request_id,
+    )
+
+    uow.audit(
+        "policy_evaluated",
+        {
+            "overall_result": policy_result.overall_result.value,
+            "auto_approved": policy_result.auto_approved,
+            "rules_passed": policy_result.rules_passed,
+            "rules_failed": policy_result.rules_failed,
+        },
+        actor="policy_engine",
+    )
+    uow.call(
+        create_audit_evidence,
+        job_id=job_id,
+        tenant_id=tenant_uuid,
+        request_id=request_id,
+        document_id=job_id,
+        raw_file_uri=file_info.get("path"),
+        extracted_text=extraction["text"],
+        prompt_version="v1",
+        model_name=model_name,
+        llm_stage="direct",
+        llm_input=proposed["llm_input"],
+        llm_output_json=proposal,
+        llm_output_raw=proposed["llm_output_raw"],
+        llm_latency_ms=llm_latency_ms,
+        validation_errors=proposal.get("risks", []),
+        risk_flags=proposal.get("risks", []),
+        decision="proposed",
+    )
+    uow.zone(DataZone.PROPOSED, processing_time_ms=llm_latency_ms)
+    await uow.flush()
+
+    # =========== Governance Gating ===========
+    needs_approval = policy_result.overall_result.value == "requires_review" or not policy_result.auto_approved
+
+    # PR17: Persist proposal data for BOTH paths (so finalize can access it later)
+    proposal_persist_result = await persist_proposal_only(conn, job_id, file_info, proposal, tenant_uuid, request_id)
+    proposal_id = proposal_persist_result.get("proposal_id")
+
+    if needs_approval:
+        logger.info(f"[{request_id}] Job {job_id} requires approval - NOT posting ledger")
+
+        uow.execute(
+            """INSERT INTO approvals
+            (id, proposal_id, tenant_id, job_id, approver_name, action, status, comments)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8) ON CONFLICT DO NOTHING""",
+            uuid.uuid4(),
+            proposal_id,
+            uuid.UUID(tenant_uuid),
+            uuid.UUID(job_id),
+            "System",
+            "pending",
+            "pending",
+            f"Pending approval (policy: {policy_result.overall_result.value})",
+        )
+        uow.audit(
+            "needs_approval",
+            {
+                "reason": f"Policy result: {policy_result.overall_result.value}",
+                "rules_failed": policy_result.rules_failed,
+            },
+            actor="policy_engine",
+        )
+        uow.call(update_audit_decision, job_id, "waiting_approval", policy_result.overall_result.value, request_id)
+        uow.set_state(JobState.WAITING_FOR_APPROVAL)
+        uow.counter("approvals_pending_total", 1.0, {"tenant": tenant_uuid})
+
+        e2e_latency_ms = int((time.time() - pipeline_start) * 1000)
+        uow.latency("end_to_end_latency", float(e2e_latency_ms), labels={"tenant": tenant_uuid})
+        await uow.flush()
+
+        logger.info(f"[{request_id}] Job {job_id} stopped at WAITING_FOR_APPROVAL in {e2e_latency_ms}ms")
+        return "waiting_for_approval"
+
+    logger.info(f"[{request_id}] Job {job_id} auto-approved - posting ledger")
+
+    # PR18: Idempotency check - ensure we don't double-post ledger on retry
+    existing_ledger = await conn.fetchrow(
+        """
+        SELECT le.id FROM ledger_entries le
+        JOIN journal_proposals jp ON le.proposal_id = jp.id
+        JOIN extracted_invoices ei ON jp.invoice_id = ei.id
+        JOIN documents d ON ei.document_id = d.id
+        WHERE d.job_id = $1
+        """,
+        job_id,
+    )
+    if existing_ledger:
+        logger.info(f"[{request_id}] [PR18] Job {job_id} already posted to ledger (idempotent skip)")
+        uow.set_state(JobState.COMPLETED)
+        await uow.flush()
+        return "completed"
+
+    uow.audit(
+        "auto_approved",
+        {"reason": "Policy rules passed", "rules_passed": policy_result.rules_passed},
+        actor="policy_engine",
+    )
+    uow.counter("auto_approved_total", 1.0, {"tenant": tenant_uuid})
+    uow.call(update_audit_decision, job_id, "auto_approved", "Policy rules passed", request_id)
+    uow.set_state(JobState.POSTING)
+    await uow.flush()
+
+    # =========== Persist to Golden Tables ===========
+    persist_result = await persist_to_db_with_conn(conn, job_id, file_info, proposal, tenant_uuid, request_id)
+
+    uow.zone(
+        DataZone.POSTED,
+        proposal_id=persist_result.get("proposal_id"),
+        ledger_entry_id=persist_result.get("ledger_id"),
+    )
+    uow.call(
+        publish_event,
+        event_type=EventType.LEDGER_POSTED,
+        aggregate_type=AggregateType.LEDGER,
+        aggregate_id=persist_result.get("ledger_id", job_id),
+        payload={
+            "job_id": job_id,
+            "proposal_id": persist_result.get("proposal_id"),
+            "ledger_entry_id": persist_result.get("ledger_id"),
+            "invoice_no": proposal.get("invoice_no"),
+            "vendor": proposal.get("vendor"),
+            "total_amount": proposal.get("total_amount"),
+            "currency": "VND",
+        },
+        tenant_id=tenant_uuid,
+        request_id=request_id,
+    )
+    uow.counter("ledger_posted_total", 1.0, {"tenant": tenant_uuid})
+    uow.audit(
+        "posted_to_ledger",
+        {"ledger_id": persist_result.get("ledger_id"), "entry_number": persist_result.get("entry_number")},
+        actor="worker",
+    )
+    uow.set_state(JobState.COMPLETED)
+
+    e2e_latency_ms = int((time.time() - pipeline_start) * 1000)
+    uow.latency("end_to_end_latency", float(e2e_latency_ms), labels={"tenant": tenant_uuid})
+    uow.audit("completed", {"e2e_latency_ms": e2e_latency_ms, "doc_type": proposal.get("doc_type")}, actor="worker")
+    await uow.flush()
+
+    logger.info(f"[{request_id}] Job {job_id} completed in {e2e_latency_ms}ms")
+    return "completed"
+
+
+async def record_failure(
+    conn,
+    job_id: str,
+    file_info: dict[str, Any],
+    error: str,
+    request_id: str | None = None,
+) -> None:
+    """Mark the job FAILED and close its audit trail."""
+    tenant = file_info.get("tenant_uuid") or file_info.get("tenant_id", "default")
+    uow = PipelineUnitOfWork(conn, job_id, tenant, request_id)
+    uow.set_state(JobState.FAILED, error=error)
+    uow.audit("failed", {"error": error[:1000]}, actor="worker")
+    uow.call(update_audit_decision, job_id, "failed", error[:500], request_id)
+    await uow.flush()
+
+
+# ===========================================================================
+# cpu-ocr stage
+# ===========================================================================
+
+
+def download_document_file(job_id: str, file_info: dict[str, Any]) -> str:
+    """Download the raw file from MinIO into a temp file; returns its path."""
+    from src.storage import download_document
+
+    if not file_info.get("minio_bucket") or not file_info.get("minio_key"):
+        raise ValueError(f"Document {job_id} has no MinIO location")
+
+    file_data = download_document(file_info["minio_bucket"], file_info["minio_key"])
+    file_ext = os.path.splitext(file_info.get("filename") or "")[1] or ".bin"
+    with tempfile.NamedTemporaryFile(suffix=file_ext, delete=False) as tmp:
+        tmp.write(file_data)
+
+    logger.info(f"[{job_id}] Downloaded {len(file_data)} bytes to {tmp.name}")
+    return tmp.name
+
+
+async def extract_document_text(file_path: str, content_type: str) -> dict[str, Any]:
+    """Extract text (and OCR boxes for images) from a local file."""
+    from src.api.main import extract_excel, extract_image, extract_pdf
+
+    ocr_start = time.time()
+    ocr_boxes: list = []
+    page_dimensions = {"width": 1000, "height": 1400}
+
+    if "pdf" in content_type:
+        text = await extract_pdf(file_path)
+    elif "image" in content_type:
+        text, ocr_boxes, page_dimensions = await extract_image(file_path)
+    elif "spreadsheet" in content_type or "excel" in content_type:
+        text = await extract_excel(file_path)
+    else:
+        with open(file_path, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+
+    ocr_latency_ms = int((time.time() - ocr_start) * 1000)
+    if not text:
+        raise ValueError("Failed to extract text from document")
+
+    logger.info(f"Extracted {len(text)} chars, {len(ocr_boxes)} boxes in {ocr_latency_ms}ms")
+    return {
+        "text": text[:MAX_STAGE_TEXT],
+        "text_length": len(text),
+        "byte_count": len(text.encode("utf-8")),
+        "ocr_boxes": ocr_boxes,
+        "page_dimensions": page_dimensions,
+        "ocr_latency_ms": ocr_latency_ms,
+    }
+
+
+# ===========================================================================
+# llm stage
+# ===========================================================================
+
+
+async def generate_proposal(
+    job_id: str,
+    file_info: dict[str, Any],
+    text: str,
+    request_id: str | None = None,
+) -> dict[str, Any]:
+    """Index the text in Qdrant (non-fatal) and ask the LLM for a journal proposal."""
+    from src.api.main import validate_proposal
+    from src.llm import get_llm_client
+
+    if config.ENABLE_QDRANT:
+        try:
+            from src.rag import generate_embedding, get_qdrant_client
+
+            text_for_embedding = text[:4000]
+            embedding = generate_embedding(text_for_embedding)
+            if embedding:
+                get_qdrant_client().upsert_documents(
+                    texts=[text_for_embedding],
+                    metadatas=[
+                        {
+                            "job_id": job_id,
+                            "tenant_id": file_info.get("tenant_uuid"),
+                            "filename": file_info.get("filename", "unknown"),
+                            "doc_type": "invoice",
+                            "source": "worker",
+                        }
+                    ],
+                    collection_name="documents_ingested",
+                )
+                logger.info(f"[{request_id}] Qdrant upsert from worker")
+        except Exception as e:
+            logger.warning(f"[{request_id}] Qdrant failed (non-fatal): {e}")
+
+    llm_client = get_llm_client()
+    user_prompt = f"""Phân tích hóa đơn sau và đề xuất bút toán:
+
+---
+{text[:4000]}
+---
+
+Trả về JSON theo format đã định."""
+
+    llm_start = time.time()
+    response = await llm_client.generate_json(
+        prompt=user_prompt,
+        system=WORKER_SYSTEM_PROMPT,
+        temperature=0.2,
+        max_tokens=2048,
+        request_id=request_id,
+        trace_id=job_id,
+    )
+    llm_latency_ms = int((time.time() - llm_start) * 1000)
+
+    response["doc_id"] = job_id
+    proposal = validate_proposal(response)
+    logger.info(f"[{request_id}] LLM response in {llm_latency_ms}ms, confidence={proposal.get('confidence')}")
+
+    return {
+        "proposal": proposal,
+        "model_name": llm_client.config.model,
+        "llm_latency_ms": llm_latency_ms,
+        "llm_input": user_prompt,
+        "llm_output_raw": str(response),
+    }
+
+
+def check_proposal(data: dict[str, Any]) -> dict[str, Any]:
+    """Batch validator: reject unusable output (retried alone), else return the cleaned proposal."""
+    from src.schemas.llm_output import coerce_and_validate, validate_llm_output
+
+    model, errors = validate_llm_output(data)
+    if model is None or not model.entries:
+        raise ValueError("; ".join(errors) or "No journal entries provided")
+    return coerce_and_validate(data)
+
+
+async def generate_proposals_batched(
+    documents: list[tuple[str, str]],
+    request_id: str | None = None,
+    client=None,
+) -> list[BatchResult]:
+    """
+    Journal proposals for many small documents, several per LLM request.
+
+    ``documents`` are (doc_id, text) pairs; results keep their order. Each
+    proposal is validated on its own and failures are retried individually.
+    """
+    batcher = LLMBatcher(
+        system=WORKER_SYSTEM_PROMPT,
+        instructions="Phân tích các hóa đơn sau và đề xuất bút toán.",
+        validate=check_proposal,
+        client=client,
+    )
+    return await batcher.run([BatchDocument(doc_id, text) for doc_id, text in documents], request_id=request_id or "")
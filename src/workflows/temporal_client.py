@@ -47,6 +47,7 @@ async def get_temporal_client():
 async def start_document_workflow(job_id: str) -> str:
     """
     Start a document processing workflow (PR17 with approval support).
+    With TEMPORAL_STAGED_QUEUES=1 the stages run on separate task queues.
 
     Args:
         job_id: The job ID (also used as workflow ID)
@@ -54,16 +55,27 @@ async def start_document_workflow(job_id: str) -> str:
     Returns:
         workflow_id (same as job_id)
     """
-    from src.workflows.document_workflow_pr17 import DocumentWorkflowPR17
-
     client = await get_temporal_client()
 
-    handle = await client.start_workflow(
-        DocumentWorkflowPR17.run,
-        job_id,
-        id=job_id,
-        task_queue=config.TEMPORAL_TASK_QUEUE,
-    )
+    if config.TEMPORAL_STAGED_QUEUES:
+        # Per-stage task queues; workflow tasks run on the db worker
+        from src.workflows.document_workflow_staged import StagedDocumentWorkflow
+
+        handle = await client.start_workflow(
+            StagedDocumentWorkflow.run,
+            job_id,
+            id=job_id,
+            task_queue=config.TEMPORAL_DB_TASK_QUEUE,
+        )
+    else:
+        from src.workflows.document_workflow_pr17 import DocumentWorkflowPR17
+
+        handle = await client.start_workflow(
+            DocumentWorkflowPR17.run,
+            job_id,
+            id=job_id,
+            task_queue=config.TEMPORAL_TASK_QUEUE,
+        )
 
     logger.info(f"[{job_id}] Temporal workflow started: workflow_id={handle.id}")
 
@@ -0,0 +1,87 @@
+"""
+ERPX AI - Stage Workers
+=======================
+One worker entry point per task queue, so each stage scales on its own:
+
+    python -m src.workflows.worker_staged ocr   # CPU nodes, WORKER_OCR_CONCURRENCY threads
+    python -m src.workflows.worker_staged llm   # I/O nodes, WORKER_LLM_CONCURRENCY slots
+    python -m src.workflows.worker_staged db    # workflows + DB activities, WORKER_DB_CONCURRENCY slots
+
+Size the db worker's pool with DB_POOL_MAX_SIZE (>= WORKER_DB_CONCURRENCY).
+"""
+
+import asyncio
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Setup path
+sys.path.insert(0, "/root/erp-ai")
+
+from src.core import config
+
+logger = logging.getLogger("erpx.worker.staged")
+
+STAGES = ("ocr", "llm", "db")
+
+
+def worker_options(stage: str) -> dict:
+    """Task queue, registrations and concurrency limits for a stage worker."""
+    from src.workflows.activities_staged import DB_ACTIVITIES, LLM_ACTIVITIES, OCR_ACTIVITIES
+    from src.workflows.document_workflow_staged import StagedDocumentWorkflow
+
+    if stage == "ocr":
+        return {
+            "task_queue": config.TEMPORAL_OCR_TASK_QUEUE,
+            "activities": OCR_ACTIVITIES,
+            "activity_executor": ThreadPoolExecutor(max_workers=config.WORKER_OCR_CONCURRENCY),
+            "max_concurrent_activities": config.WORKER_OCR_CONCURRENCY,
+        }
+    if stage == "llm":
+        return {
+            "task_queue": config.TEMPORAL_LLM_TASK_QUEUE,
+            "activities": LLM_ACTIVITIES,
+            "max_concurrent_activities": config.WORKER_LLM_CONCURRENCY,
+        }
+    if stage == "db":
+        return {
+            "task_queue": config.TEMPORAL_DB_TASK_QUEUE,
+            "workflows": [StagedDocumentWorkflow],
+            "activities": DB_ACTIVITIES,
+            "max_concurrent_activities": config.WORKER_DB_CONCURRENCY,
+        }
+    raise ValueError(f"Unknown stage {stage!r}, expected one of {', '.join(STAGES)}")
+
+
+async def run_worker(stage: str):
+    """Run the Temporal worker for one pipeline stage."""
+    from temporalio.worker import Worker
+
+    from src.workflows.temporal_client import get_temporal_client
+
+    options = worker_options(stage)
+    client = await get_temporal_client()
+    worker = Worker(client, **options)
+
+    logger.info(
+        f"Stage worker '{stage}' listening on {options['task_queue']} "
+        f"(max_concurrent_activities={options['max_concurrent_activities']}, "
+        f"db pool {config.DB_POOL_MIN_SIZE}-{config.DB_POOL_MAX_SIZE})"
+    )
+
+    try:
+        await worker.run()
+    finally:
+        from src.db import close_pool
+
+        await close_pool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if len(sys.argv) != 2 or sys.argv[1] not in STAGES:
+        sys.exit(f"usage: python -m src.workflows.worker_staged {{{'|'.join(STAGES)}}}")
+    asyncio.run(run_worker(sys.argv[1]))
@@ -0,0 +1,116 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_layer.qdrant_mock import QdrantMock
+from src.rag.quantization import CompressedVectors, CompressionConfig, EmbeddingCodec
+
+# Configuration
+NUM_VECTORS = 20000
+DIM = 1024  # multilingual-e5-large / bge-m3
+NUM_QUERIES = 100
+TOP_K = 10
+NUM_CLUSTERS = 200
+PYTHON_BASELINE_VECTORS = 2000  # QdrantMock's pure-Python scan is too slow for the full set
+
+
+def make_data(n, dim, queries, seed=0):
+    """Clustered unit vectors with a decaying spectrum, like real sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    spectrum = (1.0 / np.sqrt(np.arange(1, dim + 1))).astype(np.float32)
+    centers = rng.standard_normal((NUM_CLUSTERS, dim)).astype(np.float32) * spectrum
+    labels = rng.integers(0, NUM_CLUSTERS, n + queries)
+    x = centers[labels] + 0.5 * rng.standard_normal((n + queries, dim)).astype(np.float32) * spectrum
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x[:n], x[n:]
+
+
+def exact_topk(corpus, queries, k):
+    scores = queries @ corpus.T
+    return [set(np.argpartition(-row, k)[:k].tolist()) for row in scores]
+
+
+def run(name, search, queries, truth, bytes_per_vector, search_batch=None):
+    start = time.perf_counter()
+    found = [search(q) for q in queries]
+    qps = len(queries) / (time.perf_counter() - start)
+    batch = ""
+    if search_batch is not None:
+        start = time.perf_counter()
+        batched = search_batch(queries)
+        batch = f"{len(queries) / (time.perf_counter() - start):>9.1f}"
+        assert [set(b) for b in batched] == [set(f) for f in found], f"{name}: batch and single search disagree"
+    recall = np.mean([len(set(f) & t) / len(t) for f, t in zip(found, truth)])
+    mb_per_million = bytes_per_vector * 1_000_000 / 2**20
+    print(f"  {name:<22} {bytes_per_vector:>9.0f} {mb_per_million:>9.0f} {qps:>9.1f} {batch:>9} {recall:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs speed of compressed embeddings (CPU)")
+    parser.add_argument("--n", type=int, default=NUM_VECTORS)
+    parser.add_argument("--dim", type=int, default=DIM)
+    parser.add_argument("--queries", type=int, default=NUM_QUERIES)
+    args = parser.parse_args()
+
+    print(f"Benchmark: {args.n} x {args.dim} vectors, {args.queries} queries, top-{TOP_K}")
+    corpus, queries = make_data(args.n, args.dim, args.queries)
+    truth = exact_topk(corpus, queries, TOP_K)
+    ids = [str(i) for i in range(args.n)]
+
+    print("\nResults:")
+    print(f"  {'':<22} {'RAM B/vec':>9} {'MB/1M':>9} {'QPS':>9} {'batch QPS':>9} {f'recall@{TOP_K}':>9}")
+
+    # QdrantMock's original float-list cosine scan, on a subset
+    n_py = min(PYTHON_BASELINE_VECTORS, args.n)
+    mock = QdrantMock()
+    mock.create_collection("bench", vector_size=args.dim)
+    mock.upsert_points("bench", [{"id": ids[i], "vector": corpus[i].tolist(), "payload": {}} for i in range(n_py)])
+    py_truth = exact_topk(corpus[:n_py], queries, TOP_K)
+    per_vec = mock.memory_usage("bench")["vectors"] / n_py
+    n_q = min(10, args.queries)
+    run(
+        f"python lists ({n_py})",
+        lambda q: [int(r.id) for r in mock.search("bench", q.tolist(), TOP_K)],
+        queries[:n_q],
+        py_truth[:n_q],
+        per_vec,
+    )
+
+    configs = [
+        ("float32", CompressionConfig()),
+        ("int8", CompressionConfig("int8")),
+        ("binary", CompressionConfig("binary")),
+        ("binary (no rescore)", CompressionConfig("binary", rescore=False)),
+        ("truncate 256", CompressionConfig(dims=256)),
+        ("int8 + truncate 256", CompressionConfig("int8", dims=256)),
+        ("int8 + pca 256", CompressionConfig("int8", dims=256, reduction="pca")),
+        ("binary + pca 512", CompressionConfig("binary", dims=512, reduction="pca")),
+    ]
+    for name, config in configs:
+        codec = EmbeddingCodec(config)
+        if codec.needs_fit:
+            sample = corpus[np.random.default_rng(1).choice(args.n, min(args.n, 4096), replace=False)]
+            codec.fit(sample)
+        store = CompressedVectors(codec)
+        store.add(ids, corpus)
+        nbytes = store.nbytes
+        run(
+            name,
+            lambda q, s=store: [int(pid) for pid, _ in s.search(q, TOP_K)],
+            queries,
+            truth,
+            nbytes["codes"] / args.n,
+            search_batch=lambda qs, s=store: [[int(pid) for pid, _ in hits] for hits in s.search_batch(qs, TOP_K)],
+        )
+        if nbytes["rescore"]:
+            print(f"  {'':<22} (+{nbytes['rescore'] / args.n:.0f} B/vec float32 rescoring copies on disk)")
+
+
+if __name__ == "__main__":
+    main()
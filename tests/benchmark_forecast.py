@@ -0,0 +1,69 @@
+import logging
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.ERROR)
+warnings.filterwarnings("ignore")
+
+# Add repo root to path
+sys.path.append(os.getcwd())
+
+from src.analytics.forecast import BatchForecaster, FittedModelCache, create_forecaster
+
+
+def make_vendor_series(n_series: int, n_points: int = 365) -> dict:
+    rng = np.random.default_rng(42)
+    dates = pd.date_range("2025-01-01", periods=n_points, freq="D")
+    return {
+        f"vendor-{i:04d}": pd.DataFrame({
+            "ds": dates,
+            "y": 1_000 + rng.normal(0, 50, n_points).cumsum() + 100 * np.sin(np.arange(n_points) * 2 * np.pi / 7),
+        })
+        for i in range(n_series)
+    }
+
+
+def benchmark(n_series: int = 200, model: str = "arima", params: dict = None):
+    params = params or {"order": (1, 1, 1)}
+    series = make_vendor_series(n_series)
+    print(f"Forecasting {n_series} vendor series with {model} ({os.cpu_count()} CPUs)")
+
+    # Baseline: one fit per series, serially
+    start = time.time()
+    for df in series.values():
+        create_forecaster(model, **params).fit_predict(df, "ds", "y", 30)
+    serial = time.time() - start
+    print(f"  serial loop:            {serial:.2f}s")
+
+    with BatchForecaster(model, params, executor="process", cache=FittedModelCache()) as batch:
+        batch.forecast_many({"warmup": series["vendor-0000"]}, periods=30)  # spawn workers
+        batch.cache.clear()
+
+        start = time.time()
+        batch.forecast_many(series, periods=30)
+        parallel = time.time() - start
+        print(f"  process pool (cold):    {parallel:.2f}s  speedup {serial / parallel:.1f}x")
+
+        start = time.time()
+        results = batch.forecast_many(series, periods=30)
+        cached = time.time() - start
+        print(f"  unchanged (cached):     {cached:.2f}s  modes={sorted({r.fit_mode for r in results.values()})}")
+
+        # One new day per series
+        grown = {}
+        for key, df in series.items():
+            next_day = pd.DataFrame({"ds": [df["ds"].iloc[-1] + pd.Timedelta(days=1)], "y": [df["y"].iloc[-1]]})
+            grown[key] = pd.concat([df, next_day], ignore_index=True)
+        start = time.time()
+        results = batch.forecast_many(grown, periods=30)
+        incremental = time.time() - start
+        print(f"  +1 point (incremental): {incremental:.2f}s  modes={sorted({r.fit_mode for r in results.values()})}")
+
+
+if __name__ == "__main__":
+    benchmark()
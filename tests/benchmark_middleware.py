@@ -0,0 +1,132 @@
+"""
+Middleware overhead: BaseHTTPMiddleware stack (previous implementation)
+vs the pure-ASGI stack in api/middleware.py, driven directly through ASGI
+so only middleware cost is measured.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+
+logging.basicConfig(level=logging.ERROR)
+sys.path.append(os.getcwd())
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from api.middleware import IdempotencyMiddleware, RateLimitMiddleware, RequestLoggingMiddleware, TenantMiddleware
+from api.state_store import InMemoryStateStore
+
+REQUESTS = 3000
+
+logging.getLogger("erpx").setLevel(logging.ERROR)  # core.logging config overrides basicConfig
+
+
+async def endpoint(request):
+    return JSONResponse({"ok": True, "tenant": request.state.tenant_id})
+
+
+class LegacyTenant(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request.state.tenant_id = request.headers.get("X-Tenant-ID", "default")
+        response = await call_next(request)
+        response.headers["X-Tenant-ID"] = request.state.tenant_id
+        return response
+
+
+class LegacyRateLimit(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.request_counts = {}
+
+    async def dispatch(self, request, call_next):
+        minute = int(time.time() / 60)
+        counts = self.request_counts.setdefault(request.state.tenant_id, {})
+        counts[minute] = counts.get(minute, 0) + 1
+        response = await call_next(request)
+        response.headers["X-RateLimit-Remaining"] = str(10**9 - counts[minute])
+        return response
+
+
+class LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.time()
+        response = await call_next(request)
+        response.headers["X-Processing-Time-Ms"] = f"{(time.time() - start) * 1000:.2f}"
+        return response
+
+
+class LegacyIdempotency(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.cache = {}
+
+    async def dispatch(self, request, call_next):
+        key = request.headers.get("X-Idempotency-Key")
+        if key in self.cache:
+            return JSONResponse(content=None)
+        await request.body()
+        response = await call_next(request)
+        body = b""
+        async for chunk in response.body_iterator:
+            body += chunk
+        self.cache[key] = body
+        return JSONResponse(content=None, status_code=response.status_code, headers=dict(response.headers))
+
+
+def build(legacy: bool):
+    app = Starlette(routes=[Route("/items", endpoint, methods=["POST"])])
+    if legacy:
+        for cls in (LegacyIdempotency, LegacyLogging, LegacyRateLimit, LegacyTenant):
+            app.add_middleware(cls)
+    else:
+        store = InMemoryStateStore()
+        app.add_middleware(IdempotencyMiddleware, store=store)
+        app.add_middleware(RequestLoggingMiddleware)
+        app.add_middleware(RateLimitMiddleware, limit=10**9, store=store)
+        app.add_middleware(TenantMiddleware)
+    return app
+
+
+async def call(app, i: int):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/items", "raw_path": b"/items", "root_path": "", "query_string": b"",
+        "headers": [(b"x-idempotency-key", f"k{i}".encode()), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b'{"amount": 1000}', "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    assert sent[0]["status"] == 200
+
+
+async def run(app) -> float:
+    for i in range(100):  # warm up
+        await call(app, -i - 1)
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        await call(app, i)
+    return time.perf_counter() - start
+
+
+def benchmark():
+    print(f"Middleware stack overhead ({REQUESTS} POSTs, 4 middlewares)")
+    legacy = asyncio.run(run(build(legacy=True)))
+    print(f"  BaseHTTPMiddleware: {legacy * 1e6 / REQUESTS:.0f}us/request")
+    pure = asyncio.run(run(build(legacy=False)))
+    print(f"  pure ASGI:          {pure * 1e6 / REQUESTS:.0f}us/request  speedup {legacy / pure:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
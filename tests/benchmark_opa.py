@@ -1,4 +1,5 @@
 import asyncio
+import json
 import logging
 import os
 import sys
@@ -12,6 +13,8 @@ logging.basicConfig(level=logging.ERROR)
 sys.path.append(os.getcwd())
 
 from src.orchestrator import pipeline
+from src.policy import engine as policy_engine
+from src.policy.ruleset import PolicyRuleCache
 
 
 async def benchmark():
@@ -76,5 +79,85 @@ async def benchmark():
             print("Result: NON-BLOCKING (Fast)")
 
 
+class FakePolicyConn:
+    """asyncpg-like connection with fixed per-round-trip latency."""
+
+    def __init__(self, rules: list[dict], latency: float = 0.002):
+        self.rules = rules
+        self.latency = latency
+        self.round_trips = 0
+
+    async def fetch(self, query, *args):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+        return self.rules
+
+    async def execute(self, query, *args):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+
+    async def executemany(self, query, rows):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+
+
+def make_policy_rules(vendor_count: int = 500) -> list[dict]:
+    return [
+        {"id": "1", "name": "auto_approve_threshold", "rule_type": "threshold", "priority": 10,
+         "config": '{"max_amount": 10000000}', "action_on_fail": "require_review"},
+        {"id": "2", "name": "balanced_journal", "rule_type": "balanced", "priority": 20,
+         "config": '{"tolerance": 0.01}', "action_on_fail": "auto_reject"},
+        {"id": "3", "name": "entry_count_limit", "rule_type": "entry_count", "priority": 30,
+         "config": '{"min": 2, "max": 20}', "action_on_fail": "require_review"},
+        {"id": "4", "name": "tax_sanity", "rule_type": "tax_sanity", "priority": 40,
+         "config": '{"min_rate": 0.08, "max_rate": 0.12}', "action_on_fail": "warn_only"},
+        {"id": "5", "name": "vendor_allowlist", "rule_type": "vendor_allowlist", "priority": 50,
+         "config": json.dumps({"vendors": [f"cong ty vendor {i:04d}" for i in range(vendor_count)], "mode": "allow"}),
+         "action_on_fail": "require_review"},
+    ]
+
+
+def make_proposals(n: int) -> list[dict]:
+    return [
+        {
+            "job_id": f"job-{i}",
+            "proposal": {
+                "vendor": f"Cong ty Vendor {i % 700:04d}",
+                "total_amount": 1_100_000 + i,
+                "vat_amount": 100_000,
+                "entries": [{"debit": 1_000_000 + i}, {"credit": 1_000_000 + i}],
+            },
+        }
+        for i in range(n)
+    ]
+
+
+async def benchmark_policy_batch(n: int = 2000):
+    """Per-proposal evaluation (rules reloaded each time) vs compiled batch evaluation."""
+    rules = make_policy_rules()
+    items = make_proposals(n)
+
+    print(f"\nPolicy engine: {n} proposals, {len(rules)} rules")
+
+    # Baseline: no caching, one evaluate_proposal + INSERT per proposal
+    conn = FakePolicyConn(rules)
+    with patch("src.policy.ruleset._rule_cache", PolicyRuleCache(ttl=1e-9)):
+        start = time.time()
+        for item in items:
+            await policy_engine.evaluate_proposal(conn, item["proposal"], item["job_id"])
+        sequential = time.time() - start
+    print(f"  per-proposal (reload rules): {sequential:.3f}s, round trips={conn.round_trips}")
+
+    # Compiled batch: rules loaded once, one executemany
+    conn = FakePolicyConn(rules)
+    with patch("src.policy.ruleset._rule_cache", PolicyRuleCache()):
+        start = time.time()
+        results = await policy_engine.evaluate_proposals_batch(conn, items)
+        batched = time.time() - start
+    print(f"  compiled batch:              {batched:.3f}s, round trips={conn.round_trips}")
+    print(f"  speedup: {sequential / max(batched, 1e-9):.1f}x ({len(results)} results)")
+
+
 if __name__ == "__main__":
     asyncio.run(benchmark())
+    asyncio.run(benchmark_policy_batch())
@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.middleware import IdempotencyMiddleware, RateLimitMiddleware, TenantMiddleware
+from api.state_store import IdempotencyRecord, InMemoryStateStore, PostgresStateStore, RedisStateStore
+
+
+def make_app(store, calls, limit=3, **idempotency_kwargs):
+    async def create(request: Request):
+        calls.append(await request.body())
+        if request.query_params.get("fail"):
+            return JSONResponse({"error": "boom"}, status_code=500)
+        return JSONResponse({"n": len(calls), "tenant": request.state.tenant_id}, status_code=201)
+
+    async def export(request: Request):
+        calls.append(b"export")
+
+        async def rows():
+            for i in range(3):
+                yield f"row-{i}\n".encode()
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    app = Starlette(routes=[Route("/items", create, methods=["POST"]), Route("/export", export, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, store=store, **idempotency_kwargs)
+    app.add_middleware(RateLimitMiddleware, limit=limit, store=store)
+    app.add_middleware(TenantMiddleware)
+    return app
+
+
+def test_replay_is_shared_across_workers_and_checks_request_body():
+    store, calls = InMemoryStateStore(), []
+    worker_a = TestClient(make_app(store, calls))
+    worker_b = TestClient(make_app(store, calls))
+    key = {"X-Idempotency-Key": "k1"}
+
+    first = worker_a.post("/items", content=b'{"a": 1}', headers=key)
+    replay = worker_b.post("/items", content=b'{"a": 1}', headers=key)
+    conflict = worker_b.post("/items", content=b'{"a": 2}', headers=key)
+
+    assert first.status_code == replay.status_code == 201
+    assert replay.json() == first.json() == {"n": 1, "tenant": "default"}
+    assert replay.headers["X-Idempotency-Replayed"] == "true"
+    assert "X-Idempotency-Replayed" not in first.headers
+    assert conflict.status_code == 422 and conflict.json()["code"] == "IDEMPOTENCY_CONFLICT"
+    assert calls == [b'{"a": 1}']
+
+
+def test_idempotency_keys_are_namespaced_per_tenant():
+    store, calls = InMemoryStateStore(), []
+    client = TestClient(make_app(store, calls, limit=100))
+    body = b'{"a": 1}'
+
+    first = client.post("/items", content=body, headers={"X-Idempotency-Key": "k", "X-Tenant-ID": "tenant-001"})
+    other = client.post("/items", content=body, headers={"X-Idempotency-Key": "k", "X-Tenant-ID": "tenant-002"})
+
+    # Same client key, different tenants: both run, neither is served the other's response
+    assert other.json()["tenant"] == "tenant-002" and "X-Idempotency-Replayed" not in other.headers
+    assert len(calls) == 2 and first.json()["n"] == 1
+    assert set(store._records) == {"http:tenant-001:k", "http:tenant-002:k"}
+    assert len(IdempotencyMiddleware.namespaced_key("t", "x" * 300)) <= 255
+
+
+def test_server_errors_release_the_key_and_streams_are_captured():
+    store, calls = InMemoryStateStore(), []
+    client = TestClient(make_app(store, calls, limit=100))
+
+    assert client.post("/items?fail=1", content=b"x", headers={"X-Idempotency-Key": "k"}).status_code == 500
+    assert len(store) == 0
+    assert client.post("/items?fail=1", content=b"x", headers={"X-Idempotency-Key": "k"}).status_code == 500
+    assert len(calls) == 2
+
+    first = client.post("/export", headers={"X-Idempotency-Key": "e"})
+    replay = client.post("/export", headers={"X-Idempotency-Key": "e"})
+    assert first.text == replay.text == "row-0\nrow-1\nrow-2\n"
+    assert replay.headers["content-type"].startswith("text/csv")
+    assert calls.count(b"export") == 1
+
+
+def test_oversized_responses_pass_through_without_being_stored():
+    store, calls = InMemoryStateStore(), []
+    client = TestClient(make_app(store, calls, max_body_bytes=8))
+
+    for _ in range(2):
+        assert client.post("/export", headers={"X-Idempotency-Key": "big"}).text.startswith("row-0")
+    assert calls.count(b"export") == 2
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_claims_expire_and_block_concurrent_duplicates():
+    store = InMemoryStateStore()
+    assert await store.reserve_idempotency_key("k", "h", ttl=0.05) is None
+    in_flight = await store.reserve_idempotency_key("k", "h", ttl=0.05)
+    assert in_flight.status == "processing"
+
+    await asyncio.sleep(0.06)
+    assert await store.reserve_idempotency_key("k", "h2", ttl=10) is None
+    assert len(store._expiry_heap) == 1  # the expired deadline was popped, nothing else scanned
+
+
+def test_token_bucket_limits_per_tenant_across_workers():
+    store, calls = InMemoryStateStore(), []
+    worker_a = TestClient(make_app(store, calls))
+    worker_b = TestClient(make_app(store, calls))
+
+    codes = [(worker_a if i % 2 else worker_b).post("/items").status_code for i in range(4)]
+    assert codes == [201, 201, 201, 429]
+
+    limited = worker_a.post("/items")
+    assert limited.json()["code"] == "RATE_LIMIT"
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert worker_a.post("/items", headers={"X-Tenant-ID": "tenant-001"}).headers["X-RateLimit-Remaining"] == "2"
+
+
+class FakeRedis:
+    """Minimal async Redis: SET NX/PX, GET, DELETE and a Python token-bucket script."""
+
+    def __init__(self):
+        self.data = {}
+        self.buckets = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    def register_script(self, script):
+        async def run(keys, args):
+            capacity, rate, cost, now = (float(a) for a in args)
+            tokens, ts = self.buckets.get(keys[0], (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= cost
+            tokens = tokens - cost if allowed else tokens
+            self.buckets[keys[0]] = (tokens, now)
+            return [int(allowed), str(tokens).encode()]
+
+        return run
+
+
+@pytest.mark.asyncio
+async def test_redis_store_round_trips_records_and_buckets():
+    store = RedisStateStore(client=FakeRedis())
+    assert await store.reserve_idempotency_key("k", "h", ttl=60) is None
+    record = IdempotencyRecord("h", "completed", 201, [("content-type", "application/json")], b'{"ok": true}')
+    await store.complete_idempotency_key("k", record, ttl=60)
+    assert await store.reserve_idempotency_key("k", "h", ttl=60) == record
+
+    results = [await store.take_token("t", capacity=2, refill_per_second=0.001) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[-1].retry_after > 0
+
+
+class RecordingPool:
+    def __init__(self):
+        self.calls = []
+
+    def acquire(self):
+        pool = self
+
+        class Conn:
+            async def fetchval(self, sql, *args):
+                pool.calls.append((sql, args))
+                return 1
+
+            async def execute(self, sql, *args):
+                pool.calls.append((sql, args))
+
+        class Acquire:
+            async def __aenter__(self):
+                return Conn()
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+@pytest.mark.asyncio
+async def test_postgres_store_records_tenant_and_releases_without_delete():
+    pool = RecordingPool()
+    store = PostgresStateStore(pool)
+
+    assert await store.reserve_idempotency_key("http:acme:k", "h", ttl=60, tenant="acme") is None
+    sql, args = pool.calls[0]
+    assert "FROM tenants WHERE code = $4" in sql and args[-1] == "acme"
+
+    await store.release_idempotency_key("http:acme:k")
+    sql, args = pool.calls[1]
+    assert "DELETE" not in sql and "UPDATE idempotency_keys" in sql and "expires_at = NOW()" in sql
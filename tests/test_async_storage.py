@@ -0,0 +1,106 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from src.storage.async_store import (
+    LocalObjectStore,
+    ObjectNotFound,
+    ObjectStore,
+    etag_matches,
+    parse_range,
+    serve_object,
+)
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_hashes_incrementally_and_reads_ranges(tmp_path):
+    store = LocalObjectStore(tmp_path, bucket="docs")
+
+    bucket, key, checksum, size = await store.upload_stream(
+        io.BytesIO(DATA), "hd.pdf", "application/pdf", "acme", "job-1"
+    )
+
+    assert bucket == "docs"
+    assert key.startswith("raw/acme/") and key.endswith("/job-1/hd.pdf")
+    assert (checksum, size) == (hashlib.sha256(DATA).hexdigest(), len(DATA))
+
+    info = await store.stat(bucket, key)
+    assert info.size == len(DATA)
+    assert info.etag == hashlib.md5(DATA).hexdigest()
+    assert info.content_type == "application/pdf"
+    assert info.metadata["job_id"] == "job-1"
+
+    body = await store.open(bucket, key, offset=100, length=5000)
+    chunks = [c async for c in body.iter_chunks(1024)]
+    assert b"".join(chunks) == DATA[100:5100]
+    assert await store.download(bucket, key) == DATA
+
+    await store.delete(bucket, key)
+    with pytest.raises(ObjectNotFound):
+        await store.stat(bucket, key)
+
+
+def test_object_store_backends_must_implement_primitives():
+    class Partial(ObjectStore):
+        async def _put(self, bucket, key, reader, length, content_type, metadata):
+            pass
+
+    with pytest.raises(TypeError, match="delete"):
+        Partial()
+
+
+def test_parse_range_and_etag_matches():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=100-", 100) is False
+    assert parse_range("bytes=0-1,5-6", 100) is None
+
+    assert etag_matches('"abc"', "abc")
+    assert etag_matches('W/"x", "abc"', '"abc"')
+    assert etag_matches("*", "abc")
+    assert not etag_matches('"other"', "abc")
+    assert not etag_matches(None, "abc")
+
+
+def test_serve_object_range_and_conditional(tmp_path):
+    store = LocalObjectStore(tmp_path, bucket="docs")
+    app = FastAPI()
+    keys = {}
+
+    @app.get("/file")
+    async def get_file(request: Request):
+        try:
+            return await serve_object(store, "docs", keys["key"], request, filename="hd.pdf")
+        except ObjectNotFound:
+            raise HTTPException(status_code=404)
+
+    client = TestClient(app)
+    with client:
+        _, keys["key"], _, _ = client.portal.call(
+            store.upload_bytes, DATA, "hd.pdf", "application/pdf", "acme", "job-1"
+        )
+
+        full = client.get("/file")
+        assert full.status_code == 200
+        assert full.content == DATA
+        assert full.headers["accept-ranges"] == "bytes"
+        etag = full.headers["etag"]
+
+        part = client.get("/file", headers={"Range": "bytes=10-19"})
+        assert part.status_code == 206
+        assert part.content == DATA[10:20]
+        assert part.headers["content-range"] == f"bytes 10-19/{len(DATA)}"
+
+        assert client.get("/file", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/file", headers={"Range": f"bytes={len(DATA)}-"}).status_code == 416
+
+        keys["key"] = "raw/missing.pdf"
+        assert client.get("/file").status_code == 404
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.insights import cfo
+from src.outbox.worker import OutboxWorker
+
+TENANT = uuid.uuid4()
+
+
+class FakeDB:
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.queries: list[str] = []
+        self.snapshots: dict[tuple, tuple] = {}  # (tenant, window) -> (result, generated_at)
+
+    def acquire(self):
+        db = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return FakeConn(db)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+class FakeConn:
+    def __init__(self, db):
+        self.db = db
+
+    async def _track(self, sql):
+        self.db.queries.append(sql)
+        self.db.active += 1
+        self.db.peak = max(self.db.peak, self.db.active)
+        await asyncio.sleep(self.db.delay)
+        self.db.active -= 1
+
+    async def fetchrow(self, sql, *args):
+        await self._track(sql)
+        if "ledger_daily_stats" in sql:
+            return {
+                "entry_count": 12,
+                "total_debit": Decimal("1500.00"),
+                "total_credit": Decimal("1000.00"),
+                "net_position": Decimal("500.00"),
+                "first_entry_date": date.today() - timedelta(days=3),
+                "last_entry_date": date.today(),
+            }
+        if "cfo_insight_snapshots" in sql:
+            snap = self.db.snapshots.get(tuple(args))
+            return {"result": json.dumps(snap[0]), "generated_at": snap[1]} if snap else None
+        return None  # no forecast / simulation
+
+    async def fetch(self, sql, *args):
+        await self._track(sql)
+        if "vendor_daily_stats" in sql:
+            return [{"vendor_name": "ACME", "transaction_count": 4, "total_amount": Decimal("900")}]
+        if "cfo_insight_snapshots" in sql:
+            return [
+                {"window_days": w, "generated_at": at} for (t, w), (_, at) in self.db.snapshots.items() if t == args[0]
+            ]
+        return []
+
+    async def execute(self, sql, *args):
+        self.db.queries.append(sql)
+        if "INSERT INTO cfo_insight_snapshots" in sql:
+            tenant, window, result, generated_at = args
+            self.db.snapshots[(tenant, window)] = (json.loads(result), generated_at)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_sources_run_concurrently_on_pool_and_read_rollups():
+    db = FakeDB()
+    result = await cfo.generate_cfo_insight(None, TENANT, 30, pool=db)
+
+    assert db.peak == 4
+    assert result["metrics"]["ledger_entries_analyzed"] == 12
+    assert result["metrics"]["net_position"] == 500.0
+    assert result["top_findings"][2]["description"].startswith("Highest spending with ACME")
+    # Rollups only: no scan of raw ledger lines or invoices
+    assert not any("ledger_lines" in q or "extracted_invoices" in q for q in db.queries)
+
+    db.peak = 0
+    sequential = await cfo.generate_cfo_insight(FakeConn(db), TENANT, 30)
+    assert db.peak == 1
+    assert sequential["summary"] == result["summary"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_snapshots_coalesces_bursts():
+    db = FakeDB(delay=0)
+    conn = FakeConn(db)
+
+    assert await cfo.refresh_insight_snapshots(conn, TENANT) == 1
+    snapshot = await cfo.get_insight_snapshot(conn, TENANT, 30)
+    assert snapshot["result"]["metrics"]["vendors_count"] == 1
+
+    # Add a 90-day window; a refresh covers every window the tenant has
+    await cfo.materialize_insight(conn, TENANT, 90)
+    since = datetime.now(timezone.utc)
+    assert await cfo.refresh_insight_snapshots(conn, TENANT, since=since) == 2
+    # Already regenerated after `since`: the rest of the burst is free
+    assert await cfo.refresh_insight_snapshots(conn, TENANT, since=since) == 0
+
+
+@pytest.mark.asyncio
+async def test_outbox_ledger_posted_refreshes_tenant_snapshot():
+    db = FakeDB(delay=0)
+
+    async def factory():
+        return FakeConn(db)
+
+    worker = OutboxWorker(factory)
+    worker._batch_fetched_at = datetime.now(timezone.utc)
+    event = {"id": "e1", "event_type": "ledger.posted", "tenant_id": str(TENANT), "payload": {}}
+
+    first = await worker._deliver_internal(event, {"handler": "cfo_insight_refresh"})
+    second = await worker._deliver_internal(event, {"handler": "cfo_insight_refresh"})
+
+    assert (first["refreshed"], second["refreshed"]) == (1, 0)
+    assert (TENANT, 30) in db.snapshots
@@ -0,0 +1,110 @@
+import json
+
+import pandas as pd
+
+from src.analytics.engine.dashboard_service import DashboardService, render_chart_data
+
+
+def _service(tmp_path, **kwargs):
+    return DashboardService(
+        db_path=str(tmp_path / "dashboards.db"),
+        legacy_json_dir=str(tmp_path / "legacy"),
+        **kwargs,
+    )
+
+
+def _sales():
+    return pd.DataFrame(
+        {
+            "vendor": ["A", "B", "A"],
+            "date": ["2026-01-01", "2026-01-02", "2026-01-03"],
+            "amount": [100.0, 50.0, 25.0],
+        }
+    )
+
+
+def test_workers_share_one_store_and_list_by_tenant(tmp_path):
+    worker_a = _service(tmp_path)
+    worker_b = _service(tmp_path)
+
+    d = worker_a.create_dashboard("Sales", dataset_name="sales", tenant_id="t1")
+    worker_a.create_dashboard("Other", tenant_id="t2")
+    worker_b.add_chart(d.dashboard_id, "bar", "By vendor", _sales(), x_field="vendor", y_field="amount")
+    worker_b.add_metric(d.dashboard_id, "Total", 175.0, "175")
+
+    # The other worker sees the chart immediately, without reloading anything
+    loaded = worker_a.get_dashboard(d.dashboard_id)
+    assert [c.title for c in loaded.charts] == ["By vendor"]
+    assert loaded.charts[0].data[0] == {"date": "2026-01-01", "vendor": "A", "amount": 100.0}
+    assert [m.title for m in loaded.metrics] == ["Total"]
+
+    listed = worker_a.list_dashboards(tenant_id="t1")
+    assert [(x["name"], x["chart_count"], x["metric_count"]) for x in listed] == [("Sales", 1, 1)]
+    assert [x["name"] for x in worker_a.list_dashboards(tenant_id="t2")] == ["Other"]
+
+    assert worker_a.update_dashboard(d.dashboard_id, name="Sales 2026")
+    assert worker_b.get_dashboard(d.dashboard_id).name == "Sales 2026"
+    assert worker_b.remove_chart(d.dashboard_id, loaded.charts[0].chart_id)
+    assert worker_a.get_dashboard(d.dashboard_id).charts == []
+    assert worker_b.delete_dashboard(d.dashboard_id)
+    assert worker_a.get_dashboard(d.dashboard_id) is None
+    assert worker_a.add_metric(d.dashboard_id, "Gone", 1, "1") is None
+
+
+def test_dataset_change_rerenders_charts_with_spec(tmp_path):
+    frames = {"sales": _sales()}
+    service = _service(tmp_path, dataset_loader=frames.get)
+    d = service.auto_create_dashboard("Sales", frames["sales"], "sales", date_column="date")
+    bar = next(c for c in service.get_dashboard(d.dashboard_id).charts if c.chart_type == "bar")
+    assert bar.data == [{"vendor": "A", "amount": 125.0}, {"vendor": "B", "amount": 50.0}]
+
+    frames["sales"] = pd.DataFrame({"vendor": ["C"], "date": ["2026-02-01"], "amount": [999.0]})
+    _service(tmp_path).invalidate_dataset("sales")  # e.g. upload handled by another worker
+
+    bar = next(c for c in service.get_dashboard(d.dashboard_id).charts if c.chart_type == "bar")
+    assert bar.data == [{"vendor": "C", "amount": 999.0}] and not bar.stale
+
+    # Without a loader the cached render is served, flagged stale
+    frames["sales"] = _sales()
+    no_loader = _service(tmp_path)
+    no_loader.invalidate_dataset("sales")
+    assert all(c.stale for c in no_loader.get_dashboard(d.dashboard_id).charts)
+
+
+def test_upload_rerenders_charts_without_a_loader(tmp_path):
+    service = _service(tmp_path)
+    d = service.auto_create_dashboard("Sales", _sales(), "sales", date_column="date")
+
+    fresh = pd.DataFrame({"vendor": ["C"], "date": ["2026-02-01"], "amount": [999.0]})
+    _service(tmp_path).invalidate_dataset("sales", fresh)  # upload handled by another worker
+
+    charts = service.get_dashboard(d.dashboard_id).charts
+    assert not any(c.stale for c in charts)
+    assert next(c for c in charts if c.chart_type == "bar").data == [{"vendor": "C", "amount": 999.0}]
+
+
+def test_legacy_json_dashboards_imported_once(tmp_path):
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    chart = {"chart_id": "c1", "chart_type": "line", "title": "T", "data": [{"x": 1}], "options": {}}
+    (legacy / "d1.json").write_text(json.dumps({
+        "dashboard_id": "d1", "name": "Old", "description": "", "created_at": "2025-01-01",
+        "updated_at": "2025-01-01", "charts": [chart], "metrics": [],
+    }))
+
+    service = _service(tmp_path)
+    assert service.get_dashboard("d1").charts[0].data == [{"x": 1}]
+    service.delete_dashboard("d1")
+
+    # Restart: the marker prevents re-importing a deleted dashboard
+    assert _service(tmp_path).get_dashboard("d1") is None
+
+
+def test_render_chart_data_specs():
+    df = _sales()
+    assert render_chart_data(df, {"kind": "series", "x": "date", "y": "amount"})[-1] == {
+        "date": "2026-01-03", "amount": 25.0,
+    }
+    assert render_chart_data(df, {"kind": "top", "group_by": "vendor", "y": "amount", "limit": 1}) == [
+        {"vendor": "A", "amount": 125.0},
+    ]
@@ -0,0 +1,199 @@
+from unittest.mock import AsyncMock
+
+import asyncpg
+import pytest
+
+from src.search import DocumentSearch, InMemorySearchIndex, normalize_text, trigrams
+from src.search.service import like_pattern
+
+INVOICES = [
+    {
+        "id": "inv-1",
+        "vendor_name": "Công ty TNHH Điện lực Miền Nam",
+        "invoice_number": "HD-000123",
+        "vendor_tax_id": "0301234567",
+        "doc_type": "invoice",
+        "raw_text": "HÓA ĐƠN GIÁ TRỊ GIA TĂNG tiền điện tháng 5",
+    },
+    {
+        "id": "inv-2",
+        "vendor_name": "Cửa hàng Văn phòng phẩm Hồng Hà",
+        "invoice_number": "VPP-2024-88",
+        "vendor_tax_id": "0109998887",
+        "doc_type": "receipt",
+        "raw_text": "Giấy in A4, bút bi, sổ tay",
+    },
+    {
+        "id": "inv-3",
+        "vendor_name": "Công ty Cổ phần Viễn thông FPT",
+        "invoice_number": "FPT-5521",
+        "vendor_tax_id": "0101248141",
+        "doc_type": "invoice",
+        "raw_text": "Cước internet cáp quang tháng 5",
+    },
+]
+
+
+@pytest.fixture
+def index():
+    index = InMemorySearchIndex()
+    for inv in INVOICES:
+        index.add(inv["id"], inv)
+    return index
+
+
+def ids(results):
+    return [payload["id"] for _, payload in results]
+
+
+def test_normalize_text_strips_vietnamese_diacritics():
+    assert normalize_text("  Công ty  Điện lực ĐÀ NẴNG ") == "cong ty dien luc da nang"
+    assert normalize_text(None) == ""
+    assert "  a" in trigrams("a") and " ab" in trigrams("ab")
+    assert like_pattern("50%_off") == "%50\\%\\_off%"
+
+
+def test_search_is_accent_insensitive_and_typo_tolerant(index):
+    assert ids(index.search("cong ty dien luc"))[0] == "inv-1"
+    assert ids(index.search("Điện Lực"))[0] == "inv-1"
+    assert ids(index.search("hong ha"))[0] == "inv-2"
+    # Typo: "vien thog" for "viễn thông"
+    assert ids(index.search("vien thog fpt"))[0] == "inv-3"
+    assert index.search("zzzz qqqq") == []
+
+
+def test_search_matches_invoice_number_tax_id_and_ocr_text(index):
+    assert ids(index.search("hd-000123")) == ["inv-1"]
+    assert ids(index.search("0101248141"))[0] == "inv-3"
+    assert ids(index.search("cap quang")) == ["inv-3"]
+    # OCR-only matches rank below direct field matches
+    results = index.search("cong ty thang 5")
+    assert set(ids(results)) == {"inv-1", "inv-3"}
+    assert all(score > 0 for score, _ in results)
+
+
+def test_remove_reindex_and_filter(index):
+    index.add("inv-2", {**INVOICES[1], "vendor_name": "Nhà sách Fahasa"})
+    assert index.search("hong ha") == []
+    assert ids(index.search("fahasa")) == ["inv-2"]
+
+    index.remove("inv-1")
+    assert len(index) == 2
+    assert "inv-1" not in ids(index.search("cong ty"))
+
+    invoices_only = index.search("cong ty", filter_fn=lambda p: p["doc_type"] == "invoice")
+    assert ids(invoices_only) == ["inv-3"]
+
+
+@pytest.mark.asyncio
+async def test_missing_migration_falls_back_to_scoped_ilike_query():
+    conn = AsyncMock()
+    row = {**INVOICES[0], "document_id": None, "total_amount": 100, "currency": None, "filename": None}
+    conn.fetch.side_effect = [asyncpg.UndefinedColumnError('column "search_text" does not exist'), [row], [row]]
+
+    search = DocumentSearch(backend="postgres")
+    results = await search.search(conn, "HD-000", doc_type="invoice", limit=5, tenant_id="t1")
+
+    assert search.backend == "postgres"
+    assert [r["id"] for r in results] == ["inv-1"] and results[0]["currency"] == "VND"
+    sql, pattern, doc_type, limit, tenant = conn.fetch.await_args.args
+    assert "ILIKE" in sql and "LIMIT $3" in sql and "tenant_id" in sql
+    assert (pattern, doc_type, limit, tenant) == ("%HD-000%", "invoice", 5, "t1")
+
+    # Within the retry window the indexed query is not re-attempted
+    await search.search(conn, "fpt")
+    assert conn.fetch.await_count == 3 and "ILIKE" in conn.fetch.await_args.args[0]
+
+    # ...and afterwards it is
+    search._index_retry_at = 0
+    conn.fetch.side_effect = [[{**row, "score": 1.0}]]
+    assert (await search.search(conn, "hd-000123"))[0]["score"] == 1.0
+    assert "word_similarity" in conn.fetch.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_is_explicit_and_tenant_scoped():
+    conn = AsyncMock()
+    conn.fetch.return_value = [
+        {**inv, "document_id": None, "total_amount": 100, "currency": None, "filename": None, "tenant_id": tenant}
+        for inv, tenant in zip(INVOICES, ["t1", "t2", "t1"])
+    ]
+
+    search = DocumentSearch(backend="memory")
+    results = await search.search(conn, "cong ty dien luc", doc_type="invoice", limit=5)
+
+    assert results[0]["id"] == "inv-1"
+    assert results[0]["vendor_tax_id"] == "0301234567"
+    assert results[0]["currency"] == "VND"
+    assert results[0]["score"] > 1.0  # exact vendor match plus an OCR word
+    assert all(r["doc_type"] == "invoice" for r in results)
+    assert [r["id"] for r in await search.search(conn, "cong ty", tenant_id="t2")] == []
+    assert {r["id"] for r in await search.search(conn, "cong ty", tenant_id="t1")} == {"inv-1", "inv-3"}
+
+    # Index is cached: no further queries within the TTL
+    assert conn.fetch.await_count == 1
+    assert await search.search(conn, "   ") == []
+
+
+class TenantConn:
+    """Invoices owned by one tenant UUID; the SQL filters on the UUID, not the code."""
+
+    def __init__(self, tenant_uuid):
+        self.tenant_uuid = tenant_uuid
+        self.row = {**INVOICES[0], "document_id": None, "total_amount": 100, "currency": None, "filename": None}
+
+    async def fetchval(self, sql, *args):
+        assert "FROM tenants WHERE code" in sql and args[-1] == "default"
+        return self.tenant_uuid
+
+    async def fetch(self, sql, *args):
+        assert "ei.tenant_id = $5::uuid" in sql
+        return [{**self.row, "score": 1.0}] if args[-1] == self.tenant_uuid else []
+
+
+class TenantPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+@pytest.mark.asyncio
+async def test_search_resolves_tenant_code_to_uuid(monkeypatch):
+    import uuid
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import src.search.service as service
+    from src.api import document_routes
+    from src.copilot import tools
+    from src.datazones import unit_of_work
+
+    conn = TenantConn(uuid.uuid4())
+    monkeypatch.setattr(unit_of_work, "_tenant_ids", {})
+    monkeypatch.setattr(service, "_document_search", DocumentSearch(backend="postgres"))
+
+    async def get_pool():
+        return TenantPool(conn)
+
+    monkeypatch.setattr(document_routes, "get_db_pool", get_pool)
+    monkeypatch.setattr(tools, "get_pool", get_pool)
+
+    app = FastAPI()
+    app.include_router(document_routes.router)
+    response = TestClient(app).get("/documents/search", params={"q": "dien luc"}, headers={"X-Tenant-ID": "default"})
+    assert response.status_code == 200 and [r["id"] for r in response.json()["results"]] == ["inv-1"]
+
+    # The copilot tool gets the tenant code from the chat context
+    assert [r["id"] for r in await tools.search_documents("dien luc", tenant_id="default")] == ["inv-1"]
@@ -0,0 +1,155 @@
+import httpx
+import numpy as np
+import pytest
+
+from data_layer.qdrant_mock import QdrantMock
+from src.rag import QdrantClient
+from src.rag.quantization import (
+    CompressedVectors,
+    CompressionConfig,
+    EmbeddingCodec,
+    load_collection_codecs,
+    parse_compression_spec,
+)
+
+DIM = 64
+
+
+def _data(n=600, queries=20, seed=0):
+    rng = np.random.default_rng(seed)
+    spectrum = 1.0 / np.sqrt(np.arange(1, DIM + 1))
+    centers = rng.standard_normal((20, DIM)) * spectrum
+    x = centers[rng.integers(0, 20, n + queries)] + 0.3 * rng.standard_normal((n + queries, DIM)) * spectrum
+    x = (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+    return x[:n], x[n:]
+
+
+def _recall(store, corpus, queries, k=5):
+    truth = np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+    found = store.search_batch(queries, k)
+    return np.mean([len({int(i) for i, _ in f} & set(t.tolist())) / k for f, t in zip(found, truth)])
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_search_rescored_to_float(quantization):
+    corpus, queries = _data()
+    store = CompressedVectors(EmbeddingCodec(CompressionConfig(quantization, oversampling=10)))
+    store.add([str(i) for i in range(len(corpus))], corpus)
+
+    assert _recall(store, corpus, queries) >= 0.9
+    # Rescored scores are float cosines, and single and batch search agree
+    pid, score = store.search(queries[0], 1)[0]
+    assert score == pytest.approx(float(corpus[int(pid)] @ queries[0]), abs=1e-2)
+    assert store.search(queries[0], 5) == store.search_batch(queries[:6], 5)[0]
+
+    codes_per_vector = store.nbytes["codes"] / len(corpus)
+    assert codes_per_vector == (DIM if quantization == "int8" else DIM // 8)
+    # Rescoring copies live in a disk-backed file, not in RAM
+    assert store.nbytes["rescore"] == len(corpus) * DIM * 4
+    assert all(v.nbytes <= store.nbytes["codes"] for v in vars(store).values() if isinstance(v, np.ndarray))
+
+
+def test_removed_and_replaced_rows():
+    corpus, queries = _data(n=40)
+    store = CompressedVectors(EmbeddingCodec(CompressionConfig("int8")))
+    store.add([str(i) for i in range(40)], corpus)
+
+    top = store.search(queries[0], 1)[0][0]
+    assert store.remove([top, "missing"]) == 1
+    assert top not in [pid for pid, _ in store.search(queries[0], 40)]
+
+    # Re-adding an id replaces its vector; dead rows are compacted away
+    store.add(["0"], queries[:1])
+    assert store.search(queries[0], 1)[0][0] == "0"
+    store.remove([str(i) for i in range(1, 30)])
+    assert len(store) == len(store._ids) == len(store._floats) == len({"0", *map(str, range(30, 40))} - {top})
+    assert store.vector("0") == pytest.approx(queries[0].tolist(), abs=1e-3)
+    assert {pid for pid, _ in store.search(queries[0], 20, allowed={"0", "35"})} == {"0", "35"}
+
+
+def test_pca_codec_fit_save_load(tmp_path):
+    corpus, queries = _data()
+    codec = EmbeddingCodec(CompressionConfig("int8", dims=16, reduction="pca")).fit(corpus)
+    assert codec.reduce(corpus).shape == (len(corpus), 16) and codec.output_dim(DIM) == 16
+
+    codec.save(tmp_path / "kb.npz")
+    loaded = EmbeddingCodec.load(tmp_path / "kb.npz")
+    assert loaded.config == codec.config
+    np.testing.assert_array_equal(loaded.encode(queries), codec.encode(queries))
+
+    with pytest.raises(ValueError):
+        CompressedVectors(EmbeddingCodec(CompressionConfig(dims=16, reduction="pca"))).add(["a"], corpus[:1])
+
+
+def test_parse_spec_and_load_codecs(tmp_path):
+    configs = parse_compression_spec("accounting_kb=int8:256, docs=binary,pca_kb=none:32:pca")
+    assert configs["accounting_kb"] == CompressionConfig("int8", 256)
+    assert configs["docs"] == CompressionConfig("binary")
+    assert configs["pca_kb"].reduction == "pca"
+    with pytest.raises(ValueError):
+        parse_compression_spec("kb=int4")
+
+    # PCA collections need their fitted codec on disk
+    with pytest.raises(ValueError):
+        load_collection_codecs("pca_kb=none:16:pca", str(tmp_path))
+    EmbeddingCodec(CompressionConfig(dims=16, reduction="pca")).fit(_data()[0]).save(tmp_path / "pca_kb.npz")
+    codecs = load_collection_codecs("pca_kb=int8:16:pca", str(tmp_path))
+    assert codecs["pca_kb"].components.shape == (16, DIM)
+    assert codecs["pca_kb"].config.quantization == "int8"
+
+
+def test_mock_compressed_collection():
+    corpus, queries = _data(n=300)
+    store = QdrantMock()
+    store.create_collection("kb", vector_size=DIM)
+    store.upsert_points(
+        "kb", [{"id": str(i), "vector": v.tolist(), "payload": {"half": i % 2}} for i, v in enumerate(corpus)]
+    )
+    plain = store.memory_usage("kb")["vectors"]
+    expected = [r.id for r in store.search("kb", queries[0].tolist(), limit=3)]
+
+    assert store.compress_collection("kb", CompressionConfig("int8", dims=32))
+    usage = store.memory_usage("kb")
+    assert plain / usage["codes"] > 40 and usage["rescore"] == 300 * 32 * 4
+
+    hits = store.search("kb", queries[0].tolist(), limit=3)
+    assert [h.id for h in hits][:1] == expected[:1] and hits[0].payload["half"] == int(hits[0].id) % 2
+    assert all(int(h.id) % 2 == 1 for h in store.search("kb", queries[0].tolist(), limit=5, filter_payload={"half": 1}))
+    assert len(store.get("kb", "7").vector) == 32
+
+    assert store.delete_points("kb", [expected[0]]) == 1
+    assert expected[0] not in [h.id for h in store.search("kb", queries[0].tolist(), limit=3)]
+
+    store.create_collection("bin", compression=CompressionConfig("binary"))
+    store.upsert("bin", "a", corpus[0].tolist(), {})
+    assert store.search("bin", corpus[0].tolist(), limit=1)[0].id == "a"
+
+
+class RecordingHTTP:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url):
+        return httpx.Response(404, request=httpx.Request("GET", url))
+
+    def put(self, url, json=None, params=None):
+        self.requests.append((url, json))
+        return httpx.Response(200, request=httpx.Request("PUT", url))
+
+
+def test_real_client_reduces_and_configures_quantization():
+    codec = EmbeddingCodec(CompressionConfig("binary", dims=8))
+    client = QdrantClient(url="http://qdrant", codecs={"kb": codec})
+    client.client = RecordingHTTP()
+
+    assert client.ensure_collection("kb")
+    _, payload = client.client.requests[0]
+    assert payload["vectors"]["size"] == 8 and payload["vectors"]["on_disk"]
+    assert payload["quantization_config"] == {"binary": {"always_ram": True}}
+
+    client.upsert_points("kb", [{"id": "a", "vector": list(range(1, 17)), "payload": {}}])
+    vector = client.client.requests[1][1]["points"][0]["vector"]
+    assert len(vector) == 8 and sum(v * v for v in vector) == pytest.approx(1.0)
+
+    # Uncompressed collections pass vectors through untouched
+    assert client._reduce("other", [[3.0, 4.0]]) == [[3.0, 4.0]]
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+
+from src.observability.evaluation import (
+    CaseOutcome,
+    CassetteMiss,
+    EvalReport,
+    EvalRunner,
+    LatencyHistogram,
+    ReplayLLM,
+    compare_to_baseline,
+    load_report,
+)
+from src.observability.metrics import add_evaluation_cases
+
+
+class SlowLLM:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate_json(self, prompt, system="", schema=None, temperature=0.3, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"echo": prompt, "request_id": kwargs.get("request_id")}
+
+
+def _cases(n):
+    return [{"name": f"case_{i}", "input": {"text": f"doc {i % 3}"}, "expected": {"echo": f"doc {i % 3}"}} for i in range(n)]
+
+
+def _evaluate(llm):
+    async def evaluate(case, timer):
+        if case["name"] == "case_4":
+            raise RuntimeError("boom")
+        with timer.stage("llm"):
+            response = await llm.generate_json(case["input"]["text"], request_id=case["name"])
+        with timer.stage("score"):
+            ok = response["echo"] == case["expected"]["echo"]
+        return CaseOutcome(result="pass" if ok else "fail", actual_output=response)
+
+    return evaluate
+
+
+def test_histogram_percentiles_and_buckets():
+    stats = LatencyHistogram([float(v) for v in range(1, 101)]).summary()
+    assert stats["count"] == 100 and stats["avg_ms"] == 50.5
+    assert stats["p50_ms"] == pytest.approx(50.5)
+    assert stats["p95_ms"] == pytest.approx(95.05)
+    assert stats["p99_ms"] == pytest.approx(99.01)
+    assert stats["buckets"]["le_50"] == 50 and stats["buckets"]["le_100"] == 100 and stats["buckets"]["le_inf"] == 100
+    assert LatencyHistogram().summary() == {"count": 0}
+
+
+def test_runner_is_concurrent_ordered_and_times_stages():
+    llm = SlowLLM(delay=0.05)
+    start = time.perf_counter()
+    report = asyncio.run(EvalRunner(concurrency=10).run("accuracy", _cases(20), _evaluate(llm)))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 20 * 0.05 / 3
+    assert [c.name for c in report.cases] == [f"case_{i}" for i in range(20)]
+    assert report.cases[4].result == "error" and "boom" in report.cases[4].error_message
+
+    summary = report.summary()
+    assert (summary["passed_cases"], summary["error_cases"]) == (19, 1)
+    assert summary["stages"]["llm"]["count"] == 19
+    assert summary["stages"]["llm"]["p50_ms"] >= 45
+    assert summary["stages"]["score"]["p99_ms"] < summary["stages"]["llm"]["p50_ms"]
+
+
+def test_record_then_replay_is_deterministic_and_offline(tmp_path):
+    cassette = tmp_path / "cassette.json"
+    live = SlowLLM()
+    recorder = ReplayLLM(live, cassette, mode="record")
+    recorded = asyncio.run(EvalRunner(concurrency=4, llm_mode="record").run("accuracy", _cases(6), _evaluate(recorder)))
+    recorder.save()
+    assert live.calls == 5 and len(recorder.entries) == 3  # keyed by prompt, not request_id
+
+    replayer = ReplayLLM(path=cassette, mode="replay")
+    replayer._client = object()  # any network call would fail
+    replayed = asyncio.run(EvalRunner(concurrency=4, llm_mode="replay").run("accuracy", _cases(6), _evaluate(replayer)))
+    assert [c.result for c in replayed.cases] == [c.result for c in recorded.cases]
+    assert replayed.summary()["stages"]["llm"]["p95_ms"] < 5
+
+    with pytest.raises(CassetteMiss):
+        asyncio.run(replayer.generate_json("never recorded"))
+
+
+def test_baseline_comparison_flags_regressions(tmp_path):
+    def report(llm_ms, results):
+        cases = _cases(len(results))
+        outcomes = iter(results)
+
+        async def evaluate(case, timer):
+            timer.stages["llm"] = llm_ms
+            return CaseOutcome(result=next(outcomes))
+
+        return asyncio.run(EvalRunner(llm_mode="replay").run("accuracy", cases, evaluate))
+
+    baseline = report(100.0, ["pass"] * 4)
+    baseline.save(tmp_path / "accuracy_replay.json")
+    stored = load_report(tmp_path / "accuracy_replay.json")
+
+    assert compare_to_baseline(report(110.0, ["pass"] * 4).to_dict(), stored) == []
+    regressions = compare_to_baseline(report(200.0, ["pass", "pass", "fail", "error"]).to_dict(), stored)
+    assert any(r.startswith("accuracy") for r in regressions)
+    assert any(r.startswith("errors") for r in regressions)
+    assert "stage llm p95 100.0ms -> 200.0ms" in regressions
+
+    live = EvalReport("accuracy", [], 0.0, 1, llm_mode="live").to_dict()
+    with pytest.raises(ValueError):
+        compare_to_baseline(live, stored)
+
+
+def test_cases_are_stored_in_one_round_trip():
+    class Conn:
+        def __init__(self):
+            self.calls = []
+
+        async def executemany(self, sql, rows):
+            self.calls.append(rows)
+
+    conn = Conn()
+    cases = [
+        {
+            "case_name": f"c{i}",
+            "input_data": {},
+            "expected_output": {"a": 1},
+            "actual_output": {"a": i},
+            "result": "pass" if i == 1 else "fail",
+            "latency_ms": 1.0,
+            "case_number": i,
+        }
+        for i in range(3)
+    ]
+    assert asyncio.run(add_evaluation_cases(conn, "00000000-0000-0000-0000-000000000001", cases)) == 3
+    assert len(conn.calls) == 1 and len(conn.calls[0]) == 3
+    # diff is only stored for mismatching outputs
+    assert conn.calls[0][1][-1] is None and conn.calls[0][0][-1] is not None
+
+
+def test_committed_cassette_covers_builtin_cases():
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parent.parent
+    for eval_type in ("accuracy", "latency"):
+        run = subprocess.run(
+            [sys.executable, "scripts/run_eval.py", "--type", eval_type, "--llm-mode", "replay", "--no-db"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+        assert run.returncode == 0, run.stderr[-2000:]
+        assert "Errors: 0" in run.stderr and "No regressions" in run.stderr
+
+    missing = subprocess.run(
+        [sys.executable, "scripts/run_eval.py", "--llm-mode", "replay", "--no-db", "--cassette", "missing.json"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+    assert missing.returncode == 1
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.forecast import BatchForecaster, FittedModelCache, LinearForecaster
+from src.analytics.forecast.models import ARIMAForecaster
+
+
+def make_series(n=60, slope=2.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "ds": pd.date_range("2026-01-01", periods=n, freq="D"),
+        "y": 100 + slope * np.arange(n) + rng.normal(0, 1, n),
+    })
+
+
+def test_batch_matches_single_fit_and_caches():
+    series = {f"vendor-{i}": make_series(seed=i, slope=i + 1) for i in range(3)}
+    batch = BatchForecaster("linear", executor="serial", cache=FittedModelCache(max_size=10))
+
+    first = batch.forecast_many(series, periods=7)
+    assert [r.fit_mode for r in first.values()] == ["full"] * 3
+
+    single = LinearForecaster().fit_predict(series["vendor-1"], "ds", "y", 7)
+    np.testing.assert_allclose(first["vendor-1"].result.forecast["yhat"].values, single.forecast["yhat"].values)
+
+    second = batch.forecast_many(series, periods=7)
+    assert [r.fit_mode for r in second.values()] == ["cached"] * 3
+    assert batch.cache.hits == 3
+
+
+def test_appended_points_refit_incrementally():
+    full = make_series(n=80)
+    batch = BatchForecaster("arima", params={"order": (1, 1, 1)}, executor="serial", cache=FittedModelCache())
+
+    batch.forecast_many({"acct-111": full.iloc[:70]}, periods=5)
+    grown = batch.forecast_many({"acct-111": full}, periods=5)["acct-111"]
+    assert grown.success and grown.fit_mode == "incremental"
+    assert grown.result.forecast["ds"].iloc[0] == full["ds"].iloc[-1] + pd.Timedelta(days=1)
+
+    # Rewriting history (not just appending) forces a full fit
+    changed = full.copy()
+    changed.loc[0, "y"] += 50
+    assert batch.forecast_many({"acct-111": changed}, periods=5)["acct-111"].fit_mode == "full"
+
+
+def test_cv_folds_fanned_out_and_errors_isolated():
+    series = {"ok": make_series(n=120), "bad": pd.DataFrame({"ds": [], "y": []})}
+    with BatchForecaster("linear", executor="thread", max_workers=4, cache=FittedModelCache()) as batch:
+        results = batch.forecast_many(
+            series, periods=10, cross_validate=True, cv_kwargs={"horizon": 10, "initial": 60, "period": 10}
+        )
+
+    assert results["ok"].cv["folds"] == 5
+    assert "cv_mae" in results["ok"].cv["metrics"]
+    assert not results["bad"].success
+
+
+def test_cross_validate_executor_matches_serial():
+    df = make_series(n=120)
+    kwargs = {"horizon": 10, "initial": 60, "period": 10}
+    serial = LinearForecaster().cross_validate(df, "ds", "y", **kwargs)
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(2) as pool:
+        parallel = LinearForecaster().cross_validate(df, "ds", "y", executor=pool, **kwargs)
+    assert serial == parallel
@@ -0,0 +1,188 @@
+import math
+import os
+import time
+from dataclasses import replace
+
+import pytest
+
+from data_layer.qdrant_mock import QdrantMock
+from src.rag import SearchResult
+from src.rag.hybrid import (
+    BM25Index,
+    CrossEncoderReranker,
+    HybridRetriever,
+    LexicalIndexSink,
+    get_lexical_index,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from src.rag.ingest import KBIngester
+
+DOCS = {
+    "a": {"text": "TK 1331 - Thuế GTGT được khấu trừ của hàng hóa, dịch vụ", "category": "thong_tu"},
+    "b": {"text": "TK 3331 - Thuế GTGT phải nộp đầu ra", "category": "thong_tu"},
+    "c": {"text": "Quy trình phê duyệt hóa đơn mua hàng", "category": "sop"},
+}
+
+
+def _index():
+    index = BM25Index()
+    for doc_id, payload in DOCS.items():
+        index.add(doc_id, payload)
+    return index
+
+
+class FakeDense:
+    """Semantic-ish neighbours that rank the wrong account first."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def search_vectors_batch(self, vectors, limit, score_threshold, filter_dict, collection_name):
+        self.calls += 1
+        order = [d for d in ("b", "a", "c") if not filter_dict or DOCS[d]["category"] == filter_dict["category"]]
+        hits = [SearchResult(d, 0.9 - 0.1 * i, DOCS[d]["text"], {}, "kb") for i, d in enumerate(order)]
+        return [hits[:limit] for _ in vectors]
+
+
+def test_tokenize_folds_accents_and_splits_codes():
+    assert tokenize("Thông tư 200/2014/TT-BTC, TK1331") == ["thong", "tu", "200", "2014", "tt", "btc", "tk", "1331"]
+    assert tokenize("Đối chiếu") == tokenize("doi chieu")
+
+
+def test_bm25_exact_code_and_persistence(tmp_path):
+    index = _index()
+    assert index.search("tk 1331")[0][0] == "a"
+    assert [d for d, _ in index.search("hoa don", filter_dict={"category": "sop"})] == ["c"]
+
+    index.save(tmp_path / "kb.json")
+    loaded = BM25Index.load(tmp_path / "kb.json")
+    assert loaded.search("TK1331") == index.search("TK1331")
+
+    assert loaded.remove("a") and loaded.search("1331") == []
+
+
+def test_rrf_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "z"]], k=60)
+    assert [d for d, _ in fused] == ["y", "z", "x"]
+
+
+def test_hybrid_fixes_dense_miss_and_batches():
+    dense = FakeDense()
+    embeds = []
+    retriever = HybridRetriever(
+        dense=dense,
+        lexical=_index(),
+        embed_batch=lambda texts: embeds.append(list(texts)) or [[0.0]] * len(texts),
+    )
+
+    results = retriever.search_batch(["TK 1331", "quy trình phê duyệt"], limit=2)
+    assert results[0][0].id == "a" and 0 < results[0][0].score <= 1.0
+    assert results[1][0].id == "c"
+    assert dense.calls == 1 and embeds == [["TK 1331", "quy trình phê duyệt"]]
+
+    # Category filter applies to both retrievers
+    assert [r.id for r in retriever.search("hóa đơn", limit=3, filter_dict={"category": "sop"})] == ["c"]
+
+    # Without an embedding model, lexical results still come back
+    lexical_only = HybridRetriever(dense=dense, lexical=_index(), embed_batch=lambda texts: [])
+    assert lexical_only.search("3331", limit=1)[0].id == "b"
+
+
+def test_reranker_respects_latency_budget():
+    calls = []
+
+    def slow_scorer(pairs):
+        calls.append(len(pairs))
+        time.sleep(0.002 * len(pairs))
+        return [1.0 if "1331" in text else 0.0 for _, text in pairs]
+
+    reranker = CrossEncoderReranker(budget_ms=10, max_candidates=3, scorer=slow_scorer)
+    hits = [SearchResult(d, 0.5, DOCS[d]["text"], {}, "kb") for d in ("b", "c", "a")]
+
+    first = reranker.rerank_batch(["1331"], [hits])[0]
+    assert first[0].id == "a" and "rerank_score" in first[0].metadata
+    assert calls == [3]
+
+    # ~2ms per pair measured: a 10ms budget over 3 queries only leaves the probe pairs
+    fused = [replace(hit, score=score) for hit, score in zip(hits, (0.9, 0.6, 0.3))]
+    reranked = reranker.rerank_batch(["q1", "q2", "q3"], [fused, fused, fused])
+    assert calls == [3, 6]
+    # The unreranked tail is put below the reranked head, on the reranker's scale
+    head, tail = reranked[0][:2], reranked[0][2]
+    assert [hit.score for hit in head] == [1 / (1 + math.exp(0))] * 2
+    assert tail.id == "a" and "rerank_score" not in tail.metadata
+    assert tail.score == pytest.approx(head[-1].score * 0.3 / 0.6)
+
+
+def test_reranker_recovers_from_slow_first_call():
+    calls = []
+
+    def scorer(pairs):
+        calls.append(len(pairs))
+        time.sleep(0.2 if len(calls) == 1 else 0.0001 * len(pairs))
+        return [0.0] * len(pairs)
+
+    reranker = CrossEncoderReranker(budget_ms=20, max_candidates=3, scorer=scorer)
+    hits = [SearchResult(d, 0.5, DOCS[d]["text"], {}, "kb") for d in ("b", "c", "a")]
+    for _ in range(10):
+        reranker.rerank_batch(["q"], [hits])
+
+    assert calls[1] == 2  # probe only after the slow call
+    assert calls[-1] == 3 and reranker.pairs_per_query(1) == 3
+
+
+def test_ingestion_keeps_lexical_index_in_step(tmp_path):
+    store = QdrantMock()
+    store.create_collection("kb")
+    index = BM25Index()
+    sink = LexicalIndexSink(store, index_for=lambda c: index, path_for=lambda c: tmp_path / "lexical" / f"{c}.json")
+    ingester = KBIngester(
+        sink,
+        lambda texts: [[1.0]] * len(texts),
+        "m",
+        chunker=lambda t: t.split("\n\n"),
+        manifest_dir=str(tmp_path / "manifests"),
+    )
+
+    ingester.ingest("kb", [{"source": "tt200", "text": "TK 1331 khấu trừ\n\nTK 3331 phải nộp"}])
+    assert len(index) == 2 and BM25Index.load(tmp_path / "lexical" / "kb.json").search("1331")
+
+    ingester.ingest("kb", [{"source": "tt200", "text": "TK 1331 khấu trừ"}])
+    assert len(index) == 1 and index.search("3331") == []
+
+
+def test_shared_index_reloads_on_change_and_retries_empty(tmp_path, monkeypatch):
+    import src.rag.hybrid as hybrid
+
+    class EmptyStore:
+        calls = 0
+
+        def scroll_payloads(self, collection):
+            EmptyStore.calls += 1
+            return iter(())
+
+    monkeypatch.setattr(hybrid, "KB_LEXICAL_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(hybrid, "get_qdrant_client", EmptyStore)
+    monkeypatch.setattr(hybrid, "_indexes", {})
+
+    # An empty collection is not cached: the next call looks again
+    assert len(get_lexical_index("kb")) == 0 and len(get_lexical_index("kb")) == 0
+    assert EmptyStore.calls == 2
+
+    _index().save(tmp_path / "kb.json")
+    first = get_lexical_index("kb")
+    assert len(first) == 3 and get_lexical_index("kb") is first
+
+    # Another worker rewrites the file: the next call picks it up
+    updated = _index()
+    updated.remove("c")
+    updated.save(tmp_path / "kb.json")
+    stat = os.stat(tmp_path / "kb.json")
+    os.utime(tmp_path / "kb.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    retriever = HybridRetriever(dense=FakeDense(), embed_batch=lambda qs: [[0.0]] * len(qs), collection="kb")
+    assert len(retriever.lexical) == 2
+
+    # A corrupt file keeps the last good index instead of caching a broken one
+    (tmp_path / "kb.json").write_text("{")
+    assert len(get_lexical_index("kb")) == 2
@@ -0,0 +1,130 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.job_events import JobEvent, JobEventHub, format_job_event_sse, stream_job_events
+from src.datazones import JOB_EVENTS_CHANNEL, JobState, update_job_state
+
+
+def ev(id, state, job_id="job-1", tenant_id="t1"):
+    return JobEvent(id=id, job_id=job_id, state=state, tenant_id=tenant_id)
+
+
+def history(events):
+    async def fetch(after_id):
+        return [e for e in events if e.id > after_id]
+
+    return fetch
+
+
+def test_hub_fans_out_notifications_by_job_and_tenant():
+    hub = JobEventHub()
+    job_sub, tenant_sub, other = hub.subscribe(job_id="job-1"), hub.subscribe(tenant_id="t1"), hub.subscribe(job_id="x")
+
+    payload = {"id": 7, "job_id": "job-1", "tenant_id": "t1", "state": "extracting", "at": "2026-01-01T00:00:00"}
+    hub._on_notify(None, 1, JOB_EVENTS_CHANNEL, json.dumps(payload))
+    hub._on_notify(None, 1, JOB_EVENTS_CHANNEL, "not json")
+
+    assert job_sub.queue.get_nowait().status == "processing"
+    assert tenant_sub.queue.get_nowait().id == 7
+    assert other.queue.empty()
+
+    for sub in (job_sub, tenant_sub, other):
+        hub.unsubscribe(sub)
+    assert hub.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_job_stream_replays_history_then_goes_live_until_terminal():
+    hub = JobEventHub()
+    stream = stream_job_events(hub, history([ev(1, "uploaded"), ev(2, "extracting")]), job_id="job-1", heartbeat=0.01)
+
+    received = [await anext(stream), await anext(stream)]
+    assert await anext(stream) is None  # heartbeat while idle
+
+    hub.publish(ev(2, "extracting"))  # duplicate of replayed history
+    hub.publish(ev(3, "proposing"))
+    hub.publish(ev(4, "completed"))
+    received += [e async for e in stream]
+
+    assert [e.id for e in received] == [1, 2, 3, 4]
+    assert hub.subscriber_count == 0  # closed after the terminal event
+
+
+@pytest.mark.asyncio
+async def test_tenant_stream_resumes_and_resyncs_after_overflow():
+    hub = JobEventHub(queue_size=2)
+    persisted = [ev(i, "extracting", job_id=f"job-{i}") for i in range(1, 8)]
+    stream = stream_job_events(hub, history(persisted), tenant_id="t1", last_event_id=4, heartbeat=0.01)
+
+    assert [(await anext(stream)).id for _ in range(3)] == [5, 6, 7]  # resumed after Last-Event-ID
+
+    for i in range(8, 13):  # more than the queue holds
+        event = ev(i, "extracting", job_id=f"job-{i}")
+        persisted.append(event)
+        hub.publish(event)
+
+    assert [(await anext(stream)).id for _ in range(5)] == [8, 9, 10, 11, 12]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_tenant_stream_keeps_events_that_commit_out_of_order():
+    hub = JobEventHub(queue_size=3)
+    persisted = [ev(1, "uploaded", job_id="job-1")]
+    stream = stream_job_events(hub, history(persisted), tenant_id="t1", last_event_id=0, heartbeat=0.01)
+    assert (await anext(stream)).id == 1
+
+    # id 3 commits before id 2
+    for i in (3, 2, 3):
+        hub.publish(ev(i, "extracting", job_id=f"job-{i}"))
+    assert [(await anext(stream)).id for _ in range(2)] == [3, 2]
+    assert await anext(stream) is None  # the repeated 3 is dropped
+
+    # 4 commits after a resync has read up to 8, and its notification is
+    # dropped by the next overflow: that resync re-reads below 8 and finds it
+    def overflow(ids):
+        persisted.extend(ev(i, "extracting", job_id=f"job-{i}") for i in ids)
+        persisted.sort(key=lambda e: e.id)
+        for i in ids:
+            hub.publish(ev(i, "extracting", job_id=f"job-{i}"))
+
+    overflow([5, 6, 7, 8])
+    assert [(await anext(stream)).id for _ in range(4)] == [5, 6, 7, 8]
+    overflow([4, 9, 10, 11])
+    assert [(await anext(stream)).id for _ in range(4)] == [4, 9, 10, 11]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_update_job_state_writes_event_and_notifies_in_one_statement():
+    conn = AsyncMock()
+    conn.fetchrow.return_value = {"id": 10, "previous_state": "uploaded"}
+    assert await update_job_state(conn, "job-1", JobState.EXTRACTING) is True
+
+    sql = conn.fetchrow.await_args.args[0]
+    assert "previous_state = current_state" in sql
+    assert "INSERT INTO job_events" in sql and f"pg_notify('{JOB_EVENTS_CHANNEL}'" in sql
+    conn.fetch.assert_not_awaited()
+
+    conn.fetchrow.return_value = None
+    assert await update_job_state(conn, "missing", JobState.FAILED) is False
+
+
+def test_sse_and_websocket_endpoints_stream_job_events():
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    fetch = history([ev(1, "uploaded"), ev(2, "waiting_for_approval"), ev(3, "completed")])
+    with patch("src.api.main._job_event_fetcher", return_value=fetch):
+        client = TestClient(app)
+        response = client.get("/v1/jobs/job-1/events", headers={"Last-Event-ID": "1"})
+        with client.websocket_connect("/v1/job-events/ws?job_id=job-1") as ws:
+            messages = [ws.receive_json() for _ in range(3)]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in response.text.split("\n\n") if f.startswith("id:")]
+    assert frames == [format_job_event_sse(ev(2, "waiting_for_approval")).strip(), format_job_event_sse(ev(3, "completed")).strip()]
+    assert [m["status"] for m in messages] == ["queued", "waiting_for_approval", "completed"]
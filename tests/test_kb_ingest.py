@@ -0,0 +1,134 @@
+import threading
+import time
+
+from data_layer.qdrant_mock import QdrantMock
+from src.rag.ingest import KBIngester, chunk_id
+
+COLLECTION = "kb_test"
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.texts: list[str] = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _paragraphs(text):
+    return text.split("\n\n")
+
+
+def _setup(tmp_path, **kwargs):
+    store = QdrantMock()
+    store.create_collection(COLLECTION)
+    embed = CountingEmbedder()
+    ingester = KBIngester(
+        store, embed, "test-model", chunker=_paragraphs, manifest_dir=str(tmp_path), batch_size=2, **kwargs
+    )
+    return store, embed, ingester
+
+
+def test_rerun_embeds_only_new_chunks_and_never_duplicates(tmp_path):
+    store, embed, ingester = _setup(tmp_path)
+    docs = [
+        {"source": "tt200", "text": "TK 111\n\nTK 112\n\nTK 131", "title": "TT200"},
+        {"source": "vat", "text": "VAT 10%\n\nTK 131", "title": "VAT"},  # "TK 131" shared
+    ]
+
+    stats = ingester.ingest(COLLECTION, docs)
+    assert (stats.chunks, stats.embedded, stats.skipped) == (5, 4, 1)
+    assert store.count(COLLECTION) == 4
+    point = store.get(COLLECTION, chunk_id("TK 112"))
+    assert point.payload["text"] == "TK 112" and point.payload["title"] == "TT200"
+
+    # A fresh ingester (next bootstrap run) over the same corpus embeds nothing
+    _, embed2, ingester2 = _setup(tmp_path)
+    ingester2.sink = store
+    stats = ingester2.ingest(COLLECTION, docs)
+    assert stats.embedded == 0 and embed2.texts == []
+    assert store.count(COLLECTION) == 4
+
+    # Changed document: only its new chunk is embedded, the vanished one is deleted
+    docs[0]["text"] = "TK 111\n\nTK 113\n\nTK 131"
+    stats = ingester2.ingest(COLLECTION, docs)
+    assert embed2.texts == ["TK 113"] and stats.deleted == 1
+    assert store.get(COLLECTION, chunk_id("TK 112")) is None
+    assert store.count(COLLECTION) == 4
+
+    # Model change invalidates the manifest
+    _, embed3, ingester3 = _setup(tmp_path)
+    ingester3.sink, ingester3.model = store, "other-model"
+    assert ingester3.ingest(COLLECTION, docs).embedded == 4
+
+
+def test_failed_upsert_is_retried_next_run(tmp_path):
+    store, embed, ingester = _setup(tmp_path)
+
+    class FlakySink:
+        fail = True
+
+        def upsert_points(self, collection, points):
+            if self.fail:
+                raise ConnectionError("qdrant down")
+            store.upsert_points(collection, points)
+
+        def delete_points(self, collection, ids):
+            store.delete_points(collection, ids)
+
+    ingester.sink = FlakySink()
+    docs = [{"source": "sop", "text": "Step 1\n\nStep 2"}]
+    assert ingester.ingest(COLLECTION, docs).failed == 2
+
+    ingester.sink.fail = False
+    stats = ingester.ingest(COLLECTION, docs)
+    assert stats.embedded == 2 and store.count(COLLECTION) == 2
+
+
+def test_upserts_overlap_with_embedding(tmp_path):
+    store, embed, ingester = _setup(tmp_path, upsert_concurrency=4)
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class SlowSink:
+        def upsert_points(self, collection, points):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            store.upsert_points(collection, points)
+            with lock:
+                state["active"] -= 1
+
+        def delete_points(self, collection, ids):
+            store.delete_points(collection, ids)
+
+    ingester.sink = SlowSink()
+    docs = [{"source": f"doc{i}", "text": f"a{i}\n\nb{i}"} for i in range(8)]
+    start = time.perf_counter()
+    stats = ingester.ingest(COLLECTION, docs)
+    elapsed = time.perf_counter() - start
+
+    assert stats.embedded == 16 and store.count(COLLECTION) == 16
+    assert state["peak"] > 1
+    assert elapsed < 8 * 0.05
+
+
+def test_manifest_reset_when_collection_was_wiped(tmp_path):
+    store, embed, ingester = _setup(tmp_path)
+    docs = [{"source": "tt200", "text": "TK 111\n\nTK 112"}, {"source": "vat", "text": "VAT 10%"}]
+    assert ingester.ingest(COLLECTION, docs).embedded == 3
+
+    # Collection recreated (e.g. Qdrant volume lost); the manifest still lists every chunk
+    store.delete_collection(COLLECTION)
+    store.create_collection(COLLECTION)
+    embed.texts.clear()
+    stats = ingester.ingest(COLLECTION, docs)
+    assert stats.embedded == 3 and stats.skipped == 0
+    assert sorted(embed.texts) == ["TK 111", "TK 112", "VAT 10%"]
+    assert store.count(COLLECTION) == 3
+
+    # Extra points from elsewhere do not invalidate the manifest
+    store.upsert(COLLECTION, "other", [1.0, 1.0], {})
+    assert ingester.ingest(COLLECTION, docs).embedded == 0
@@ -0,0 +1,129 @@
+import re
+
+import pytest
+
+from src.llm.batching import BatchDocument, LLMBatcher, estimate_tokens, plan_packs
+from src.workflows.pipeline_stages import generate_proposals_batched
+
+PROPOSAL = {
+    "doc_type": "purchase_invoice",
+    "total_amount": 110,
+    "vat_amount": 10,
+    "entries": [
+        {"account_code": "156", "debit": 100, "credit": 0},
+        {"account_code": "1331", "debit": 10, "credit": 0},
+        {"account_code": "331", "debit": 0, "credit": 110},
+    ],
+    "confidence": 0.9,
+}
+
+
+class FakeClient:
+    """Answers packs keyed by document id; ``missing``/``invalid`` ids are dropped or garbled in packs."""
+
+    def __init__(self, missing=(), invalid=(), fail_packs=False):
+        self.missing = set(missing)
+        self.invalid = set(invalid)
+        self.fail_packs = fail_packs
+        self.prompts: list[str] = []
+
+    async def generate_json(self, prompt, system="", temperature=0.3, max_tokens=2048, request_id="", **kw):
+        self.prompts.append(prompt)
+        ids = re.findall(r'<document id="([^"]+)">', prompt)
+        if not ids:
+            return {"doc": prompt.split("---")[1].strip(), **PROPOSAL}
+        if self.fail_packs:
+            raise ValueError("LLM response is not valid JSON")
+        results = {}
+        for doc_id in ids:
+            if doc_id in self.missing:
+                continue
+            results[doc_id] = {"oops": True} if doc_id in self.invalid else {"doc": doc_id, **PROPOSAL}
+        return {"results": results}
+
+
+def docs(n, size=200):
+    return [BatchDocument(f"INV-{i}", f"HOA DON {i} " + "x" * size) for i in range(n)]
+
+
+def test_plan_packs_respects_token_budgets():
+    small = docs(10)
+    packs = plan_packs(small, max_docs=4, max_input_tokens=10_000, max_output_tokens=8000, output_tokens_per_doc=500)
+    assert [len(p) for p in packs] == [4, 4, 2]
+
+    # output budget caps the pack below max_docs
+    packs = plan_packs(small, max_docs=8, max_input_tokens=10_000, max_output_tokens=1500, output_tokens_per_doc=500)
+    assert [len(p) for p in packs] == [3, 3, 3, 1]
+
+    # input budget: a large document ends up alone
+    mixed = docs(2) + [BatchDocument("BIG", "y" * 9000)] + docs(2)[:1]
+    tokens = estimate_tokens(mixed[0].text)
+    packs = plan_packs(
+        mixed, max_docs=8, max_input_tokens=tokens * 2 + 10, max_output_tokens=8000, output_tokens_per_doc=500
+    )
+    assert [[d.doc_id for d in p] for p in packs] == [["INV-0", "INV-1"], ["BIG"], ["INV-0"]]
+
+
+@pytest.mark.asyncio
+async def test_members_demultiplexed_and_only_failures_retried():
+    client = FakeClient(missing={"INV-2"}, invalid={"INV-5"})
+
+    def validate(data):
+        if "entries" not in data:
+            raise ValueError("no entries")
+        return data
+
+    batcher = LLMBatcher(system="sys", validate=validate, client=client, max_docs=4, concurrency=2)
+    results = await batcher.run(docs(8), request_id="t")
+
+    assert [r.doc_id for r in results] == [f"INV-{i}" for i in range(8)]
+    assert all(r.ok for r in results)
+    assert results[0].data["doc"] == "INV-0" and results[0].batched
+    assert not results[2].batched and results[2].attempts == 2
+    assert not results[5].batched and "HOA DON 5" in results[5].data["doc"]
+    assert batcher.requests == 2 + 2  # two packs, two individual retries
+    assert batcher.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_pack_falls_back_to_single_requests():
+    client = FakeClient(fail_packs=True)
+    batcher = LLMBatcher(system="sys", client=client, max_docs=3)
+
+    results = await batcher.run(docs(3))
+
+    assert all(r.ok and not r.batched for r in results)
+    assert batcher.requests == 1 + 3
+
+    with pytest.raises(ValueError, match="repeated: A"):
+        await batcher.run([BatchDocument("A", "x"), BatchDocument("A", "y")])
+
+
+def test_batch_endpoint_rejects_duplicate_doc_ids():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.routes import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/v1")
+    documents = [{"doc_id": "A", "ocr_text": "x"}, {"doc_id": "B", "ocr_text": "y"}, {"doc_id": "A", "ocr_text": "z"}]
+
+    response = TestClient(app).post("/v1/accounting/batch?llm_batch=true", json=documents)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Duplicate doc_id in batch: A"
+
+
+@pytest.mark.asyncio
+async def test_batched_proposals_validated_per_document():
+    client = FakeClient(invalid={"INV-1"})
+
+    results = await generate_proposals_batched(
+        [(d.doc_id, d.text) for d in docs(3)], request_id="t", client=client
+    )
+
+    assert [r.ok for r in results] == [True, True, True]
+    assert [r.batched for r in results] == [True, False, True]
+    assert results[0].data["doc_type"] == "purchase_invoice"
+    assert len(results[0].data["entries"]) == 3
+    assert len(client.prompts) == 2  # one pack + one retry for the entry-less result
@@ -0,0 +1,171 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.llm.client import LLMClient, LLMConfig, LLMInferenceError
+from src.llm.streaming import (
+    JsonObjectDetector,
+    StreamChunk,
+    format_sse,
+    iter_sse_data,
+    parse_stream_chunk,
+    partial_string_field,
+)
+
+
+def sse_body(*payloads) -> bytes:
+    lines = [": keep-alive\n\n"]
+    for payload in payloads:
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        lines.append(f"data: {data}\n\n")
+    return "".join(lines).encode()
+
+
+def delta(content="", reasoning="", finish=None):
+    d = {}
+    if content:
+        d["content"] = content
+    if reasoning:
+        d["reasoning_content"] = reasoning
+    return {"choices": [{"delta": d, "finish_reason": finish}]}
+
+
+async def alines(*lines):
+    for line in lines:
+        yield line
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_joins_multiline_events_and_skips_comments():
+    lines = alines(": ping", "data: a", "data: b", "", "event: x", "data:c", "", "data: tail")
+    assert [d async for d in iter_sse_data(lines)] == ["a\nb", "c", "tail"]
+
+    chunk = parse_stream_chunk(delta("Xin", "think", "stop"))
+    assert (chunk.content, chunk.reasoning, chunk.finish_reason) == ("Xin", "think", "stop")
+    assert parse_stream_chunk({"choices": [], "usage": {"completion_tokens": 3}}).usage == {"completion_tokens": 3}
+
+
+def test_json_object_detector_handles_split_chunks_and_braces_in_strings():
+    text = 'Ok {"thought": "a } b \\" {", "tool": "search_documents", "params": {"query": "x"}} trailing'
+    detector = JsonObjectDetector()
+    found = [detector.feed(text[i : i + 3]) for i in range(0, len(text), 3)]
+    objects = [f for f in found if f is not None]
+    assert len(objects) == 1
+    assert json.loads(objects[0])["params"] == {"query": "x"}
+    assert detector.complete and detector.buffer == text
+
+
+def test_partial_string_field_decodes_complete_prefix_only():
+    assert partial_string_field('{"thought": "x", "resp', "response") == ""
+    assert partial_string_field('{"response": "Xin ch\\u00e0o\\nb', "response") == "Xin chào\nb"
+    assert partial_string_field('{"response": "ab\\', "response") == "ab"
+    assert partial_string_field('{"response": "ab\\u00', "response") == "ab"
+    assert partial_string_field('{"response": "\\ud83d\\ude00 ok"}', "response") == "\U0001F600 ok"
+    assert format_sse("delta", {"text": "đ"}) == 'event: delta\ndata: {"text": "đ"}\n\n'
+
+
+def make_client(handler):
+    client = LLMClient(LLMConfig(url="http://llm.test", api_key="key"))
+    transport = httpx.MockTransport(handler)
+    real = httpx.AsyncClient
+    patcher = patch("src.llm.client.httpx.AsyncClient", lambda **kw: real(transport=transport, **kw))
+    return client, patcher
+
+
+@pytest.mark.asyncio
+async def test_llm_client_stream_yields_chunks_incrementally():
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(json.loads(request.content))
+        body = sse_body(
+            delta(reasoning="thinking"),
+            delta("Xin "),
+            "not-json",
+            delta("chào", finish="stop"),
+            {"choices": [], "usage": {"completion_tokens": 2}},
+            "[DONE]",
+            delta("ignored"),
+        )
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+    client, patcher = make_client(handler)
+    with patcher:
+        chunks = [c async for c in client.stream("hi", system="sys")]
+
+    assert requests[0]["stream"] is True
+    assert "".join(c.content for c in chunks) == "Xin chào"
+    assert chunks[0].reasoning == "thinking"
+    assert chunks[-1].usage == {"completion_tokens": 2}
+
+
+@pytest.mark.asyncio
+async def test_llm_client_stream_maps_http_errors():
+    client, patcher = make_client(lambda request: httpx.Response(503, text="overloaded"))
+    with patcher, pytest.raises(LLMInferenceError, match="503"):
+        async for _ in client.stream("hi"):
+            pass
+    assert client._consecutive_failures == 1
+
+
+class FakeLLM:
+    def __init__(self, *generations):
+        self.generations = list(generations)
+        self.consumed = []
+
+    async def stream(self, prompt, **kwargs):
+        pieces = self.generations.pop(0)
+        for piece in pieces:
+            self.consumed.append(piece)
+            yield StreamChunk(content=piece)
+
+
+@pytest.mark.asyncio
+async def test_analytics_chat_stream_runs_tool_before_generation_finishes():
+    from src.analytics.assistant.agent import AnalyticsAgent
+    from src.analytics.assistant.memory import ConversationMemory
+
+    llm = FakeLLM(
+        ["Để tôi xem. ", "``", '`tool\n{"name": "list_datasets", ', '"params": {}}', "\n```", "NEVER READ"],
+        ["Có ", "2 datasets."],
+    )
+    agent = AnalyticsAgent(memory=ConversationMemory())
+    agent._llm_client = llm
+    agent._tool_executor = AsyncMock()
+    agent._tool_executor.execute.return_value = {"success": True, "datasets": [{"name": "a"}, {"name": "b"}]}
+
+    events = [e async for e in agent.chat_stream("có bao nhiêu dataset?")]
+    names = [name for name, _ in events]
+
+    assert "NEVER READ" not in llm.consumed
+    assert names.index("tool_call") < names.index("tool_result") < names.index("done")
+    text = "".join(d["text"] for name, d in events if name == "delta")
+    assert text == "Để tôi xem. Có 2 datasets."
+    done = events[-1][1]
+    assert done["message"] == "Có 2 datasets."
+    assert done["tool_calls"] == [{"name": "list_datasets", "params": {}}]
+
+
+def test_copilot_chat_stream_endpoint_emits_deltas_tool_and_final():
+    from fastapi.testclient import TestClient
+
+    from src.api.main import ChatResponse, app
+
+    llm = FakeLLM(['{"thought": "tìm", "tool": "search_documents", "params": {"query": "abc"}, ', '"response": "Đang tìm"}', "junk"])
+    execute = AsyncMock(return_value=ChatResponse(response="**Kết quả tìm kiếm:**"))
+
+    with patch("src.llm.client.LLMClient", return_value=llm), patch("src.api.main._execute_copilot_decision", execute):
+        response = TestClient(app).post("/v1/copilot/chat/stream", json={"message": "tìm abc"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0][len("event: ") :], json.loads(block.split("\n")[1][len("data: ") :]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert events[0] == ("delta", {"text": "Đang tìm"})
+    assert events[1] == ("tool", {"tool": "search_documents", "params": {"query": "abc"}})
+    assert events[2][0] == "final" and events[2][1]["response"] == "**Kết quả tìm kiếm:**"
+    assert "junk" not in llm.consumed
+    assert execute.await_args.args[0]["tool"] == "search_documents"
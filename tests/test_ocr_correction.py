@@ -0,0 +1,98 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.processing.ocr_correction import build_span_prompt, correct_line_with_rules, correct_ocr_boxes
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("HOA DON GIA TRI GIA TANG", "HÓA ĐƠN GIÁ TRỊ GIA TĂNG"),
+        ("Ma so thue. 0101234567", "Mã số thuế: 0101234567"),
+        ("Ngay. 04/O3/2010", "Ngày: 04/03/2010"),
+        ("So 001", "Số: 001"),
+        ("TOIAL: 1.2OO.000", "TOTAL: 1.200.000"),
+        ("lnvoice No. 12", "Invoice No. 12"),
+        ("Ngay 04 thang 03 nam 2010", "Ngày 04 tháng 03 năm 2010"),
+        # Already correct / not a label: untouched
+        ("Hóa Đơn", "Hóa Đơn"),
+        ("Công ty Điện lực Miền Nam", "Công ty Điện lực Miền Nam"),
+        ("Solo 12", "Solo 12"),
+    ],
+)
+def test_rule_corrections(raw, expected):
+    assert correct_line_with_rules(raw)[0] == expected
+
+
+def box(text, confidence):
+    return {"bbox": [0, 0, 10, 10], "text": text, "confidence": confidence, "lang": "vi"}
+
+
+BOXES = [
+    box("CONG TY TNHH ABC", 0.99),
+    box("Ma so thue: 0101234567", 0.97),
+    box("Dja chl: 12 Ly Thuong Kiet", 0.62),
+    box("Tong cong: 1.100.000", 0.95),
+    box("1.10O.000", 0.40),
+    box("So tien viet bang chu: Mot trieu mot tram nghin dong", 0.71),
+]
+
+
+def test_span_prompt_marks_spans_and_includes_context_only():
+    lines = [b["text"] for b in BOXES]
+    prompt = build_span_prompt(lines, [2, 5], context_lines=1)
+    assert "[2] Dja chl" in prompt and "[5] So tien" in prompt
+    assert "    Ma so thue" in prompt and "    1.10O.000" in prompt
+    assert "CONG TY" not in prompt  # beyond the context window
+
+
+@pytest.mark.asyncio
+async def test_clean_scan_never_calls_llm():
+    client = AsyncMock()
+    clean = [box("HOA DON GIA TRI GIA TANG", 0.98), box("Ngay. 04/O3/2010", 0.96)]
+    result = await correct_ocr_boxes(clean, client=client)
+
+    client.generate_json.assert_not_awaited()
+    assert result.llm_calls == 0
+    assert result.text == "HÓA ĐƠN GIÁ TRỊ GIA TĂNG\nNgày: 04/03/2010"
+    assert result.boxes[1]["text_corrected"] == "Ngày: 04/03/2010"
+    assert result.boxes[1]["correction"] == "rules"
+    assert result.boxes[1]["text"] == "Ngay. 04/O3/2010"
+
+
+@pytest.mark.asyncio
+async def test_only_low_confidence_word_spans_go_to_llm_and_map_back():
+    client = AsyncMock()
+    client.generate_json.return_value = {
+        "2": "Địa chỉ: 12 Lý Thường Kiệt",
+        "5": "Số tiền viết bằng chữ: Một triệu một trăm nghìn đồng 9",  # digit added -> rejected
+        "0": "ignored, not requested",
+    }
+
+    result = await correct_ocr_boxes(BOXES, client=client, confidence_threshold=0.85)
+
+    assert client.generate_json.await_count == 1
+    prompt = client.generate_json.await_args.kwargs["prompt"]
+    assert "[2]" in prompt and "[5]" in prompt and "[4]" not in prompt  # numbers-only box stays local
+    assert "CONG TY" not in prompt  # outside every span's context window
+
+    assert result.llm_spans == 2 and result.llm_rejected == 1
+    assert result.boxes[2]["text_corrected"] == "Địa chỉ: 12 Lý Thường Kiệt"
+    assert result.boxes[2]["correction"] == "llm"
+    assert result.boxes[4]["text_corrected"] == "1.100.000"
+    assert result.boxes[5]["correction"] == "rules"  # lexicon fix kept, LLM fix rejected
+    assert result.text.split("\n")[0] == "CONG TY TNHH ABC"
+
+
+@pytest.mark.asyncio
+async def test_spans_are_batched_and_llm_failures_keep_rule_output():
+    client = AsyncMock()
+    client.generate_json.side_effect = RuntimeError("LLM down")
+    boxes = [box(f"Dong so {i} bi loi", 0.3) for i in range(5)]
+
+    result = await correct_ocr_boxes(boxes, client=client, max_spans_per_call=2)
+
+    assert client.generate_json.await_count == 3
+    assert result.llm_calls == 3
+    assert result.text.split("\n") == [b["text"] for b in boxes]
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.pagination import CountCache, decode_cursor, encode_cursor, keyset_condition, paginate
+
+T0 = datetime(2026, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    cursor = encode_cursor(T0, "9b2f1c1e-0000-4000-8000-000000000001")
+    assert decode_cursor(cursor) == (T0, "9b2f1c1e-0000-4000-8000-000000000001")
+    assert decode_cursor(encode_cursor(T0.isoformat(), "x")) == (T0, "x")
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_condition_and_paginate():
+    assert keyset_condition(None, "d.created_at", "d.id", 3) == (None, [])
+    condition, params = keyset_condition(encode_cursor(T0, "abc"), "d.created_at", "d.id", 3)
+    assert condition == "(d.created_at, d.id) < ($3::timestamptz, $4::uuid)"
+    assert params == [T0, "abc"]
+
+    rows = [{"id": i, "created_at": T0} for i in range(4)]
+    page, next_cursor = paginate(rows, 3)
+    assert [r["id"] for r in page] == [0, 1, 2]
+    assert decode_cursor(next_cursor) == (T0, "2")
+    assert paginate(rows, 4) == (rows, None)
+
+
+@pytest.mark.asyncio
+async def test_count_cache_estimates_large_tables_and_caches_filtered_counts():
+    cache = CountCache(ttl=60, exact_threshold=1000)
+    conn = AsyncMock()
+
+    conn.fetchval.return_value = 500_000
+    assert await cache.count(conn, "documents") == (500_000, True)
+    assert "reltuples" in conn.fetchval.await_args.args[0]
+
+    conn.fetchval.reset_mock()
+    conn.fetchval.return_value = 42
+    assert await cache.count(conn, "documents", "WHERE d.status = $1", ["new"], alias="d") == (42, False)
+    assert await cache.count(conn, "documents", "WHERE d.status = $1", ["new"], alias="d") == (42, False)
+    conn.fetchval.assert_awaited_once()
+    assert conn.fetchval.await_args.args == ("SELECT COUNT(*) FROM documents d WHERE d.status = $1", "new")
+
+
+@pytest.mark.asyncio
+async def test_list_documents_uses_slim_keyset_query():
+    from src.api import document_routes
+
+    conn = AsyncMock()
+    conn.fetch.return_value = [
+        {"id": f"id-{i}", "filename": f"f{i}.pdf", "status": "new", "created_at": T0, "x_total_amount": "1000"}
+        for i in range(3)
+    ]
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+
+    with patch.object(document_routes, "get_db_pool", AsyncMock(return_value=pool)), \
+         patch.object(document_routes, "count_cache", CountCache(exact_threshold=10**9)):
+        conn.fetchval.return_value = 3
+        result = await document_routes.list_documents(
+            status="new", doc_type=None, limit=2, offset=0, cursor=encode_cursor(T0, "id-0")
+        )
+
+    sql, *params = conn.fetch.await_args.args
+    assert "raw_text" not in sql and "d.extracted_data," not in sql
+    assert "(d.created_at, d.id) < ($2::timestamptz, $3::uuid)" in sql
+    assert "OFFSET" not in sql
+    assert params == ["new", T0, "id-0", 3]
+    assert [d["id"] for d in result["documents"]] == ["id-0", "id-1"]
+    assert result["documents"][0]["total_amount"] == 1000.0
+    assert "extracted_text" not in result["documents"][0]
+    assert result["has_more"] and decode_cursor(result["next_cursor"]) == (T0, "id-1")
+    assert result["total"] == 3
+
+
+def test_document_summary_keeps_json_types_of_full_format():
+    from src.api.document_routes import format_document, format_document_summary
+
+    extracted = {"invoice_date": "2024-03-01", "tax_amount": 80000, "total_amount": 880000}
+    full = format_document({"id": "d1", "extracted_data": extracted})
+    # asyncpg returns the jsonb projections as JSON text
+    summary = format_document_summary(
+        {"id": "d1", "x_invoice_date": '"2024-03-01"', "x_tax_amount": "80000", "x_total_amount": "880000"}
+    )
+    for field in ("invoice_date", "tax_amount", "total_amount"):
+        assert summary[field] == full[field] and type(summary[field]) is type(full[field])
+    assert format_document_summary({"id": "d2"})["tax_amount"] is None
@@ -0,0 +1,162 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.audit.store import AUDIT_EVENT_INSERT_SQL, EVIDENCE_LOG_INSERT_SQL
+from src.datazones import DataZone, JobState, PipelineUnitOfWork, resolve_tenant_id
+from src.datazones import unit_of_work
+from src.datazones.tracker import ZONE_ENTRY_INSERT_SQL
+from src.observability.metrics import METRIC_INSERT_SQL
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.transactions += 1
+        self.conn.depth += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.conn.depth -= 1
+        if exc_type:
+            self.conn.rollbacks += 1
+
+
+class FakeConn:
+    """Records every statement; each call is one round trip."""
+
+    def __init__(self, fail_on: str | None = None):
+        self.calls: list[tuple] = []
+        self.transactions = self.rollbacks = self.depth = 0
+        self.fail_on = fail_on
+        self.tenant_id = uuid.uuid4()
+
+    def _record(self, kind, sql, rows=1):
+        self.calls.append((kind, sql, rows, self.depth))
+        if self.fail_on and sql == self.fail_on:
+            raise RuntimeError("constraint violation")
+
+    async def execute(self, sql, *args):
+        self._record("execute", sql)
+
+    async def executemany(self, sql, rows):
+        self._record("executemany", sql, len(list(rows)))
+
+    async def fetchrow(self, sql, *args):
+        self._record("fetchrow", sql)
+        return {"id": len(self.calls), "previous_state": None}
+
+    async def fetchval(self, sql, *args):
+        self._record("fetchval", sql)
+        return self.tenant_id
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_log_rows_per_table_in_one_transaction():
+    conn = FakeConn()
+    uow = PipelineUnitOfWork(conn, str(uuid.uuid4()), str(uuid.uuid4()), "req-1")
+    uow.execute("UPDATE documents SET a = $1", 1)
+    uow.execute("UPDATE documents SET a = $1", 2)
+    uow.set_state(JobState.EXTRACTED)
+    uow.audit("extracted", {"text_length": 10})
+    uow.audit("proposed")
+    uow.zone(DataZone.EXTRACTED, byte_count=10)
+    uow.counter("ocr_calls_total")
+    uow.latency("ocr_latency", 120.0)
+    uow.evidence("extract", {"text_length": 10}, action="extract_text")
+
+    await uow.flush()
+
+    assert [(kind, rows) for kind, _, rows, _ in conn.calls] == [
+        ("executemany", 2),  # coalesced documents updates
+        ("fetchrow", 1),  # job state + job event
+        ("executemany", 1),
+        ("executemany", 2),
+        ("executemany", 1 + 1 + 7),  # counter, latency gauge, buckets >= 120ms and +Inf
+        ("executemany", 1),
+    ]
+    assert [sql for _, sql, _, _ in conn.calls[2:]] == [
+        ZONE_ENTRY_INSERT_SQL,
+        AUDIT_EVENT_INSERT_SQL,
+        METRIC_INSERT_SQL,
+        EVIDENCE_LOG_INSERT_SQL,
+    ]
+    assert all(depth >= 1 for *_, depth in conn.calls)
+    assert uow.pending == 0 and uow.flushes == 1
+
+    await uow.flush()  # nothing buffered: no transaction
+    assert conn.transactions == 2  # outer + evidence savepoint
+
+
+@pytest.mark.asyncio
+async def test_evidence_failure_is_logged_not_raised():
+    conn = FakeConn(fail_on=EVIDENCE_LOG_INSERT_SQL)
+    uow = PipelineUnitOfWork(conn, str(uuid.uuid4()), "default")
+    uow.audit("received")
+    uow.evidence("classify", {"doc_type": "invoice"})
+
+    await uow.flush()
+    assert conn.rollbacks == 1  # only the savepoint
+
+    conn.fail_on = AUDIT_EVENT_INSERT_SQL
+    uow.audit("received")
+    with pytest.raises(RuntimeError):
+        await uow.flush()
+    assert uow.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_resolve_tenant_id_is_cached():
+    unit_of_work._tenant_ids.clear()
+    conn = FakeConn()
+    assert await resolve_tenant_id(conn, "acme") == conn.tenant_id
+    assert await resolve_tenant_id(conn, "acme") == conn.tenant_id
+    assert len(conn.calls) == 1 and "ON CONFLICT (code) DO NOTHING" in conn.calls[0][1]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_flushes_once_per_stage(tmp_path):
+    from src.api import main
+    from src.core import config as core_config
+    from src.policy.engine import OverallResult
+
+    unit_of_work._tenant_ids.clear()
+    doc = tmp_path / "invoice.txt"
+    doc.write_text("HOA DON GTGT\nTong cong: 1.000.000 VND")
+    job_id = str(uuid.uuid4())
+    conn = FakeConn()
+
+    llm = SimpleNamespace(
+        config=SimpleNamespace(model="test-model"),
+        generate_json=AsyncMock(return_value={"doc_type": "purchase_invoice", "confidence": 0.6, "entries": []}),
+    )
+    policy = SimpleNamespace(
+        overall_result=OverallResult.REQUIRES_REVIEW, auto_approved=False, rules_passed=2, rules_failed=1
+    )
+
+    with (
+        patch.object(main, "get_db_connection", AsyncMock(return_value=conn)),
+        patch.object(core_config, "ENABLE_MINIO", False),
+        patch.object(core_config, "ENABLE_QDRANT", False),
+        patch("src.llm.get_llm_client", return_value=llm),
+        patch("src.policy.engine.evaluate_proposal", AsyncMock(return_value=policy)),
+    ):
+        main.job_store.create(job_id, {})
+        await main.process_document_async(
+            job_id, str(doc), {"tenant_id": "acme", "content_type": "text/plain", "filename": "invoice.txt"}
+        )
+
+    assert main.job_store.get(job_id)["status"] == "waiting_for_approval"
+    assert conn.transactions == 4 + 2  # 4 stage flushes, 2 of them with an evidence savepoint
+    assert conn.rollbacks == 0
+    # tenant lookup + 4 stage flushes, versus 58 single-row statements before batching
+    assert len(conn.calls) <= 26
@@ -0,0 +1,75 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.policy.engine import OverallResult, RuleResult, evaluate_proposals_batch, evaluate_vendor_allowlist
+from src.policy.ruleset import PolicyRuleCache, VendorMatcher, compile_rules
+
+RULES = [
+    {"name": "auto_approve_threshold", "rule_type": "threshold", "config": {"max_amount": 10000000},
+     "action_on_fail": "require_review"},
+    {"name": "balanced_journal", "rule_type": "balanced", "config": {"tolerance": 0.01},
+     "action_on_fail": "auto_reject"},
+    {"name": "vendor_allowlist", "rule_type": "vendor_allowlist",
+     "config": {"vendors": ["Cong ty ABC", "^vnpt", "xyz ("], "mode": "allow"}, "action_on_fail": "require_review"},
+    {"name": "mystery", "rule_type": "unknown_type", "config": {}, "action_on_fail": "warn_only"},
+]
+
+
+def make_conn(rules=RULES):
+    conn = AsyncMock()
+    conn.fetch.return_value = [
+        {"id": str(i), "priority": i, **r, "config": json.dumps(r["config"])} for i, r in enumerate(rules)
+    ]
+    return conn
+
+
+@pytest.mark.parametrize(
+    "vendor",
+    ["cong ty abc", "cong ty abc chi nhanh 2", "abc", "vnpt ha noi", "ha noi vnpt", "xyz (", "other", "y"],
+)
+def test_vendor_matcher_equivalent_to_pattern_loop(vendor):
+    vendors = ["Cong ty ABC", "^vnpt", "xyz ("]
+    expected = evaluate_vendor_allowlist({"vendor": vendor}, {"vendors": vendors}, "r").result
+    assert VendorMatcher(vendors).matches(vendor) == (expected == RuleResult.PASS)
+
+
+def test_compile_rules_skips_unknown_types():
+    ruleset = compile_rules(RULES)
+    assert [r.name for r in ruleset.rules] == ["auto_approve_threshold", "balanced_journal", "vendor_allowlist"]
+
+
+@pytest.mark.asyncio
+async def test_rule_cache_loads_once_and_invalidates():
+    cache = PolicyRuleCache(ttl=0)
+    conn = make_conn()
+
+    await cache.get(conn, None)
+    await cache.get(conn, None)
+    assert conn.fetch.await_count == 1
+
+    cache._on_notify(None, 0, "policy_rules_changed", "")
+    await cache.get(conn, None)
+    assert conn.fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_evaluate_proposals_batch_single_executemany():
+    conn = make_conn()
+    items = [
+        {"job_id": "job-1", "proposal": {"vendor": "Cong ty ABC", "total_amount": 1000,
+                                         "entries": [{"debit": 1000}, {"credit": 1000}]}},
+        {"job_id": "job-2", "proposal": {"vendor": "Unknown", "total_amount": 1000,
+                                         "entries": [{"debit": 1000}, {"credit": 900}]}},
+    ]
+
+    with patch("src.policy.ruleset._rule_cache", PolicyRuleCache(ttl=0)):
+        results = await evaluate_proposals_batch(conn, items)
+
+    assert [r.overall_result for r in results] == [OverallResult.APPROVED, OverallResult.REJECTED]
+    assert results[0].auto_approved is True
+    conn.fetch.assert_awaited_once()
+    conn.executemany.assert_awaited_once()
+    assert len(conn.executemany.await_args.args[1]) == 2
+    conn.execute.assert_not_awaited()
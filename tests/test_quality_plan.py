@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.quality.expectations import ExpectColumnValuesToBeDatetime
+from src.analytics.quality.plan import ValidationPlan
+from src.analytics.quality.validator import DataValidator
+
+SCHEMA = {
+    "columns": {
+        "id": {"required": True, "unique": True},
+        "amount": {"required": True, "min": 0, "max": 1000},
+        "status": {"values": ["pending", "completed"]},
+        "code": {"unique": True},
+        "missing": {"required": True},
+        "label": {"min": 0},
+    },
+    "min_rows": 1,
+    "max_rows": 100,
+}
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 60
+    return pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "amount": np.where(rng.random(n) < 0.1, np.nan, rng.uniform(-50, 1200, n)),
+            "status": rng.choice(["pending", "completed", "void", None], n),
+            "code": rng.integers(0, 40, n),
+            "label": ["x"] * n,
+            "posted_at": pd.date_range("2024-01-01", periods=n).astype(str),
+        }
+    )
+
+
+def as_comparable(result):
+    d = result.to_dict()
+    for key in ("observed", "expected"):
+        if isinstance(d[key], list):
+            d[key] = sorted(map(str, d[key]))
+    if "unexpected_values" in d["details"]:
+        d["details"]["unexpected_values"] = sorted(map(str, d["details"]["unexpected_values"]))
+    return d
+
+
+def test_compiled_plan_matches_per_rule_expectations(df):
+    validator = DataValidator.from_schema("sales", SCHEMA)
+    validator.add_rule(ExpectColumnValuesToBeDatetime("posted_at"))
+
+    suite = validator.validate(df)
+    expected = [rule.validate(df) for rule in validator.rules]
+
+    assert [as_comparable(r) for r in suite.results] == [as_comparable(r) for r in expected]
+    assert not suite.success
+    assert suite.statistics["scanned_rows"] == len(df) and not suite.statistics["sampled"]
+
+    # Rules on one column share one scan plan
+    plan = validator.compile()
+    assert plan.columns["amount"].nulls and plan.columns["amount"].ranges == [(0, 1000)]
+    assert [type(r).__name__ for r in plan.fallback] == ["ExpectColumnValuesToBeDatetime"]
+
+
+def test_chunked_validation_matches_in_memory(df):
+    validator = DataValidator.from_schema("sales", SCHEMA)
+    whole = validator.validate(df)
+    chunked = validator.validate_chunks(df.iloc[i : i + 7] for i in range(0, len(df), 7))
+
+    assert [as_comparable(r) for r in chunked.results] == [as_comparable(r) for r in whole.results]
+    assert chunked.statistics["chunks"] == 9
+    assert chunked.statistics["scanned_rows"] == len(df)
+
+
+def test_sampling_scans_subset_but_counts_all_rows(df):
+    validator = DataValidator.from_schema("sales", {"columns": {"id": {"unique": True}}, "max_rows": 10})
+    suite = validator.validate(df, sample=20)
+
+    assert suite.statistics["scanned_rows"] == 20 and suite.statistics["sampled"]
+    by_rule = {r.rule_name: r for r in suite.results}
+    assert by_rule["expect_column_values_unique(id)"].expected_value == 20
+    assert by_rule["expect_table_row_count_between(None, 10)"].observed_value == len(df)
+
+
+def test_plan_cache_is_invalidated_when_rules_change():
+    validator = DataValidator("t").expect_column_to_exist("a")
+    plan = validator.compile()
+    assert validator.compile() is plan
+    validator.expect_column_values_unique("a")
+    assert validator.compile() is not plan
+    assert isinstance(validator.compile(), ValidationPlan)
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.middleware import ResourceMonitorMiddleware
+from api.resources import AdmissionController, PressureLevel, ResourceSampler, TempFileJanitor
+
+
+class Probe:
+    def __init__(self, memory=80.0, disk=10_000.0):
+        self.memory, self.disk, self.calls = memory, disk, 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.memory, self.disk
+
+
+def test_sampler_smooths_spikes_but_escalates_critical_readings_at_once():
+    probe = Probe(memory=80.0)
+    sampler = ResourceSampler(alpha=0.3, probe=probe)
+    assert sampler.snapshot.level == PressureLevel.NORMAL
+
+    probe.memory = 25.0  # one elevated reading: smoothed 63.5% stays NORMAL
+    assert sampler.sample_once().memory_level == PressureLevel.NORMAL
+    probe.memory = 5.0  # raw critical reading wins over the smoothed average
+    assert sampler.sample_once().memory_level == PressureLevel.CRITICAL
+
+    probe.memory = 80.0  # the spike barely moved the average: back to NORMAL
+    assert sampler.sample_once().memory_level == PressureLevel.NORMAL
+
+    probe.memory = 20.0  # sustained ELEVATED readings pull the average down gradually
+    levels = [sampler.sample_once().memory_level for _ in range(6)]
+    assert levels[0] == PressureLevel.NORMAL and levels[-1] == PressureLevel.ELEVATED
+
+    probe.disk = 400.0
+    assert sampler.sample_once().disk_level == PressureLevel.NORMAL  # smoothed 7120MB
+    assert probe.calls == 11
+
+
+def test_janitor_removes_only_stale_entries(tmp_path):
+    stale_file, fresh_file, stale_dir = tmp_path / "ocr_old.png", tmp_path / "ocr_new.png", tmp_path / "batch_1"
+    stale_file.write_bytes(b"x")
+    fresh_file.write_bytes(b"x")
+    stale_dir.mkdir()
+    (stale_dir / "page.png").write_bytes(b"x")
+    old = time.time() - 3 * 3600
+    os.utime(stale_file, (old, old))
+    os.utime(stale_dir, (old, old))
+
+    janitor = TempFileJanitor(patterns=(str(tmp_path / "ocr_*"), str(tmp_path / "batch_*")))
+
+    async def run():
+        first = janitor.request_cleanup()
+        assert janitor.request_cleanup() is None  # one sweep at a time / rate limited
+        return await first
+
+    assert asyncio.run(run()) == 2
+    assert fresh_file.exists() and not stale_file.exists() and not stale_dir.exists()
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_fifo_then_sheds_on_full_queue_and_timeout():
+    admission = AdmissionController(capacity=2, max_queue=1, max_wait=0.05)
+    assert await admission.acquire(2)
+
+    waiter = asyncio.create_task(admission.acquire(1))
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+    assert not await admission.acquire(1)  # queue full -> shed
+
+    admission.release(2)
+    assert await waiter and admission.in_use == 1
+
+    assert await admission.acquire(1)
+    assert not await admission.acquire(1)  # waits max_wait, then shed
+    assert admission.queued == 0 and admission.shed == 2
+
+
+@pytest.mark.asyncio
+async def test_admission_budget_shrinks_with_pressure():
+    probe = Probe(memory=25.0)  # ELEVATED: half budget
+    admission = AdmissionController(capacity=4, max_wait=0.01, sampler=ResourceSampler(probe=probe))
+    assert await admission.acquire(2)
+    assert not await admission.acquire(1)
+
+    probe.memory = 5.0
+    admission.sampler.sample_once()
+    admission.release(2)
+    assert not await admission.acquire(0.1)  # CRITICAL sheds even when idle
+
+
+def make_client(probe, **kwargs):
+    async def upload(request):
+        await asyncio.sleep(0.01)
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[
+        Route("/v1/upload", upload, methods=["POST"]),
+        Route("/v1/documents/{doc_id}/extract", upload, methods=["POST"]),
+        Route("/v1/jobs", upload, methods=["POST"]),
+    ])
+    sampler = ResourceSampler(interval=60, probe=probe)
+    app.add_middleware(ResourceMonitorMiddleware, sampler=sampler, **kwargs)
+    return TestClient(app), sampler
+
+
+def test_middleware_sheds_heavy_requests_under_memory_pressure_only():
+    probe = Probe(memory=5.0)
+    client, sampler = make_client(probe)
+
+    rejected = client.post("/v1/documents/abc/extract")
+    assert rejected.status_code == 503
+    assert rejected.json()["code"] == "RESOURCE_PRESSURE"
+    assert rejected.headers["Retry-After"] == "30"
+    assert client.post("/v1/jobs").status_code == 200  # not a heavy endpoint
+
+    probe.memory = 80.0
+    for _ in range(8):
+        sampler.sample_once()
+    assert client.post("/v1/upload", content=b"x" * 1024).status_code == 200
+
+
+def test_cost_scales_with_endpoint_and_body_size():
+    middleware = ResourceMonitorMiddleware(app=None, sampler=ResourceSampler(probe=Probe()))
+
+    def scope(path, size=0, method="POST"):
+        return {"type": "http", "method": method, "path": path, "headers": [(b"content-length", str(size).encode())]}
+
+    assert middleware.estimate_cost(scope("/v1/upload")) == 1.0
+    assert middleware.estimate_cost(scope("/v1/upload", size=20 * 1024 * 1024)) == 3.0
+    assert middleware.estimate_cost(scope("/v1/documents/d1/extract")) == 2.0
+    assert middleware.estimate_cost(scope("/v1/analytics/datasets")) == 1.0
+    assert middleware.estimate_cost(scope("/v1/analyze/datasets/upload")) == 1.0
+    assert middleware.estimate_cost(scope("/v1/accounting/batch")) == 4.0
+    assert middleware.estimate_cost(scope("/v1/accounting/coding")) is None
+    assert middleware.estimate_cost(scope("/v1/upload", method="GET")) is None
+    assert middleware.estimate_cost(scope("/v1/documents")) is None
+
+
+def test_heavy_patterns_match_mounted_routes():
+    """Every heavy pattern must match a POST route of one of the two apps"""
+    from api.main import app as accounting_app
+    from src.api.main import app as main_app
+
+    paths = [
+        path
+        for app in (accounting_app, main_app)
+        for path, methods in app.openapi()["paths"].items()
+        if "post" in methods
+    ]
+    for pattern, _ in ResourceMonitorMiddleware.HEAVY_ENDPOINTS:
+        assert any(pattern.match(path.replace("{", "").replace("}", "")) for path in paths), pattern.pattern
+    assert any(m.cls is ResourceMonitorMiddleware for m in accounting_app.user_middleware)
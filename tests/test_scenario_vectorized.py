@@ -0,0 +1,114 @@
+import time
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from src.simulations.scenario import run_scenario_simulation
+from src.simulations.vectorized import run_grid_simulation, run_monte_carlo_simulation, simulate_scenarios
+
+AS_OF = date(2026, 3, 1)
+
+
+def make_forecast(avg_daily_net=1250.0, window_days=30):
+    return {
+        "as_of_date": AS_OF.isoformat(),
+        "window_days": window_days,
+        "avg_daily_net": avg_daily_net,
+        "daily": [
+            {"date": (AS_OF + timedelta(days=i)).isoformat(), "expected_net": round(avg_daily_net + 7 * i, 2)}
+            for i in range(1, window_days + 1)
+        ],
+    }
+
+
+@pytest.mark.parametrize("avg_daily_net", [1250.0, -830.5])
+@pytest.mark.parametrize("assumptions", [(1.0, 1.0, 0), (1.2, 0.9, 5), (0.8, 1.3, 12), (1.1, 1.0, 45)])
+def test_vectorized_matches_scalar_simulation(avg_daily_net, assumptions):
+    forecast = make_forecast(avg_daily_net)
+    rev, cost, delay = assumptions
+    scalar = run_scenario_simulation(
+        uuid.uuid4(),
+        forecast,
+        {"assumptions": {"revenue_multiplier": rev, "cost_multiplier": cost, "payment_delay_days": delay}},
+    )["summary"]
+
+    batch = simulate_scenarios(forecast, [rev], [cost], [delay])
+    assert batch.total_baseline == pytest.approx(scalar["total_baseline_net"])
+    assert batch.total_projected[0] == pytest.approx(scalar["total_projected_net"])
+    assert batch.total_delta[0] == pytest.approx(scalar["total_delta"])
+    assert batch.impact_percent[0] == pytest.approx(scalar["impact_percent"])
+
+
+def test_grid_matrices_and_speed():
+    grid = {
+        "revenue_multiplier": np.linspace(0.5, 1.5, 21).tolist(),
+        "cost_multiplier": np.linspace(0.5, 1.5, 21).tolist(),
+        "payment_delay_days": list(range(0, 21)),
+    }
+    start = time.perf_counter()
+    result = run_grid_simulation(make_forecast(window_days=90), grid)
+    elapsed = time.perf_counter() - start
+
+    assert result["scenario_count"] == 21 * 21 * 21
+    matrix = np.array(result["matrices"]["total_delta"])
+    assert matrix.shape == (21, 21, 21)
+    # More revenue helps, more cost and longer delays hurt
+    assert (np.diff(matrix, axis=0) >= 0).all()
+    assert (np.diff(matrix, axis=1) <= 0).all()
+    assert result["summary"]["best_case"]["revenue_multiplier"] == 1.5
+    assert elapsed < 1.0
+
+
+def test_monte_carlo_bands_are_ordered_and_reproducible():
+    distributions = {
+        "revenue_multiplier": {"distribution": "normal", "mean": 1.0, "std": 0.15},
+        "cost_multiplier": {"distribution": "triangular", "low": 0.9, "mode": 1.0, "high": 1.3},
+        "payment_delay_days": {"distribution": "choice", "values": [0, 15, 30], "weights": [0.6, 0.3, 0.1]},
+    }
+    first = run_monte_carlo_simulation(make_forecast(), distributions, n_samples=20_000, seed=7)
+    second = run_monte_carlo_simulation(make_forecast(), distributions, n_samples=20_000, seed=7)
+    assert first == second
+
+    bands = first["bands"]["cumulative_projected_net"]
+    assert len(bands["p50"]) == 30
+    assert all(lo <= mid <= hi for lo, mid, hi in zip(bands["p5"], bands["p50"], bands["p95"]))
+    assert 0 <= first["probabilities"]["below_baseline"] <= 1
+
+    with pytest.raises(ValueError):
+        run_monte_carlo_simulation(make_forecast(), {"cost_multiplier": {"distribution": "pareto"}}, n_samples=10)
+
+
+def test_bands_are_chunked_and_sweeps_are_bounded(monkeypatch):
+    import src.simulations.vectorized as vectorized
+
+    distributions = {"payment_delay_days": {"distribution": "uniform", "low": 0, "high": 30}}
+    whole = run_monte_carlo_simulation(make_forecast(), distributions, n_samples=500, seed=3)
+    monkeypatch.setattr(vectorized, "BAND_CHUNK_ELEMENTS", 500 * 7)  # 7 days per chunk
+    assert run_monte_carlo_simulation(make_forecast(), distributions, n_samples=500, seed=3) == whole
+
+    with pytest.raises(ValueError, match="max 10000"):
+        run_grid_simulation(make_forecast(), {"revenue_multiplier": [1.0] * 101, "cost_multiplier": [1.0] * 100})
+    stored = vectorized.persisted_result(run_grid_simulation(make_forecast()))
+    assert "matrices" not in stored and stored["summary"] and stored["axes"]
+
+
+def test_sweep_endpoint_rejects_oversized_requests():
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    client = TestClient(app)
+    assert client.post("/v1/simulations/sweep", json={"window_days": 5000}).status_code == 422
+    huge = {"revenue_multiplier": [1.0] * 1000, "cost_multiplier": [1.0] * 1000}
+    response = client.post("/v1/simulations/sweep", json={"grid": huge})
+    assert response.status_code == 400 and "max 10000" in response.json()["detail"]
+
+
+def test_cfo_sensitivity_surface_uses_default_grid():
+    from src.insights.cfo import _build_sensitivity
+
+    surface = _build_sensitivity({"forecast": make_forecast(), "window_days": 30}, True)
+    assert surface["mode"] == "grid"
+    assert surface["scenario_count"] == 13 * 13 * 5
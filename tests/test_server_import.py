@@ -0,0 +1,190 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+import api.server_import as server_import
+from api.server_import import FILE_UPSERT_SQL, JOB_INSERT_SQL, ServerImport
+
+
+class FakeDB:
+    def __init__(self):
+        self.files: dict[str, tuple] = {}  # path -> server_import_files row
+        self.jobs: list[tuple] = []
+        self.transactions = 0
+        self.executemany_calls = 0
+
+    def acquire(self):
+        db = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return FakeConn(db)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+TENANT_UUID = uuid.uuid4()
+
+
+class FakeConn:
+    def __init__(self, db: FakeDB):
+        self.db = db
+
+    async def fetchval(self, sql, *args):  # resolve_tenant_id
+        assert args[-1] == "acme"
+        return TENANT_UUID
+
+    async def fetch(self, sql, *args):
+        return [{"path": path} for path, row in self.db.files.items() if row[2] != "failed"]
+
+    async def execute(self, sql, *args):
+        pass
+
+    async def executemany(self, sql, rows):
+        self.db.executemany_calls += 1
+        if sql is JOB_INSERT_SQL:
+            self.db.jobs.extend(rows)
+        elif sql is FILE_UPSERT_SQL:
+            self.db.files.update((row[1], row) for row in rows)
+
+    def transaction(self):
+        db = self.db
+
+        class Tx:
+            async def __aenter__(self):
+                db.transactions += 1
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Tx()
+
+
+@pytest.fixture(autouse=True)
+def tenant_cache(monkeypatch):
+    from src.datazones import unit_of_work
+
+    monkeypatch.setattr(unit_of_work, "_tenant_ids", {})
+
+
+@pytest.fixture
+def import_dir(tmp_path):
+    for name, content in [("a.pdf", "A"), ("b.pdf", "B"), ("c.pdf", "A"), ("d.pdf", "OLD"), ("e.pdf", "BAD")]:
+        (tmp_path / name).write_text(content)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_import_dedups_uploads_concurrently_and_batches_rows(import_dir, monkeypatch):
+    old_checksum, _ = server_import.hash_file(import_dir / "d.pdf")
+    uploads, active, peak = [], [0], [0]
+    lock = threading.Lock()
+    fail = {"e.pdf"}
+
+    def fake_upload(path, checksum, size, tenant_id, job_id):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+            uploads.append(path.name)
+        if path.name in fail:
+            raise OSError("connection reset")
+        return "erpx-documents", f"raw/{tenant_id}/{job_id}/{path.name}", checksum, size
+
+    async def fake_duplicate(conn, checksum, size, tenant_id=None):
+        assert tenant_id == TENANT_UUID  # the code is resolved once, not passed as-is
+        return {"first_job_id": "job-old"} if checksum == old_checksum else None
+
+    monkeypatch.setattr(server_import, "upload_file", fake_upload)
+    monkeypatch.setattr(server_import, "check_document_duplicate", fake_duplicate)
+
+    db = FakeDB()
+    run = ServerImport(db, str(uuid.uuid4()), import_dir, "*.pdf", False, "acme", concurrency=3, batch_size=2)
+    await run.run()
+
+    statuses = {path.rsplit("/", 1)[-1]: row[2] for path, row in db.files.items()}
+    # a.pdf and c.pdf have the same content: whichever worker gets there first imports it
+    first = "a.pdf" if statuses["a.pdf"] == "imported" else "c.pdf"
+    assert sorted([statuses["a.pdf"], statuses["c.pdf"]]) == ["duplicate", "imported"]
+    assert statuses["b.pdf"] == "imported"
+    assert statuses["d.pdf"] == "duplicate"  # already in document_checksums
+    assert statuses["e.pdf"] == "failed"
+    assert sorted(uploads) == sorted([first, "b.pdf", "e.pdf"])
+    assert 1 < peak[0] <= 3
+    assert sorted(job[2] for job in db.jobs) == sorted([first, "b.pdf"])
+    assert {job[1] for job in db.jobs} == {TENANT_UUID}
+    assert db.transactions <= 3  # batched, not one per file
+
+    # Resume only retries what did not finish
+    fail.clear()
+    uploads.clear()
+    await ServerImport(db, run.import_id, import_dir, "*.pdf", False, "acme", concurrency=3).run()
+    assert uploads == ["e.pdf"]
+    assert db.files[str(import_dir / "e.pdf")][2] == "imported"
+    assert len(db.jobs) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_does_not_mark_identical_files_handled(tmp_path, monkeypatch):
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (tmp_path / name).write_text("same")
+    uploads = []
+
+    def flaky_upload(path, checksum, size, tenant_id, job_id):
+        uploads.append(path.name)
+        if len(uploads) == 1:
+            raise OSError("connection reset")
+        return "erpx-documents", f"raw/{tenant_id}/{job_id}/{path.name}", checksum, size
+
+    async def no_duplicate(conn, checksum, size, tenant_id=None):
+        return None
+
+    monkeypatch.setattr(server_import, "upload_file", flaky_upload)
+    monkeypatch.setattr(server_import, "check_document_duplicate", no_duplicate)
+
+    db = FakeDB()
+    await ServerImport(db, str(uuid.uuid4()), tmp_path, "*.pdf", False, "acme", concurrency=3).run()
+
+    # The first copy fails, the next one is uploaded, the last is its duplicate
+    assert len(uploads) == 2
+    assert sorted(row[2] for row in db.files.values()) == ["duplicate", "failed", "imported"]
+    imported = next(row for row in db.files.values() if row[2] == "imported")
+    assert next(row for row in db.files.values() if row[2] == "duplicate")[3] == imported[3]
+
+
+def test_list_import_files_is_sorted_and_skips_directories(import_dir):
+    (import_dir / "sub").mkdir()
+    (import_dir / "sub" / "f.pdf").write_text("F")
+
+    assert [f.name for f in server_import.list_import_files(import_dir, "*.pdf", False)] == [
+        "a.pdf",
+        "b.pdf",
+        "c.pdf",
+        "d.pdf",
+        "e.pdf",
+    ]
+    assert len(server_import.list_import_files(import_dir, "*.pdf", True)) == 6
+
+
+@pytest.mark.asyncio
+async def test_checksum_lookup_scopes_by_tenant_uuid_only():
+    from unittest.mock import AsyncMock
+
+    from src.datazones.idempotency import check_document_duplicate, document_checksum_row
+
+    conn = AsyncMock()
+    conn.fetchrow.return_value = None
+    await check_document_duplicate(conn, "abc", 10, TENANT_UUID)
+    assert conn.fetchrow.await_args.args[1:] == ("abc", 10, TENANT_UUID)
+
+    # A tenant code is not a UUID: no "tenant_id = NULL" clause matching every NULL row
+    await check_document_duplicate(conn, "abc", 10, "long-tenant-code")
+    assert conn.fetchrow.await_args.args[1:] == ("abc", 10)
+    assert document_checksum_row("abc", 10, "job-1", tenant_id=TENANT_UUID)[1] == TENANT_UUID
@@ -0,0 +1,164 @@
+import uuid
+
+import pytest
+
+from src.datazones import JobState
+from src.workflows.pipeline_stages import MAX_STAGE_TEXT, begin_job, extract_document_text, record_extraction
+
+
+class FakeConn:
+    def __init__(self):
+        self.statements: list[tuple] = []
+        self.transactions = 0
+        self.tenant_id = uuid.uuid4()
+
+    async def execute(self, sql, *args):
+        self.statements.append((sql, args))
+
+    async def executemany(self, sql, rows):
+        self.statements.append((sql, list(rows)))
+
+    async def fetchrow(self, sql, *args):
+        self.statements.append((sql, args))
+        return {"id": 1, "previous_state": None}
+
+    async def fetchval(self, sql, *args):
+        self.statements.append((sql, args))
+        return self.tenant_id
+
+    def transaction(self):
+        conn = self
+
+        class Tx:
+            async def __aenter__(self):
+                conn.transactions += 1
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Tx()
+
+    def states(self):
+        return [args[0] for sql, args in self.statements if "UPDATE job_processing_state" in sql]
+
+
+@pytest.mark.asyncio
+async def test_db_stages_batch_their_writes(tmp_path):
+    doc = tmp_path / "invoice.txt"
+    doc.write_text("HOA DON GTGT " * 6000)
+    job_id = str(uuid.uuid4())
+    conn = FakeConn()
+
+    file_info = await begin_job(conn, job_id, {"tenant_id": "acme", "content_type": "text/plain"})
+    assert file_info["tenant_uuid"] == str(conn.tenant_id)
+
+    extraction = await extract_document_text(str(doc), file_info["content_type"])
+    assert extraction["text_length"] == 13 * 6000
+    assert len(extraction["text"]) == MAX_STAGE_TEXT  # bounded Temporal payload
+
+    await record_extraction(conn, job_id, file_info, extraction)
+
+    assert conn.transactions == 2  # one per db stage
+    assert conn.states() == [JobState.EXTRACTING.value, JobState.EXTRACTED.value, JobState.PROPOSING.value]
+
+
+def test_stage_workers_have_own_queues_and_limits(monkeypatch):
+    pytest.importorskip("temporalio")
+    from src.core import config
+    from src.workflows.worker_staged import worker_options
+
+    monkeypatch.setattr(config, "WORKER_OCR_CONCURRENCY", 3)
+    monkeypatch.setattr(config, "WORKER_LLM_CONCURRENCY", 40)
+
+    ocr, llm, db = worker_options("ocr"), worker_options("llm"), worker_options("db")
+    assert len({ocr["task_queue"], llm["task_queue"], db["task_queue"]}) == 3
+    assert ocr["max_concurrent_activities"] == 3 and ocr["activity_executor"]._max_workers == 3
+    assert llm["max_concurrent_activities"] == 40 and "workflows" not in llm
+    assert [a.__name__ for a in ocr["activities"]] == ["extract_text_activity"]
+    assert db["workflows"][0].__name__ == "StagedDocumentWorkflow"
+    with pytest.raises(ValueError):
+        worker_options("gpu")
+
+
+@pytest.mark.asyncio
+async def test_staged_workflow_routes_each_stage_to_its_queue():
+    pytest.importorskip("temporalio")
+    from temporalio import activity
+    from temporalio.client import WorkflowFailureError
+    from temporalio.exceptions import ApplicationError
+    from temporalio.testing import WorkflowEnvironment
+    from temporalio.worker import Worker
+
+    from src.core import config
+    from src.workflows.document_workflow_staged import StagedDocumentWorkflow
+
+    try:
+        env = await WorkflowEnvironment.start_local()
+    except Exception as e:
+        pytest.skip(f"Temporal dev server unavailable: {e}")
+
+    ran: list[tuple[str, str]] = []
+
+    def record(name):
+        ran.append((name, activity.info().task_queue))
+
+    @activity.defn(name="begin_job_activity")
+    async def begin(job_id):
+        record("begin")
+        return {"tenant_id": "acme", "tenant_uuid": str(uuid.uuid4())}
+
+    @activity.defn(name="extract_text_activity")
+    async def extract(job_id, file_info):
+        record("extract")
+        return {"text": "invoice"}
+
+    @activity.defn(name="record_extraction_activity")
+    async def recorded(job_id, file_info, extraction):
+        record("record")
+
+    @activity.defn(name="propose_activity")
+    async def propose(job_id, file_info, text):
+        record("propose")
+        if job_id == "job-fail":
+            raise ApplicationError("LLM unavailable", non_retryable=True)
+        return {"proposal": {}}
+
+    @activity.defn(name="apply_proposal_activity")
+    async def apply(job_id, file_info, extraction, proposed, pipeline_start):
+        record("apply")
+        return "completed"
+
+    @activity.defn(name="record_failure_activity")
+    async def failed(job_id, file_info, error):
+        record("failure")
+
+    async with env:
+        workers = [
+            Worker(
+                env.client,
+                task_queue=config.TEMPORAL_DB_TASK_QUEUE,
+                workflows=[StagedDocumentWorkflow],
+                activities=[begin, recorded, apply, failed],
+            ),
+            Worker(env.client, task_queue=config.TEMPORAL_OCR_TASK_QUEUE, activities=[extract]),
+            Worker(env.client, task_queue=config.TEMPORAL_LLM_TASK_QUEUE, activities=[propose]),
+        ]
+        async with workers[0], workers[1], workers[2]:
+            result = await env.client.execute_workflow(
+                StagedDocumentWorkflow.run, "job-ok", id="job-ok", task_queue=config.TEMPORAL_DB_TASK_QUEUE
+            )
+            assert result == "completed"
+            assert ran == [
+                ("begin", config.TEMPORAL_DB_TASK_QUEUE),
+                ("extract", config.TEMPORAL_OCR_TASK_QUEUE),
+                ("record", config.TEMPORAL_DB_TASK_QUEUE),
+                ("propose", config.TEMPORAL_LLM_TASK_QUEUE),
+                ("apply", config.TEMPORAL_DB_TASK_QUEUE),
+            ]
+
+            ran.clear()
+            with pytest.raises(WorkflowFailureError):
+                await env.client.execute_workflow(
+                    StagedDocumentWorkflow.run, "job-fail", id="job-fail", task_queue=config.TEMPORAL_DB_TASK_QUEUE
+                )
+            assert ran[-1] == ("failure", config.TEMPORAL_DB_TASK_QUEUE)
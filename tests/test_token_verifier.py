@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from src.api.token_verifier import ClaimsCache, JWKSCache, JWKSUnavailable, TokenVerifier
+
+ISSUER = "http://keycloak:8080/realms/erpx"
+
+
+def make_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private.public_key()))
+    jwk.update(kid=kid, use="sig", alg="RS256")
+    return private, jwk
+
+
+def sign(private, kid, **claims):
+    payload = {"sub": "u1", "iss": ISSUER, "exp": int(time.time()) + 600, **claims}
+    return jwt.encode(payload, private, algorithm="RS256", headers={"kid": kid})
+
+
+class FakeIdP:
+    def __init__(self, *jwks):
+        self.jwks = list(jwks)
+        self.calls = 0
+        self.down = False
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.down:
+            raise ConnectionError("keycloak unreachable")
+        return {"keys": self.jwks + [{"kid": "enc-1", "kty": "RSA", "use": "enc", "alg": "RSA-OAEP"}]}
+
+
+@pytest.mark.asyncio
+async def test_verify_caches_claims_and_rotates_keys():
+    key1, jwk1 = make_key("k1")
+    key2, jwk2 = make_key("k2")
+    idp = FakeIdP(jwk1)
+    verifier = TokenVerifier(JWKSCache(idp.fetch, min_refresh_interval=0), issuer=ISSUER)
+
+    token = sign(key1, "k1")
+    results = await asyncio.gather(*[verifier.verify(token) for _ in range(5)])
+    assert all(r["sub"] == "u1" for r in results)
+    assert idp.calls == 1  # concurrent cold-start callers share one fetch
+    assert verifier.jwks.kids == {"k1"}
+
+    await verifier.verify(token)
+    assert verifier.cache.hits >= 1
+
+    # Rotation: a token signed with a new kid triggers one refresh
+    idp.jwks = [jwk1, jwk2]
+    assert (await verifier.verify(sign(key2, "k2", sub="u2")))["sub"] == "u2"
+    assert idp.calls == 2
+
+    # IdP down: stale keys keep verifying
+    idp.down = True
+    assert await verifier.jwks.refresh() is False
+    assert (await verifier.verify(sign(key1, "k1", sub="u3")))["sub"] == "u3"
+
+    # Forged signature and unknown kid are rejected
+    forged, _ = make_key("k1")
+    with pytest.raises(jwt.InvalidSignatureError):
+        await verifier.verify(sign(forged, "k1"))
+    with pytest.raises(jwt.InvalidTokenError, match="Unknown signing key"):
+        await verifier.verify(sign(forged, "nope"))
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refresh_is_rate_limited_and_cold_outage_fails():
+    key1, jwk1 = make_key("k1")
+    idp = FakeIdP(jwk1)
+    verifier = TokenVerifier(JWKSCache(idp.fetch, min_refresh_interval=60), issuer=ISSUER)
+    await verifier.jwks.refresh()
+
+    for _ in range(3):
+        with pytest.raises(jwt.InvalidTokenError):
+            await verifier.verify(sign(key1, "forged-kid"))
+    assert idp.calls == 1
+
+    down = FakeIdP()
+    down.down = True
+    cold = TokenVerifier(JWKSCache(down.fetch), issuer=ISSUER)
+    with pytest.raises(JWKSUnavailable):
+        await cold.verify(sign(key1, "k1"))
+
+
+def test_claims_cache_honours_exp_and_size():
+    now = [1000.0]
+    cache = ClaimsCache(max_size=2, max_ttl=300, clock=lambda: now[0])
+
+    cache.put(b"a", {"exp": 1010})
+    cache.put(b"b", {"exp": 5000})
+    assert cache.get(b"a") is not None
+    now[0] = 1010
+    assert cache.get(b"a") is None  # token's own exp
+    assert cache.get(b"b") is not None
+    now[0] = 1300
+    assert cache.get(b"b") is None  # max_ttl caps reuse
+
+    for k in (b"x", b"y", b"z"):
+        cache.put(k, {"exp": 9999})
+    assert len(cache) == 2 and cache.get(b"x") is None
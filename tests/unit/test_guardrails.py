@@ -11,6 +11,7 @@ import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from guardrails.evidence_index import SourceEvidenceIndex
 from guardrails.input_validator import InputValidator
 from guardrails.output_validator import OutputValidator
 from guardrails.policy_checker import PolicyChecker
@@ -281,5 +282,117 @@ class TestCombinedGuardrails:
         assert result.approver_level in ["kế toán trưởng", "manager", "senior"]
 
 
+class TestSourceEvidenceIndex:
+    """Tests for the shared per-document evidence index"""
+
+    SOURCE_TEXT = "HOA DON GTGT\nKy hieu: 1C24-TAA  So: 0001234\nMST: 0101 234 567\nTong cong: 1,100,000 VND"
+
+    def test_numeric_lookups(self):
+        """Test exact, formatted and near-match numbers"""
+        index = SourceEvidenceIndex(self.SOURCE_TEXT, {"lines": [{"amount": 1000000}]})
+
+        assert index.value_in_source(1100000)  # formatted in text
+        assert index.value_in_source(1000000.0)  # structured, by equality
+        assert index.value_in_source(1234.5)  # within 1 of 1234 in text
+        assert not index.value_in_source(2000000)
+
+    def test_string_lookups_ignore_spaces_and_dashes(self):
+        """Test serial/tax-id matching without spaces or dashes"""
+        index = SourceEvidenceIndex(self.SOURCE_TEXT)
+
+        assert index.string_in_source("1C24TAA")
+        assert index.string_in_source("0101-234-567")
+        assert not index.string_in_source("0109999999")
+        assert index.ngram_overlap("0101234568") > 0.5
+
+    def test_validator_and_policy_checker_share_index(self):
+        """Test OutputValidator and PolicyChecker using one prebuilt index"""
+        index = SourceEvidenceIndex(self.SOURCE_TEXT)
+        validator = OutputValidator(evidence_index=index)
+        output = {
+            "doc_id": "TEST-010",
+            "tenant_id": "tenant-001",
+            "asof_payload": {
+                "chung_tu": {},
+                "hoa_don": {"invoice_serial": "1C24TAA", "tax_id": "0101234567"},
+                "chi_tiet": {"grand_total": 3_000_000},
+            },
+        }
+
+        result = validator.validate(output)
+        assert validator.evidence_index is index
+        assert result.hallucination_detected is True
+        assert any("grand_total" in w for w in result.warnings)
+
+        policy_result = PolicyChecker().check_policy(output, evidence_index=index)
+        assert not any("not found in source" in v for v in policy_result.violations)
+        assert any("not found in source" in r for r in policy_result.recommendations)
+
+        enforced = PolicyChecker(tenant_config={"enforce_source_grounding": True})
+        policy_result = enforced.check_policy(output, evidence_index=index)
+        assert any("not found in source" in v for v in policy_result.violations)
+
+    def test_orchestrator_builds_one_index_for_guardrails_and_evidence(self, tmp_path):
+        """Test the validate node passes the same source index to both consumers"""
+        import asyncio
+        from unittest.mock import MagicMock, patch
+
+        from governance.evidence_store import EvidenceStore
+        from src.orchestrator import validate_proposal_node
+
+        engine = MagicMock()
+        engine.process.return_value = {
+            "overall_valid": True,
+            "needs_human_review": False,
+            "all_errors": [],
+            "all_warnings": [],
+        }
+        store = EvidenceStore(storage_path=str(tmp_path))
+        state = {
+            "job_id": "job-1",
+            "tenant_id": "tenant-001",
+            "file_info": {},
+            "raw_text": self.SOURCE_TEXT,
+            "extracted_data": {"total_amount": 3_000_000, "invoice_no": "1C24TAA"},
+            "proposal": {"entries": []},
+            "steps": [],
+        }
+
+        with (
+            patch("src.orchestrator.get_guardrails_engine", return_value=engine),
+            patch("src.orchestrator.get_evidence_store", return_value=store),
+            patch.object(store, "store_from_output", wraps=store.store_from_output) as stored,
+        ):
+            asyncio.run(validate_proposal_node(state))
+
+        index = engine.process.call_args.kwargs["evidence_index"]
+        assert isinstance(index, SourceEvidenceIndex)
+        assert stored.call_args.kwargs["evidence_index"] is index
+        verified = {e.field_name: e.metadata["verified_in_source"] for e in store.get_for_document("job-1")}
+        assert verified == {"total_amount": False, "_text_evidence": True}
+
+    def test_evidence_store_writes_once_per_document_and_is_bounded(self, tmp_path):
+        """Test output evidence is persisted in one file write and old documents leave memory"""
+        import json
+        from unittest.mock import patch
+
+        from governance.evidence_store import EvidenceStore
+
+        store = EvidenceStore(storage_path=str(tmp_path), max_documents=2)
+        output = {"evidence": {"numbers_found": [{"label": "total_amount", "value": 1}], "key_text_snippets": ["a"]}}
+
+        with patch.object(store, "_persist_evidence", wraps=store._persist_evidence) as persist:
+            ids = store.store_from_output("doc-1", "t1", output)
+        assert persist.call_count == 1 and len(ids) == 2
+
+        store.store_from_output("doc-2", "t1", output)
+        store.store_from_output("doc-3", "t1", output)
+        assert store.get_for_document("doc-1") == [] and store.get(ids[0]) is None
+        assert len(store.get_for_document("doc-3")) == 2
+        assert all(len(ids) == 2 for ids in store._field_index.values())
+        # Evicted documents are still on disk
+        assert len(json.loads((tmp_path / "t1_doc-1.json").read_text())) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -61,7 +61,8 @@ export default function ServerImportModal({ isOpen, onClose }: ServerImportModal
     mutationFn: () => api.importFromServer(selectedPath, filePattern, recursive),
     onSuccess: (data) => {
       queryClient.invalidateQueries({ queryKey: ['documents'] });
-      if (data.data?.imported > 0) {
+      // Imports run in the background on the server; close once one has started
+      if (data.data?.import_id || data.data?.imported > 0) {
         onClose();
       }
     },